@@ -0,0 +1,42 @@
+"""add_column_statistics_profiles
+
+Revision ID: add_column_statistics_profiles
+Revises: 8c1fc67d9224
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_column_statistics_profiles'
+down_revision = '8c1fc67d9224'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One-pass column statistics shared by sampling, profiling and DQ scoring
+    op.create_table(
+        'cycle_report_data_source_column_profiles',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('data_source_id', sa.Integer(), sa.ForeignKey('cycle_report_planning_data_sources.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('source_table', sa.String(255), nullable=False),
+        sa.Column('source_version', sa.String(64), nullable=False),
+        sa.Column('column_name', sa.String(255), nullable=False),
+        sa.Column('row_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('null_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('distinct_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('statistics', postgresql.JSONB(), nullable=False),
+        sa.Column('profiled_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('source_table', 'source_version', 'column_name', name='uq_column_profile_version'),
+        sa.Index('ix_cycle_report_data_source_column_profiles_data_source_id', 'data_source_id'),
+        sa.Index('idx_column_profile_lookup', 'source_table', 'column_name', 'profiled_at')
+    )
+
+
+def downgrade():
+    op.drop_table('cycle_report_data_source_column_profiles')
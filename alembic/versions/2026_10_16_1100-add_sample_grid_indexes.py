@@ -0,0 +1,40 @@
+"""add_sample_grid_indexes
+
+Revision ID: add_sample_grid_indexes
+Revises: add_column_statistics_profiles
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_sample_grid_indexes'
+down_revision = 'add_column_statistics_profiles'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination of the sample grid, in default and identifier order
+    op.create_index(
+        'idx_sample_selection_samples_version_created',
+        'cycle_report_sample_selection_samples',
+        ['version_id', 'created_at', 'sample_id']
+    )
+    op.create_index(
+        'idx_sample_selection_samples_version_identifier',
+        'cycle_report_sample_selection_samples',
+        ['version_id', 'sample_identifier', 'sample_id']
+    )
+    # Samples of approved versions across a phase
+    op.create_index(
+        'idx_sample_selection_samples_phase_version',
+        'cycle_report_sample_selection_samples',
+        ['phase_id', 'version_id']
+    )
+
+
+def downgrade():
+    op.drop_index('idx_sample_selection_samples_phase_version', table_name='cycle_report_sample_selection_samples')
+    op.drop_index('idx_sample_selection_samples_version_identifier', table_name='cycle_report_sample_selection_samples')
+    op.drop_index('idx_sample_selection_samples_version_created', table_name='cycle_report_sample_selection_samples')
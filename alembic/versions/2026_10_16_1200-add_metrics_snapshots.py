@@ -0,0 +1,119 @@
+"""add_metrics_snapshots
+
+Revision ID: add_metrics_snapshots
+Revises: add_sample_grid_indexes
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_metrics_snapshots'
+down_revision = 'add_sample_grid_indexes'
+branch_labels = None
+depends_on = None
+
+# Tables (all with a phase_id column) whose changes invalidate a report's metrics
+SOURCE_TABLES = [
+    'workflow_phases',
+    'cycle_report_planning_attributes',
+    'cycle_report_data_profiling_rule_versions',
+    'cycle_report_data_profiling_rules',
+    'cycle_report_data_profiling_results',
+    'cycle_report_scoping_versions',
+    'cycle_report_scoping_attributes',
+    'cycle_report_sample_selection_versions',
+    'cycle_report_sample_selection_samples',
+    'cycle_report_data_owner_lob_mapping',
+    'cycle_report_test_cases',
+    'cycle_report_test_execution_results',
+    'cycle_report_observation_mgmt_observation_records',
+]
+
+# One trigger per event, because a trigger with transition tables may only fire on one
+TRIGGER_EVENTS = [('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD')]
+
+
+def _trigger_name(table, event):
+    # PostgreSQL identifiers are limited to 63 characters
+    return f"trg_metrics_{event}_{table}"[:63]
+
+
+def upgrade():
+    # Pre-aggregated dashboard metrics per (cycle, report, phase, LOB)
+    op.create_table(
+        'cycle_report_metrics_snapshots',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('cycle_id', sa.Integer(), sa.ForeignKey('test_cycles.cycle_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('report_id', sa.Integer(), sa.ForeignKey('reports.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('phase_name', sa.String(100), nullable=False, server_default=''),
+        sa.Column('lob_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('metrics', postgresql.JSONB(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('compute_ms', sa.Integer(), nullable=True),
+        sa.Column('source_changed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('first_changed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('cycle_id', 'report_id', 'phase_name', 'lob_id', name='uq_metrics_snapshot_scope')
+    )
+    op.create_index(
+        'idx_metrics_snapshot_stale',
+        'cycle_report_metrics_snapshots',
+        ['cycle_id', 'report_id'],
+        postgresql_where=sa.text('source_changed_at > computed_at')
+    )
+
+    # Stamp the snapshots of every report touched by a statement, once per statement.
+    # clock_timestamp() rather than now(): a transaction that started before a
+    # refresh must still mark the refreshed rows stale.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION mark_metrics_snapshots_changed() RETURNS trigger AS $$
+        BEGIN
+            UPDATE cycle_report_metrics_snapshots s
+            SET source_changed_at = clock_timestamp(),
+                -- Only set when the row becomes stale, for staleness age and refresh order
+                first_changed_at = CASE
+                    WHEN s.source_changed_at IS NULL OR s.source_changed_at <= s.computed_at THEN clock_timestamp()
+                    ELSE s.first_changed_at
+                END
+            FROM workflow_phases p
+            WHERE p.phase_id IN (SELECT DISTINCT phase_id FROM changed_rows)
+            AND s.cycle_id = p.cycle_id
+            AND s.report_id = p.report_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in SOURCE_TABLES:
+        for event, transition in TRIGGER_EVENTS:
+            # Skip tables missing from older deployments
+            op.execute(f"""
+                DO $$
+                BEGIN
+                    IF to_regclass('{table}') IS NOT NULL THEN
+                        CREATE TRIGGER {_trigger_name(table, event)}
+                        AFTER {event.upper()} ON {table}
+                        REFERENCING {transition} TABLE AS changed_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION mark_metrics_snapshots_changed();
+                    END IF;
+                END $$;
+            """)
+
+
+def downgrade():
+    for table in SOURCE_TABLES:
+        for event, _ in TRIGGER_EVENTS:
+            op.execute(f"""
+                DO $$
+                BEGIN
+                    IF to_regclass('{table}') IS NOT NULL THEN
+                        DROP TRIGGER IF EXISTS {_trigger_name(table, event)} ON {table};
+                    END IF;
+                END $$;
+            """)
+    op.execute("DROP FUNCTION IF EXISTS mark_metrics_snapshots_changed()")
+    op.drop_index('idx_metrics_snapshot_stale', table_name='cycle_report_metrics_snapshots')
+    op.drop_table('cycle_report_metrics_snapshots')
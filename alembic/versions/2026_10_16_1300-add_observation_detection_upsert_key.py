@@ -0,0 +1,45 @@
+"""add_observation_detection_upsert_key
+
+Revision ID: add_observation_detection_upsert_key
+Revises: add_metrics_snapshots
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_observation_detection_upsert_key'
+down_revision = 'add_metrics_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'cycle_report_observation_mgmt_observation_records',
+        sa.Column('source_lob_id', sa.Integer(), sa.ForeignKey('lobs.lob_id'), nullable=True)
+    )
+    # Conflict target of the auto-detected observation group upsert
+    op.create_index(
+        'uq_observation_auto_detected_group',
+        'cycle_report_observation_mgmt_observation_records',
+        ['phase_id', 'source_attribute_id', 'source_lob_id'],
+        unique=True,
+        postgresql_where=sa.text("detection_method = 'Auto-detected'")
+    )
+    # Failed latest executions of a phase, scanned by detection
+    op.create_index(
+        'idx_test_execution_results_phase_failed',
+        'cycle_report_test_execution_results',
+        ['phase_id', 'id'],
+        postgresql_where=sa.text(
+            "is_latest_execution AND execution_status = 'completed' AND test_result IN ('fail', 'inconclusive')"
+        )
+    )
+
+
+def downgrade():
+    op.drop_index('idx_test_execution_results_phase_failed', table_name='cycle_report_test_execution_results')
+    op.drop_index('uq_observation_auto_detected_group', table_name='cycle_report_observation_mgmt_observation_records')
+    op.drop_column('cycle_report_observation_mgmt_observation_records', 'source_lob_id')
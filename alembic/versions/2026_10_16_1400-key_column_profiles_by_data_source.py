@@ -0,0 +1,44 @@
+"""key_column_profiles_by_data_source
+
+Revision ID: key_column_profiles_by_data_source
+Revises: add_observation_detection_upsert_key
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'key_column_profiles_by_data_source'
+down_revision = 'add_observation_detection_upsert_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables of different data sources may share a name (e.g. public.data_table)
+    op.drop_constraint('uq_column_profile_version', 'cycle_report_data_source_column_profiles', type_='unique')
+    op.create_index(
+        'uq_column_profile_version',
+        'cycle_report_data_source_column_profiles',
+        [sa.text('coalesce(data_source_id, 0)'), 'source_table', 'source_version', 'column_name'],
+        unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('uq_column_profile_version', table_name='cycle_report_data_source_column_profiles')
+    # Profiles of different data sources may now collide on the narrower key
+    op.execute("""
+        DELETE FROM cycle_report_data_source_column_profiles a
+        USING cycle_report_data_source_column_profiles b
+        WHERE a.source_table = b.source_table
+          AND a.source_version = b.source_version
+          AND a.column_name = b.column_name
+          AND a.id < b.id
+    """)
+    op.create_unique_constraint(
+        'uq_column_profile_version',
+        'cycle_report_data_source_column_profiles',
+        ['source_table', 'source_version', 'column_name']
+    )
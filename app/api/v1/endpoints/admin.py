@@ -4,16 +4,19 @@ Clean architecture implementation of Admin API endpoints
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, Query, status, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user, require_roles
+from app.core.dependencies import get_current_user, get_streaming_user, require_roles
+from app.core.exceptions import AuthorizationException
 from app.core.auth import UserRoles
 from app.models.user import User
 from app.services.security_service import get_security_service, SecurityService
 from app.services.backup_service import get_backup_service, BackupService
 from app.services.cache_service import get_cache_service, CacheService
-from app.services.audit_database_service import get_audit_database_service, AuditDatabaseService
+from app.core.response_cache import get_response_cache, GLOBAL_SCOPE, ALL_REPORTS_SCOPE
+from app.services.audit_database_service import get_audit_database_service, AuditDatabaseService, EXPORT_FORMATS
 
 from app.application.dtos.admin import (
     # Security Management
@@ -414,6 +417,31 @@ async def list_cache_keys(
     })
 
 
+@router.get(
+    "/cache/responses",
+    dependencies=[Depends(require_roles([UserRoles.ADMIN]))]
+)
+async def get_response_cache_stats(
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Get HTTP response cache occupancy and per-route hit/miss/eviction counts (Admin only)"""
+    return get_response_cache().get_stats()
+
+
+@router.post(
+    "/cache/responses/invalidate",
+    dependencies=[Depends(require_roles([UserRoles.ADMIN]))]
+)
+async def invalidate_response_cache(
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Invalidate every cached HTTP response on all workers (Admin only)"""
+    cache = get_response_cache()
+    cache.invalidate([ALL_REPORTS_SCOPE])
+    cache.clear()
+    return {"message": "Response cache invalidated", "scopes": [GLOBAL_SCOPE, ALL_REPORTS_SCOPE]}
+
+
 @router.get(
     "/system-health/comprehensive",
     response_model=ComprehensiveSystemHealthDTO,
@@ -455,6 +483,7 @@ async def query_audit_events(
     compliance_only: bool = Query(False, description="Show only compliance-relevant events"),
     limit: int = Query(100, description="Maximum number of events"),
     offset: int = Query(0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces offset)"),
     current_user: User = Depends(get_current_user),
     audit_service: AuditDatabaseService = Depends(get_audit_database_service),
     db: AsyncSession = Depends(get_db)
@@ -478,7 +507,8 @@ async def query_audit_events(
         resource_type=resource_type,
         compliance_only=compliance_only,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
     
     use_case = QueryAuditEventsUseCase(
@@ -554,6 +584,91 @@ async def export_audit_data(
     return await use_case.execute(request_dto)
 
 
+@router.get("/audit/export/stream")
+async def stream_audit_export(
+    start_date: str = Query(..., description="Start date (ISO format)"),
+    end_date: str = Query(..., description="End date (ISO format)"),
+    format: str = Query("ndjson", description="Export format: ndjson, csv, parquet"),
+    event_types: Optional[List[str]] = Query(None, description="Event types to filter"),
+    user_id: Optional[int] = Query(None, description="User ID to filter"),
+    resource_type: Optional[str] = Query(None, description="Resource type to filter"),
+    resource_id: Optional[str] = Query(None, description="Resource ID to filter"),
+    compliance_only: bool = Query(False, description="Export only compliance-relevant events"),
+    current_user: User = Depends(get_streaming_user),
+    audit_service: AuditDatabaseService = Depends(get_audit_database_service)
+) -> StreamingResponse:
+    """
+    Stream audit events in ``(event_timestamp, id)`` order (Admin only)
+    
+    The export is read in keyset pages and written as it is read, so memory use does
+    not depend on the size of the range. No application database session is held
+    while streaming.
+    """
+    if current_user.role != UserRoles.ADMIN:
+        raise AuthorizationException("Access denied. Required roles: ['Admin']")
+    
+    format = format.lower()
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    
+    start_datetime = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+    end_datetime = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+    if end_datetime < start_datetime:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    if not await audit_service.connect():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Audit database unavailable"
+        )
+    
+    chunks = audit_service.stream_export(
+        start_datetime,
+        end_datetime,
+        format,
+        event_types=event_types,
+        user_id=user_id,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        compliance_only=compliance_only
+    )
+    try:
+        # Encode the first page before committing to a 200 (e.g. missing pyarrow)
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b""
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    await audit_service.log_event(
+        event_type="data_export",
+        user_id=current_user.user_id,
+        username=current_user.email,
+        user_role=current_user.role,
+        resource_type="audit_events",
+        action_performed="export",
+        event_description=f"Audit export {start_datetime.isoformat()} to {end_datetime.isoformat()} as {format}"
+    )
+    
+    async def body():
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+    
+    filename = f"audit_{start_datetime:%Y%m%d}_{end_datetime:%Y%m%d}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.delete(
     "/audit/cleanup",
     response_model=AuditCleanupResponseDTO,
@@ -3,7 +3,7 @@ Clean Architecture Authentication API endpoints
 NO FALLBACKS - 100% Clean Architecture
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -21,6 +21,8 @@ from app.application.use_cases.auth import (
     ChangePasswordUseCase,
     GetCurrentUserUseCase
 )
+from app.core.auth import create_stream_ticket
+from app.core.config import settings
 from app.core.dependencies import get_current_user_id
 
 router = APIRouter()
@@ -165,6 +167,28 @@ async def change_password(
         )
 
 
+@router.post("/stream-ticket")
+async def issue_stream_ticket(
+    path: str = Body(..., embed=True),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Issue a short-lived ticket that opens the event stream or WebSocket at ``path``
+
+    Pass it as the ``ticket`` query parameter where the client cannot send an
+    Authorization header (EventSource, browser WebSockets).
+    """
+    if not path.startswith(f"{settings.api_v1_str}/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Stream tickets are only issued for paths under {settings.api_v1_str}"
+        )
+    return {
+        "ticket": create_stream_ticket(user_id, path),
+        "expires_in": settings.stream_ticket_expire_seconds
+    }
+
+
 @router.post("/logout")
 async def logout(
     user_id: int = Depends(get_current_user_id)
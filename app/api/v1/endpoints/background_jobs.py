@@ -2,9 +2,13 @@
 Background Jobs API endpoints for managing long-running operations
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.core.dependencies import get_current_user
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.dependencies import get_current_user, get_streaming_user, authenticate_stream
+from app.core.exceptions import AuthenticationException
+from app.core.job_events import job_event_stream, format_sse
 from app.models.user import User
 from app.core.background_jobs import job_manager
 from app.core.redis_job_manager import get_redis_job_manager
@@ -13,13 +17,22 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 router = APIRouter()
 
+
+def _can_stream_job(job: Dict[str, Any], user: User) -> bool:
+    """Whether ``user`` may follow the job's events: its owner or an admin"""
+    if user.is_admin:
+        return True
+    metadata = job.get("metadata") or {}
+    owner_id = metadata.get("user_id", metadata.get("initiated_by_id"))
+    return owner_id is not None and str(owner_id) == str(user.user_id)
+
 @router.get("/test")
 async def test_jobs_system():
     """
     Test endpoint to check if the background jobs system is working
     """
     active_jobs_count = len(job_manager.get_active_jobs())
-    total_jobs_count = len(job_manager.jobs)
+    total_jobs_count = job_manager.count_jobs()
     
     return {
         "status": "healthy",
@@ -38,7 +51,7 @@ async def get_job_status(
     """
     logger.info(f"🔍 GET /jobs/{job_id}/status called")
     logger.info(f"📊 Current user: {current_user.email if current_user else 'None'}")
-    logger.info(f"📋 Total jobs in manager: {len(job_manager.jobs)}")
+    logger.info(f"📋 Total jobs in manager: {job_manager.count_jobs()}")
     
     # Try Redis job manager first (for Celery tasks)
     redis_job_manager = get_redis_job_manager()
@@ -59,6 +72,75 @@ async def get_job_status(
     logger.info(f"✅ Returning job status for {job_id}")
     return job_status
 
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    last_event_id: Optional[int] = Query(None),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_streaming_user)
+):
+    """
+    Stream job progress as server-sent events
+
+    Sends a ``snapshot`` of the job, then ``progress`` deltas as they happen and a
+    final ``end`` event. Each event carries the job's sequence number as its id, so a
+    reconnecting EventSource resumes where it left off.
+    """
+    job = await run_in_threadpool(job_manager.get_job, job_id)
+    # Other users' jobs are reported as missing rather than forbidden
+    if not job or not _can_stream_job(job, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    async def event_source():
+        async for event, seq, data in job_event_stream(job_id, resume_from, request.is_disconnected):
+            yield format_sse(event, seq, data)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{job_id}/ws")
+async def job_events_websocket(
+    websocket: WebSocket,
+    job_id: str,
+    ticket: Optional[str] = Query(None),
+    last_event_id: Optional[int] = Query(None)
+):
+    """
+    Stream job progress over a WebSocket
+
+    Authenticated by a bearer header or a ``ticket`` from ``POST /auth/stream-ticket``.
+    Messages are ``{"event", "id", "data"}`` with the same events as ``/events``.
+    """
+    try:
+        current_user = await authenticate_stream(
+            websocket.headers.get("authorization"), ticket, websocket.url.path
+        )
+    except AuthenticationException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    job = await run_in_threadpool(job_manager.get_job, job_id)
+    if not job or not _can_stream_job(job, current_user):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        async for event, seq, data in job_event_stream(job_id, last_event_id):
+            await websocket.send_json({"event": event, "id": seq, "data": data})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
 @router.get("/active")
 async def get_active_jobs(
     current_user: User = Depends(get_current_user)
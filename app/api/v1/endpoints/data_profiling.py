@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 import uuid
 import logging
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user, RoleChecker
 from app.models.user import User
@@ -738,7 +739,7 @@ async def execute_profiling_rules(
     RoleChecker(tester_roles + management_roles)(current_user)
     
     try:
-        job_id = await service.execute_approved_rules(version_id)
+        job_id = await service.execute_approved_rules(version_id, user_id=current_user.user_id)
         
         return {
             "success": True,
@@ -810,7 +811,7 @@ async def execute_profiling_for_report(
         
         # Execute the version
         logger.info(f"Executing version {version.version_id}...")
-        job_id = await service.execute_approved_rules(str(version.version_id))
+        job_id = await service.execute_approved_rules(str(version.version_id), user_id=current_user.user_id)
         
         logger.info(f"Execution started with job_id: {job_id}")
         
@@ -2154,7 +2155,9 @@ async def get_job_status(
             "error": job.get("error"),
             "metadata": job.get("metadata", {}),
             "created_at": job.get("created_at"),
-            "updated_at": job.get("updated_at")
+            "updated_at": job.get("updated_at"),
+            # Push alternative to polling this endpoint
+            "events_url": f"{settings.api_v1_str}/jobs/{job_id}/events"
         }
     except HTTPException:
         raise
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 from pydantic import BaseModel
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.core.permissions import require_permission
@@ -589,7 +590,8 @@ async def get_job_status(
     if not job_status:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
-    return job_status
+    # Push alternative to polling this endpoint
+    return {**job_status, "events_url": f"{settings.api_v1_str}/jobs/{job_id}/events"}
 
 
 @router.get("/cycles/{cycle_id}/reports/{report_id}/rules")
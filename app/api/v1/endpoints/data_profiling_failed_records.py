@@ -152,18 +152,22 @@ async def get_failed_records(
     
     if data_source.source_type == 'postgresql':
         try:
-            import psycopg2
+            from contextlib import closing
+            from sqlalchemy.engine import URL
+            from app.core.data_source_pools import get_data_source_pool_registry
             
             connection_config = data_source.connection_config or {}
-            host = connection_config.get('host', 'localhost')
-            port = connection_config.get('port', '5432')
-            database = connection_config.get('database', 'synapse_dt')
-            user = connection_config.get('user', 'synapse_user')
-            password = connection_config.get('password', 'synapse_password')
+            url = URL.create(
+                "postgresql+psycopg2",
+                username=connection_config.get('user', 'synapse_user'),
+                password=connection_config.get('password', 'synapse_password'),
+                host=connection_config.get('host', 'localhost'),
+                port=int(connection_config.get('port', 5432)),
+                database=connection_config.get('database', 'synapse_dt'),
+            )
+            engine = get_data_source_pool_registry().get_sync_engine(url, connection_config.get('max_pool_size'))
             
-            conn_str = f"host={host} port={port} dbname={database} user={user} password={password}"
-            
-            with psycopg2.connect(conn_str) as conn:
+            with closing(engine.raw_connection()) as conn:
                 table_name = connection_config.get('table_name', 'data_table')
                 schema_name = connection_config.get('schema', 'public')
                 
@@ -2,8 +2,10 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth import UserRoles
+from app.core.data_source_pools import get_data_source_pool_registry
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, require_roles
 from app.core.permissions import require_permission
 from app.models.user import User
 from app.application.dtos.data_source import (
@@ -142,4 +144,28 @@ async def get_data_source_stats(
     - Breakdown by database type
     - Recent connection test results
     """
-    return await DataSourceUseCase.get_stats(current_user, db)
\ No newline at end of file
+    return await DataSourceUseCase.get_stats(current_user, db)
+
+
+@router.get(
+    "/pools/stats",
+    dependencies=[Depends(require_roles([UserRoles.ADMIN]))]
+)
+async def get_data_source_pool_stats(
+    health_check: bool = Query(False, description="Run SELECT 1 through each pool"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get occupancy and health of the shared data source connection pools (Admin only).
+    
+    Returns:
+    - Pool size, checked-out and idle connections per data source
+    - Checkout and error counters, age and idle time
+    - Optional per-pool health check results
+    """
+    registry = get_data_source_pool_registry()
+    await registry.evict_idle()
+    stats = registry.get_stats()
+    if health_check:
+        stats["health"] = await registry.health_check()
+    return stats
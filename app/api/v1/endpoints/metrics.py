@@ -1235,4 +1235,100 @@ async def get_test_executive_metrics_redesigned(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate test executive metrics: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/snapshots/cycles/{cycle_id}")
+@require_permission("metrics", "read")
+async def get_cycle_metrics_snapshots(
+    cycle_id: int,
+    lob_id: Optional[int] = Query(None, description="Sample and test case metrics of one LOB"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the metrics snapshot of every report in a cycle with their staleness"""
+    try:
+        from sqlalchemy import select
+        from app.models.cycle_report import CycleReport
+        from app.models.metrics_snapshot import ALL_LOBS
+        from app.services.metrics_snapshot_service import get_metrics_snapshot_service
+        
+        reports = await get_metrics_snapshot_service(db).get_cycle_metrics(
+            cycle_id, lob_id=lob_id if lob_id is not None else ALL_LOBS
+        )
+        cycle_report_ids = (await db.execute(
+            select(CycleReport.report_id).where(CycleReport.cycle_id == cycle_id)
+        )).scalars().all()
+        snapshot_report_ids = {report["report_id"] for report in reports}
+        
+        def total(*path):
+            values = []
+            for report in reports:
+                value = report["metrics"]
+                for key in path:
+                    value = value.get(key, {}) if isinstance(value, dict) else {}
+                values.append(value if isinstance(value, (int, float)) else 0)
+            return sum(values)
+        
+        return {
+            "cycle_id": cycle_id,
+            "lob_id": lob_id,
+            "reports": reports,
+            "totals": {
+                "approved_samples": total("approved_samples"),
+                "test_cases": {
+                    "total": total("test_cases", "total"),
+                    "passed": total("test_cases", "passed"),
+                    "failed": total("test_cases", "failed"),
+                    "pending": total("test_cases", "pending")
+                }
+            },
+            "staleness": {
+                "stale_reports": sum(1 for report in reports if report["snapshot"]["is_stale"]),
+                "oldest_computed_at": min((report["snapshot"]["computed_at"] for report in reports), default=None),
+                # Reports nobody has opened yet; their snapshot is built on first read
+                "reports_without_snapshot": [
+                    report_id for report_id in cycle_report_ids if report_id not in snapshot_report_ids
+                ] if lob_id is None else []
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get cycle metrics snapshots: {str(e)}"
+        )
+
+
+@router.get("/snapshots/{cycle_id}/{report_id}")
+@require_permission("metrics", "read")
+async def get_report_metrics_snapshot(
+    cycle_id: int,
+    report_id: int,
+    phase_name: Optional[str] = Query(None, description="Also return this phase's metrics"),
+    lob_id: Optional[int] = Query(None, description="Sample and test case metrics of one LOB"),
+    refresh: bool = Query(False, description="Recompute before returning"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a report's metrics snapshot, recomputing it when missing or stale for too long"""
+    try:
+        from app.models.metrics_snapshot import ALL_LOBS
+        from app.services.metrics_snapshot_service import get_metrics_snapshot_service
+        
+        return await get_metrics_snapshot_service(db).get_report_metrics(
+            cycle_id,
+            report_id,
+            phase_name=phase_name,
+            lob_id=lob_id if lob_id is not None else ALL_LOBS,
+            refresh=refresh
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get report metrics snapshot: {str(e)}"
+        )
@@ -12,8 +12,6 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, text
 from sqlalchemy.orm import selectinload
-import PyPDF2
-import io
 import json
 import asyncpg
 
@@ -42,6 +40,7 @@ from app.schemas.planning import (
     AttributeBulkVersionRequest, AttributeBulkVersionResponse
 )
 from app.services.llm_service import get_llm_service
+from app.services.document_text_service import get_document_text_service
 from app.services.workflow_orchestrator import WorkflowOrchestrator
 from app.services.attribute_versioning_service import AttributeVersioningService
 from app.core.exceptions import ValidationException, NotFoundException, BusinessLogicException
@@ -397,10 +396,7 @@ async def upload_planning_document(
     extracted_text = None
     if file.content_type == "application/pdf":
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-            extracted_text = ""
-            for page in pdf_reader.pages:
-                extracted_text += page.extract_text() + "\n"
+            extracted_text = (await get_document_text_service().extract_bytes(content, ".pdf")).text
         except Exception as e:
             logger.warning(f"Failed to extract PDF text: {e}")
     
@@ -20,6 +20,7 @@ from app.models.request_info import CycleReportTestCase, RFIDataSource
 from app.models.cycle_report_data_source import CycleReportDataSource
 from app.models.report_attribute import ReportAttribute
 from app.services.llm_service import HybridLLMService
+from app.services.document_text_service import get_document_text_service
 from app.application.dtos.request_info import (
     RequestInfoPhaseStartDTO,
     TestCaseCreateDTO,
@@ -2228,22 +2229,10 @@ async def extract_document_values(
             logger.info(f"Reading document from file path: {file_path}")
             
             if file_path and os.path.exists(file_path):
-                # For PDFs, we need to extract text first
-                if file_path.endswith('.pdf'):
-                    import PyPDF2
-                    logger.info(f"Reading PDF file: {file_path}")
-                    with open(file_path, 'rb') as pdf_file:
-                        pdf_reader = PyPDF2.PdfReader(pdf_file)
-                        logger.info(f"PDF has {len(pdf_reader.pages)} pages")
-                        for page in pdf_reader.pages:
-                            page_text = page.extract_text()
-                            document_text += page_text + "\n"
-                    logger.info(f"Extracted PDF content length: {len(document_text)}")
-                else:
-                    logger.info(f"Reading text file: {file_path}")
-                    with open(file_path, 'r') as text_file:
-                        document_text = text_file.read()
-                    logger.info(f"Read text content length: {len(document_text)}")
+                # Parsed off the event loop; repeat reads of the same file hit the cache
+                document = await get_document_text_service().extract_file(file_path, file_hash=evidence.file_hash)
+                document_text = document.text
+                logger.info(f"Extracted document content length: {len(document_text)} ({document.page_count} pages)")
             else:
                 logger.warning(f"File does not exist at path: {file_path}")
                 raise HTTPException(
@@ -2257,16 +2246,10 @@ async def extract_document_values(
             logger.info(f"Processing uploaded file: {file.filename}, size: {len(content)} bytes")
             
             if file.filename.lower().endswith('.pdf'):
-                import PyPDF2
-                import io
                 try:
-                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-                    num_pages = len(pdf_reader.pages)
-                    logger.info(f"PDF has {num_pages} pages")
-                    for i, page in enumerate(pdf_reader.pages):
-                        page_text = page.extract_text()
-                        logger.info(f"Page {i+1} extracted {len(page_text)} characters")
-                        document_text += page_text + "\n"
+                    document = await get_document_text_service().extract_bytes(content, ".pdf")
+                    document_text = document.text
+                    logger.info(f"PDF has {document.page_count} pages")
                     logger.info(f"Total PDF text extracted: {len(document_text)} characters")
                 except Exception as pdf_error:
                     logger.error(f"PDF extraction error: {str(pdf_error)}", exc_info=True)
@@ -42,7 +42,6 @@ from app.models.cycle_report_data_source import CycleReportDataSource
 from app.models.planning import PlanningPDEMapping
 from app.core.background_jobs import job_manager, BackgroundJobManager
 from app.core.redis_job_manager import get_redis_job_manager
-from app.core.database import AsyncSessionLocal
 from app.tasks.sample_selection_tasks import execute_intelligent_sampling_task
 from app.api.v1.utils.deprecation import deprecated_endpoint
 from app.services.universal_assignment_service import UniversalAssignmentService
@@ -422,8 +421,8 @@ async def get_samples(
     if not phase:
         raise HTTPException(status_code=404, detail="Sample Selection phase not found")
     
-    # Migrate from phase_data if needed (one-time operation)
-    await SampleSelectionTableService.migrate_from_phase_data(db, phase, current_user.user_id)
+    # Migrate from phase_data if needed (once per phase)
+    await SampleSelectionTableService.ensure_phase_migrated(db, phase, current_user.user_id)
     
     # Get samples from version tables
     samples, version_obj = await SampleSelectionTableService.get_samples_for_display(
@@ -433,6 +432,68 @@ async def get_samples(
     return {"samples": samples}
 
 
+@router.get("/cycles/{cycle_id}/reports/{report_id}/samples/grid")
+async def get_samples_grid(
+    cycle_id: int,
+    report_id: int,
+    version: Optional[int] = Query(None),
+    approved_only: bool = Query(False, description="Samples of all approved versions instead of one version"),
+    lob_id: Optional[List[int]] = Query(None),
+    unassigned_lob: bool = Query(False, description="Include samples without a LOB in the LOB filter"),
+    tester_decision: Optional[List[str]] = Query(None),
+    report_owner_decision: Optional[List[str]] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    sort_by: str = Query("created_at", description="Sample field or sample_data.<key>"),
+    sort_dir: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
+    columns: Optional[List[str]] = Query(None, description="sample_data keys to return; all when omitted"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get one page of samples for the review grid, filtered and sorted server-side"""
+    if current_user.role not in ["Tester", "Test Manager", "Report Owner", "Report Owner Executive"]:
+        raise HTTPException(status_code=403, detail="Not authorized to view samples")
+    
+    phase_query = await db.execute(
+        select(WorkflowPhase).where(
+            and_(
+                WorkflowPhase.cycle_id == cycle_id,
+                WorkflowPhase.report_id == report_id,
+                WorkflowPhase.phase_name == "Sample Selection"
+            )
+        )
+    )
+    phase = phase_query.scalar_one_or_none()
+    
+    if not phase:
+        raise HTTPException(status_code=404, detail="Sample Selection phase not found")
+    
+    await SampleSelectionTableService.ensure_phase_migrated(db, phase, current_user.user_id)
+    
+    try:
+        return await SampleSelectionTableService.get_samples_page(
+            db,
+            phase.phase_id,
+            version_number=version,
+            approved_only=approved_only,
+            lob_ids=lob_id,
+            unassigned_lob=unassigned_lob,
+            tester_decisions=tester_decision,
+            report_owner_decisions=report_owner_decision,
+            categories=category,
+            sort_by=sort_by,
+            sort_desc=sort_dir == "desc",
+            limit=limit,
+            cursor=cursor,
+            columns=columns,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ============= INTERNAL SAMPLE GENERATION FUNCTIONS =============
 # These are the core functions that do the actual work, without decorators
 
@@ -878,8 +939,8 @@ async def generate_samples(
         if not phase:
             raise HTTPException(status_code=404, detail="Sample Selection phase not found")
         
-        # Migrate from phase_data if needed (one-time operation)
-        await SampleSelectionTableService.migrate_from_phase_data(db, phase, current_user.user_id)
+        # Migrate from phase_data if needed (once per phase)
+        await SampleSelectionTableService.ensure_phase_migrated(db, phase, current_user.user_id)
         
         # Get or create current version
         version = await SampleSelectionTableService.get_or_create_version(
@@ -1952,209 +2013,206 @@ async def get_sample_analytics(
     cycle_id: int,
     report_id: int,
     version_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get analytics for sample selection phase"""
-    # Create a fresh database session to avoid transaction issues
-    from app.core.database import AsyncSessionLocal
-    
-    async with AsyncSessionLocal() as db:
+    try:
+        # Get workflow phase first, before any potential transaction errors
+        phase_query = await db.execute(
+            text("""
+                SELECT phase_id, cycle_id, report_id, phase_name, status, phase_data, 
+                       actual_start_date, created_at
+                FROM workflow_phases 
+                WHERE cycle_id = :cycle_id 
+                AND report_id = :report_id 
+                AND phase_name::text = 'Sample Selection'
+            """),
+            {"cycle_id": cycle_id, "report_id": report_id}
+        )
+        phase_row = phase_query.first()
+        
+        # Default metrics in case service fails
+        metrics_dict = {
+            "total_attributes": 0,
+            "scoped_attributes_non_pk": 0,
+            "scoped_attributes_pk": 0,
+            "lobs_count": 0,
+            "data_providers_count": 0
+        }
+        
+        # Try to get metrics from universal service in a savepoint of the request session
         try:
-            # Get workflow phase first, before any potential transaction errors
-            phase_query = await db.execute(
-                text("""
-                    SELECT phase_id, cycle_id, report_id, phase_name, status, phase_data, 
-                           actual_start_date, created_at
-                    FROM workflow_phases 
-                    WHERE cycle_id = :cycle_id 
-                    AND report_id = :report_id 
-                    AND phase_name::text = 'Sample Selection'
-                """),
-                {"cycle_id": cycle_id, "report_id": report_id}
-            )
-            phase_row = phase_query.first()
-            
-            # Default metrics in case service fails
-            metrics_dict = {
-                "total_attributes": 0,
-                "scoped_attributes_non_pk": 0,
-                "scoped_attributes_pk": 0,
-                "lobs_count": 0,
-                "data_providers_count": 0
-            }
-            
-            # Try to get metrics from universal service in a separate transaction
-            try:
-                # Use a separate session for metrics to avoid transaction contamination
-                async with AsyncSessionLocal() as metrics_db:
-                    from app.services.universal_metrics_service import get_universal_metrics_service, MetricsContext
-                    
-                    context = MetricsContext(
-                        cycle_id=cycle_id,
-                        report_id=report_id,
-                        user_id=current_user.user_id,
-                        user_role=current_user.role,
-                        phase_name="Sample Selection"
-                    )
-                    
-                    metrics_service = get_universal_metrics_service(metrics_db)
-                    
-                    # Get phase-specific metrics directly to avoid enum issues
-                    phase_metrics = await metrics_service.get_phase_specific_metrics(context)
-                    
-                    # Update metrics if we got them
-                    if phase_metrics:
-                        metrics_dict.update({
-                            "total_attributes": phase_metrics.get("total_attributes", 0),
-                            "scoped_attributes_non_pk": phase_metrics.get("scoped_attributes_non_pk", 0),
-                            "scoped_attributes_pk": phase_metrics.get("scoped_attributes_pk", 0),
-                            "lobs_count": phase_metrics.get("lobs_count", 0),
-                            "data_providers_count": phase_metrics.get("data_providers_count", 0)
-                        })
-            except Exception as e:
-                logger.warning(f"Failed to get universal metrics, using defaults: {e}")
-            
-            # Convert to object-like structure if found
-            phase = None
-            if phase_row:
-                from types import SimpleNamespace
-                phase = SimpleNamespace(
-                    phase_id=phase_row.phase_id,
-                    status=phase_row.status,
-                    phase_data=phase_row.phase_data,
-                    actual_start_date=phase_row.actual_start_date,
-                    created_at=phase_row.created_at
-                )
-            
-            if not phase:
-                return {
-                    "total_samples": 0,
-                    "included_samples": 0,
-                    "excluded_samples": 0,
-                    "pending_samples": 0,
-                    "submitted_samples": 0,
-                    "approved_samples": 0,
-                    "rejected_samples": 0,
-                    "revision_required_samples": 0,
-                    "phase_status": "Not Started",
-                    "can_complete_phase": False,
-                    "total_submissions": 0,
-                    "latest_submission": None,
-                    # Metrics from Universal Metrics Service
-                    "total_attributes": metrics_dict["total_attributes"],
-                    "scoped_attributes": metrics_dict["scoped_attributes_non_pk"],  # Non-PK for consistency
-                    "pk_attributes": metrics_dict["scoped_attributes_pk"],
-                    "total_lobs": metrics_dict["lobs_count"],
-                    "total_data_providers": metrics_dict["data_providers_count"],
-                    "started_at": None,
-                    # Add days elapsed
-                    "days_elapsed": 0
-                }
-            
-            # Calculate stats from samples table
-            from app.models.sample_selection import SampleSelectionSample, SampleSelectionVersion
-            
-            # Get the latest approved version
-            version_query = await db.execute(
-                select(SampleSelectionVersion).where(
-                    and_(
-                        SampleSelectionVersion.phase_id == phase.phase_id,
-                        SampleSelectionVersion.version_status == VersionStatus.APPROVED
-                    )
-                ).order_by(SampleSelectionVersion.version_number.desc()).limit(1)
-            )
-            approved_version = version_query.scalar_one_or_none()
-            
-            if not approved_version:
-                # If no approved version, get the latest version
-                version_query = await db.execute(
-                    select(SampleSelectionVersion).where(
-                        SampleSelectionVersion.phase_id == phase.phase_id
-                    ).order_by(SampleSelectionVersion.version_number.desc()).limit(1)
-                )
-                approved_version = version_query.scalar_one_or_none()
-            
-            # Get samples from the specific version
-            if approved_version:
-                samples_query = await db.execute(
-                    select(SampleSelectionSample).where(
-                        and_(
-                            SampleSelectionSample.phase_id == phase.phase_id,
-                            SampleSelectionSample.version_id == approved_version.version_id
-                        )
-                    )
+            # A failed metrics query rolls back to the savepoint instead of aborting the request transaction
+            async with db.begin_nested():
+                from app.services.universal_metrics_service import get_universal_metrics_service, MetricsContext
+                
+                context = MetricsContext(
+                    cycle_id=cycle_id,
+                    report_id=report_id,
+                    user_id=current_user.user_id,
+                    user_role=current_user.role,
+                    phase_name="Sample Selection"
                 )
-                samples = samples_query.scalars().all()
-            else:
-                samples = []
-            
-            stats = {
-                'total': len(samples),
-                'included': sum(1 for s in samples if s.tester_decision == 'approved'),
-                'excluded': sum(1 for s in samples if s.tester_decision == 'rejected'),
-                'pending': sum(1 for s in samples if not s.tester_decision),
-                'submitted': sum(1 for s in samples if s.report_owner_decision is not None),
-                'approved': sum(1 for s in samples if s.report_owner_decision == 'approved'),  # Report owner approved samples
-                'rejected': sum(1 for s in samples if s.report_owner_decision == 'rejected'),
-                'revision_required': sum(1 for s in samples if s.report_owner_decision == 'revision_required')
-            }
-            
-            # Get latest submission info
-            submissions = phase.phase_data.get('submissions', []) if phase.phase_data else []
-            latest_submission = None
-            
-            if submissions:
-                # Sort by version number to get latest
-                sorted_submissions = sorted(submissions, key=lambda x: x.get('version_number', 0), reverse=True)
-                latest = sorted_submissions[0]
-                latest_submission = {
-                    "submission_id": latest.get('submission_id'),
-                    "version": latest.get('version_number'),
-                    "status": latest.get('status', 'pending'),
-                    "submitted_at": latest.get('submitted_at'),
-                    "submitted_by": latest.get('submitted_by'),
-                    "included_samples": latest.get('included_samples', 0),
-                    "total_samples": latest.get('total_samples', 0)
-                }
-            
-            # Determine if can complete phase
-            can_complete = (
-                phase.status == "Pending Approval" and
-                stats['approved'] > 0 and
-                latest_submission and
-                latest_submission['status'] == 'approved'
+                
+                metrics_service = get_universal_metrics_service(db)
+                
+                # Get phase-specific metrics directly to avoid enum issues
+                phase_metrics = await metrics_service.get_phase_specific_metrics(context)
+                
+                # Update metrics if we got them
+                if phase_metrics:
+                    metrics_dict.update({
+                        "total_attributes": phase_metrics.get("total_attributes", 0),
+                        "scoped_attributes_non_pk": phase_metrics.get("scoped_attributes_non_pk", 0),
+                        "scoped_attributes_pk": phase_metrics.get("scoped_attributes_pk", 0),
+                        "lobs_count": phase_metrics.get("lobs_count", 0),
+                        "data_providers_count": phase_metrics.get("data_providers_count", 0)
+                    })
+        except Exception as e:
+            logger.warning(f"Failed to get universal metrics, using defaults: {e}")
+        
+        # Convert to object-like structure if found
+        phase = None
+        if phase_row:
+            from types import SimpleNamespace
+            phase = SimpleNamespace(
+                phase_id=phase_row.phase_id,
+                status=phase_row.status,
+                phase_data=phase_row.phase_data,
+                actual_start_date=phase_row.actual_start_date,
+                created_at=phase_row.created_at
             )
-            
+        
+        if not phase:
             return {
-                "total_samples": stats['total'],
-                "included_samples": stats['included'],
-                "excluded_samples": stats['excluded'],
-                "pending_samples": stats['pending'],
-                "submitted_samples": stats['submitted'],
-                "approved_samples": stats['approved'],
-                "rejected_samples": stats['rejected'],
-                "revision_required_samples": stats['revision_required'],
-                "phase_status": phase.status,
-                "can_complete_phase": can_complete,
-                "total_submissions": len(submissions),
-                "latest_submission": latest_submission,
+                "total_samples": 0,
+                "included_samples": 0,
+                "excluded_samples": 0,
+                "pending_samples": 0,
+                "submitted_samples": 0,
+                "approved_samples": 0,
+                "rejected_samples": 0,
+                "revision_required_samples": 0,
+                "phase_status": "Not Started",
+                "can_complete_phase": False,
+                "total_submissions": 0,
+                "latest_submission": None,
                 # Metrics from Universal Metrics Service
                 "total_attributes": metrics_dict["total_attributes"],
                 "scoped_attributes": metrics_dict["scoped_attributes_non_pk"],  # Non-PK for consistency
                 "pk_attributes": metrics_dict["scoped_attributes_pk"],
                 "total_lobs": metrics_dict["lobs_count"],
                 "total_data_providers": metrics_dict["data_providers_count"],
-                "started_at": phase.actual_start_date.isoformat() if phase.actual_start_date else None,
+                "started_at": None,
                 # Add days elapsed
-                "days_elapsed": (datetime.now(timezone.utc) - phase.created_at).days if phase.created_at else 0
+                "days_elapsed": 0
             }
-            
-        except Exception as e:
-            logger.error(f"Error in get_sample_analytics: {str(e)}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-            # Rollback the transaction if it's in a bad state
-            await db.rollback()
-            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        
+        # Calculate stats from samples table
+        from app.models.sample_selection import SampleSelectionSample, SampleSelectionVersion
+        
+        # Get the latest approved version
+        version_query = await db.execute(
+            select(SampleSelectionVersion).where(
+                and_(
+                    SampleSelectionVersion.phase_id == phase.phase_id,
+                    SampleSelectionVersion.version_status == VersionStatus.APPROVED
+                )
+            ).order_by(SampleSelectionVersion.version_number.desc()).limit(1)
+        )
+        approved_version = version_query.scalar_one_or_none()
+        
+        if not approved_version:
+            # If no approved version, get the latest version
+            version_query = await db.execute(
+                select(SampleSelectionVersion).where(
+                    SampleSelectionVersion.phase_id == phase.phase_id
+                ).order_by(SampleSelectionVersion.version_number.desc()).limit(1)
+            )
+            approved_version = version_query.scalar_one_or_none()
+        
+        # Get samples from the specific version
+        if approved_version:
+            samples_query = await db.execute(
+                select(SampleSelectionSample).where(
+                    and_(
+                        SampleSelectionSample.phase_id == phase.phase_id,
+                        SampleSelectionSample.version_id == approved_version.version_id
+                    )
+                )
+            )
+            samples = samples_query.scalars().all()
+        else:
+            samples = []
+        
+        stats = {
+            'total': len(samples),
+            'included': sum(1 for s in samples if s.tester_decision == 'approved'),
+            'excluded': sum(1 for s in samples if s.tester_decision == 'rejected'),
+            'pending': sum(1 for s in samples if not s.tester_decision),
+            'submitted': sum(1 for s in samples if s.report_owner_decision is not None),
+            'approved': sum(1 for s in samples if s.report_owner_decision == 'approved'),  # Report owner approved samples
+            'rejected': sum(1 for s in samples if s.report_owner_decision == 'rejected'),
+            'revision_required': sum(1 for s in samples if s.report_owner_decision == 'revision_required')
+        }
+        
+        # Get latest submission info
+        submissions = phase.phase_data.get('submissions', []) if phase.phase_data else []
+        latest_submission = None
+        
+        if submissions:
+            # Sort by version number to get latest
+            sorted_submissions = sorted(submissions, key=lambda x: x.get('version_number', 0), reverse=True)
+            latest = sorted_submissions[0]
+            latest_submission = {
+                "submission_id": latest.get('submission_id'),
+                "version": latest.get('version_number'),
+                "status": latest.get('status', 'pending'),
+                "submitted_at": latest.get('submitted_at'),
+                "submitted_by": latest.get('submitted_by'),
+                "included_samples": latest.get('included_samples', 0),
+                "total_samples": latest.get('total_samples', 0)
+            }
+        
+        # Determine if can complete phase
+        can_complete = (
+            phase.status == "Pending Approval" and
+            stats['approved'] > 0 and
+            latest_submission and
+            latest_submission['status'] == 'approved'
+        )
+        
+        return {
+            "total_samples": stats['total'],
+            "included_samples": stats['included'],
+            "excluded_samples": stats['excluded'],
+            "pending_samples": stats['pending'],
+            "submitted_samples": stats['submitted'],
+            "approved_samples": stats['approved'],
+            "rejected_samples": stats['rejected'],
+            "revision_required_samples": stats['revision_required'],
+            "phase_status": phase.status,
+            "can_complete_phase": can_complete,
+            "total_submissions": len(submissions),
+            "latest_submission": latest_submission,
+            # Metrics from Universal Metrics Service
+            "total_attributes": metrics_dict["total_attributes"],
+            "scoped_attributes": metrics_dict["scoped_attributes_non_pk"],  # Non-PK for consistency
+            "pk_attributes": metrics_dict["scoped_attributes_pk"],
+            "total_lobs": metrics_dict["lobs_count"],
+            "total_data_providers": metrics_dict["data_providers_count"],
+            "started_at": phase.actual_start_date.isoformat() if phase.actual_start_date else None,
+            # Add days elapsed
+            "days_elapsed": (datetime.now(timezone.utc) - phase.created_at).days if phase.created_at else 0
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in get_sample_analytics: {str(e)}")
+        logger.error(f"Full traceback: {traceback.format_exc()}")
+        # Rollback the transaction if it's in a bad state
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/cycles/{cycle_id}/reports/{report_id}/samples/feedback")
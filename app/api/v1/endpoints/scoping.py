@@ -20,7 +20,6 @@ from app.core.exceptions import (
     ValidationError, NotFoundError, ConflictError, 
     BusinessLogicError, PermissionError
 )
-from app.core.background_jobs import BackgroundJobManager
 from app.core.permissions import require_permission
 from app.models.user import User
 from app.models.scoping import ScopingVersion, ScopingAttribute, VersionStatus, TesterDecision
@@ -884,7 +883,6 @@ async def generate_scoping_recommendations(
         cycle = cycle_result.scalar_one_or_none()
         
         # Start background job for LLM recommendations
-        job_manager = BackgroundJobManager()
         job_id = str(uuid.uuid4())
         
         # Use Redis job manager for cross-container state
@@ -893,9 +891,10 @@ async def generate_scoping_recommendations(
         
         # Create job record in Redis
         redis_job_manager.create_job(
-            job_id,
-            job_type="scoping_llm_recommendations",
+            "scoping_llm_recommendations",
+            job_id=job_id,
             metadata={
+                "user_id": current_user.user_id,
                 "version_id": str(version_id),
                 "phase_id": version.phase_id,
                 "cycle_id": phase.cycle_id,
@@ -1165,12 +1164,14 @@ async def bulk_approve_attributes(
     
     Request body:
     {
-        "attribute_ids": ["uuid1", "uuid2", ...],
-        "notes": "Optional approval notes"
+        "attribute_ids": [101, 102, ...],
+        "notes": "Optional approval notes",
+        "version_id": "Optional version UUID (defaults to the draft or pending version)"
     }
     """
     try:
-        attribute_ids = [UUID(id_str) for id_str in request.get("attribute_ids", [])]
+        attribute_ids = [int(id_str) for id_str in request.get("attribute_ids", [])]
+        version_id = UUID(request["version_id"]) if request.get("version_id") else None
         notes = request.get("notes")
         
         service = ScopingService(db)
@@ -1178,7 +1179,8 @@ async def bulk_approve_attributes(
             attribute_ids=attribute_ids,
             user_id=current_user.user_id,
             user_role=current_user.role,
-            notes=notes
+            notes=notes,
+            version_id=version_id
         )
         
         return result
@@ -1204,13 +1206,15 @@ async def bulk_reject_attributes(
     
     Request body:
     {
-        "attribute_ids": ["uuid1", "uuid2", ...],
+        "attribute_ids": [101, 102, ...],
         "reason": "Reason for rejection",
-        "notes": "Optional additional notes"
+        "notes": "Optional additional notes",
+        "version_id": "Optional version UUID (defaults to the draft or pending version)"
     }
     """
     try:
-        attribute_ids = [UUID(id_str) for id_str in request.get("attribute_ids", [])]
+        attribute_ids = [int(id_str) for id_str in request.get("attribute_ids", [])]
+        version_id = UUID(request["version_id"]) if request.get("version_id") else None
         reason = request.get("reason")
         notes = request.get("notes")
         
@@ -1223,7 +1227,8 @@ async def bulk_reject_attributes(
             user_id=current_user.user_id,
             user_role=current_user.role,
             reason=reason,
-            notes=notes
+            notes=notes,
+            version_id=version_id
         )
         
         return result
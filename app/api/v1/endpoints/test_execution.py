@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select, and_, or_, func, desc
 
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.core.exceptions import ValidationError, ResourceNotFoundError, BusinessLogicError
@@ -29,6 +30,7 @@ from app.services.database_connection_service import DatabaseConnectionService
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
+settings = get_settings()
 router = APIRouter()
 
 
@@ -62,8 +64,28 @@ async def execute_test_cases_for_report(
         
         execution_results = []
         errors = []
+        test_case_ids = request.test_case_ids
+        
+        # Database evidence sharing a query template runs as one query per data source;
+        # the remaining test cases are executed one by one below
+        configuration = request.configuration or {}
+        if (
+            settings.test_execution_batch_enabled
+            and configuration.get("batch_execution", True)
+            and not configuration.get("execute_in_background", False)
+        ):
+            batch = await service.execute_test_cases_batch(
+                [test_case_id for test_case_id in test_case_ids if test_case_id],
+                phase_id,
+                request.execution_reason,
+                request.execution_method,
+                current_user.user_id
+            )
+            execution_results.extend(batch["execution_ids"].values())
+            batched = set(batch["execution_ids"])
+            test_case_ids = [test_case_id for test_case_id in test_case_ids if test_case_id not in batched]
         
-        for test_case_id in request.test_case_ids:
+        for test_case_id in test_case_ids:
             try:
                 # Get approved evidence for test case
                 try:
@@ -20,6 +20,7 @@ from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.core.permissions import require_permission
 from app.services.llm_service import get_llm_service
+from app.services.document_text_service import get_document_text_service
 from app.core.prompt_manager import prompt_manager
 from app.models.user import User
 from app.models.test_cycle import TestCycle
@@ -101,18 +102,13 @@ def simulate_database_testing(
         "query_plan": "Index Scan using sample_id_idx (cost=0.29..8.30 rows=1 width=32)"
     }
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF file"""
+async def extract_document_text(file_path: str, file_hash: Optional[str] = None) -> str:
+    """Extract text from a PDF or text document, off the event loop and cached by content hash"""
     try:
-        import PyPDF2
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+        document = await get_document_text_service().extract_file(file_path, file_hash=file_hash)
+        return document.text
     except Exception as e:
-        logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
+        logger.error(f"Error extracting text from document {file_path}: {str(e)}")
         return ""
 
 def classify_document_type(document_text: str, typical_source_documents: str) -> Dict[str, Any]:
@@ -2208,15 +2204,7 @@ async def perform_real_document_analysis(
     file_path = document.file_path
     
     # Extract text from document (file existence already verified)
-    if file_path.lower().endswith('.pdf'):
-        document_text = extract_text_from_pdf(file_path)
-    else:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                document_text = f.read()
-        except Exception as e:
-            logger.error(f"Error reading file {file_path}: {str(e)}")
-            document_text = ""
+    document_text = await extract_document_text(file_path, getattr(document, 'file_hash', None))
     
     if not document_text.strip():
         return {
@@ -14,6 +14,8 @@ from app.services.universal_metrics_service import (
     MetricsContext,
     UniversalMetrics
 )
+from app.services.metrics_snapshot_service import get_metrics_snapshot_service, universal_metrics_to_dict
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -26,6 +28,7 @@ async def get_universal_metrics(
     cycle_id: int,
     report_id: int,
     phase_name: Optional[str] = Query(None, description="Optional phase name for phase-specific metrics"),
+    refresh: bool = Query(False, description="Recompute instead of serving the metrics snapshot"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
@@ -39,10 +42,26 @@ async def get_universal_metrics(
     - Approved samples and their LOBs
     - Data providers
     - Test cases (total, passed, failed, pending)
+    
+    Served from the report's metrics snapshot; ``snapshot`` tells how old it is
+    and whether source rows changed since.
     """
     try:
         logger.info(f"Getting universal metrics for cycle {cycle_id}, report {report_id}, phase {phase_name}")
         
+        if settings.metrics_snapshot_enabled:
+            response = await get_metrics_snapshot_service(db).get_report_metrics(
+                cycle_id, report_id, phase_name=phase_name, refresh=refresh
+            )
+            response.pop("lob_id", None)
+            response["calculated_at"] = response["snapshot"]["computed_at"]
+            response["context"] = {
+                "user_id": current_user.user_id,
+                "user_role": current_user.role,
+                "phase_name": phase_name
+            }
+            return response
+        
         # Create metrics context
         context = MetricsContext(
             cycle_id=cycle_id,
@@ -63,32 +82,7 @@ async def get_universal_metrics(
         response = {
             "cycle_id": cycle_id,
             "report_id": report_id,
-            "metrics": {
-                # Core metrics
-                "total_attributes": metrics.total_attributes,
-                "all_dq_rules": metrics.all_dq_rules,
-                "approved_dq_rules": metrics.approved_dq_rules,
-                "scoped_attributes": {
-                    "primary_key": metrics.scoped_attributes_pk,
-                    "non_primary_key": metrics.scoped_attributes_non_pk,
-                    "total": metrics.scoped_attributes_total
-                },
-                "approved_samples": metrics.approved_samples,
-                "lobs_count": metrics.lobs_count,
-                "data_providers_count": metrics.data_providers_count,
-                "test_cases": {
-                    "total": metrics.test_cases_total,
-                    "passed": metrics.test_cases_passed,
-                    "failed": metrics.test_cases_failed,
-                    "pending": metrics.test_cases_pending
-                },
-                # Computed metrics
-                "rates": {
-                    "dq_rules_approval": round(metrics.dq_rules_approval_rate, 2),
-                    "test_execution": round(metrics.test_execution_rate, 2),
-                    "test_pass": round(metrics.test_pass_rate, 2)
-                }
-            },
+            "metrics": universal_metrics_to_dict(metrics),
             "calculated_at": metrics.calculated_at.isoformat(),
             "context": {
                 "user_id": context.user_id,
@@ -216,6 +216,7 @@ class AuditEventQueryDTO(BaseModel):
     compliance_only: bool = False
     limit: int = Field(default=100, le=1000)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None
 
 
 class AuditEventDTO(BaseModel):
@@ -240,7 +241,7 @@ class AuditEventsResponseDTO(BaseModel):
     events: List[AuditEventDTO]
     total_returned: int
     filters_applied: Dict[str, Any]
-    pagination: Dict[str, int]
+    pagination: Dict[str, Any]
 
 
 class AuditSummaryDTO(BaseModel):
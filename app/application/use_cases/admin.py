@@ -53,6 +53,7 @@ from app.application.dtos.admin import (
 )
 from app.core.exceptions import BusinessRuleViolation, ResourceNotFound
 from app.models.user import User
+from app.services.audit_database_service import encode_audit_cursor
 
 
 # Base class for Admin use cases
@@ -563,21 +564,22 @@ class QueryAuditEventsUseCase(AdminUseCase):
                 resource_type=request.resource_type,
                 compliance_only=request.compliance_only,
                 limit=request.limit,
-                offset=request.offset
+                offset=request.offset,
+                cursor=request.cursor
             )
             
             events = [
                 AuditEventDTO(
-                    event_id=e["event_id"],
-                    timestamp=e["timestamp"],
+                    event_id=e["id"],
+                    timestamp=e["event_timestamp"],
                     event_type=e["event_type"],
                     user_id=e.get("user_id"),
                     username=e.get("username"),
                     resource_type=e.get("resource_type"),
                     resource_id=e.get("resource_id"),
-                    action=e["action"],
-                    result=e["result"],
-                    details=e.get("details", {}),
+                    action=e.get("action_performed") or e["event_type"],
+                    result=e["status"],
+                    details=e.get("event_metadata") or {},
                     ip_address=e.get("ip_address"),
                     user_agent=e.get("user_agent"),
                     compliance_relevant=e.get("compliance_relevant", False)
@@ -599,7 +601,10 @@ class QueryAuditEventsUseCase(AdminUseCase):
                 },
                 pagination={
                     "limit": request.limit,
-                    "offset": request.offset
+                    "offset": request.offset,
+                    "next_cursor": (
+                        encode_audit_cursor(events_data[-1]) if len(events_data) == request.limit else None
+                    )
                 }
             )
         except Exception as e:
@@ -58,7 +58,7 @@ class AuthenticateUserUseCase:
         # Create access token
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
         access_token = self.auth_service.create_access_token(
-            data={"sub": str(user.user_id)},
+            data={"sub": str(user.user_id), "role": user.role},
             expires_delta=access_token_expires
         )
         
@@ -23,6 +23,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = settings.algorithm
 SECRET_KEY = settings.secret_key
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+# Stream tickets are signed with their own key, so they never pass as access tokens and vice versa
+STREAM_TICKET_KEY = f"{SECRET_KEY}:stream-ticket"
 
 # Security scheme for FastAPI
 security = HTTPBearer()
@@ -72,6 +74,32 @@ def verify_token(token: str) -> dict:
         raise AuthenticationException(f"Invalid token: {str(e)}")
 
 
+def create_stream_ticket(user_id: int, path: str) -> str:
+    """
+    Create a short-lived ticket that opens the stream at ``path``
+
+    EventSource and browser WebSockets cannot send an Authorization header; the
+    ticket goes in the query string instead of the access token, so a logged URL
+    only opens that one stream, and only for ``stream_ticket_expire_seconds``.
+    """
+    expire = datetime.utcnow() + timedelta(seconds=settings.stream_ticket_expire_seconds)
+    return jwt.encode({"sub": str(user_id), "path": path, "exp": expire}, STREAM_TICKET_KEY, algorithm=ALGORITHM)
+
+
+def verify_stream_ticket(ticket: str, path: str) -> int:
+    """User ID of a stream ticket issued for ``path``"""
+    try:
+        payload = jwt.decode(ticket, STREAM_TICKET_KEY, algorithms=[ALGORITHM])
+    except JWTError as e:
+        raise AuthenticationException(f"Invalid stream ticket: {str(e)}")
+    if payload.get("path") != path:
+        raise AuthenticationException("Stream ticket was issued for another stream")
+    try:
+        return int(payload.get("sub"))
+    except (ValueError, TypeError):
+        raise AuthenticationException("Invalid stream ticket: user ID must be a number")
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email address"""
     result = await db.execute(select(User).where(User.email == email))
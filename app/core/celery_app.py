@@ -69,6 +69,7 @@ celery_app.conf.imports = [
     'app.tasks.planning_celery_tasks',  # New planning tasks with pause/resume
     'app.tasks.scoping_celery_tasks',  # New scoping tasks with pause/resume
     'app.tasks.sample_selection_tasks',  # Sample selection tasks for intelligent sampling
+    'app.tasks.metrics_snapshot_tasks',  # Dashboard metrics snapshot maintenance
     # Temporarily disabled due to import errors
     # 'app.tasks.llm_tasks',
     # 'app.tasks.report_tasks',
@@ -96,6 +97,16 @@ celery_app.conf.beat_schedule = {
         'task': 'app.tasks.maintenance_tasks.cleanup_old_tasks',
         'schedule': crontab(hour=2, minute=0),
     },
+    # Recompute dashboard metrics snapshots whose source rows changed
+    'refresh-metrics-snapshots': {
+        'task': 'app.tasks.metrics_snapshot_tasks.refresh_stale_metrics_snapshots',
+        'schedule': crontab(minute='*'),
+    },
+    # Full reconciliation of dashboard metrics snapshots daily at 3 AM UTC
+    'reconcile-metrics-snapshots': {
+        'task': 'app.tasks.metrics_snapshot_tasks.reconcile_metrics_snapshots',
+        'schedule': crontab(hour=3, minute=0),
+    },
     # Generate metrics reports weekly on Monday at 9 AM UTC
     'generate-weekly-metrics': {
         'task': 'app.tasks.report_tasks.generate_weekly_metrics',
@@ -104,7 +115,7 @@ celery_app.conf.beat_schedule = {
 }
 
 # Celery signals for monitoring
-from celery.signals import task_prerun, task_postrun, task_failure
+from celery.signals import task_prerun, task_postrun, task_failure, worker_process_shutdown
 import logging
 
 logger = logging.getLogger(__name__)
@@ -124,6 +135,16 @@ def task_failure_handler(sender=None, task_id=None, exception=None, args=None, k
     """Log task failures"""
     logger.error(f"Task {sender.name} [{task_id}] failed: {exception}")
 
+@worker_process_shutdown.connect
+def worker_process_shutdown_handler(**kw):
+    """Close the process-wide data source pools shared by this worker's tasks"""
+    import asyncio
+    from app.core.data_source_pools import get_data_source_pool_registry
+    try:
+        asyncio.run(get_data_source_pool_registry().close_all())
+    except Exception as e:
+        logger.warning(f"Error closing data source pools on worker shutdown: {e}")
+
 # Initialize Celery app when module is imported
 if __name__ == '__main__':
     celery_app.start()
\ No newline at end of file
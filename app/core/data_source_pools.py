@@ -0,0 +1,439 @@
+"""
+Process-wide registry of connection pools for external data sources
+
+Profiling, sampling, RFI query validation and test execution all connect to the
+same configured data sources. Instead of opening (and authenticating) a new
+connection for every rule or query, they borrow connections from pools held
+here, keyed by a fingerprint of the decrypted connection details.
+
+Async pools (asyncpg, aiomysql, async SQLAlchemy engines) are bound to the
+event loop that created them, so they are additionally keyed by loop; Celery
+tasks that run a fresh loop per task get a fresh pool and the stale one is
+discarded. Pools idle for longer than ``data_source_pool_idle_timeout`` are
+closed the next time the registry is used.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Union
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Connection detail keys that identify a distinct pool; anything else
+# (timeouts, table names, sampling options) can share one
+FINGERPRINT_KEYS = (
+    'host', 'port', 'database', 'db', 'service_name', 'schema',
+    'user', 'username', 'password', 'sslmode',
+)
+
+
+def fingerprint(source_type: str, connection_details: Union[Dict[str, Any], str, URL]) -> str:
+    """Stable hash of the decrypted connection details of a data source"""
+    if isinstance(connection_details, (str, URL)):
+        url = make_url(connection_details) if isinstance(connection_details, str) else connection_details
+        payload = url.render_as_string(hide_password=False)
+    else:
+        payload = json.dumps(
+            {key: connection_details.get(key) for key in FINGERPRINT_KEYS},
+            sort_keys=True, default=str
+        )
+    return hashlib.sha256(f"{source_type}|{payload}".encode('utf-8')).hexdigest()
+
+
+def _describe(connection_details: Union[Dict[str, Any], str, URL]) -> str:
+    """Password-free label for stats output"""
+    if isinstance(connection_details, (str, URL)):
+        url = make_url(connection_details) if isinstance(connection_details, str) else connection_details
+        return url.render_as_string(hide_password=True)
+    user = connection_details.get('username') or connection_details.get('user') or ''
+    host = connection_details.get('host', '')
+    port = connection_details.get('port', '')
+    database = connection_details.get('database') or connection_details.get('db') or ''
+    return f"{user}@{host}:{port}/{database}"
+
+
+@dataclass
+class PoolEntry:
+    """A cached pool and its usage counters"""
+    kind: str  # "asyncpg", "aiomysql", "sync_engine" or "async_engine"
+    source_type: str
+    label: str
+    pool: Any
+    max_size: int
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: int = 0
+    checkouts: int = 0
+    errors: int = 0
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    def occupancy(self) -> Dict[str, Any]:
+        """Current pool size / checked-out connections, where the driver exposes them"""
+        if self.kind == 'asyncpg':
+            size = self.pool.get_size()
+            idle = self.pool.get_idle_size()
+            return {"size": size, "checked_out": size - idle, "idle": idle}
+        if self.kind == 'aiomysql':
+            return {"size": self.pool.size, "checked_out": self.pool.size - self.pool.freesize,
+                    "idle": self.pool.freesize}
+        engine = self.pool.sync_engine if self.kind == 'async_engine' else self.pool
+        pool = engine.pool
+        if hasattr(pool, 'checkedout'):
+            return {"size": pool.checkedout() + pool.checkedin(),
+                    "checked_out": pool.checkedout(), "idle": pool.checkedin()}
+        return {"size": None, "checked_out": self.in_use, "idle": None}
+
+
+class DataSourcePoolRegistry:
+    """
+    Cache of connection pools shared by every service that queries external data sources
+    """
+
+    def __init__(self, max_size: Optional[int] = None, idle_timeout: Optional[int] = None):
+        self.max_size = max_size or settings.data_source_pool_max_size
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings.data_source_pool_idle_timeout
+        self._entries: Dict[Tuple[str, str, Optional[int]], PoolEntry] = {}
+        # Sync engines are created from worker threads as well as the event loop
+        self._lock = threading.RLock()
+        self._async_locks: Dict[Tuple[str, str, int], asyncio.Lock] = {}
+
+    # ------------------------------------------------------------------
+    # Lookup helpers
+    # ------------------------------------------------------------------
+
+    def _max_size_for(self, connection_details: Any) -> int:
+        if isinstance(connection_details, dict) and connection_details.get('max_pool_size'):
+            return int(connection_details['max_pool_size'])
+        return self.max_size
+
+    @staticmethod
+    def _current_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    def _get_live_entry(self, key) -> Optional[PoolEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.loop is not None and entry.loop.is_closed():
+            # The loop that owned this pool is gone; its connections are unusable
+            self._entries.pop(key, None)
+            self._discard(entry)
+            return None
+        return entry
+
+    def _async_lock(self, key) -> asyncio.Lock:
+        lock = self._async_locks.get(key)
+        if lock is None:
+            lock = self._async_locks[key] = asyncio.Lock()
+        return lock
+
+    # ------------------------------------------------------------------
+    # Driver pools (asyncpg / aiomysql)
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        source_type: str,
+        connection_details: Dict[str, Any],
+        timeout: float = 30.0
+    ) -> AsyncIterator[Any]:
+        """Borrow a driver connection for a postgresql or mysql data source"""
+        await self.evict_idle()
+
+        loop = self._current_loop()
+        key = (source_type, fingerprint(source_type, connection_details), id(loop))
+        entry = self._get_live_entry(key)
+        if entry is None:
+            async with self._async_lock(key):
+                entry = self._get_live_entry(key)
+                if entry is None:
+                    entry = await self._create_driver_pool(source_type, connection_details, timeout, loop)
+                    self._entries[key] = entry
+
+        entry.touch()
+        entry.in_use += 1
+        entry.checkouts += 1
+        try:
+            if entry.kind == 'asyncpg':
+                async with entry.pool.acquire(timeout=timeout) as conn:
+                    yield conn
+            else:
+                async with entry.pool.acquire() as conn:
+                    yield conn
+        except Exception:
+            entry.errors += 1
+            raise
+        finally:
+            entry.in_use -= 1
+            entry.touch()
+
+    async def _create_driver_pool(
+        self,
+        source_type: str,
+        connection_details: Dict[str, Any],
+        timeout: float,
+        loop: asyncio.AbstractEventLoop
+    ) -> PoolEntry:
+        max_size = self._max_size_for(connection_details)
+        user = connection_details.get('username') or connection_details.get('user')
+
+        if source_type == 'postgresql':
+            import asyncpg
+            pool = await asyncpg.create_pool(
+                host=connection_details['host'],
+                port=connection_details.get('port', 5432),
+                database=connection_details['database'],
+                user=user,
+                password=connection_details.get('password', ''),
+                min_size=1,
+                max_size=max_size,
+                max_inactive_connection_lifetime=self.idle_timeout or 0,
+                timeout=timeout
+            )
+            kind = 'asyncpg'
+        elif source_type == 'mysql':
+            import aiomysql
+            pool = await aiomysql.create_pool(
+                host=connection_details['host'],
+                port=int(connection_details.get('port', 3306)),
+                db=connection_details['database'],
+                user=user,
+                password=connection_details.get('password', ''),
+                minsize=1,
+                maxsize=max_size,
+                connect_timeout=int(timeout),
+                pool_recycle=self.idle_timeout or -1
+            )
+            kind = 'aiomysql'
+        else:
+            raise ValueError(f"No pooled driver for source type: {source_type}")
+
+        label = _describe(connection_details)
+        logger.info(f"Created {kind} pool for {label} (max_size={max_size})")
+        return PoolEntry(kind=kind, source_type=source_type, label=label,
+                         pool=pool, max_size=max_size, loop=loop)
+
+    # ------------------------------------------------------------------
+    # SQLAlchemy engines
+    # ------------------------------------------------------------------
+
+    def get_sync_engine(self, url: Union[str, URL], max_size: Optional[int] = None) -> Engine:
+        """Cached synchronous engine for pandas / DBAPI access to a data source"""
+        self._evict_idle_sync()
+        url = make_url(url) if isinstance(url, str) else url
+        key = ('sync_engine', fingerprint(url.get_backend_name(), url), None)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                max_size = max_size or self.max_size
+                engine = create_engine(
+                    url,
+                    pool_size=max_size,
+                    max_overflow=0,
+                    pool_pre_ping=True,
+                    pool_recycle=self.idle_timeout or -1
+                )
+                entry = PoolEntry(kind='sync_engine', source_type=url.get_backend_name(),
+                                  label=_describe(url), pool=engine, max_size=max_size)
+                self._entries[key] = entry
+                logger.info(f"Created engine for {entry.label} (max_size={max_size})")
+            entry.touch()
+            entry.checkouts += 1
+            return entry.pool
+
+    def get_async_engine(self, url: Union[str, URL], max_size: Optional[int] = None) -> AsyncEngine:
+        """Cached async engine for a data source, bound to the running event loop"""
+        url = make_url(url) if isinstance(url, str) else url
+        loop = self._current_loop()
+        key = ('async_engine', fingerprint(url.get_backend_name(), url), id(loop))
+
+        with self._lock:
+            entry = self._get_live_entry(key)
+            if entry is None:
+                max_size = max_size or self.max_size
+                engine = create_async_engine(
+                    url,
+                    pool_size=max_size,
+                    max_overflow=0,
+                    pool_pre_ping=True,
+                    pool_recycle=self.idle_timeout or -1
+                )
+                entry = PoolEntry(kind='async_engine', source_type=url.get_backend_name(),
+                                  label=_describe(url), pool=engine, max_size=max_size, loop=loop)
+                self._entries[key] = entry
+                logger.info(f"Created async engine for {entry.label} (max_size={max_size})")
+            entry.touch()
+            entry.checkouts += 1
+            return entry.pool
+
+    # ------------------------------------------------------------------
+    # Eviction and shutdown
+    # ------------------------------------------------------------------
+
+    def _idle_keys(self, kinds) -> list:
+        if not self.idle_timeout:
+            return []
+        cutoff = time.monotonic() - self.idle_timeout
+        return [
+            key for key, entry in self._entries.items()
+            if entry.kind in kinds and entry.in_use == 0 and entry.last_used < cutoff
+            and entry.occupancy().get('checked_out') in (0, None)
+        ]
+
+    def _evict_idle_sync(self):
+        with self._lock:
+            for key in self._idle_keys(('sync_engine',)):
+                entry = self._entries.pop(key)
+                logger.info(f"Evicting idle engine for {entry.label}")
+                entry.pool.dispose()
+
+    async def evict_idle(self):
+        """Close pools that have not been used within the idle timeout"""
+        self._evict_idle_sync()
+        with self._lock:
+            stale = [(key, self._entries.pop(key))
+                     for key in self._idle_keys(('asyncpg', 'aiomysql', 'async_engine'))]
+        for key, entry in stale:
+            logger.info(f"Evicting idle {entry.kind} pool for {entry.label}")
+            self._async_locks.pop(key, None)
+            await self._close(entry)
+
+    async def _close(self, entry: PoolEntry):
+        """Close a pool gracefully if it belongs to this loop, otherwise drop it"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if entry.loop is not None and entry.loop is not running:
+            self._discard(entry)
+            return
+        try:
+            if entry.kind == 'asyncpg':
+                await entry.pool.close()
+            elif entry.kind == 'aiomysql':
+                entry.pool.close()
+                await entry.pool.wait_closed()
+            elif entry.kind == 'async_engine':
+                await entry.pool.dispose()
+            else:
+                entry.pool.dispose()
+        except Exception as e:
+            logger.warning(f"Error closing pool for {entry.label}: {str(e)}")
+
+    @staticmethod
+    def _discard(entry: PoolEntry):
+        """Release a pool whose event loop is no longer running, without awaiting it"""
+        try:
+            if entry.kind in ('asyncpg', 'aiomysql'):
+                entry.pool.terminate()
+            elif entry.kind == 'async_engine':
+                entry.pool.sync_engine.dispose(close=False)
+            else:
+                entry.pool.dispose()
+        except Exception as e:
+            logger.debug(f"Error discarding pool for {entry.label}: {str(e)}")
+
+    async def close_all(self):
+        """Close every pool; called on application shutdown"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._async_locks.clear()
+        for entry in entries:
+            await self._close(entry)
+        if entries:
+            logger.info(f"Closed {len(entries)} data source pools")
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Occupancy and usage counters for every cached pool"""
+        now = time.monotonic()
+        pools = []
+        with self._lock:
+            for (kind, key_fingerprint, _), entry in self._entries.items():
+                try:
+                    occupancy = entry.occupancy()
+                except Exception:
+                    occupancy = {"size": None, "checked_out": entry.in_use, "idle": None}
+                pools.append({
+                    "fingerprint": key_fingerprint[:12],
+                    "kind": entry.kind,
+                    "source_type": entry.source_type,
+                    "target": entry.label,
+                    "max_size": entry.max_size,
+                    **occupancy,
+                    "in_use": entry.in_use,
+                    "checkouts": entry.checkouts,
+                    "errors": entry.errors,
+                    "age_seconds": round(now - entry.created_at, 1),
+                    "idle_seconds": round(now - entry.last_used, 1),
+                    "loop_closed": bool(entry.loop is not None and entry.loop.is_closed()),
+                })
+        return {
+            "pool_count": len(pools),
+            "default_max_size": self.max_size,
+            "idle_timeout_seconds": self.idle_timeout,
+            "pools": pools,
+        }
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Run SELECT 1 through every pool usable from the current loop"""
+        loop = self._current_loop()
+        results = {}
+        with self._lock:
+            entries = [(key, entry) for key, entry in self._entries.items()
+                       if entry.loop is None or entry.loop is loop]
+        for (kind, key_fingerprint, _), entry in entries:
+            name = f"{kind}:{key_fingerprint[:12]}"
+            try:
+                if entry.kind == 'asyncpg':
+                    async with entry.pool.acquire(timeout=5) as conn:
+                        await conn.fetchval("SELECT 1")
+                elif entry.kind == 'aiomysql':
+                    async with entry.pool.acquire() as conn:
+                        async with conn.cursor() as cursor:
+                            await cursor.execute("SELECT 1")
+                elif entry.kind == 'async_engine':
+                    async with entry.pool.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+                else:
+                    def _ping(engine=entry.pool):
+                        with engine.connect() as conn:
+                            conn.execute(text("SELECT 1"))
+                    await asyncio.to_thread(_ping)
+                results[name] = {"healthy": True, "target": entry.label}
+            except Exception as e:
+                entry.errors += 1
+                results[name] = {"healthy": False, "target": entry.label, "error": str(e)}
+        return results
+
+
+# Singleton instance
+_data_source_pool_registry = None
+
+
+def get_data_source_pool_registry() -> DataSourcePoolRegistry:
+    """Get or create the process-wide data source pool registry"""
+    global _data_source_pool_registry
+    if _data_source_pool_registry is None:
+        _data_source_pool_registry = DataSourcePoolRegistry()
+    return _data_source_pool_registry
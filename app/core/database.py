@@ -68,6 +68,16 @@ SyncSessionLocal = sessionmaker(
 # Create declarative base
 Base = declarative_base()
 
+# Invalidate cached HTTP responses when phase, version or sample writes commit,
+# and compiled permissions when RBAC writes commit
+from app.core import permission_matrix, response_cache
+response_cache.register_invalidation_hooks()
+permission_matrix.register_invalidation_hooks()
+
+# Count the statements of every request, whichever session issues them
+from app.core import query_instrumentation
+query_instrumentation.register_instrumentation_hooks()
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -75,23 +85,23 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     import time
     start_time = time.time()
-    logger.info("get_db called - attempting to create session")
+    logger.debug("get_db called - attempting to create session")
     
     try:
-        logger.info("Creating AsyncSessionLocal...")
+        logger.debug("Creating AsyncSessionLocal...")
         async with AsyncSessionLocal() as session:
-            logger.info(f"Session created successfully in {time.time() - start_time:.2f}s")
+            logger.debug(f"Session created successfully in {time.time() - start_time:.2f}s")
             try:
                 yield session
-                logger.info(f"About to commit session after {time.time() - start_time:.2f}s")
+                logger.debug(f"About to commit session after {time.time() - start_time:.2f}s")
                 await session.commit()
-                logger.info(f"Session committed successfully after {time.time() - start_time:.2f}s")
+                logger.debug(f"Session committed successfully after {time.time() - start_time:.2f}s")
             except Exception as e:
                 logger.error(f"Session error after {time.time() - start_time:.2f}s", error=str(e))
                 await session.rollback()
                 raise
             finally:
-                logger.info(f"Closing session after {time.time() - start_time:.2f}s")
+                logger.debug(f"Closing session after {time.time() - start_time:.2f}s")
                 await session.close()
     except Exception as e:
         logger.error(f"Failed to create session after {time.time() - start_time:.2f}s", error=str(e))
@@ -103,23 +113,23 @@ def get_sync_db() -> Generator[Session, None, None]:
     Sync database session for Celery tasks
     """
     start_time = time.time()
-    logger.info("get_sync_db called - attempting to create sync session")
+    logger.debug("get_sync_db called - attempting to create sync session")
     
     try:
-        logger.info("Creating SyncSessionLocal...")
+        logger.debug("Creating SyncSessionLocal...")
         with SyncSessionLocal() as session:
-            logger.info(f"Sync session created successfully in {time.time() - start_time:.2f}s")
+            logger.debug(f"Sync session created successfully in {time.time() - start_time:.2f}s")
             try:
                 yield session
-                logger.info(f"About to commit sync session after {time.time() - start_time:.2f}s")
+                logger.debug(f"About to commit sync session after {time.time() - start_time:.2f}s")
                 session.commit()
-                logger.info(f"Sync session committed successfully after {time.time() - start_time:.2f}s")
+                logger.debug(f"Sync session committed successfully after {time.time() - start_time:.2f}s")
             except Exception as e:
                 logger.error(f"Sync session error after {time.time() - start_time:.2f}s", error=str(e))
                 session.rollback()
                 raise
             finally:
-                logger.info(f"Closing sync session after {time.time() - start_time:.2f}s")
+                logger.debug(f"Closing sync session after {time.time() - start_time:.2f}s")
                 session.close()
     except Exception as e:
         logger.error(f"Failed to create sync session after {time.time() - start_time:.2f}s", error=str(e))
@@ -3,12 +3,12 @@ FastAPI dependencies for authentication, database, and authorization
 """
 
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.auth import verify_token, get_user_by_id, UserRoles
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.auth import verify_token, verify_stream_ticket, get_user_by_id, UserRoles
 from app.models.user import User
 from app.core.exceptions import AuthenticationException, AuthorizationException
 from app.core.background_jobs import job_manager
@@ -193,6 +193,57 @@ async def get_current_user_optional(
         return None
 
 
+async def authenticate_token(token: Optional[str]) -> User:
+    """
+    Resolve a JWT to an active user with a short-lived session
+
+    For long-lived responses (event streams, WebSockets) that must not hold a
+    database connection for as long as the client stays connected.
+    """
+    if not token:
+        raise AuthenticationException("Not authenticated")
+    async with AsyncSessionLocal() as db:
+        return await get_current_user(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db
+        )
+
+
+async def authenticate_stream_ticket(ticket: Optional[str], path: str) -> User:
+    """Resolve a stream ticket issued for ``path`` to an active user, with a short-lived session"""
+    if not ticket:
+        raise AuthenticationException("Not authenticated")
+    user_id = verify_stream_ticket(ticket, path)
+    async with AsyncSessionLocal() as db:
+        user = await get_user_by_id(db, user_id)
+    if user is None:
+        raise AuthenticationException("User not found")
+    if not user.is_active:
+        raise AuthenticationException("User account is inactive")
+    return user
+
+
+async def authenticate_stream(authorization: Optional[str], ticket: Optional[str], path: str) -> User:
+    """Authenticate a stream by its bearer ``Authorization`` header, or else by a stream ticket"""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return await authenticate_token(token)
+    return await authenticate_stream_ticket(ticket, path)
+
+
+async def get_streaming_user(
+    request: Request,
+    ticket: Optional[str] = Query(None)
+) -> User:
+    """
+    Current user for streaming endpoints
+
+    Accepts the usual bearer header or a ``ticket`` query parameter from
+    ``POST /auth/stream-ticket``, since EventSource cannot set headers. Access
+    tokens are never accepted in the query string, where access logs keep them.
+    """
+    return await authenticate_stream(request.headers.get("authorization"), ticket, request.url.path)
+
+
 def get_job_manager():
     """Get the background job manager instance"""
     return job_manager 
\ No newline at end of file
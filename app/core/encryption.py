@@ -1,58 +1,152 @@
 """
 Encryption utilities for sensitive data storage
 Handles encryption/decryption of connection details and other sensitive information
+
+Keys form a keyring: ``SYNAPSE_ENCRYPTION_KEY`` (or the key derived from
+``SYNAPSE_DB_ENCRYPTION_PASSWORD``) encrypts, and the comma-separated Fernet keys
+in ``SYNAPSE_ENCRYPTION_PREVIOUS_KEYS`` are still accepted for decryption, so keys
+can be rotated without re-encrypting every row at once (see ``rotate_string``).
+The PBKDF2 derivation runs once per process, and decrypted connection details are
+kept for a short time keyed by a hash of their ciphertext, with the cached
+plaintext overwritten when it is evicted.
 """
 
 import os
 import base64
+import hashlib
 import json
-from typing import Dict, Any, Optional
-from cryptography.fernet import Fernet
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+from cryptography.fernet import Fernet, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import logging
 
+from app.core.config import get_settings
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PBKDF2_ITERATIONS = 100000
+
+
+@lru_cache(maxsize=8)
+def _derive_key(password: bytes, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+    """Derive a Fernet key from a password, once per process for each password and salt"""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password))
+
+
+def key_fingerprint(key: bytes) -> str:
+    """Short, non-secret identifier of a key for logs and rotation reports"""
+    return hashlib.sha256(key).hexdigest()[:12]
+
+
+class _DecryptedCache:
+    """
+    Bounded, expiring cache of decrypted plaintext keyed by ciphertext hash
+    
+    Plaintext is held in bytearrays that are overwritten with zeros when an entry
+    expires, is evicted or the cache is cleared. Callers get freshly parsed copies.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytearray]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _zero(buffer: bytearray):
+        buffer[:] = bytes(len(buffer))
+    
+    def get(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            expires_at, buffer = entry
+            if expires_at <= time.monotonic():
+                del self._entries[digest]
+                self._zero(buffer)
+                return None
+            self._entries.move_to_end(digest)
+            return bytes(buffer)
+    
+    def put(self, digest: str, plaintext: bytes):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._zero(previous[1])
+            self._entries[digest] = (time.monotonic() + self.ttl_seconds, bytearray(plaintext))
+            while len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._zero(evicted)
+    
+    def clear(self):
+        with self._lock:
+            for _, buffer in self._entries.values():
+                self._zero(buffer)
+            self._entries.clear()
 
 
 class EncryptionService:
     """Service for encrypting/decrypting sensitive data"""
     
     def __init__(self):
-        self._cipher_suite: Optional[Fernet] = None
+        self._cipher_suite: Optional[MultiFernet] = None
+        self.key_fingerprints: List[str] = []  # Encryption key first, then keys still accepted for decryption
+        self._decrypted_cache = _DecryptedCache(
+            ttl_seconds=getattr(settings, 'encryption_decrypt_cache_ttl_seconds', 300),
+            max_entries=getattr(settings, 'encryption_decrypt_cache_max_entries', 256)
+        )
         self._initialize_cipher()
     
+    def _load_keys(self) -> List[bytes]:
+        """Keys from the environment, the one used for encryption first"""
+        encryption_key = os.getenv('SYNAPSE_ENCRYPTION_KEY')
+        
+        if not encryption_key:
+            # Generate a key from password if no direct key provided
+            password = os.getenv('SYNAPSE_DB_ENCRYPTION_PASSWORD', 'default-dev-password').encode()
+            salt = os.getenv('SYNAPSE_ENCRYPTION_SALT', 'default-salt-change-in-prod').encode()
+            keys = [_derive_key(password, salt)]
+        else:
+            keys = [encryption_key.strip().encode()]
+        
+        # Retired keys, still accepted for decryption until rows are rotated
+        previous_keys = os.getenv('SYNAPSE_ENCRYPTION_PREVIOUS_KEYS', '')
+        keys.extend(key.strip().encode() for key in previous_keys.split(',') if key.strip())
+        return list(dict.fromkeys(keys))
+    
     def _initialize_cipher(self):
         """Initialize the cipher suite from environment variables"""
         try:
-            # Get encryption key from environment
-            encryption_key = os.getenv('SYNAPSE_ENCRYPTION_KEY')
-            
-            if not encryption_key:
-                # Generate a key from password if no direct key provided
-                password = os.getenv('SYNAPSE_DB_ENCRYPTION_PASSWORD', 'default-dev-password').encode()
-                salt = os.getenv('SYNAPSE_ENCRYPTION_SALT', 'default-salt-change-in-prod').encode()
-                
-                # Derive key from password
-                kdf = PBKDF2HMAC(
-                    algorithm=hashes.SHA256(),
-                    length=32,
-                    salt=salt,
-                    iterations=100000,
-                )
-                key = base64.urlsafe_b64encode(kdf.derive(password))
-            else:
-                key = encryption_key.encode()
-            
-            self._cipher_suite = Fernet(key)
-            logger.info("Encryption service initialized successfully")
+            keys = self._load_keys()
+            self._cipher_suite = MultiFernet([Fernet(key) for key in keys])
+            self.key_fingerprints = [key_fingerprint(key) for key in keys]
+            logger.info(
+                f"Encryption service initialized with key {self.key_fingerprints[0]}"
+                f" ({len(keys) - 1} previous keys accepted for decryption)"
+            )
             
         except Exception as e:
             logger.error(f"Failed to initialize encryption service: {str(e)}")
             # In development, use a default key (NOT for production)
             if os.getenv('ENVIRONMENT', 'development') == 'development':
                 default_key = Fernet.generate_key()
-                self._cipher_suite = Fernet(default_key)
+                self._cipher_suite = MultiFernet([Fernet(default_key)])
+                self.key_fingerprints = [key_fingerprint(default_key)]
                 logger.warning("Using default encryption key for development")
             else:
                 raise
@@ -82,11 +176,17 @@ class EncryptionService:
             raise RuntimeError("Encryption service not initialized")
         
         try:
-            # Decode from base64
-            encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode())
+            # The same connection details are decrypted for every test execution
+            digest = hashlib.sha256(encrypted_data.encode()).hexdigest()
+            decrypted_bytes = self._decrypted_cache.get(digest)
             
-            # Decrypt
-            decrypted_bytes = self._cipher_suite.decrypt(encrypted_bytes)
+            if decrypted_bytes is None:
+                # Decode from base64
+                encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode())
+                
+                # Decrypt
+                decrypted_bytes = self._cipher_suite.decrypt(encrypted_bytes)
+                self._decrypted_cache.put(digest, decrypted_bytes)
             
             # Parse JSON
             json_str = decrypted_bytes.decode()
@@ -121,6 +221,18 @@ class EncryptionService:
             logger.error(f"String decryption failed: {str(e)}")
             raise
     
+    def rotate_string(self, encrypted_data: str) -> str:
+        """Re-encrypt a value encrypted with any accepted key under the current key"""
+        if not self._cipher_suite:
+            raise RuntimeError("Encryption service not initialized")
+        
+        encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode())
+        return base64.urlsafe_b64encode(self._cipher_suite.rotate(encrypted_bytes)).decode()
+    
+    def clear_cache(self):
+        """Drop (and zero) all cached decrypted values"""
+        self._decrypted_cache.clear()
+    
     def is_encrypted(self, data: str) -> bool:
         """Check if a string appears to be encrypted (basic heuristic)"""
         try:
@@ -139,12 +251,15 @@ class EncryptionService:
 
 # Global encryption service instance
 _encryption_service: Optional[EncryptionService] = None
+_encryption_service_lock = threading.Lock()
 
 def get_encryption_service() -> EncryptionService:
     """Get the global encryption service instance"""
     global _encryption_service
     if _encryption_service is None:
-        _encryption_service = EncryptionService()
+        with _encryption_service_lock:
+            if _encryption_service is None:
+                _encryption_service = EncryptionService()
     return _encryption_service
 
 
@@ -157,6 +272,9 @@ def encrypt_connection_details(connection_details: Dict[str, Any]) -> str:
 
 def decrypt_connection_details(encrypted_details: str) -> Dict[str, Any]:
     """Decrypt database connection details"""
+    if isinstance(encrypted_details, dict):
+        # Stored unencrypted (JSON column)
+        return encrypted_details
     service = get_encryption_service()
     return service.decrypt_dict(encrypted_details)
 
@@ -101,4 +101,8 @@ class BusinessRuleViolation(SynapseDTException):
 
 class ResourceNotFound(NotFoundException):
     """Raised when a requested resource is not found"""
-    pass
\ No newline at end of file
+    pass
+
+class QueryBudgetExceeded(DatabaseException):
+    """Raised when a request issues more database statements than its route's query budget"""
+    pass
@@ -0,0 +1,226 @@
+"""
+Job Events
+Push delivery of background job progress to SSE and WebSocket clients
+
+The job store publishes a delta (changed fields plus a per-job ``seq``) on every
+update. ``JobEventBroker`` keeps one pattern subscription per process (or a
+listener on the in-process store) and fans deltas out to local subscribers, so
+hundreds of open streams cost one Redis connection instead of one poll each.
+
+``job_event_stream`` turns a subscription into the events a client sees:
+
+- ``snapshot``: the full job, sent first (unless the client resumes at the
+  current ``seq``) and again whenever deltas were missed
+- ``progress``: a delta, in ``seq`` order
+- ``end``: the job reached a terminal status; the stream closes afterwards
+
+A client resumes by passing the last ``seq`` it saw (``Last-Event-ID`` for SSE).
+Job state is fully described by the latest snapshot, so resuming never needs a
+replay log: a client that is behind gets one snapshot and continues from there.
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.background_jobs import job_manager
+from app.core.config import settings
+from app.core.job_store import EVENTS_CHANNEL_PREFIX, TERMINAL_STATUSES, JobStore
+
+logger = logging.getLogger(__name__)
+
+# Marker queued when a subscriber fell behind and must resynchronise from a snapshot
+RESYNC = {"resync": True}
+
+
+class JobEventBroker:
+    """Process-wide fan-out of job progress deltas to local subscribers"""
+
+    def __init__(self, store: Optional[JobStore] = None):
+        self._store = store
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._listening = False
+
+    @property
+    def store(self) -> JobStore:
+        return self._store or job_manager.store
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.store.backend == "redis":
+            if self._reader is None or self._reader.done() or self._loop is not loop:
+                self._loop = loop
+                self._reader = loop.create_task(self._read_redis())
+        else:
+            self._loop = loop
+            if not self._listening:
+                self.store.add_listener(self._dispatch_threadsafe)
+                self._listening = True
+
+    async def _read_redis(self) -> None:
+        """Forward every job delta published on Redis to local subscribers, reconnecting on errors"""
+        import redis.asyncio as aioredis
+
+        backoff = 1.0
+        while self._subscribers or self._reader is asyncio.current_task():
+            client = aioredis.from_url(self.store.redis_url, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{EVENTS_CHANNEL_PREFIX}*")
+                backoff = 1.0
+                # Anything published while disconnected was missed
+                self._resync_all()
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    job_id = message["channel"][len(EVENTS_CHANNEL_PREFIX):]
+                    if job_id in self._subscribers:
+                        self._dispatch(job_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job event subscription lost ({e}); reconnecting in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.close()
+                    await client.close()
+                except Exception:
+                    pass
+
+    def _dispatch_threadsafe(self, job_id: str, delta: Dict[str, Any]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed() or job_id not in self._subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, job_id, dict(delta))
+        except RuntimeError:
+            # Loop shut down between the check and the call
+            pass
+
+    def _dispatch(self, job_id: str, delta: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(job_id, ())):
+            self._offer(queue, delta)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog and make it reload the snapshot
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    def _resync_all(self) -> None:
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._offer(queue, RESYNC)
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving the deltas of ``job_id`` for the duration of the context"""
+        self._ensure_started()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.job_events_queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(job_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[job_id]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "jobs": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+        }
+
+
+async def job_event_stream(
+    job_id: str,
+    last_event_id: Optional[int] = None,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+) -> AsyncIterator[Tuple[str, Optional[int], Dict[str, Any]]]:
+    """
+    Yield ``(event, seq, data)`` for a job until it finishes or the client disconnects
+
+    ``event`` is ``snapshot``, ``progress``, ``end`` or ``heartbeat`` (sent after
+    ``job_events_heartbeat_seconds`` without changes so proxies keep the stream open).
+    """
+    broker = get_job_event_broker()
+    last_seq = last_event_id if last_event_id is not None else -1
+
+    async with broker.subscribe(job_id) as queue:
+        # Subscribe before reading the snapshot so no delta falls in between
+        resync = True
+        while True:
+            if resync:
+                job = await run_in_threadpool(job_manager.get_job, job_id)
+                if job is None:
+                    yield "end", None, {"job_id": job_id, "status": "not_found"}
+                    return
+                seq = job.get("event_seq") or 0
+                if seq != last_seq:
+                    last_seq = seq
+                    yield "snapshot", seq, job
+                if job.get("status") in TERMINAL_STATUSES:
+                    yield "end", seq, {"job_id": job_id, "status": job["status"]}
+                    return
+                resync = False
+
+            try:
+                delta = await asyncio.wait_for(queue.get(), timeout=settings.job_events_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if is_disconnected and await is_disconnected():
+                    return
+                yield "heartbeat", None, {}
+                continue
+
+            if delta is RESYNC:
+                resync = True
+                continue
+            seq = delta.get("seq") or 0
+            if seq <= last_seq:
+                continue
+            if seq > last_seq + 1:
+                # A delta went missing (e.g. during a reconnect): the snapshot is authoritative
+                resync = True
+                continue
+
+            last_seq = seq
+            yield "progress", seq, delta
+            if delta.get("status") in TERMINAL_STATUSES:
+                yield "end", seq, {"job_id": job_id, "status": delta["status"]}
+                return
+
+
+def format_sse(event: str, seq: Optional[int], data: Dict[str, Any]) -> str:
+    """Encode one server-sent event"""
+    if event == "heartbeat":
+        return ": keepalive\n\n"
+    lines = []
+    if seq is not None:
+        lines.append(f"id: {seq}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+_job_event_broker: Optional[JobEventBroker] = None
+
+
+def get_job_event_broker() -> JobEventBroker:
+    """Get the process-wide job event broker"""
+    global _job_event_broker
+    if _job_event_broker is None:
+        _job_event_broker = JobEventBroker()
+    return _job_event_broker
@@ -0,0 +1,554 @@
+"""
+Job Store
+Single backend for background job state shared by the API and Celery workers
+
+Each job is stored as one record whose fields are updated individually, so a
+progress tick costs O(1) regardless of how many jobs exist:
+
+- ``RedisJobStore``: one hash per job (``job_state:<id>``) with a TTL, a set of active
+  job ids and a sorted index of all jobs bounded to ``job_store_max_history``.
+  Updates and step increments run as Lua scripts, so concurrent workers never
+  lose each other's progress.
+- ``MemoryJobStore``: in-process fallback for development without Redis, with an
+  optional write-behind JSON snapshot flushed by a background thread.
+
+Field values are JSON encoded; metadata keys are stored as separate ``meta:<key>``
+fields so merging metadata never rewrites the rest of the job.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+ACTIVE_STATUSES = ("pending", "running", "pausing", "paused")
+
+JOB_FIELDS = (
+    "job_id", "job_type", "status", "progress_percentage", "current_step", "total_steps",
+    "completed_steps", "message", "result", "error", "created_at", "started_at", "completed_at",
+    "event_seq"
+)
+METADATA_PREFIX = "meta:"
+
+# KEYS: job hash, active set, events channel
+# ARGV: job id, ttl, now (JSON), status ('' if unchanged), recompute progress flag,
+#       reset progress on failure flag, delta (JSON), then field/value pairs
+_UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local delta = cjson.decode(ARGV[7])
+for i = 8, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+local status = ARGV[4]
+if status == 'running' then
+    if redis.call('HSETNX', KEYS[1], 'started_at', ARGV[3]) == 1 then
+        delta['started_at'] = cjson.decode(ARGV[3])
+    end
+elseif status == 'completed' or status == 'failed' or status == 'cancelled' then
+    redis.call('HSET', KEYS[1], 'completed_at', ARGV[3])
+    delta['completed_at'] = cjson.decode(ARGV[3])
+    redis.call('SREM', KEYS[2], ARGV[1])
+    if status == 'failed' and ARGV[6] == '1' then
+        redis.call('HSET', KEYS[1], 'progress_percentage', 0)
+        delta['progress_percentage'] = 0
+    end
+end
+if ARGV[5] == '1' then
+    local total = tonumber(redis.call('HGET', KEYS[1], 'total_steps') or '0') or 0
+    if total > 0 then
+        local done = tonumber(redis.call('HGET', KEYS[1], 'completed_steps') or '0') or 0
+        local progress = math.floor(done * 100 / total)
+        redis.call('HSET', KEYS[1], 'progress_percentage', progress)
+        delta['progress_percentage'] = progress
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+delta['job_id'] = ARGV[1]
+delta['seq'] = redis.call('HINCRBY', KEYS[1], 'event_seq', 1)
+redis.call('PUBLISH', KEYS[3], cjson.encode(delta))
+return 1
+"""
+
+# KEYS: job hash, events channel; ARGV: job id, steps, ttl.
+# Returns the new completed_steps, or -1 if the job is gone
+_INCREMENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local done = redis.call('HINCRBY', KEYS[1], 'completed_steps', ARGV[2])
+local delta = {job_id = ARGV[1], completed_steps = done}
+local total = tonumber(redis.call('HGET', KEYS[1], 'total_steps') or '0') or 0
+if total > 0 then
+    local progress = math.min(100, math.floor(done * 100 / total))
+    redis.call('HSET', KEYS[1], 'progress_percentage', progress)
+    delta['progress_percentage'] = progress
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+delta['seq'] = redis.call('HINCRBY', KEYS[1], 'event_seq', 1)
+redis.call('PUBLISH', KEYS[2], cjson.encode(delta))
+return done
+"""
+
+EVENTS_CHANNEL_PREFIX = "job_state:events:"
+
+
+def events_channel(job_id: str) -> str:
+    """Pub/sub channel carrying a job's progress deltas"""
+    return f"{EVENTS_CHANNEL_PREFIX}{job_id}"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def new_job_record(job_id: str, job_type: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Initial state of a job"""
+    return {
+        "job_id": job_id,
+        "job_type": job_type,
+        "status": "pending",
+        "progress_percentage": 0,
+        "current_step": "",
+        "total_steps": 0,
+        "completed_steps": 0,
+        "message": "",
+        "result": None,
+        "error": None,
+        "created_at": _now(),
+        "started_at": None,
+        "completed_at": None,
+        "event_seq": 0,
+        "metadata": dict(metadata or {}),
+    }
+
+
+def _apply_update(
+    job: Dict[str, Any],
+    fields: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]],
+    status: Optional[str],
+    recompute_progress: bool,
+    reset_progress_on_failure: bool
+) -> Dict[str, Any]:
+    """In-memory equivalent of ``_UPDATE_SCRIPT``; returns the published delta"""
+    delta = dict(fields)
+    job.update(fields)
+    if metadata:
+        job["metadata"].update(metadata)
+        delta["metadata"] = dict(metadata)
+    if status == "running" and not job.get("started_at"):
+        job["started_at"] = delta["started_at"] = _now()
+    elif status in TERMINAL_STATUSES:
+        job["completed_at"] = delta["completed_at"] = _now()
+        if status == "failed" and reset_progress_on_failure:
+            job["progress_percentage"] = delta["progress_percentage"] = 0
+    if recompute_progress and job.get("total_steps"):
+        job["progress_percentage"] = delta["progress_percentage"] = int(
+            job["completed_steps"] * 100 / job["total_steps"]
+        )
+    return delta
+
+
+class JobStore:
+    """Interface shared by the job store backends"""
+
+    backend = "base"
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    def create(self, job: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def update(
+        self,
+        job_id: str,
+        fields: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+        recompute_progress: bool = False,
+        reset_progress_on_failure: bool = False
+    ) -> bool:
+        """Set ``fields`` (and merge ``metadata``) on an existing job; False if it does not exist"""
+        raise NotImplementedError
+
+    def increment(self, job_id: str, steps: int = 1) -> Optional[int]:
+        """Atomically add ``steps`` completed steps; returns the new count, or None if the job does not exist"""
+        raise NotImplementedError
+
+    def active_jobs(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def evict_expired(self, max_age_seconds: int) -> int:
+        """Drop finished jobs older than ``max_age_seconds``; returns how many were removed"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Persist anything still buffered"""
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Call ``callback(job_id, delta)`` for every change made through this store instance
+
+        Only meaningful for in-process stores; Redis publishes deltas on ``events_channel``.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, job_id: str, delta: Dict[str, Any]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(job_id, delta)
+            except Exception as e:
+                logger.warning(f"Job event listener failed: {e}")
+
+
+class RedisJobStore(JobStore):
+    """Job state in Redis, one hash per job"""
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_history: Optional[int] = None
+    ):
+        import redis
+
+        super().__init__()
+        self.redis_url = redis_url or settings.redis_url
+        self.ttl = ttl_seconds or settings.job_store_ttl_seconds
+        self.max_history = max_history or settings.job_store_max_history
+        # Separate namespace from the JSON string keys written by the previous job manager
+        self.job_prefix = "job_state:"
+        self.active_jobs_key = "job_state:active"
+        self.index_key = "job_state:index"
+        self.client = redis.from_url(self.redis_url, decode_responses=True)
+        self._update_script = self.client.register_script(_UPDATE_SCRIPT)
+        self._increment_script = self.client.register_script(_INCREMENT_SCRIPT)
+
+    def ping(self) -> None:
+        self.client.ping()
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.job_prefix}{job_id}"
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        encoded = {name: json.dumps(value, default=str) for name, value in fields.items()}
+        for name, value in (metadata or {}).items():
+            encoded[f"{METADATA_PREFIX}{name}"] = json.dumps(value, default=str)
+        return encoded
+
+    @staticmethod
+    def _decode(raw: Dict[str, str]) -> Dict[str, Any]:
+        job: Dict[str, Any] = {name: None for name in JOB_FIELDS}
+        job["metadata"] = {}
+        for name, value in raw.items():
+            try:
+                decoded = json.loads(value)
+            except (TypeError, ValueError):
+                decoded = value
+            if name.startswith(METADATA_PREFIX):
+                job["metadata"][name[len(METADATA_PREFIX):]] = decoded
+            else:
+                job[name] = decoded
+        return job
+
+    def create(self, job: Dict[str, Any]) -> None:
+        fields = {name: value for name, value in job.items() if name != "metadata" and value is not None}
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(self._key(job["job_id"]), mapping=self._encode(fields, job.get("metadata")))
+        pipe.expire(self._key(job["job_id"]), self.ttl)
+        pipe.sadd(self.active_jobs_key, job["job_id"])
+        pipe.zadd(self.index_key, {job["job_id"]: time.time()})
+        pipe.zcard(self.index_key)
+        history_size = pipe.execute()[-1]
+        if history_size > self.max_history:
+            self._trim_history(history_size - self.max_history)
+
+    def _trim_history(self, overflow: int) -> None:
+        """Forget the oldest jobs beyond the history bound, keeping ones still running"""
+        oldest = self.client.zrange(self.index_key, 0, overflow - 1)
+        pipe = self.client.pipeline(transaction=False)
+        for job_id in oldest:
+            pipe.sismember(self.active_jobs_key, job_id)
+        active = pipe.execute() if oldest else []
+        finished = [job_id for job_id, is_active in zip(oldest, active) if not is_active]
+        if finished:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(*[self._key(job_id) for job_id in finished])
+            pipe.zrem(self.index_key, *finished)
+            pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.hgetall(self._key(job_id))
+        return self._decode(raw) if raw else None
+
+    def update(
+        self,
+        job_id: str,
+        fields: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+        recompute_progress: bool = False,
+        reset_progress_on_failure: bool = False
+    ) -> bool:
+        delta = dict(fields)
+        if metadata:
+            delta["metadata"] = metadata
+        args: List[Any] = [
+            job_id, self.ttl, json.dumps(_now()), status or "",
+            "1" if recompute_progress else "0", "1" if reset_progress_on_failure else "0",
+            json.dumps(delta, default=str)
+        ]
+        for name, value in self._encode(fields, metadata).items():
+            args.extend((name, value))
+        return bool(self._update_script(
+            keys=[self._key(job_id), self.active_jobs_key, events_channel(job_id)], args=args
+        ))
+
+    def increment(self, job_id: str, steps: int = 1) -> Optional[int]:
+        done = self._increment_script(
+            keys=[self._key(job_id), events_channel(job_id)], args=[job_id, int(steps), self.ttl]
+        )
+        return None if done < 0 else int(done)
+
+    def active_jobs(self) -> List[Dict[str, Any]]:
+        job_ids = list(self.client.smembers(self.active_jobs_key))
+        if not job_ids:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(self._key(job_id))
+        jobs, stale = [], []
+        for job_id, raw in zip(job_ids, pipe.execute()):
+            job = self._decode(raw) if raw else None
+            if job and job.get("status") in ACTIVE_STATUSES:
+                jobs.append(job)
+            else:
+                stale.append(job_id)
+        if stale:
+            # Expired or finished jobs left in the active set
+            self.client.srem(self.active_jobs_key, *stale)
+        return jobs
+
+    def count(self) -> int:
+        return int(self.client.zcard(self.index_key))
+
+    def evict_expired(self, max_age_seconds: int) -> int:
+        # Job hashes expire by TTL; only the index needs pruning
+        return int(self.client.zremrangebyscore(self.index_key, "-inf", time.time() - max(max_age_seconds, self.ttl)))
+
+
+class MemoryJobStore(JobStore):
+    """In-process job state with an optional write-behind JSON snapshot"""
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval: Optional[float] = None,
+        ttl_seconds: Optional[int] = None,
+        max_history: Optional[int] = None
+    ):
+        super().__init__()
+        self.ttl = ttl_seconds or settings.job_store_ttl_seconds
+        self.max_history = max_history or settings.job_store_max_history
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval or settings.job_store_snapshot_interval
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._dirty = threading.Event()
+        if self.snapshot_path:
+            self._load_snapshot()
+            threading.Thread(target=self._flush_loop, name="job-store-snapshot", daemon=True).start()
+
+    def _load_snapshot(self) -> None:
+        if not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r") as f:
+                jobs = json.load(f)
+            for job_id, job in jobs.items():
+                job.setdefault("metadata", {})
+                self.jobs[job_id] = job
+                self._expires[job_id] = time.time() + self.ttl
+            logger.info(f"Loaded {len(self.jobs)} jobs from snapshot {self.snapshot_path}")
+        except Exception as e:
+            logger.error(f"Failed to load job snapshot {self.snapshot_path}: {e}")
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            time.sleep(self.snapshot_interval)
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the snapshot now (atomically replacing the previous one)"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            self._dirty.clear()
+            data = json.dumps(self.jobs, default=str)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.error(f"Failed to write job snapshot {self.snapshot_path}: {e}")
+
+    def _touch(self, job_id: str) -> None:
+        self._expires[job_id] = time.time() + self.ttl
+        if self.snapshot_path:
+            self._dirty.set()
+
+    def _live(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        if job is not None and self._expires.get(job_id, 0) < time.time():
+            self._remove(job_id)
+            return None
+        return job
+
+    def _remove(self, job_id: str) -> None:
+        self.jobs.pop(job_id, None)
+        self._expires.pop(job_id, None)
+
+    @staticmethod
+    def _copy(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {**job, "metadata": dict(job.get("metadata") or {})}
+
+    def create(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self.jobs[job["job_id"]] = self._copy(job)
+            self._touch(job["job_id"])
+            overflow = len(self.jobs) - self.max_history
+            if overflow > 0:
+                finished = [
+                    job_id for job_id, existing in self.jobs.items()
+                    if existing.get("status") in TERMINAL_STATUSES
+                ][:overflow]
+                for job_id in finished:
+                    self._remove(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._live(job_id)
+            return self._copy(job) if job else None
+
+    def update(
+        self,
+        job_id: str,
+        fields: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+        recompute_progress: bool = False,
+        reset_progress_on_failure: bool = False
+    ) -> bool:
+        with self._lock:
+            job = self._live(job_id)
+            if job is None:
+                return False
+            delta = _apply_update(job, fields, metadata, status, recompute_progress, reset_progress_on_failure)
+            job["event_seq"] = delta["seq"] = (job.get("event_seq") or 0) + 1
+            delta["job_id"] = job_id
+            self._touch(job_id)
+            self._notify(job_id, delta)
+            return True
+
+    def increment(self, job_id: str, steps: int = 1) -> Optional[int]:
+        with self._lock:
+            job = self._live(job_id)
+            if job is None:
+                return None
+            job["completed_steps"] = (job.get("completed_steps") or 0) + steps
+            delta = {"job_id": job_id, "completed_steps": job["completed_steps"]}
+            if job.get("total_steps"):
+                job["progress_percentage"] = delta["progress_percentage"] = min(
+                    100, int(job["completed_steps"] * 100 / job["total_steps"])
+                )
+            job["event_seq"] = delta["seq"] = (job.get("event_seq") or 0) + 1
+            self._touch(job_id)
+            self._notify(job_id, delta)
+            return job["completed_steps"]
+
+    def active_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                self._copy(job) for job_id, job in list(self.jobs.items())
+                if self._live(job_id) and job.get("status") in ACTIVE_STATUSES
+            ]
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self.jobs)
+
+    def evict_expired(self, max_age_seconds: int) -> int:
+        cutoff = datetime.utcnow().timestamp() - max_age_seconds
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for job_id, job in list(self.jobs.items()):
+                completed_at = job.get("completed_at")
+                finished_long_ago = (
+                    job.get("status") in TERMINAL_STATUSES and completed_at
+                    and datetime.fromisoformat(completed_at).timestamp() < cutoff
+                )
+                if finished_long_ago or self._expires.get(job_id, 0) < now:
+                    self._remove(job_id)
+                    removed += 1
+            if removed and self.snapshot_path:
+                self._dirty.set()
+        return removed
+
+
+_job_store: Optional[JobStore] = None
+_job_store_lock = threading.Lock()
+
+
+def _create_job_store() -> JobStore:
+    backend = settings.job_store_backend.lower()
+    snapshot_path = settings.job_store_snapshot_path or None
+    if backend in ("redis", "auto"):
+        try:
+            store = RedisJobStore()
+            store.ping()
+            logger.info("Using Redis job store")
+            return store
+        except Exception as e:
+            if backend == "redis":
+                raise
+            logger.warning(f"Redis unavailable for job state ({e}); using in-process job store")
+    return MemoryJobStore(snapshot_path=snapshot_path)
+
+
+def get_job_store() -> JobStore:
+    """Get the process-wide job store, choosing the backend on first use"""
+    global _job_store
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                _job_store = _create_job_store()
+    return _job_store
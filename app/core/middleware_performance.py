@@ -1,15 +1,29 @@
 """Performance monitoring middleware"""
 import time
 import logging
-from typing import Callable
+from typing import Callable, List, Optional
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from prometheus_client import Counter, Histogram, Gauge
 import psutil
 import asyncio
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+try:
+    import brotli
+except ImportError:  # Optional: gzip only without it
+    brotli = None
+
+from app.core.auth import verify_token
+from app.core import query_instrumentation
+from app.core.config import settings
 from app.core.performance import performance_monitor
+from app.core.response_cache import (
+    CachedResponse, ResponseCache, compute_etag, get_response_cache, request_scopes
+)
 
 logger = logging.getLogger(__name__)
 
@@ -150,86 +164,322 @@ class ResourceMonitoringMiddleware(BaseHTTPMiddleware):
 
 
 class CacheMiddleware(BaseHTTPMiddleware):
-    """Middleware for caching responses"""
+    """
+    Serve repeated GET requests from the shared response cache
     
-    def __init__(self, app):
+    Responses are keyed per user (or per role on ``response_cache_role_paths`` when
+    the token carries a role) and carry an ETag, so revalidating clients get a 304
+    without a body. Streaming, non-200, cookie-setting and ``no-store`` responses
+    are never cached.
+    """
+    
+    def __init__(self, app, cache: Optional[ResponseCache] = None):
         super().__init__(app)
-        self._cache = {}
-        self._cache_ttl = 300  # 5 minutes
+        self.cache = cache or get_response_cache()
+        self.exclude_paths = tuple(settings.response_cache_exclude_paths)
+        self.role_paths = tuple(settings.response_cache_role_paths)
+        self.max_entry_bytes = settings.response_cache_max_entry_bytes
+    
+    def _principal(self, request: Request) -> Optional[str]:
+        """Cache partition of the caller, or None when the request must not be cached"""
+        authorization = request.headers.get("authorization")
+        if not authorization:
+            return "anonymous"
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            payload = verify_token(token)
+        except Exception:
+            return None
+        if payload.get("role") and self.role_paths and request.url.path.startswith(self.role_paths):
+            return f"role:{payload['role']}"
+        return f"user:{payload['sub']}"
+    
+    @staticmethod
+    def _route_name(request: Request) -> str:
+        endpoint = request.scope.get("endpoint")
+        if endpoint is None:
+            return request.url.path
+        return f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+    
+    @staticmethod
+    def _not_modified(request: Request, etag: str) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    
+    def _replay(self, request: Request, entry: CachedResponse, cache_status: str) -> Response:
+        if self._not_modified(request, entry.etag):
+            response = Response(status_code=304, headers={"ETag": entry.etag})
+        else:
+            response = Response(content=entry.body, status_code=entry.status_code, headers=dict(entry.headers))
+        response.headers["X-Cache"] = cache_status
+        return response
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Only cache GET requests
-        if request.method != "GET":
+        if request.method != "GET" or request.url.path.startswith(self.exclude_paths):
             return await call_next(request)
         
-        # Skip if no-cache header
-        if request.headers.get("cache-control") == "no-cache":
+        # Skip if the client asks for a fresh response
+        cache_control = request.headers.get("cache-control", "")
+        if "no-cache" in cache_control or "no-store" in cache_control:
             return await call_next(request)
         
-        # Generate cache key
-        cache_key = f"{request.method}:{request.url.path}:{request.url.query}"
-        
-        # Check cache
-        if cache_key in self._cache:
-            cached_response, timestamp = self._cache[cache_key]
-            if time.time() - timestamp < self._cache_ttl:
-                # Return cached response
-                response = Response(
-                    content=cached_response["content"],
-                    status_code=cached_response["status_code"],
-                    headers=cached_response["headers"]
-                )
-                response.headers["X-Cache"] = "HIT"
-                return response
+        principal = self._principal(request)
+        if principal is None:
+            return await call_next(request)
+        
+        scopes = request_scopes(request.url.path, request.query_params)
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        cache_key = await self.cache.build_key(request.method, request.url.path, query, principal, scopes)
+        
+        entry = await self.cache.get(cache_key)
+        if entry is not None:
+            return self._replay(request, entry, "HIT")
         
-        # Process request
         response = await call_next(request)
+        route = self._route_name(request)
+        self.cache.record_miss(route)
         
-        # Cache successful GET responses
-        if response.status_code == 200 and request.method == "GET":
-            # Read response body
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-            
-            # Cache response
-            self._cache[cache_key] = ({
-                "content": body,
-                "status_code": response.status_code,
-                "headers": dict(response.headers)
-            }, time.time())
-            
-            # Create new response with body
-            response = Response(
-                content=body,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
-            response.headers["X-Cache"] = "MISS"
+        if (
+            response.status_code != 200
+            or response.headers.get("content-type", "").startswith("text/event-stream")
+            or "set-cookie" in response.headers
+            or "no-store" in response.headers.get("cache-control", "")
+        ):
+            return response
         
-        return response
+        # Read the body, giving up on caching once it outgrows a single entry
+        chunks = []
+        size = 0
+        body_iterator = response.body_iterator
+        async for chunk in body_iterator:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_entry_bytes:
+                break
+        else:
+            body = b"".join(chunks)
+            etag = compute_etag(body)
+            headers = [
+                (k, v) for k, v in response.headers.items()
+                if k not in ("content-length", "etag", "x-cache")
+            ]
+            headers.append(("etag", etag))
+            headers.append(("vary", "Authorization"))
+            entry = CachedResponse(status_code=response.status_code, headers=headers, body=body, etag=etag, route=route)
+            await self.cache.set(cache_key, entry)
+            return self._replay(request, entry, "MISS")
+        
+        async def remaining_body():
+            for chunk in chunks:
+                yield chunk
+            async for chunk in body_iterator:
+                yield chunk
+        
+        return StreamingResponse(
+            remaining_body(),
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            background=response.background
+        )
 
 
-class CompressionMiddleware(BaseHTTPMiddleware):
-    """Middleware for response compression"""
+class CompressionMiddleware:
+    """
+    Pure ASGI response compression (brotli when available and accepted, else gzip)
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Check if client accepts gzip
-        accept_encoding = request.headers.get("accept-encoding", "")
+    Compresses chunk by chunk as the body is sent, so streaming responses are
+    compressed with constant memory instead of being buffered. Only allowlisted
+    content types at least ``compression_minimum_size`` bytes long are compressed;
+    event streams are never compressed so their events are not held back.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        content_types: Optional[List[str]] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.compression_minimum_size
+        self.content_types = tuple(content_types or settings.compression_content_types)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        response = await call_next(request)
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        responder = _CompressionResponder(send, encoding, self.minimum_size, self.content_types)
+        await self.app(scope, receive, responder.send)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported encoding from an Accept-Encoding header"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+    
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class _StreamCompressor:
+    """Incremental gzip or brotli encoder"""
+    
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+    
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class _CompressionResponder:
+    """Wraps ``send`` for one response, deciding on compression at the first body chunk"""
+    
+    def __init__(self, send: Send, encoding: str, minimum_size: int, content_types: tuple):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.content_types = content_types
+        self.start_message: Optional[Message] = None
+        self.pending = b""
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+    
+    def _compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(self.content_types) and content_type != "text/event-stream"
+    
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if message["status"] in (204, 304) or not self._compressible(headers):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                # Held until the first body chunk decides the encoding
+                self.start_message = message
+            return
+        
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
         
-        # Only compress if client accepts gzip and response is large enough
-        if "gzip" in accept_encoding and len(response.body) > 1000:
-            import gzip
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        
+        if self.compressor is None:
+            # Gather up to minimum_size bytes before committing to compression
+            self.pending += body
+            if len(self.pending) < self.minimum_size and more_body:
+                return
+            if len(self.pending) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": self.pending, "more_body": False})
+                return
+            
+            self.compressor = _StreamCompressor(self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            body, self.pending = self.pending, b""
             
-            # Compress response body
-            compressed_body = gzip.compress(response.body)
+            if not more_body:
+                # Whole body in hand: send it with an exact length
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
             
-            # Only use compressed if it's smaller
-            if len(compressed_body) < len(response.body):
-                response.body = compressed_body
-                response.headers["content-encoding"] = "gzip"
-                response.headers["content-length"] = str(len(compressed_body))
+            del headers["Content-Length"]
+            await self._send(self.start_message)
         
-        return response
\ No newline at end of file
+        compressed = self.compressor.compress(body)
+        if not more_body:
+            compressed += self.compressor.finish()
+        if compressed or not more_body:
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Pure ASGI middleware counting the database statements of each request
+    
+    Statements issued by any session while the request is served are collected
+    by ``query_instrumentation``. Counts up to the response start are reported in
+    ``X-DB-Query-Count``, ``X-DB-Time-Ms``, ``X-DB-Rows`` and, when a statement
+    shape repeats past the N+1 threshold, ``X-DB-N-Plus-One``; the final counts
+    go to the per-route Prometheus histograms once the request completes.
+    """
+    
+    def __init__(self, app: ASGIApp, headers: Optional[bool] = None):
+        self.app = app
+        self.headers = headers if headers is not None else settings.db_instrumentation_headers
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.db_instrumentation_enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        # Routing stores the endpoint in the shared scope, so its budget resolves on the first statement
+        stats = query_instrumentation.QueryStats(
+            n_plus_one_threshold=settings.db_n_plus_one_threshold,
+            budget_source=lambda: query_instrumentation.endpoint_budget(scope.get("endpoint"))
+        )
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.headers:
+                headers = MutableHeaders(raw=message.setdefault("headers", []))
+                headers["X-DB-Query-Count"] = str(stats.statements)
+                headers["X-DB-Time-Ms"] = f"{stats.db_time * 1000:.1f}"
+                headers["X-DB-Rows"] = str(stats.rows)
+                repeated = stats.repeated_shapes
+                if repeated:
+                    headers["X-DB-N-Plus-One"] = str(max(repeated.values()))
+            await send(message)
+        
+        token = query_instrumentation.start_tracking(stats)
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            query_instrumentation.stop_tracking(token)
+            route = scope.get("route")
+            query_instrumentation.record_request(
+                scope["method"], getattr(route, "path", None) or "unmatched", stats
+            )
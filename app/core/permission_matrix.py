@@ -0,0 +1,401 @@
+"""
+Permission Matrix
+Process-wide compiled RBAC data so permission checks run without database queries
+
+The matrix holds the permission catalogue, each role's permissions and the role
+hierarchy, plus one compiled entry per user: admin flag, the frozenset of
+permission ids granted through the user's roles (inheritance flattened), and the
+user's direct and resource-level grants or denials. Entries are built on the
+first check for a user and reused until invalidated, until the earliest
+expiry among their grants, or for at most ``rbac_cache_ttl`` seconds.
+
+Committed writes to the RBAC tables (or to a user's role) invalidate the affected
+entries through SQLAlchemy session hooks, and the invalidation is broadcast on
+Redis pub/sub so every API process drops its copy.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+from sqlalchemy import and_, event, inspect, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "rbac:invalidate"
+ALL = "all"
+
+# Tables whose writes change every user's effective permissions
+GLOBAL_RBAC_TABLES = {"rbac_permissions", "rbac_roles", "rbac_role_permissions", "rbac_role_hierarchy"}
+# Tables whose writes change one user's effective permissions (keyed by user_id)
+USER_RBAC_TABLES = {"rbac_user_roles", "rbac_user_permissions", "rbac_resource_permissions", "users"}
+
+
+@dataclass(frozen=True)
+class UserPermissions:
+    """Compiled permissions of one user"""
+    is_admin: bool
+    role_permissions: FrozenSet[int]
+    user_overrides: Dict[int, bool]
+    resource_overrides: Dict[Tuple[str, int, int], bool]
+    valid_until: float
+
+    def decide(self, permission_id: int, resource: str, resource_id: Optional[int]) -> bool:
+        """Same precedence as the query-based check: direct grant/deny, resource grant/deny, roles"""
+        override = self.user_overrides.get(permission_id)
+        if override is not None:
+            return override
+        if resource_id:
+            override = self.resource_overrides.get((resource, resource_id, permission_id))
+            if override is not None:
+                return override
+        return permission_id in self.role_permissions
+
+
+def _expiry(expires_at: Optional[datetime], valid_until: float) -> float:
+    """Tighten ``valid_until`` to a grant's expiry (expiry columns are naive UTC)"""
+    if expires_at is None:
+        return valid_until
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return min(valid_until, expires_at.timestamp())
+
+
+_publisher = None
+
+
+def publish_invalidation(origin: str, target: str) -> None:
+    """Broadcast that ``target`` (``all`` or ``user:<id>``) must be recompiled"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        # Called from after_commit on the event loop: publish from the default executor
+        loop.run_in_executor(None, _publish_now, origin, target)
+        return
+    _publish_now(origin, target)
+
+
+def _publish_now(origin: str, target: str) -> None:
+    global _publisher
+    try:
+        if _publisher is None:
+            import redis
+            _publisher = redis.from_url(
+                settings.redis_url, decode_responses=True, socket_timeout=1, socket_connect_timeout=1
+            )
+        _publisher.publish(INVALIDATION_CHANNEL, f"{origin}|{target}")
+    except Exception as e:
+        # Other processes fall back to the TTL
+        logger.warning(f"Could not broadcast RBAC invalidation of {target}: {e}")
+
+
+class PermissionMatrix:
+    """Shared permission data with per-user compiled entries"""
+
+    def __init__(self, max_users: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_users = max_users or settings.rbac_matrix_max_users
+        self.ttl_seconds = ttl_seconds or settings.rbac_cache_ttl
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._user_generations: Dict[int, int] = {}
+
+        self._catalogue_loaded_at: Optional[float] = None
+        self._permission_ids: Dict[Tuple[str, str], int] = {}
+        self._role_permissions: Dict[int, FrozenSet[int]] = {}
+        self._role_parents: Dict[int, FrozenSet[int]] = {}
+        self._users: "OrderedDict[int, UserPermissions]" = OrderedDict()
+
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[threading.Thread] = None
+
+    # Checks
+
+    async def check_permission(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        resource: str,
+        action: str,
+        resource_id: Optional[int] = None
+    ) -> bool:
+        """Whether the user may perform ``resource:action``; only queries on a cold entry"""
+        await self._ensure_catalogue(db)
+        entry = await self._get_user(db, user_id)
+        if entry is None:
+            return False
+        if entry.is_admin:
+            return True
+
+        permission_id = self.permission_id(resource, action)
+        if permission_id is None:
+            logger.warning(f"Permission not found: {resource}:{action}")
+            return False
+        return entry.decide(permission_id, resource, resource_id)
+
+    def permission_id(self, resource: str, action: str) -> Optional[int]:
+        permission_id = self._permission_ids.get((resource, action))
+        if permission_id is None:
+            # Treat "report" and "reports" the same
+            normalized_resource = resource.rstrip('s') if resource.endswith('s') else resource
+            permission_id = self._permission_ids.get((normalized_resource, action))
+        return permission_id
+
+    # Loading
+
+    async def _ensure_catalogue(self, db: AsyncSession) -> None:
+        loaded_at = self._catalogue_loaded_at
+        if loaded_at is not None and time.time() - loaded_at < self.ttl_seconds:
+            return
+
+        from app.models.rbac import Permission, RoleHierarchy, RolePermission
+
+        generation = self._generation
+        permissions = await db.execute(select(Permission.permission_id, Permission.resource, Permission.action))
+        permission_ids = {(resource, action): permission_id for permission_id, resource, action in permissions}
+
+        role_permissions: Dict[int, Set[int]] = {}
+        rows = await db.execute(select(RolePermission.role_id, RolePermission.permission_id))
+        for role_id, permission_id in rows:
+            role_permissions.setdefault(role_id, set()).add(permission_id)
+
+        role_parents: Dict[int, Set[int]] = {}
+        rows = await db.execute(select(RoleHierarchy.child_role_id, RoleHierarchy.parent_role_id))
+        for child_role_id, parent_role_id in rows:
+            role_parents.setdefault(child_role_id, set()).add(parent_role_id)
+
+        with self._lock:
+            self._permission_ids = permission_ids
+            self._role_permissions = {role_id: frozenset(ids) for role_id, ids in role_permissions.items()}
+            self._role_parents = {role_id: frozenset(ids) for role_id, ids in role_parents.items()}
+            self._users.clear()
+            # Invalidated while loading: serve this check, reload on the next one
+            self._catalogue_loaded_at = time.time() if generation == self._generation else None
+
+    def _ancestors(self, role_id: int) -> Set[int]:
+        """All roles ``role_id`` inherits from"""
+        seen: Set[int] = set()
+        stack = list(self._role_parents.get(role_id, ()))
+        while stack:
+            parent = stack.pop()
+            if parent not in seen:
+                seen.add(parent)
+                stack.extend(self._role_parents.get(parent, ()))
+        return seen
+
+    async def _get_user(self, db: AsyncSession, user_id: int) -> Optional[UserPermissions]:
+        now = time.time()
+        entry = self._users.get(user_id)
+        if entry is not None and now < entry.valid_until:
+            return entry
+
+        from app.models.rbac import ResourcePermission, UserPermission, UserRole
+        from app.models.user import User
+
+        generation = self._generation
+        user_generation = self._user_generations.get(user_id, 0)
+        valid_until = now + self.ttl_seconds
+        utcnow = datetime.utcnow()
+
+        role = await db.scalar(select(User.role).where(User.user_id == user_id))
+        if role is None:
+            return None
+
+        roles: Set[int] = set()
+        rows = await db.execute(
+            select(UserRole.role_id, UserRole.expires_at).where(
+                and_(
+                    UserRole.user_id == user_id,
+                    or_(UserRole.expires_at.is_(None), UserRole.expires_at > utcnow)
+                )
+            )
+        )
+        for role_id, expires_at in rows:
+            roles.add(role_id)
+            roles.update(self._ancestors(role_id))
+            valid_until = _expiry(expires_at, valid_until)
+
+        role_permissions: Set[int] = set()
+        for role_id in roles:
+            role_permissions.update(self._role_permissions.get(role_id, ()))
+
+        user_overrides: Dict[int, bool] = {}
+        rows = await db.execute(
+            select(UserPermission.permission_id, UserPermission.granted, UserPermission.expires_at).where(
+                and_(
+                    UserPermission.user_id == user_id,
+                    or_(UserPermission.expires_at.is_(None), UserPermission.expires_at > utcnow)
+                )
+            )
+        )
+        for permission_id, granted, expires_at in rows:
+            user_overrides[permission_id] = granted
+            valid_until = _expiry(expires_at, valid_until)
+
+        resource_overrides: Dict[Tuple[str, int, int], bool] = {}
+        rows = await db.execute(
+            select(
+                ResourcePermission.resource_type, ResourcePermission.resource_id,
+                ResourcePermission.permission_id, ResourcePermission.granted, ResourcePermission.expires_at
+            ).where(
+                and_(
+                    ResourcePermission.user_id == user_id,
+                    or_(ResourcePermission.expires_at.is_(None), ResourcePermission.expires_at > utcnow)
+                )
+            )
+        )
+        for resource_type, resource_id, permission_id, granted, expires_at in rows:
+            resource_overrides[(resource_type, resource_id, permission_id)] = granted
+            valid_until = _expiry(expires_at, valid_until)
+
+        entry = UserPermissions(
+            is_admin=role == 'Admin',
+            role_permissions=frozenset(role_permissions),
+            user_overrides=user_overrides,
+            resource_overrides=resource_overrides,
+            valid_until=valid_until if valid_until >= now else now,
+        )
+
+        with self._lock:
+            if generation == self._generation and user_generation == self._user_generations.get(user_id, 0):
+                self._users[user_id] = entry
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        return entry
+
+    # Invalidation
+
+    def invalidate_user(self, user_id: int, broadcast: bool = True) -> None:
+        with self._lock:
+            self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+            self._users.pop(user_id, None)
+        if broadcast:
+            self._publish(f"user:{user_id}")
+
+    def invalidate_all(self, broadcast: bool = True) -> None:
+        with self._lock:
+            self._generation += 1
+            self._catalogue_loaded_at = None
+            self._users.clear()
+        if broadcast:
+            self._publish(ALL)
+
+    def _publish(self, target: str) -> None:
+        publish_invalidation(self._origin, target)
+
+    def _apply(self, message: str) -> None:
+        origin, _, target = message.partition("|")
+        if origin == self._origin:
+            return
+        if target == ALL:
+            self.invalidate_all(broadcast=False)
+        elif target.startswith("user:"):
+            self.invalidate_user(int(target[5:]), broadcast=False)
+
+    def start_listener(self) -> None:
+        """Apply invalidations broadcast by other processes (daemon thread)"""
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._listener = threading.Thread(target=self._listen, name="rbac-invalidation", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        import redis
+
+        backoff = 1.0
+        while True:
+            try:
+                client = redis.from_url(settings.redis_url, decode_responses=True)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Broadcasts sent while disconnected were missed
+                self.invalidate_all(broadcast=False)
+                backoff = 1.0
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply(message["data"])
+            except Exception as e:
+                logger.debug(f"RBAC invalidation listener disconnected ({e}); retrying in {backoff:.0f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "permissions": len(self._permission_ids),
+            "roles": len(self._role_permissions),
+            "users": len(self._users),
+            "generation": self._generation,
+        }
+
+
+_permission_matrix: Optional[PermissionMatrix] = None
+
+
+def get_permission_matrix() -> PermissionMatrix:
+    """Get the process-wide permission matrix, listening for invalidations from other processes"""
+    global _permission_matrix
+    if _permission_matrix is None:
+        _permission_matrix = PermissionMatrix()
+        _permission_matrix.start_listener()
+    return _permission_matrix
+
+
+# Invalidation hooks
+
+def _collect_rbac_writes(session: Session, flush_context) -> None:
+    targets: Set = session.info.setdefault("rbac_invalidations", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__tablename__", "")
+        if table in GLOBAL_RBAC_TABLES:
+            targets.add(ALL)
+        elif table in USER_RBAC_TABLES:
+            user_id = inspect(obj).dict.get("user_id")
+            targets.add(user_id if user_id is not None else ALL)
+
+
+def _invalidate_committed(session: Session) -> None:
+    targets = session.info.pop("rbac_invalidations", None)
+    if not targets:
+        return
+    if ALL in targets:
+        targets = [ALL]
+
+    matrix = _permission_matrix
+    for target in targets:
+        if matrix is None:
+            # Nothing compiled in this process (e.g. a worker): only tell the API processes
+            publish_invalidation("", ALL if target == ALL else f"user:{target}")
+        elif target == ALL:
+            matrix.invalidate_all()
+        else:
+            matrix.invalidate_user(target)
+
+
+def _discard(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop("rbac_invalidations", None)
+
+
+_hooks_registered = False
+
+
+def register_invalidation_hooks() -> None:
+    """Invalidate compiled permissions whenever a session commits RBAC or user role writes"""
+    global _hooks_registered
+    if _hooks_registered:
+        return
+    event.listen(Session, "after_flush", _collect_rbac_writes)
+    event.listen(Session, "after_commit", _invalidate_committed)
+    event.listen(Session, "after_soft_rollback", _discard)
+    _hooks_registered = True
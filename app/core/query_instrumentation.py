@@ -0,0 +1,211 @@
+"""
+Request-scoped database instrumentation
+
+Every statement executed while a request is served is counted against that
+request. ``register_instrumentation_hooks`` listens to cursor executions of all
+engines and adds the statement, its database time and the rows it returned to
+the ``QueryStats`` held in a context variable, so sessions opened outside
+``get_db`` are counted as well. Statements are also counted by shape, the SQL
+text with literals and bind placeholders normalized, and a shape run more than
+``db_n_plus_one_threshold`` times in one request is reported as an N+1 pattern.
+
+Routes declare a query budget with ``query_budget``. With
+``db_query_budget_enforced`` on, as in tests, the statement exceeding the
+budget raises ``QueryBudgetExceeded`` instead of running. ``track_queries``
+collects the same stats around any block of code.
+"""
+
+import logging
+import re
+import time
+from collections import Counter as ShapeCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.exceptions import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_ATTR = "__query_budget__"
+_START_TIMES_KEY = "query_instrumentation_start_times"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+db_queries_per_request = Histogram(
+    'synapse_db_queries_per_request',
+    'Database statements issued per HTTP request',
+    ['method', 'route'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+
+db_time_per_request = Histogram(
+    'synapse_db_time_per_request_seconds',
+    'Database time spent per HTTP request',
+    ['method', 'route']
+)
+
+db_rows_per_request = Histogram(
+    'synapse_db_rows_per_request',
+    'Rows returned by the database per HTTP request',
+    ['method', 'route'],
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000)
+)
+
+db_n_plus_one_requests = Counter(
+    'synapse_db_n_plus_one_requests_total',
+    'HTTP requests repeating one statement shape more than the N+1 threshold',
+    ['method', 'route']
+)
+
+
+@dataclass
+class QueryStats:
+    """Database statements issued while serving one request or ``track_queries`` block"""
+    statements: int = 0
+    db_time: float = 0.0  # Seconds
+    rows: int = 0
+    shapes: ShapeCounter = field(default_factory=ShapeCounter)
+    n_plus_one_threshold: int = 10
+    budget: Optional[int] = None  # Statements allowed, None for no budget
+    budget_source: Optional[Callable[[], Optional[int]]] = None  # Resolves the budget once the route is known
+
+    def current_budget(self) -> Optional[int]:
+        if self.budget is None and self.budget_source is not None:
+            return self.budget_source()
+        return self.budget
+
+    @property
+    def repeated_shapes(self) -> Dict[str, int]:
+        """Statement shapes run more than the N+1 threshold, with their counts"""
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count > self.n_plus_one_threshold
+        }
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """SQL text with literals, bind placeholders and expanded IN lists normalized"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _VALUE_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def query_budget(max_statements: int) -> Callable:
+    """
+    Declare the number of database statements a route may issue per request
+
+    Applied under the route decorator; the endpoint itself is returned unchanged.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(endpoint, QUERY_BUDGET_ATTR, max_statements)
+        return endpoint
+    return decorator
+
+
+def endpoint_budget(endpoint: Any) -> Optional[int]:
+    return getattr(endpoint, QUERY_BUDGET_ATTR, None)
+
+
+def start_tracking(stats: QueryStats):
+    """Count statements of the current context into ``stats``; returns the token for ``stop_tracking``"""
+    return _current_stats.set(stats)
+
+
+def stop_tracking(token) -> None:
+    _current_stats.reset(token)
+
+
+def get_current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """Collect the statements issued inside the block, optionally enforcing a budget"""
+    stats = QueryStats(
+        n_plus_one_threshold=settings.db_n_plus_one_threshold,
+        budget=budget
+    )
+    token = start_tracking(stats)
+    try:
+        yield stats
+    finally:
+        stop_tracking(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+
+    # Pushed first so ``_handle_error`` pops it if the budget check raises
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+    budget = stats.current_budget()
+    if budget is not None and stats.statements >= budget and settings.db_query_budget_enforced:
+        raise QueryBudgetExceeded(
+            f"Query budget of {budget} statements exceeded by: {statement_shape(statement)[:200]}"
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start_times = conn.info.get(_START_TIMES_KEY)
+    if stats is None or not start_times:
+        return
+
+    stats.db_time += time.perf_counter() - start_times.pop()
+    stats.statements += 1
+    stats.shapes[statement_shape(statement)] += 1
+    if cursor.description is not None and cursor.rowcount and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _handle_error(exception_context):
+    start_times = exception_context.connection.info.get(_START_TIMES_KEY) if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
+
+def record_request(method: str, route: str, stats: QueryStats) -> None:
+    """Export the stats of a finished request to Prometheus and log N+1 patterns"""
+    db_queries_per_request.labels(method=method, route=route).observe(stats.statements)
+    db_time_per_request.labels(method=method, route=route).observe(stats.db_time)
+    db_rows_per_request.labels(method=method, route=route).observe(stats.rows)
+
+    repeated = stats.repeated_shapes
+    if repeated:
+        db_n_plus_one_requests.labels(method=method, route=route).inc()
+        for shape, count in repeated.items():
+            logger.warning(f"Possible N+1 in {method} {route}: statement run {count} times: {shape[:300]}")
+
+
+_hooks_registered = False
+
+
+def register_instrumentation_hooks() -> None:
+    """Count cursor executions of every engine against the current request"""
+    global _hooks_registered
+    if _hooks_registered or not settings.db_instrumentation_enabled:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _hooks_registered = True
@@ -0,0 +1,414 @@
+"""
+HTTP Response Cache
+Bounded two-tier cache for GET responses, keyed per user and invalidated on writes
+
+Entries live in a per-process LRU bounded by entry count and total bytes, and
+(when Redis is reachable) in Redis so API workers share them. Keys include the
+requesting principal, so one user's response is never served to another, and a
+set of invalidation generations:
+
+- report-scoped requests (``/cycles/{c}/reports/{r}`` or ``cycle_id``/``report_id``
+  query parameters) depend on that report's generation and on ``all``
+- every other request depends on ``global``
+
+Committing a write to a phase, version, sample, scoping, attribute, test case,
+test execution or observation table bumps the generation of the affected report
+(or ``all`` when the report cannot be resolved) and always ``global``, so existing
+entries stop matching and age out of the LRU. ORM unit-of-work writes are resolved
+to their report; Core and bulk INSERT/UPDATE/DELETE statements run through a
+session, including textual ones, invalidate ``all``.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+ALL_REPORTS_SCOPE = "all"
+GENERATIONS_KEY = "response_cache:generations"
+ENTRY_KEY_PREFIX = "response_cache:entry:"
+
+# Tables whose writes invalidate cached responses
+INVALIDATING_TABLES = re.compile(r"phase|version|sample|scoping|attribute|test_case|test_execution|observation")
+# Target tables of textual INSERT/UPDATE/DELETE statements, including writes inside CTEs
+TEXT_WRITE_TABLE = re.compile(r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(?:ONLY\s+)?([\w.\"]+)", re.IGNORECASE)
+
+REPORT_PATH = re.compile(r"/cycles/(\d+)/reports/(\d+)")
+
+cache_lookups = Counter(
+    'synapse_response_cache_lookups_total',
+    'Response cache lookups',
+    ['route', 'result']
+)
+
+cache_evictions = Counter(
+    'synapse_response_cache_evictions_total',
+    'Response cache entries evicted from the local LRU',
+    ['route']
+)
+
+cache_invalidations = Counter(
+    'synapse_response_cache_invalidations_total',
+    'Response cache generation bumps',
+    ['scope_type']
+)
+
+
+def report_scope(cycle_id: Any, report_id: Any) -> str:
+    return f"report:{cycle_id}:{report_id}"
+
+
+def request_scopes(path: str, query_params: Dict[str, str]) -> List[str]:
+    """Invalidation scopes a cached response for this request depends on"""
+    match = REPORT_PATH.search(path)
+    if match:
+        return [report_scope(*match.groups()), ALL_REPORTS_SCOPE]
+    if query_params.get("cycle_id") and query_params.get("report_id"):
+        return [report_scope(query_params["cycle_id"], query_params["report_id"]), ALL_REPORTS_SCOPE]
+    return [GLOBAL_SCOPE]
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body with the headers needed to replay it"""
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    etag: str
+    route: str
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def dumps(self) -> bytes:
+        meta = {
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "etag": self.etag,
+            "route": self.route,
+            "stored_at": self.stored_at,
+        }
+        return json.dumps(meta).encode() + b"\0" + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        meta, body = data.split(b"\0", 1)
+        meta = json.loads(meta)
+        return cls(
+            status_code=meta["status_code"],
+            headers=[tuple(h) for h in meta["headers"]],
+            body=body,
+            etag=meta["etag"],
+            route=meta["route"],
+            stored_at=meta["stored_at"],
+        )
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class ResponseCache:
+    """Per-process LRU with an optional shared Redis tier"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None
+    ):
+        self.max_entries = max_entries or settings.response_cache_max_entries
+        self.max_bytes = max_bytes or settings.response_cache_max_bytes
+        self.ttl_seconds = ttl_seconds or settings.response_cache_ttl_seconds
+        self.redis_url = redis_url if redis_url is not None else (
+            settings.redis_url if settings.response_cache_redis else None
+        )
+
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+
+        self._async_redis = None
+        self._sync_redis = None
+        self._redis_down_until = 0.0
+        self._pending_publishes: Set[asyncio.Task] = set()
+
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # Statistics
+
+    def _count(self, route: str, result: str) -> None:
+        route_stats = self._stats.setdefault(route, {"hit": 0, "redis_hit": 0, "miss": 0, "eviction": 0})
+        route_stats[result] += 1
+        if result == "eviction":
+            cache_evictions.labels(route=route).inc()
+        else:
+            cache_lookups.labels(route=route, result=result).inc()
+
+    def record_miss(self, route: str) -> None:
+        self._count(route, "miss")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "redis": self._redis_available(),
+                "routes": {route: dict(counts) for route, counts in self._stats.items()},
+            }
+
+    # Redis tier
+
+    def _redis_available(self) -> bool:
+        return bool(self.redis_url) and time.time() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception) -> None:
+        # Back off instead of paying a connection timeout on every request
+        logger.warning(f"Response cache Redis tier unavailable: {e}")
+        self._redis_down_until = time.time() + 30
+
+    def _get_async_redis(self):
+        if self._async_redis is None:
+            import redis.asyncio as aioredis
+            self._async_redis = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._async_redis
+
+    def _get_sync_redis(self):
+        if self._sync_redis is None:
+            import redis
+            self._sync_redis = redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._sync_redis
+
+    # Keys
+
+    async def generations(self, scopes: List[str]) -> List[int]:
+        """Current generation of each scope, shared through Redis when available"""
+        if self._redis_available():
+            try:
+                values = await self._get_async_redis().hmget(GENERATIONS_KEY, scopes)
+                return [int(v) if v is not None else 0 for v in values]
+            except Exception as e:
+                self._redis_failed(e)
+        return [self._generations.get(scope, 0) for scope in scopes]
+
+    async def build_key(self, method: str, path: str, query: str, principal: str, scopes: List[str]) -> str:
+        generations = await self.generations(scopes)
+        versioned = ",".join(f"{scope}={gen}" for scope, gen in zip(scopes, generations))
+        raw = "\n".join([method, path, query, principal, versioned])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    # Lookup and storage
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._count(entry.route, "hit")
+                    return entry
+                self._remove(key)
+
+        if self._redis_available():
+            try:
+                data = await self._get_async_redis().get(ENTRY_KEY_PREFIX + key)
+            except Exception as e:
+                self._redis_failed(e)
+                data = None
+            if data is not None:
+                entry = CachedResponse.loads(data)
+                with self._lock:
+                    self._store_local(key, entry)
+                self._count(entry.route, "redis_hit")
+                return entry
+        return None
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._store_local(key, entry)
+        if self._redis_available():
+            try:
+                await self._get_async_redis().set(ENTRY_KEY_PREFIX + key, entry.dumps(), ex=self.ttl_seconds)
+            except Exception as e:
+                self._redis_failed(e)
+
+    def _store_local(self, key: str, entry: CachedResponse) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest_key, oldest = next(iter(self._entries.items()))
+            self._remove(oldest_key)
+            self._count(oldest.route, "eviction")
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # Invalidation
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        """
+        Bump the generation of ``scopes`` (and ``global``) so dependent entries stop matching
+
+        Called from ``after_commit``, so inside an event loop the shared Redis
+        generations are bumped by a task scheduled on the loop instead of blocking
+        it; sessions outside a loop (Celery) bump them synchronously.
+        """
+        scopes = set(scopes) | {GLOBAL_SCOPE}
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+        for scope in scopes:
+            cache_invalidations.labels(scope_type=scope.split(":", 1)[0]).inc()
+
+        if not self._redis_available():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            loop.call_soon(self._schedule_publish, scopes)
+            return
+
+        try:
+            pipe = self._get_sync_redis().pipeline(transaction=False)
+            for scope in scopes:
+                pipe.hincrby(GENERATIONS_KEY, scope, 1)
+            pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _schedule_publish(self, scopes: Set[str]) -> None:
+        task = asyncio.ensure_future(self._publish_generations(scopes))
+        # Keep a reference until done so the task is not garbage collected mid-flight
+        self._pending_publishes.add(task)
+        task.add_done_callback(self._pending_publishes.discard)
+
+    async def _publish_generations(self, scopes: Set[str]) -> None:
+        try:
+            pipe = self._get_async_redis().pipeline(transaction=False)
+            for scope in scopes:
+                pipe.hincrby(GENERATIONS_KEY, scope, 1)
+            await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+
+# Invalidation hooks
+
+def _object_scope(session: Session, obj: Any) -> str:
+    """Report scope of a written object, without loading anything from the database"""
+    state = inspect(obj)
+    values = state.dict
+    if values.get("cycle_id") is not None and values.get("report_id") is not None:
+        return report_scope(values["cycle_id"], values["report_id"])
+
+    phase_id = values.get("phase_id")
+    if phase_id is not None:
+        from app.models.workflow import WorkflowPhase
+
+        phase = session.identity_map.get(inspect(WorkflowPhase).identity_key_from_primary_key([phase_id]))
+        if phase is not None:
+            return report_scope(phase.cycle_id, phase.report_id)
+    return ALL_REPORTS_SCOPE
+
+
+def _collect_written_scopes(session: Session, flush_context) -> None:
+    scopes: Set[str] = session.info.setdefault("response_cache_scopes", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__tablename__", "")
+        if INVALIDATING_TABLES.search(table):
+            scopes.add(_object_scope(session, obj))
+
+
+def _written_tables(statement: Any) -> List[str]:
+    """Target table names of an INSERT/UPDATE/DELETE statement, textual or not"""
+    if isinstance(statement, TextClause):
+        return [name.replace('"', '').rsplit(".", 1)[-1] for name in TEXT_WRITE_TABLE.findall(statement.text)]
+    if isinstance(statement, UpdateBase):
+        return [getattr(statement.table, "name", "")]
+    return []
+
+
+def _collect_statement_scopes(orm_execute_state: ORMExecuteState) -> None:
+    """Core and bulk writes bypass the unit of work; their report is not resolved, so they invalidate ``all``"""
+    if any(INVALIDATING_TABLES.search(table) for table in _written_tables(orm_execute_state.statement)):
+        orm_execute_state.session.info.setdefault("response_cache_scopes", set()).add(ALL_REPORTS_SCOPE)
+
+
+def _collect_bulk_scopes(update_context) -> None:
+    # Legacy Query.update()/delete()
+    table = getattr(update_context.mapper.local_table, "name", "")
+    if INVALIDATING_TABLES.search(table):
+        update_context.session.info.setdefault("response_cache_scopes", set()).add(ALL_REPORTS_SCOPE)
+
+
+def _invalidate_committed_scopes(session: Session) -> None:
+    scopes = session.info.pop("response_cache_scopes", None)
+    if scopes:
+        get_response_cache().invalidate(scopes)
+
+
+def _discard_scopes(session: Session, previous_transaction) -> None:
+    # Savepoint rollbacks keep the outer transaction's writes pending
+    if previous_transaction.parent is None:
+        session.info.pop("response_cache_scopes", None)
+
+
+_hooks_registered = False
+
+
+def register_invalidation_hooks() -> None:
+    """Invalidate cached responses whenever a session commits writes to the invalidating tables"""
+    global _hooks_registered
+    if _hooks_registered:
+        return
+    event.listen(Session, "after_flush", _collect_written_scopes)
+    event.listen(Session, "do_orm_execute", _collect_statement_scopes)
+    event.listen(Session, "after_bulk_update", _collect_bulk_scopes)
+    event.listen(Session, "after_bulk_delete", _collect_bulk_scopes)
+    event.listen(Session, "after_commit", _invalidate_committed_scopes)
+    event.listen(Session, "after_soft_rollback", _discard_scopes)
+    _hooks_registered = True
@@ -13,6 +13,7 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import engine, Base, init_db, close_db
+from app.core.data_source_pools import get_data_source_pool_registry
 from app.core.logging import setup_logging
 from app.api.v1.api import api_router
 from app.core.exceptions import (
@@ -24,6 +25,7 @@ from app.core.exceptions import (
 )
 from app.core.middleware import setup_middleware
 from app.middleware.audit_middleware import AuditMiddleware
+from app.core.middleware_performance import CacheMiddleware, CompressionMiddleware, QueryInstrumentationMiddleware
 from app.models.audit_mixin import register_audit_listeners
 
 # Setup structured logging
@@ -47,7 +49,7 @@ async def lifespan(app: FastAPI):
     
     # Import and check job manager
     from app.core.background_jobs import job_manager
-    logger.info(f"Job manager initialized with {len(job_manager.jobs)} jobs")
+    logger.info(f"Job manager initialized with {job_manager.count_jobs()} jobs")
     
     # Setup clean architecture dependencies
     from app.infrastructure.di import setup_dependencies
@@ -69,6 +71,10 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    from app.services.audit_database_service import get_audit_database_service
+    await get_audit_database_service().close()
+    await get_data_source_pool_registry().close_all()
+    job_manager.store.close()
     await close_db()
     logger.info("Shutting down SynapseDT application")
 
@@ -131,6 +137,16 @@ async def ensure_cors_on_errors(request: Request, call_next):
 # Setup advanced security middleware
 setup_middleware(app)
 
+# Serve repeated GETs from the shared, write-invalidated response cache
+if settings.response_cache_enabled:
+    app.add_middleware(CacheMiddleware)
+
+# Compress responses chunk by chunk (outside the cache, which stores identity bodies)
+app.add_middleware(CompressionMiddleware)
+
+# Count database statements, time and rows per request, in X-DB-* headers and per-route histograms
+app.add_middleware(QueryInstrumentationMiddleware)
+
 # Add audit middleware for user tracking
 app.add_middleware(AuditMiddleware)
 
@@ -175,6 +175,8 @@ from app.models.data_profiling import (
     Severity, Decision, DataSourceType,
     # Upload tracking model
     DataProfilingUpload,
+    # Column statistics shared by sampling, profiling and DQ scoring
+    ColumnStatisticsProfile,
     # Legacy models (deprecated)
     DataProfilingFile, ProfilingResult,
     # Aliases for backward compatibility
@@ -197,6 +199,9 @@ from app.models.pde_mapping_review import (
 #     assignment_status_enum, assignment_priority_enum, assignment_type_enum
 # )
 
+# Materialized dashboard metrics
+from app.models.metrics_snapshot import MetricsSnapshot
+
 # Workflow Activity models
 from app.models.workflow_activity import (
     WorkflowActivity, WorkflowActivityHistory, WorkflowActivityDependency,
@@ -356,8 +361,12 @@ __all__ = [
     
     # Data Profiling Management
     "DataProfilingUpload", "DataProfilingFile", "ProfilingRule", "ProfilingResult",
+    "ColumnStatisticsProfile",
     "ProfilingRuleStatus", "ProfilingRuleType",
     
+    # Dashboard metrics snapshots
+    "MetricsSnapshot",
+    
     # PDE Mapping Review
     "PDEMappingReview", "ReviewStatus", "ReviewActionType", "PDEMappingReviewHistory", "PDEMappingApprovalRule",
     
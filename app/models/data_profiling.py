@@ -14,7 +14,7 @@ Key Features:
 
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, BigInteger, Text, Boolean, ForeignKey, DateTime, Float, DECIMAL, JSON
+from sqlalchemy import Column, String, Integer, BigInteger, Text, Boolean, ForeignKey, DateTime, Float, DECIMAL, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM as PgEnum
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
@@ -549,6 +549,43 @@ class AttributeProfileResult(CustomPKModel, AuditMixin):
         return f"<AttributeProfileResult(id={self.id}, attribute_name={self.attribute_name}, quality_score={self.overall_quality_score})>"
 
 
+class ColumnStatisticsProfile(CustomPKModel):
+    """
+    One-pass statistics for a source column, shared by sampling, profiling and DQ scoring.
+    
+    Profiles are keyed by the data source, the source table and a data version fingerprint,
+    so they are rebuilt only when the table changes. Profiles without a data source are
+    keyed as data source 0. ``statistics`` holds the full sketch output
+    (quantiles, top values, rare values, frequency spread).
+    """
+    
+    __tablename__ = "cycle_report_data_source_column_profiles"
+    
+    id = Column(Integer, primary_key=True)
+    data_source_id = Column(Integer, ForeignKey('cycle_report_planning_data_sources.id', ondelete='CASCADE'), nullable=True, index=True)
+    source_table = Column(String(255), nullable=False)  # schema.table
+    source_version = Column(String(64), nullable=False)  # Data version fingerprint of the table
+    column_name = Column(String(255), nullable=False)
+    
+    row_count = Column(BigInteger, nullable=False, default=0)
+    null_count = Column(BigInteger, nullable=False, default=0)
+    distinct_count = Column(BigInteger, nullable=False, default=0)  # HyperLogLog estimate
+    statistics = Column(JSONB, nullable=False)
+    profiled_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index(
+            'uq_column_profile_version',
+            func.coalesce(data_source_id, 0), 'source_table', 'source_version', 'column_name',
+            unique=True
+        ),
+        Index('idx_column_profile_lookup', 'source_table', 'column_name', 'profiled_at'),
+    )
+    
+    def __repr__(self):
+        return f"<ColumnStatisticsProfile(source_table={self.source_table}, column_name={self.column_name}, version={self.source_version})>"
+
+
 # Legacy models - DEPRECATED, will be removed after migration
 class DataProfilingFile(CustomPKModel, AuditMixin):
     """DEPRECATED: Files referenced from planning phase instead"""
@@ -0,0 +1,47 @@
+"""
+Materialized metrics snapshots for dashboards
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.models.base import CustomPKModel
+
+# Key values of the report-wide and all-LOB rows
+REPORT_WIDE_PHASE = ""
+ALL_LOBS = 0
+
+
+class MetricsSnapshot(CustomPKModel):
+    """
+    Pre-aggregated metrics of a cycle report, per phase and LOB.
+    
+    ``phase_name`` is empty for the report-wide universal metrics and ``lob_id`` is 0
+    for rows covering all LOBs. Statement triggers on the source tables stamp
+    ``source_changed_at`` whenever a version, decision, test case or execution of
+    the report changes, so a row is stale while ``source_changed_at > computed_at``.
+    ``first_changed_at`` is only stamped when a fresh row becomes stale.
+    """
+    
+    __tablename__ = "cycle_report_metrics_snapshots"
+    
+    id = Column(Integer, primary_key=True)
+    cycle_id = Column(Integer, ForeignKey('test_cycles.cycle_id', ondelete='CASCADE'), nullable=False)
+    report_id = Column(Integer, ForeignKey('reports.id', ondelete='CASCADE'), nullable=False)
+    phase_name = Column(String(100), nullable=False, default=REPORT_WIDE_PHASE, server_default=REPORT_WIDE_PHASE)
+    lob_id = Column(Integer, nullable=False, default=ALL_LOBS, server_default=str(ALL_LOBS))
+    
+    metrics = Column(JSONB, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # When recomputation started
+    compute_ms = Column(Integer, nullable=True)  # Time the recomputation took
+    source_changed_at = Column(DateTime(timezone=True), nullable=True)  # Last change to the report's source rows
+    first_changed_at = Column(DateTime(timezone=True), nullable=True)  # Change that made the row stale
+    
+    __table_args__ = (
+        UniqueConstraint('cycle_id', 'report_id', 'phase_name', 'lob_id', name='uq_metrics_snapshot_scope'),
+        Index('idx_metrics_snapshot_stale', 'cycle_id', 'report_id', postgresql_where=text('source_changed_at > computed_at')),
+    )
+    
+    def __repr__(self):
+        return f"<MetricsSnapshot(cycle_id={self.cycle_id}, report_id={self.report_id}, phase={self.phase_name!r}, lob_id={self.lob_id})>"
@@ -2,7 +2,7 @@
 Observation Management Phase database models
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey, Enum as SQLEnum, func, UniqueConstraint, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey, Enum as SQLEnum, func, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
@@ -141,6 +141,7 @@ class ObservationRecord(CustomPKModel, AuditMixin):
     source_test_execution_id = Column(Integer, ForeignKey('cycle_report_test_execution_results.id'), nullable=True)  # DEPRECATED: Use test_execution_links
     # source_sample_record_id removed - derive from test cases instead
     source_attribute_id = Column(Integer, ForeignKey("cycle_report_planning_attributes.id"), nullable=False)
+    source_lob_id = Column(Integer, ForeignKey('lobs.lob_id'), nullable=True)  # LOB of auto-detected observation groups
     detection_method = Column(String)  # Auto-detected, Manual, Review-based
     detection_confidence = Column(Float)  # Confidence score for auto-detected
     
@@ -183,6 +184,16 @@ class ObservationRecord(CustomPKModel, AuditMixin):
     # Overall approval status
     approval_status = Column(String, nullable=True, default="Pending Review")
     
+    __table_args__ = (
+        # One auto-detected observation per attribute and LOB of a phase, the upsert target of detection
+        Index(
+            'uq_observation_auto_detected_group',
+            'phase_id', 'source_attribute_id', 'source_lob_id',
+            unique=True,
+            postgresql_where=text("detection_method = 'Auto-detected'")
+        ),
+    )
+    
     # Relationships
     phase = relationship("app.models.workflow.WorkflowPhase", back_populates="observations")
     source_test_execution = relationship("app.models.test_execution.TestExecution", foreign_keys=[source_test_execution_id])  # DEPRECATED
@@ -8,7 +8,7 @@ used across the application, providing comprehensive sample selection decision m
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, String, Integer, Text, Boolean, ForeignKey, DateTime, Float, DECIMAL
+from sqlalchemy import Column, String, Integer, Text, Boolean, ForeignKey, DateTime, Float, DECIMAL, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM as PgEnum 
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
@@ -272,6 +272,13 @@ class SampleSelectionSample(CustomPKModel, AuditMixin):
     carried_from_sample_id = Column(UUID(as_uuid=True), ForeignKey('cycle_report_sample_selection_samples.sample_id'), nullable=True)
     carry_forward_reason = Column(Text, nullable=True)
     
+    # Sample grid: keyset pages of a version in default and identifier order, approved samples of a phase
+    __table_args__ = (
+        Index('idx_sample_selection_samples_version_created', 'version_id', 'created_at', 'sample_id'),
+        Index('idx_sample_selection_samples_version_identifier', 'version_id', 'sample_identifier', 'sample_id'),
+        Index('idx_sample_selection_samples_phase_version', 'phase_id', 'version_id'),
+    )
+    
     # Relationships
     version = relationship("SampleSelectionVersion", foreign_keys=[version_id], back_populates="samples")
     phase = relationship("app.models.workflow.WorkflowPhase")
@@ -5,7 +5,7 @@ Simplified architecture based on corrected implementation plan
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from sqlalchemy import Column, Integer, String, Text, Boolean, Float, DateTime, ForeignKey, UniqueConstraint, CheckConstraint, Index
+from sqlalchemy import Column, Integer, String, Text, Boolean, Float, DateTime, ForeignKey, UniqueConstraint, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -118,6 +118,10 @@ class TestExecution(BaseModel):
         Index('idx_test_execution_results_execution_status', 'execution_status'),
         Index('idx_test_execution_results_executed_by', 'executed_by'),
         Index('idx_test_execution_results_created_at', 'created_at'),
+        Index(
+            'idx_test_execution_results_phase_failed', 'phase_id', 'id',
+            postgresql_where=text("is_latest_execution AND execution_status = 'completed' AND test_result IN ('fail', 'inconclusive')")
+        ),
     )
     
     def __repr__(self):
@@ -364,6 +364,7 @@ class DetectionStatistics(BaseModel):
 class DetectionResults(BaseModel):
     """Schema for detection results"""
     processed_count: int
+    skipped_count: int = 0
     groups_created: int
     observations_created: int
     errors: List[str]
@@ -1,20 +1,31 @@
 """
 Separate Audit Database Service
 Provides isolated audit logging for compliance requirements with 7-year retention
+
+On PostgreSQL ``audit_events`` is range-partitioned by month on ``event_timestamp``,
+so time-bounded queries and exports only touch the partitions they cover and
+retention cleanup drops whole partitions. Reads page with a keyset cursor on
+``(event_timestamp, id)`` instead of offsets.
 """
 
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+import base64
+import csv
+import io
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+from datetime import date, datetime, timedelta, timezone
 from dataclasses import dataclass, asdict
 from enum import Enum
 
 import asyncpg
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, Index, func
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, Index, func, insert, select, delete, text, tuple_
 from sqlalchemy.dialects.postgresql import UUID
+from prometheus_client import Counter, Gauge, Histogram
 import uuid
 
 from app.core.config import get_settings
@@ -25,6 +36,36 @@ settings = get_settings()
 # Separate audit database base
 AuditBase = declarative_base()
 
+# Writer metrics
+audit_queue_depth = Gauge(
+    'synapse_audit_queue_depth',
+    'Audit events waiting for the background writer'
+)
+
+audit_events_written = Counter(
+    'synapse_audit_events_written_total',
+    'Audit events written to the audit database'
+)
+
+audit_events_dropped = Counter(
+    'synapse_audit_events_dropped_total',
+    'Audit events dropped by the background writer',
+    ['reason']
+)
+
+audit_flush_duration = Histogram(
+    'synapse_audit_flush_duration_seconds',
+    'Time to write one batch of audit events'
+)
+
+
+class _FlushRequest:
+    """Queue marker asking the writer to write its current batch now"""
+    
+    def __init__(self, stop: bool = False):
+        self.stop = stop
+        self.done = asyncio.get_running_loop().create_future()
+
 
 class AuditEventType(Enum):
     """Types of audit events"""
@@ -70,9 +111,10 @@ class AuditEvent(AuditBase):
     """Audit event model for separate audit database"""
     __tablename__ = "audit_events"
     
+    # The partition key has to be part of the primary key of a partitioned table
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     event_type = Column(String(50), nullable=False, index=True)
-    event_timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    event_timestamp = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow, index=True)
     
     # User and session information
     user_id = Column(Integer, nullable=True, index=True)
@@ -105,13 +147,100 @@ class AuditEvent(AuditBase):
     
     # Indexes for performance
     __table_args__ = (
-        Index('ix_audit_events_user_timestamp', 'user_id', 'event_timestamp'),
-        Index('ix_audit_events_type_timestamp', 'event_type', 'event_timestamp'),
+        Index('ix_audit_events_timestamp_id', 'event_timestamp', 'id'),
+        Index('ix_audit_events_user_timestamp', 'user_id', 'event_timestamp', 'id'),
+        Index('ix_audit_events_type_timestamp', 'event_type', 'event_timestamp', 'id'),
         Index('ix_audit_events_compliance_timestamp', 'compliance_relevant', 'event_timestamp'),
-        Index('ix_audit_events_resource', 'resource_type', 'resource_id'),
+        Index('ix_audit_events_resource', 'resource_type', 'resource_id', 'event_timestamp'),
+        {'postgresql_partition_by': 'RANGE (event_timestamp)'},
     )
 
 
+# Export columns, in output order
+EXPORT_COLUMNS = [column.name for column in AuditEvent.__table__.columns]
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def encode_audit_cursor(event: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just past ``event``"""
+    raw = f"{event['event_timestamp']}|{event['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_audit_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """``(event_timestamp, id)`` of a cursor from ``encode_audit_cursor``"""
+    try:
+        timestamp, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), uuid.UUID(event_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid audit cursor: {cursor}") from e
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # event_timestamp is stored as naive UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _json_or_none(value: Any) -> Optional[str]:
+    return json.dumps(value, default=str) if value is not None else None
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ValueError("Parquet audit export requires pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+class _ParquetSink:
+    """Write-only file object handing encoded Parquet bytes back as they are produced"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        # Parquet records absolute offsets in its footer
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def writable(self) -> bool:
+        return True
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
 @dataclass
 class AuditSummary:
     """Summary of audit events"""
@@ -139,13 +268,28 @@ class AuditDatabaseService:
         self.batch_size = getattr(settings, 'audit_batch_size', 100)
         self.retention_years = getattr(settings, 'audit_retention_years', 7)
         
+        # Background writer configuration
+        self.queue_max_size = getattr(settings, 'audit_queue_max_size', 10000)
+        self.flush_interval = getattr(settings, 'audit_flush_interval_seconds', 1.0)
+        self.queue_full_policy = getattr(settings, 'audit_queue_full_policy', 'block')
+        self.enqueue_timeout = getattr(settings, 'audit_enqueue_timeout_seconds', 0.5)
+        self.write_retries = getattr(settings, 'audit_write_retries', 3)
+        self.export_page_size = getattr(settings, 'audit_export_page_size', 5000)
+        self.parquet_compression = getattr(settings, 'audit_export_parquet_compression', 'zstd')
+        
         self._engine = None
         self._session_factory = None
         self._connected = False
         
-        # Event queue for batch processing
-        self._event_queue = []
-        self._queue_lock = asyncio.Lock()
+        # Monthly partitions known to exist (PostgreSQL only)
+        self._partitioned = False
+        self._partitions: set = set()
+        
+        # Events are written by a background task; requests only enqueue
+        self._event_queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._writer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"written": 0, "dropped": 0, "batches": 0, "write_seconds": 0.0}
         
         logger.info("Audit database service initialized")
     
@@ -175,8 +319,20 @@ class AuditDatabaseService:
             # Test connection
             async with self._engine.begin() as conn:
                 await conn.run_sync(AuditBase.metadata.create_all)
+                if self._engine.dialect.name == "postgresql":
+                    self._partitioned = bool(await conn.scalar(text(
+                        "SELECT 1 FROM pg_partitioned_table "
+                        f"WHERE partrelid = to_regclass('{AuditEvent.__tablename__}')"
+                    )))
+                    if not self._partitioned:
+                        logger.warning(
+                            "audit_events predates time partitioning; queries still work but "
+                            "scan the whole table until it is migrated to a partitioned table"
+                        )
             
             self._connected = True
+            now = datetime.utcnow()
+            await self.ensure_partitions(now, now + timedelta(days=31))
             logger.info("Successfully connected to audit database")
             return True
             
@@ -185,6 +341,29 @@ class AuditDatabaseService:
             self._connected = False
             return False
     
+    async def ensure_partitions(self, start: datetime, end: Optional[datetime] = None):
+        """Create the monthly partitions covering ``start`` through ``end``"""
+        if not self._partitioned:
+            return
+        month = _month_start(start)
+        last = _month_start(end or start)
+        while month <= last:
+            upper = _next_month(month)
+            name = f"{AuditEvent.__tablename__}_{month:%Y_%m}"
+            if name not in self._partitions:
+                try:
+                    async with self._engine.begin() as conn:
+                        await conn.execute(text(
+                            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {AuditEvent.__tablename__} "
+                            f"FOR VALUES FROM ('{month}') TO ('{upper}')"
+                        ))
+                    self._partitions.add(name)
+                    logger.debug(f"Audit partition {name} ready")
+                except Exception as e:
+                    # Another worker may have created it concurrently; the insert retry will tell
+                    logger.warning(f"Could not create audit partition {name}: {str(e)}")
+            month = upper
+    
     async def disconnect(self):
         """Disconnect from audit database"""
         try:
@@ -245,15 +424,8 @@ class AuditDatabaseService:
             }
             
             if batch:
-                # Add to queue for batch processing
-                async with self._queue_lock:
-                    self._event_queue.append(audit_event)
-                    
-                    # Process batch if queue is full
-                    if len(self._event_queue) >= self.batch_size:
-                        await self._flush_event_queue()
-                
-                return True
+                # Hand off to the background writer
+                return await self._enqueue(audit_event)
             else:
                 # Write immediately
                 return await self._write_events([audit_event])
@@ -262,38 +434,220 @@ class AuditDatabaseService:
             logger.error(f"Failed to log audit event: {str(e)}")
             return False
     
+    # Background writer
+    
+    def _ensure_writer(self) -> asyncio.Queue:
+        """Queue of the writer task running on the current event loop, starting it if needed"""
+        loop = asyncio.get_running_loop()
+        if self._writer is None or self._writer.done() or self._writer_loop is not loop:
+            self._event_queue = asyncio.Queue(maxsize=self.queue_max_size)
+            self._writer_loop = loop
+            self._writer = loop.create_task(self._run_writer(self._event_queue))
+        return self._event_queue
+    
+    async def _enqueue(self, audit_event: Dict[str, Any]) -> bool:
+        """Queue an event, applying the backpressure policy when the queue is full"""
+        queue = self._ensure_writer()
+        try:
+            queue.put_nowait(audit_event)
+        except asyncio.QueueFull:
+            if self.queue_full_policy != "block":
+                return self._drop(1, "queue_full")
+            try:
+                # Slow the producer briefly rather than drop a compliance record
+                await asyncio.wait_for(queue.put(audit_event), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                return self._drop(1, "queue_full")
+        audit_queue_depth.set(queue.qsize())
+        return True
+    
+    def _drop(self, count: int, reason: str) -> bool:
+        self._stats["dropped"] += count
+        audit_events_dropped.labels(reason=reason).inc(count)
+        logger.error(f"Dropped {count} audit event(s): {reason}")
+        return False
+    
+    async def _run_writer(self, queue: asyncio.Queue):
+        """Write queued events in batches of batch_size or every flush_interval seconds"""
+        loop = asyncio.get_running_loop()
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+        
+        while True:
+            timeout = None if deadline is None else max(deadline - loop.time(), 0)
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                item = None
+            
+            if isinstance(item, _FlushRequest):
+                await self._write_batch(batch)
+                batch, deadline = [], None
+                audit_queue_depth.set(queue.qsize())
+                item.done.set_result(True)
+                if item.stop:
+                    return
+                continue
+            
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = loop.time() + self.flush_interval
+            
+            if batch and (len(batch) >= self.batch_size or loop.time() >= deadline):
+                await self._write_batch(batch)
+                batch, deadline = [], None
+                audit_queue_depth.set(queue.qsize())
+    
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Write one batch, retrying with backoff before giving up on it"""
+        if not batch:
+            return
+        for attempt in range(self.write_retries + 1):
+            started = time.perf_counter()
+            if await self._write_events(batch):
+                elapsed = time.perf_counter() - started
+                audit_flush_duration.observe(elapsed)
+                audit_events_written.inc(len(batch))
+                self._stats["written"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["write_seconds"] += elapsed
+                return
+            if attempt < self.write_retries:
+                await asyncio.sleep(min(2 ** attempt, 30))
+        self._drop(len(batch), "write_failed")
+    
     async def _write_events(self, events: List[Dict[str, Any]]) -> bool:
-        """Write events to audit database"""
+        """Bulk insert events into the audit database (COPY on asyncpg, executemany otherwise)"""
         if not await self.connect():
             return False
         
+        rows = [{"id": uuid.uuid4(), **event} for event in events]
+        
         try:
-            async with self._session_factory() as session:
-                audit_objects = [AuditEvent(**event) for event in events]
-                session.add_all(audit_objects)
-                await session.commit()
-                
-                logger.debug(f"Successfully wrote {len(events)} audit events")
-                return True
-                
+            timestamps = [row["event_timestamp"] for row in rows]
+            await self.ensure_partitions(min(timestamps), max(timestamps))
+            
+            async with self._engine.begin() as conn:
+                if self._engine.dialect.driver == "asyncpg":
+                    columns = [column.name for column in AuditEvent.__table__.columns]
+                    json_columns = {"event_metadata", "old_values", "new_values"}
+                    records = [
+                        tuple(
+                            json.dumps(row.get(column), default=str)
+                            if column in json_columns and row.get(column) is not None
+                            else row.get(column)
+                            for column in columns
+                        )
+                        for row in rows
+                    ]
+                    raw_connection = await conn.get_raw_connection()
+                    await raw_connection.driver_connection.copy_records_to_table(
+                        AuditEvent.__tablename__, records=records, columns=columns
+                    )
+                else:
+                    await conn.execute(insert(AuditEvent.__table__), rows)
+            
+            logger.debug(f"Successfully wrote {len(events)} audit events")
+            return True
+            
         except Exception as e:
             logger.error(f"Failed to write audit events: {str(e)}")
             return False
     
-    async def _flush_event_queue(self):
-        """Flush the event queue to database"""
-        if not self._event_queue:
+    async def flush_queue(self):
+        """Write every event queued so far and wait for it"""
+        if self._writer is None or self._writer.done() or self._writer_loop is not asyncio.get_running_loop():
             return
-        
-        events_to_write = self._event_queue.copy()
-        self._event_queue.clear()
-        
-        await self._write_events(events_to_write)
+        request = _FlushRequest()
+        await self._event_queue.put(request)
+        await request.done
     
-    async def flush_queue(self):
-        """Manually flush the event queue"""
-        async with self._queue_lock:
-            await self._flush_event_queue()
+    async def close(self, timeout: float = 10.0):
+        """Drain the queue, stop the writer and dispose of the engine (application shutdown)"""
+        if self._writer is not None and not self._writer.done() and self._writer_loop is asyncio.get_running_loop():
+            request = _FlushRequest(stop=True)
+            try:
+                await asyncio.wait_for(self._event_queue.put(request), timeout=timeout)
+                await asyncio.wait_for(self._writer, timeout=timeout)
+            except asyncio.TimeoutError:
+                self._writer.cancel()
+                self._drop(self._event_queue.qsize(), "shutdown_timeout")
+        await self.disconnect()
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Queue depth and write throughput of the background writer"""
+        write_seconds = self._stats["write_seconds"]
+        return {
+            "queue_size": self._event_queue.qsize() if self._event_queue else 0,
+            "queue_max_size": self.queue_max_size,
+            "events_written": self._stats["written"],
+            "events_dropped": self._stats["dropped"],
+            "batches_written": self._stats["batches"],
+            "events_per_second": round(self._stats["written"] / write_seconds, 1) if write_seconds else None,
+            "writer_running": self._writer is not None and not self._writer.done()
+        }
+    
+    @staticmethod
+    def _filter_events(
+        stmt,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        event_types: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        status: Optional[str] = None,
+        compliance_only: bool = False
+    ):
+        """Apply the audit event filters; the time bounds let PostgreSQL prune partitions"""
+        if start_date:
+            stmt = stmt.where(AuditEvent.event_timestamp >= _naive_utc(start_date))
+        if end_date:
+            stmt = stmt.where(AuditEvent.event_timestamp <= _naive_utc(end_date))
+        if event_types:
+            stmt = stmt.where(AuditEvent.event_type.in_(event_types))
+        if user_id:
+            stmt = stmt.where(AuditEvent.user_id == user_id)
+        if username:
+            stmt = stmt.where(AuditEvent.username == username)
+        if resource_type:
+            stmt = stmt.where(AuditEvent.resource_type == resource_type)
+        if resource_id:
+            stmt = stmt.where(AuditEvent.resource_id == resource_id)
+        if status:
+            stmt = stmt.where(AuditEvent.status == status)
+        if compliance_only:
+            stmt = stmt.where(AuditEvent.compliance_relevant == True)
+        return stmt
+    
+    @staticmethod
+    def _event_to_dict(event: AuditEvent) -> Dict[str, Any]:
+        return {
+            "id": str(event.id),
+            "event_type": event.event_type,
+            "event_timestamp": event.event_timestamp.isoformat(),
+            "user_id": event.user_id,
+            "username": event.username,
+            "user_role": event.user_role,
+            "session_id": event.session_id,
+            "ip_address": event.ip_address,
+            "user_agent": event.user_agent,
+            "request_method": event.request_method,
+            "request_url": event.request_url,
+            "request_id": event.request_id,
+            "resource_type": event.resource_type,
+            "resource_id": event.resource_id,
+            "action_performed": event.action_performed,
+            "event_description": event.event_description,
+            "event_metadata": event.event_metadata,
+            "old_values": event.old_values,
+            "new_values": event.new_values,
+            "status": event.status,
+            "compliance_relevant": event.compliance_relevant,
+            "retention_years": event.retention_years
+        }
     
     async def query_events(
         self,
@@ -307,78 +661,156 @@ class AuditDatabaseService:
         status: Optional[str] = None,
         compliance_only: bool = False,
         limit: int = 1000,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Query audit events with filters"""
+        """
+        Query audit events with filters, newest first
+        
+        Pass ``encode_audit_cursor(last_event)`` as ``cursor`` to get the next page;
+        unlike ``offset`` its cost does not grow with the page number.
+        """
         if not await self.connect():
             return []
         
         try:
+            stmt = self._filter_events(
+                select(AuditEvent),
+                start_date=start_date,
+                end_date=end_date,
+                event_types=event_types,
+                user_id=user_id,
+                username=username,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                status=status,
+                compliance_only=compliance_only
+            )
+            if cursor:
+                stmt = stmt.where(
+                    tuple_(AuditEvent.event_timestamp, AuditEvent.id) < tuple_(*decode_audit_cursor(cursor))
+                )
+            elif offset:
+                stmt = stmt.offset(offset)
+            stmt = stmt.order_by(AuditEvent.event_timestamp.desc(), AuditEvent.id.desc()).limit(limit)
+            
             async with self._session_factory() as session:
-                # Build query
-                query = session.query(AuditEvent)
-                
-                # Apply filters
-                if start_date:
-                    query = query.filter(AuditEvent.event_timestamp >= start_date)
-                if end_date:
-                    query = query.filter(AuditEvent.event_timestamp <= end_date)
-                if event_types:
-                    query = query.filter(AuditEvent.event_type.in_(event_types))
-                if user_id:
-                    query = query.filter(AuditEvent.user_id == user_id)
-                if username:
-                    query = query.filter(AuditEvent.username == username)
-                if resource_type:
-                    query = query.filter(AuditEvent.resource_type == resource_type)
-                if resource_id:
-                    query = query.filter(AuditEvent.resource_id == resource_id)
-                if status:
-                    query = query.filter(AuditEvent.status == status)
-                if compliance_only:
-                    query = query.filter(AuditEvent.compliance_relevant == True)
-                
-                # Order and paginate
-                query = query.order_by(AuditEvent.event_timestamp.desc())
-                query = query.offset(offset).limit(limit)
-                
-                # Execute query
-                result = await session.execute(query)
-                events = result.scalars().all()
-                
-                # Convert to dictionaries
-                return [
-                    {
-                        "id": str(event.id),
-                        "event_type": event.event_type,
-                        "event_timestamp": event.event_timestamp.isoformat(),
-                        "user_id": event.user_id,
-                        "username": event.username,
-                        "user_role": event.user_role,
-                        "session_id": event.session_id,
-                        "ip_address": event.ip_address,
-                        "user_agent": event.user_agent,
-                        "request_method": event.request_method,
-                        "request_url": event.request_url,
-                        "request_id": event.request_id,
-                        "resource_type": event.resource_type,
-                        "resource_id": event.resource_id,
-                        "action_performed": event.action_performed,
-                        "event_description": event.event_description,
-                        "event_metadata": event.event_metadata,
-                        "old_values": event.old_values,
-                        "new_values": event.new_values,
-                        "status": event.status,
-                        "compliance_relevant": event.compliance_relevant,
-                        "retention_years": event.retention_years
-                    }
-                    for event in events
-                ]
+                result = await session.execute(stmt)
+                return [self._event_to_dict(event) for event in result.scalars().all()]
                 
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Failed to query audit events: {str(e)}")
             return []
     
+    async def iter_event_pages(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        **filters
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield every matching event in ``(event_timestamp, id)`` order, one page at a time
+        
+        Each page is read in its own short session with a keyset predicate, so an
+        export of any size holds one page in memory and never pins a connection.
+        """
+        if not await self.connect():
+            raise RuntimeError("Audit database connection failed")
+        
+        page_size = page_size or self.export_page_size
+        base = self._filter_events(select(AuditEvent), start_date=start_date, end_date=end_date, **filters)
+        base = base.order_by(AuditEvent.event_timestamp, AuditEvent.id).limit(page_size)
+        after: Optional[Tuple[datetime, uuid.UUID]] = None
+        
+        while True:
+            stmt = base
+            if after is not None:
+                stmt = stmt.where(tuple_(AuditEvent.event_timestamp, AuditEvent.id) > tuple_(*after))
+            async with self._session_factory() as session:
+                events = (await session.execute(stmt)).scalars().all()
+            if not events:
+                return
+            after = (events[-1].event_timestamp, events[-1].id)
+            yield [self._event_to_dict(event) for event in events]
+            if len(events) < page_size:
+                return
+    
+    async def stream_export(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        format: str = "ndjson",
+        **filters
+    ) -> AsyncIterator[bytes]:
+        """Encode matching events as NDJSON, CSV or Parquet, yielding one chunk per page"""
+        format = format.lower()
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported audit export format: {format}")
+        pages = self.iter_event_pages(start_date, end_date, **filters)
+        
+        if format == "ndjson":
+            async for page in pages:
+                yield "".join(json.dumps(event, default=str) + "\n" for event in page).encode()
+        
+        elif format == "csv":
+            output = io.StringIO()
+            writer = csv.DictWriter(output, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            async for page in pages:
+                writer.writerows(
+                    {
+                        column: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+                        for column, value in event.items()
+                    }
+                    for event in page
+                )
+                yield output.getvalue().encode()
+                output.seek(0)
+                output.truncate()
+            if output.tell():
+                yield output.getvalue().encode()
+        
+        else:
+            async for chunk in self._stream_parquet(pages):
+                yield chunk
+    
+    async def _stream_parquet(self, pages: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+        """One Parquet row group per page, flushed as soon as it is encoded"""
+        pa, pq = _require_pyarrow()
+        schema = pa.schema([
+            (column, {
+                "event_timestamp": pa.timestamp("us"),
+                "user_id": pa.int64(),
+                "retention_years": pa.int32(),
+                "compliance_relevant": pa.bool_(),
+            }.get(column, pa.string()))
+            for column in EXPORT_COLUMNS
+        ])
+        sink = _ParquetSink()
+        writer = pq.ParquetWriter(sink, schema, compression=self.parquet_compression)
+        try:
+            async for page in pages:
+                rows = [
+                    {
+                        **event,
+                        "event_timestamp": datetime.fromisoformat(event["event_timestamp"]),
+                        "event_metadata": _json_or_none(event["event_metadata"]),
+                        "old_values": _json_or_none(event["old_values"]),
+                        "new_values": _json_or_none(event["new_values"]),
+                    }
+                    for event in page
+                ]
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+        yield sink.drain()
+    
     async def get_audit_summary(
         self,
         start_date: Optional[datetime] = None,
@@ -396,27 +828,27 @@ class AuditDatabaseService:
             
             async with self._session_factory() as session:
                 # Total events
-                total_query = session.query(func.count(AuditEvent.id)).filter(
+                total_query = select(func.count(AuditEvent.id)).where(
                     AuditEvent.event_timestamp.between(start_date, end_date)
                 )
                 total_result = await session.execute(total_query)
                 total_events = total_result.scalar()
                 
                 # Events by type
-                type_query = session.query(
+                type_query = select(
                     AuditEvent.event_type,
                     func.count(AuditEvent.id)
-                ).filter(
+                ).where(
                     AuditEvent.event_timestamp.between(start_date, end_date)
                 ).group_by(AuditEvent.event_type)
                 type_result = await session.execute(type_query)
                 events_by_type = dict(type_result.fetchall())
                 
                 # Events by user
-                user_query = session.query(
+                user_query = select(
                     AuditEvent.username,
                     func.count(AuditEvent.id)
-                ).filter(
+                ).where(
                     AuditEvent.event_timestamp.between(start_date, end_date),
                     AuditEvent.username.is_not(None)
                 ).group_by(AuditEvent.username).limit(10)
@@ -424,17 +856,17 @@ class AuditDatabaseService:
                 events_by_user = dict(user_result.fetchall())
                 
                 # Events by status
-                status_query = session.query(
+                status_query = select(
                     AuditEvent.status,
                     func.count(AuditEvent.id)
-                ).filter(
+                ).where(
                     AuditEvent.event_timestamp.between(start_date, end_date)
                 ).group_by(AuditEvent.status)
                 status_result = await session.execute(status_query)
                 events_by_status = dict(status_result.fetchall())
                 
                 # Compliance events
-                compliance_query = session.query(func.count(AuditEvent.id)).filter(
+                compliance_query = select(func.count(AuditEvent.id)).where(
                     AuditEvent.event_timestamp.between(start_date, end_date),
                     AuditEvent.compliance_relevant == True
                 )
@@ -443,7 +875,7 @@ class AuditDatabaseService:
                 
                 # Retention status
                 retention_cutoff = datetime.utcnow() - timedelta(days=365 * self.retention_years)
-                old_events_query = session.query(func.count(AuditEvent.id)).filter(
+                old_events_query = select(func.count(AuditEvent.id)).where(
                     AuditEvent.event_timestamp < retention_cutoff
                 )
                 old_events_result = await session.execute(old_events_query)
@@ -477,86 +909,97 @@ class AuditDatabaseService:
         try:
             retention_cutoff = datetime.utcnow() - timedelta(days=365 * self.retention_years)
             
-            async with self._session_factory() as session:
-                # Count events to be deleted
-                count_query = session.query(func.count(AuditEvent.id)).filter(
-                    AuditEvent.event_timestamp < retention_cutoff
+            # Whole months past retention go by dropping their partition
+            partitions_dropped = await self._drop_expired_partitions(retention_cutoff)
+            
+            # Delete what is left (the partition holding the cutoff, or an unpartitioned table) in batches
+            deleted_total = 0
+            batch_size = 1000
+            
+            while True:
+                expired = (
+                    select(AuditEvent.id)
+                    .where(AuditEvent.event_timestamp < retention_cutoff)
+                    .limit(batch_size)
+                    .scalar_subquery()
                 )
-                count_result = await session.execute(count_query)
-                events_to_delete = count_result.scalar()
-                
-                if events_to_delete == 0:
-                    return {
-                        "message": "No events past retention period",
-                        "events_deleted": 0,
-                        "retention_cutoff": retention_cutoff.isoformat()
-                    }
+                async with self._engine.begin() as conn:
+                    result = await conn.execute(
+                        delete(AuditEvent)
+                        .where(AuditEvent.event_timestamp < retention_cutoff)
+                        .where(AuditEvent.id.in_(expired))
+                    )
                 
-                # Delete old events in batches
-                deleted_total = 0
-                batch_size = 1000
-                
-                while True:
-                    delete_query = session.query(AuditEvent).filter(
-                        AuditEvent.event_timestamp < retention_cutoff
-                    ).limit(batch_size)
-                    
-                    events_batch = await session.execute(delete_query)
-                    events = events_batch.scalars().all()
-                    
-                    if not events:
-                        break
-                    
-                    for event in events:
-                        await session.delete(event)
-                    
-                    await session.commit()
-                    deleted_total += len(events)
-                    
-                    logger.info(f"Deleted {len(events)} old audit events (total: {deleted_total})")
+                if not result.rowcount:
+                    break
                 
+                deleted_total += result.rowcount
+                logger.info(f"Deleted {result.rowcount} old audit events (total: {deleted_total})")
+            
+            if deleted_total == 0 and not partitions_dropped:
                 return {
-                    "message": "Old audit events cleaned up successfully",
-                    "events_deleted": deleted_total,
-                    "retention_cutoff": retention_cutoff.isoformat(),
-                    "retention_years": self.retention_years
+                    "message": "No events past retention period",
+                    "events_deleted": 0,
+                    "retention_cutoff": retention_cutoff.isoformat()
                 }
+            
+            return {
+                "message": "Old audit events cleaned up successfully",
+                "events_deleted": deleted_total,
+                "partitions_dropped": partitions_dropped,
+                "retention_cutoff": retention_cutoff.isoformat(),
+                "retention_years": self.retention_years
+            }
                 
         except Exception as e:
             logger.error(f"Failed to cleanup old audit events: {str(e)}")
             return {"error": str(e)}
     
+    async def _drop_expired_partitions(self, retention_cutoff: datetime) -> List[str]:
+        """Drop monthly partitions that end before ``retention_cutoff``"""
+        if not self._partitioned:
+            return []
+        
+        prefix = f"{AuditEvent.__tablename__}_"
+        async with self._engine.begin() as conn:
+            result = await conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                f"WHERE i.inhparent = to_regclass('{AuditEvent.__tablename__}')"
+            ))
+            names = [row[0] for row in result]
+        
+        dropped = []
+        for name in sorted(names):
+            try:
+                month = datetime.strptime(name[len(prefix):], "%Y_%m").date()
+            except ValueError:
+                continue
+            if _next_month(month) > retention_cutoff.date():
+                continue
+            async with self._engine.begin() as conn:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            self._partitions.discard(name)
+            dropped.append(name)
+            logger.info(f"Dropped audit partition {name} past retention")
+        return dropped
+    
     async def export_audit_data(
         self,
         start_date: datetime,
         end_date: datetime,
         format: str = "json"
     ) -> Optional[str]:
-        """Export audit data for compliance reporting"""
-        events = await self.query_events(
-            start_date=start_date,
-            end_date=end_date,
-            limit=10000  # Large limit for export
-        )
-        
-        if not events:
-            return None
-        
+        """Export audit data for compliance reporting (in memory; see ``stream_export`` for large ranges)"""
         try:
             if format.lower() == "json":
-                import json
-                return json.dumps(events, indent=2, default=str)
-            elif format.lower() == "csv":
-                import csv
-                import io
-                
-                output = io.StringIO()
-                if events:
-                    writer = csv.DictWriter(output, fieldnames=events[0].keys())
-                    writer.writeheader()
-                    writer.writerows(events)
-                
-                return output.getvalue()
+                events = []
+                async for page in self.iter_event_pages(start_date, end_date):
+                    events.extend(page)
+                return json.dumps(events, indent=2, default=str) if events else None
+            elif format.lower() in ("csv", "ndjson"):
+                chunks = [chunk async for chunk in self.stream_export(start_date, end_date, format)]
+                data = b"".join(chunks).decode()
+                return data if data.count("\n") > (format.lower() == "csv") else None
             else:
                 return None
                 
@@ -577,19 +1020,19 @@ class AuditDatabaseService:
             # Test database operations
             async with self._session_factory() as session:
                 # Test simple query
-                test_query = session.query(func.count(AuditEvent.id))
+                test_query = select(func.count(AuditEvent.id))
                 result = await session.execute(test_query)
                 total_events = result.scalar()
                 
                 # Check recent events
-                recent_query = session.query(func.count(AuditEvent.id)).filter(
+                recent_query = select(func.count(AuditEvent.id)).where(
                     AuditEvent.event_timestamp >= datetime.utcnow() - timedelta(hours=24)
                 )
                 recent_result = await session.execute(recent_query)
                 recent_events = recent_result.scalar()
             
             # Queue status
-            queue_size = len(self._event_queue)
+            writer_stats = self.get_writer_stats()
             
             return {
                 "service": "audit_database",
@@ -603,11 +1046,12 @@ class AuditDatabaseService:
                 "statistics": {
                     "total_events": total_events,
                     "events_last_24h": recent_events,
-                    "queue_size": queue_size
+                    "queue_size": writer_stats["queue_size"]
                 },
                 "performance": {
                     "connection_pool_active": True,
-                    "batch_processing": "enabled"
+                    "batch_processing": "enabled",
+                    "writer": writer_stats
                 }
             }
             
@@ -648,7 +1092,7 @@ async def audit_user_action(
         session_id=session_id,
         ip_address=ip_address,
         action_performed=action,
-        event_metadata=details
+        metadata=details
     )
 
 
@@ -668,7 +1112,7 @@ async def audit_data_access(
         resource_type=resource_type,
         resource_id=resource_id,
         action_performed=action,
-        event_metadata=details,
+        metadata=details,
         compliance_relevant=True
     )
 
@@ -684,6 +1128,6 @@ async def audit_system_event(
         event_type=event_type,
         user_id=user_id,
         event_description=description,
-        event_metadata=details,
+        metadata=details,
         compliance_relevant=True
     ) 
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""
+Column Sketches
+Mergeable, bounded-memory summaries used to profile every scoped column in one pass
+
+- ``HyperLogLog``: approximate distinct counts
+- ``QuantileSketch``: KLL approximate quantiles
+- ``FrequentItems``: Misra-Gries heavy hitters (exact while the column has few distinct values)
+- ``DistinctValueSample``: uniform sample of distinct values with their exact frequencies,
+  chosen by smallest hash (used for rare-value and frequency-spread estimates)
+
+``ColumnProfileBuilder`` combines them for one column and ``TableProfileBuilder`` feeds
+DataFrame chunks to one builder per column. Nothing here touches the database.
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """Stable 64-bit hashes of string values (independent of process and chunk)"""
+    return pd.util.hash_array(np.asarray(values, dtype=object), categorize=False)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over precomputed 64-bit hashes"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # Remaining bits, with a guard bit so the rank is bounded
+        rest = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(self.m * math.log(self.m / zeros)))
+        return int(round(raw))
+
+
+class QuantileSketch:
+    """KLL quantile sketch over floats; rank error is about 1.7 / k"""
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self):
+        while True:
+            for level, items in enumerate(self.levels):
+                if len(items) > self._capacity(level):
+                    self._compact(level)
+                    break
+            else:
+                return
+
+    def _compact(self, level: int):
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        items = np.sort(self.levels[level])
+        leftover = items[:0]
+        if len(items) % 2:
+            leftover, items = items[-1:], items[:-1]
+        promoted = items[int(self._rng.integers(2))::2]
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+        self.levels[level] = leftover
+
+    def quantiles(self, fractions: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Optional[float]]:
+        fractions = list(fractions)
+        if self.n == 0:
+            return {str(q): None for q in fractions}
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind='mergesort')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.array(fractions) * cumulative[-1], side='left')
+        positions = np.clip(positions, 0, len(items) - 1)
+        return {str(q): float(items[p]) for q, p in zip(fractions, positions)}
+
+
+class FrequentItems:
+    """Misra-Gries heavy hitters; counts are lower bounds, off by at most ``max_error``"""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.max_error = 0
+
+    def _reduce(self, counts: pd.Series) -> pd.Series:
+        if len(counts) > self.capacity:
+            threshold = int(counts.nlargest(self.capacity + 1).iloc[-1])
+            counts = counts - threshold
+            counts = counts[counts > 0]
+            self.max_error += threshold
+        return counts
+
+    def update_counts(self, value_counts: pd.Series):
+        if value_counts.empty:
+            return
+        # Summaries are mergeable: reduce the chunk first so the merge stays small
+        value_counts = self._reduce(value_counts)
+        counts = self.counts.add(value_counts, fill_value=0) if len(self.counts) else value_counts
+        self.counts = self._reduce(counts).astype(np.int64)
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        return [
+            {"value": value, "count": int(count)}
+            for value, count in self.counts.nlargest(k).items()
+        ]
+
+
+class DistinctValueSample:
+    """
+    The ``size`` distinct values with the smallest hashes, with exact counts
+
+    A value can only be in the final sample if it was admitted on its first
+    occurrence and never evicted, so every retained count is exact.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self.sample = pd.DataFrame({"hash": pd.Series(dtype=np.uint64), "count": pd.Series(dtype=np.int64)})
+
+    def update(self, value_counts: pd.Series, hashes: np.ndarray):
+        chunk = pd.DataFrame({"hash": hashes, "count": value_counts.to_numpy()}, index=value_counts.index)
+        if len(self.sample) >= self.size:
+            chunk = chunk[chunk["hash"] <= self.sample["hash"].max()]
+        if chunk.empty:
+            return
+        if len(self.sample):
+            merged = pd.concat([self.sample, chunk])
+            merged = merged.groupby(level=0, sort=False).agg({"hash": "first", "count": "sum"})
+        else:
+            merged = chunk
+        self.sample = merged.nsmallest(self.size, "hash")
+
+    def frequencies(self) -> np.ndarray:
+        return self.sample["count"].to_numpy()
+
+    def rare_values(self, max_count: int = 2, limit: int = 5) -> List[Dict[str, Any]]:
+        rare = self.sample[self.sample["count"] <= max_count].sort_index()
+        return [{"value": value, "count": int(row["count"])} for value, row in rare.head(limit).iterrows()]
+
+
+class ColumnProfileBuilder:
+    """One-pass statistics for a single column"""
+
+    def __init__(self, column_name: str, top_k: int = 20, seed: int = 0):
+        self.column_name = column_name
+        self.top_k = top_k
+        self.row_count = 0
+        self.null_count = 0
+        self.numeric_count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.hll = HyperLogLog()
+        self.quantiles = QuantileSketch(seed=seed)
+        self.frequent = FrequentItems()
+        self.distinct_sample = DistinctValueSample()
+
+    def update(self, series: pd.Series):
+        self.row_count += len(series)
+        values = series.dropna()
+        self.null_count += len(series) - len(values)
+        if values.empty:
+            return
+
+        # Count on the native values, then key the (much smaller) distinct set by string
+        value_counts = values.value_counts(sort=False)
+        value_counts.index = value_counts.index.astype(str)
+        if not value_counts.index.is_unique:
+            value_counts = value_counts.groupby(level=0, sort=False).sum()
+        # Hash only the distinct values; HLL and the distinct sample are duplicate-insensitive
+        hashes = hash_values(value_counts.index.to_numpy())
+        self.hll.update_hashes(hashes)
+        self.frequent.update_counts(value_counts)
+        self.distinct_sample.update(value_counts, hashes)
+
+        numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        numeric = numeric[np.isfinite(numeric)]
+        if len(numeric):
+            self._add_moments(numeric)
+            self.quantiles.update(numeric)
+
+    def _add_moments(self, numeric: np.ndarray):
+        # Chan et al. parallel update of mean and sum of squared deviations
+        count = len(numeric)
+        mean = float(numeric.mean())
+        m2 = float(((numeric - mean) ** 2).sum())
+        total = self.numeric_count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.numeric_count * count / total
+        self.numeric_count = total
+
+    def result(self) -> Dict[str, Any]:
+        non_null = self.row_count - self.null_count
+        distinct = min(self.hll.estimate(), non_null)
+        if len(self.frequent.counts) < self.frequent.capacity and self.frequent.max_error == 0:
+            # Every distinct value is tracked exactly
+            distinct = len(self.frequent.counts)
+
+        top_values = self.frequent.top(self.top_k)
+        sample_frequencies = self.distinct_sample.frequencies()
+        avg_frequency = non_null / distinct if distinct else 0.0
+        stddev_frequency = float(np.std(sample_frequencies, ddof=1)) if len(sample_frequencies) > 1 else 0.0
+        max_frequency = top_values[0]["count"] if top_values else 0
+
+        return {
+            "column_name": self.column_name,
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "non_null_count": non_null,
+            "distinct_count": distinct,
+            "numeric_count": self.numeric_count,
+            "min": self.quantiles.min,
+            "max": self.quantiles.max,
+            "mean": self._mean if self.numeric_count else None,
+            "stddev": math.sqrt(self._m2 / (self.numeric_count - 1)) if self.numeric_count > 1 else None,
+            "quantiles": self.quantiles.quantiles(),
+            "top_values": top_values,
+            "top_values_max_error": self.frequent.max_error,
+            "rare_values": self.distinct_sample.rare_values(),
+            "frequency": {
+                "max_frequency": max_frequency,
+                "max_frequency_pct": max_frequency * 100.0 / self.row_count if self.row_count else 0.0,
+                "avg_frequency": avg_frequency,
+                "stddev_frequency": stddev_frequency,
+            },
+        }
+
+
+class TableProfileBuilder:
+    """Feeds DataFrame chunks to one ColumnProfileBuilder per column"""
+
+    def __init__(self, columns: Iterable[str], top_k: int = 20, seed: int = 0):
+        self.builders = {
+            column: ColumnProfileBuilder(column, top_k=top_k, seed=seed)
+            for column in dict.fromkeys(columns)
+        }
+
+    def update(self, df: pd.DataFrame):
+        for column, builder in self.builders.items():
+            if column in df.columns:
+                builder.update(df[column])
+
+    def result(self) -> Dict[str, Dict[str, Any]]:
+        return {column: builder.result() for column, builder in self.builders.items()}
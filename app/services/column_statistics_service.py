@@ -0,0 +1,263 @@
+"""
+Column Statistics Service
+Builds, persists and reuses one-pass column statistics profiles
+
+A profile holds approximate quantiles, distinct counts, top values, rare values
+and null counts for every scoped column of a source table. It is built from a
+single streamed read of the table (see ``app.services.column_sketches``) and
+stored per data source, table and data version, so sample selection, profiling and DQ scoring
+read the stored statistics instead of re-aggregating the source table.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy import and_, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.data_profiling import ColumnStatisticsProfile
+from app.services.column_sketches import TableProfileBuilder
+
+logger = get_logger(__name__)
+
+# Used when the table has no change counters (e.g. views); such profiles expire by age
+UNVERSIONED = "unversioned"
+
+
+def _data_source_key_expression():
+    """``coalesce(data_source_id, 0)`` exactly as indexed by ``uq_column_profile_version``"""
+    # A literal 0 rather than a bind parameter, so ON CONFLICT can infer the index
+    return func.coalesce(ColumnStatisticsProfile.data_source_id, literal_column("0"))
+
+
+def _data_source_key(data_source_id: Optional[int]):
+    """Predicate on the data source part of the profile key"""
+    return _data_source_key_expression() == (data_source_id or 0)
+
+
+def table_version_query(schema_name: str, table_name: str) -> str:
+    """SQL returning the change counters that fingerprint a table's contents"""
+    return f"""
+        SELECT n_tup_ins, n_tup_upd, n_tup_del, n_live_tup
+        FROM pg_stat_user_tables
+        WHERE schemaname = '{schema_name}' AND relname = '{table_name}'
+    """
+
+
+def fingerprint_table_version(row: Optional[Iterable[Any]]) -> str:
+    """Data version fingerprint from a ``table_version_query`` row"""
+    if row is None:
+        return UNVERSIONED
+    return hashlib.md5(":".join(str(v) for v in row).encode()).hexdigest()[:16]
+
+
+def sampling_statistics(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Distribution statistics used by intelligent sampling, derived from a column profile
+
+    Keys match the aggregate query this replaces: min/max/avg/stddev, quartiles,
+    frequency spread, null and distinct counts, and the unusually frequent and
+    rare values (``{"value", "frequency", "frequency_pct"}``).
+    """
+    profile = profile or {}
+    quantiles = profile.get("quantiles") or {}
+    frequency = profile.get("frequency") or {}
+    row_count = profile.get("row_count") or 0
+
+    def with_pct(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "value": item["value"],
+            "frequency": item["count"],
+            "frequency_pct": item["count"] * 100.0 / row_count if row_count else 0.0
+        }
+
+    avg_frequency = frequency.get("avg_frequency") or 0.0
+    stddev_frequency = frequency.get("stddev_frequency") or 0.0
+    high_threshold = avg_frequency + 2 * stddev_frequency
+    high_freq_values = [
+        with_pct(item) for item in profile.get("top_values", [])
+        if item["count"] > high_threshold
+    ][:5]
+
+    return {
+        "min_val": profile.get("min"),
+        "max_val": profile.get("max"),
+        "avg_val": profile.get("mean"),
+        "stddev_val": profile.get("stddev"),
+        "q1": quantiles.get("0.25"),
+        "median": quantiles.get("0.5"),
+        "q3": quantiles.get("0.75"),
+        "max_frequency": frequency.get("max_frequency"),
+        "avg_frequency": avg_frequency,
+        "stddev_frequency": stddev_frequency,
+        "max_frequency_pct": frequency.get("max_frequency_pct"),
+        "null_count": profile.get("null_count"),
+        "distinct_count": profile.get("distinct_count"),
+        "high_freq_values": high_freq_values,
+        "low_freq_values": [with_pct(item) for item in profile.get("rare_values", [])]
+    }
+
+
+class ColumnStatisticsService:
+    """Load, build and persist column statistics profiles"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def table_version(self, schema_name: str, table_name: str) -> str:
+        """Data version fingerprint of a table in this database"""
+        try:
+            # Savepoint so a failed lookup does not abort the caller's transaction
+            async with self.db.begin_nested():
+                result = await self.db.execute(text(table_version_query(schema_name, table_name)))
+                return fingerprint_table_version(result.fetchone())
+        except Exception as e:
+            logger.warning(f"Could not fingerprint {schema_name}.{table_name}: {e}")
+            return UNVERSIONED
+
+    async def load_profile(
+        self,
+        source_table: str,
+        source_version: str,
+        columns: List[str],
+        data_source_id: Optional[int] = None
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Stored statistics for ``columns``, or None unless every column has a usable profile"""
+        result = await self.db.execute(
+            select(ColumnStatisticsProfile).where(
+                and_(
+                    _data_source_key(data_source_id),
+                    ColumnStatisticsProfile.source_table == source_table,
+                    ColumnStatisticsProfile.source_version == source_version,
+                    ColumnStatisticsProfile.column_name.in_(columns)
+                )
+            )
+        )
+        profiles = {p.column_name: p for p in result.scalars().all()}
+        if any(column not in profiles for column in columns):
+            return None
+
+        if source_version == UNVERSIONED:
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.column_profile_max_age_hours)
+            if any(p.profiled_at is None or p.profiled_at < cutoff for p in profiles.values()):
+                return None
+
+        return {column: profiles[column].statistics for column in columns}
+
+    async def build_profile(
+        self,
+        schema_name: str,
+        table_name: str,
+        columns: List[str],
+        chunk_size: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Profile ``columns`` of a table in this database with one streamed read"""
+        chunk_size = chunk_size or settings.column_profile_chunk_size
+        columns = list(dict.fromkeys(columns))
+        builder = TableProfileBuilder(columns)
+
+        query = f"""
+            SELECT {', '.join([f'"{col}"' for col in columns])}
+            FROM {schema_name}.{table_name}
+        """
+        result = await self.db.stream(text(query), execution_options={"yield_per": chunk_size})
+        async for rows in result.partitions(chunk_size):
+            builder.update(pd.DataFrame(rows, columns=columns))
+
+        logger.info(f"Built column statistics profile for {len(columns)} columns of {schema_name}.{table_name}")
+        return builder.result()
+
+    async def save_profile(
+        self,
+        source_table: str,
+        source_version: str,
+        statistics: Dict[str, Dict[str, Any]],
+        data_source_id: Optional[int] = None
+    ) -> None:
+        """
+        Store per-column statistics, replacing any profile of the same data source and table version
+
+        Runs in a savepoint, so the profile is committed together with the caller's
+        transaction and a failure here leaves that transaction usable.
+        """
+        if not statistics:
+            return
+        stmt = pg_insert(ColumnStatisticsProfile).values([
+            {
+                "data_source_id": data_source_id,
+                "source_table": source_table,
+                "source_version": source_version,
+                "column_name": column_name,
+                "row_count": column_stats.get("row_count", 0),
+                "null_count": column_stats.get("null_count", 0),
+                "distinct_count": column_stats.get("distinct_count", 0),
+                "statistics": column_stats
+            }
+            for column_name, column_stats in statistics.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                _data_source_key_expression(),
+                ColumnStatisticsProfile.source_table,
+                ColumnStatisticsProfile.source_version,
+                ColumnStatisticsProfile.column_name
+            ],
+            set_={
+                "row_count": stmt.excluded.row_count,
+                "null_count": stmt.excluded.null_count,
+                "distinct_count": stmt.excluded.distinct_count,
+                "statistics": stmt.excluded.statistics,
+                "profiled_at": func.now(),
+                "updated_at": func.now()
+            }
+        )
+        async with self.db.begin_nested():
+            await self.db.execute(stmt)
+
+    async def get_or_build_profile(
+        self,
+        schema_name: str,
+        table_name: str,
+        columns: List[str],
+        data_source_id: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistics for ``columns`` of a table in this database, reusing the stored
+        profile of the current table version and building (and storing) it otherwise
+        """
+        columns = list(dict.fromkeys(columns))
+        source_table = f"{schema_name}.{table_name}"
+        source_version = await self.table_version(schema_name, table_name)
+
+        statistics = await self.load_profile(source_table, source_version, columns, data_source_id)
+        if statistics is not None:
+            logger.info(f"Reusing column statistics profile of {source_table} (version {source_version})")
+            return statistics
+
+        statistics = await self.build_profile(schema_name, table_name, columns)
+        try:
+            await self.save_profile(source_table, source_version, statistics, data_source_id)
+        except Exception as e:
+            # Failing to cache the profile must not fail the caller
+            logger.warning(f"Could not store column statistics profile of {source_table}: {e}")
+        return statistics
+
+    async def get_latest_column_profile(
+        self,
+        data_source_id: int,
+        column_name: str
+    ) -> Optional[ColumnStatisticsProfile]:
+        """Most recent profile of a data source column, whatever its version"""
+        result = await self.db.execute(
+            select(ColumnStatisticsProfile).where(
+                and_(
+                    ColumnStatisticsProfile.data_source_id == data_source_id,
+                    ColumnStatisticsProfile.column_name == column_name
+                )
+            ).order_by(ColumnStatisticsProfile.profiled_at.desc()).limit(1)
+        )
+        return result.scalar_one_or_none()
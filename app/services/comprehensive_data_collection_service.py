@@ -3,7 +3,11 @@ Comprehensive Data Collection Service for Test Report Generation
 Collects and aggregates data from all phases for comprehensive reporting
 """
 
-from typing import Dict, Any, List, Optional
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, text
@@ -22,44 +26,240 @@ from app.models.sample_selection import SampleSelectionVersion, SampleSelectionS
 from app.models.request_info import CycleReportTestCase, TestCaseSourceEvidence
 from app.models.test_execution import TestExecution
 from app.models.observation_management import ObservationRecord
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
 from app.core.logging import get_logger
+from app.services.cache_service import get_cache_service
 
 logger = get_logger(__name__)
+settings = get_settings()
+
+# Report section -> collector method. The collectors are independent of each other.
+PHASE_COLLECTORS = {
+    "report_info": "_get_report_info",
+    "stakeholders": "_get_stakeholders",
+    "planning": "_collect_planning_data",
+    "data_profiling": "_collect_data_profiling_data",
+    "scoping": "_collect_scoping_data",
+    "sample_selection": "_collect_sample_selection_data",
+    "request_info": "_collect_request_info_data",
+    "test_execution": "_collect_test_execution_data",
+    "observation_management": "_collect_observation_data",
+    "execution_metrics": "_collect_execution_metrics",
+}
+
+SECTION_CACHE_CATEGORY = "reports"
+
+# Skip the section cache for a while after Redis was unreachable
+_section_cache_down_until = 0.0
 
 
 class ComprehensiveDataCollectionService:
     """Service to collect comprehensive data from all phases"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: Optional[Callable[[], AsyncSession]] = AsyncSessionLocal
+    ):
         self.db = db
+        # Each collector runs on its own session from this factory; None collects sequentially on ``db``
+        self.session_factory = session_factory
+        self.collector_timings: Dict[str, float] = {}
     
-    async def collect_all_phase_data(self, cycle_id: int, report_id: int) -> Dict[str, Any]:
-        """Collect comprehensive data from all phases"""
+    async def collect_all_phase_data(self, cycle_id: int, report_id: int, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Collect comprehensive data from all phases
+        
+        Phase collectors run concurrently (up to ``report_collection_concurrency``)
+        on separate pooled sessions, so collection takes about as long as the
+        slowest phase. Phase sections whose source rows are unchanged since the
+        last collection are served from the section cache.
+        """
         logger.info(f"Collecting comprehensive data for cycle {cycle_id}, report {report_id}")
+        started = time.perf_counter()
+        self.collector_timings = {}
+        
+        fingerprints: Dict[str, str] = {}
+        cached: Dict[str, Any] = {}
+        if use_cache and self._section_cache_enabled():
+            fingerprints = await self._get_section_fingerprints(cycle_id, report_id)
+            cached = await self._get_cached_sections(cycle_id, report_id, fingerprints)
+        
+        pending = [section for section in PHASE_COLLECTORS if section not in cached]
+        collected = await self._run_collectors(pending, cycle_id, report_id)
+        
+        if fingerprints:
+            await self._cache_sections(cycle_id, report_id, {
+                section: {"fingerprint": fingerprints[section], "data": collected[section]}
+                for section in pending if section in fingerprints
+            })
         
-        # Get basic report and cycle information
-        report_info = await self._get_report_info(cycle_id, report_id)
-        stakeholders = await self._get_stakeholders(cycle_id, report_id)
-        
-        # Collect data from each phase
-        phase_data = {
-            "report_info": report_info,
-            "stakeholders": stakeholders,
-            "planning": await self._collect_planning_data(cycle_id, report_id),
-            "data_profiling": await self._collect_data_profiling_data(cycle_id, report_id),
-            "scoping": await self._collect_scoping_data(cycle_id, report_id),
-            "sample_selection": await self._collect_sample_selection_data(cycle_id, report_id),
-            "request_info": await self._collect_request_info_data(cycle_id, report_id),
-            "test_execution": await self._collect_test_execution_data(cycle_id, report_id),
-            "observation_management": await self._collect_observation_data(cycle_id, report_id),
-            "execution_metrics": await self._collect_execution_metrics(cycle_id, report_id)
-        }
+        phase_data = {section: cached[section] if section in cached else collected[section] for section in PHASE_COLLECTORS}
         
         # Add summary statistics
         phase_data["summary"] = self._calculate_summary_statistics(phase_data)
+        phase_data["collection_metadata"] = {
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "collector_timings_ms": dict(self.collector_timings),
+            "cached_sections": sorted(cached),
+        }
+        logger.info(
+            f"Collected report data for cycle {cycle_id}, report {report_id} in "
+            f"{phase_data['collection_metadata']['total_ms']}ms ({len(cached)} sections cached), "
+            f"collector timings: {self.collector_timings}"
+        )
         
         return phase_data
     
+    async def _run_collectors(self, sections: List[str], cycle_id: int, report_id: int) -> Dict[str, Any]:
+        """Run the collectors of ``sections`` and record how long each took"""
+        if self.session_factory is None:
+            results = {}
+            for section in sections:
+                results[section] = await self._run_collector(self, section, cycle_id, report_id)
+            return results
+        
+        semaphore = asyncio.Semaphore(max(1, getattr(settings, 'report_collection_concurrency', 4)))
+        
+        async def run_on_own_session(section: str):
+            async with semaphore:
+                # A session serves one statement at a time, so concurrent collectors need their own
+                async with self.session_factory() as session:
+                    collector = type(self)(session, session_factory=None)
+                    return await self._run_collector(collector, section, cycle_id, report_id)
+        
+        results = await asyncio.gather(*(run_on_own_session(section) for section in sections))
+        return dict(zip(sections, results))
+    
+    async def _run_collector(
+        self,
+        collector: "ComprehensiveDataCollectionService",
+        section: str,
+        cycle_id: int,
+        report_id: int
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return await getattr(collector, PHASE_COLLECTORS[section])(cycle_id, report_id)
+        finally:
+            self.collector_timings[section] = round((time.perf_counter() - started) * 1000, 1)
+    
+    def _section_sources(self, cycle_id: int, report_id: int) -> Dict[str, List[Tuple[Any, Any]]]:
+        """Tables (and row filters) each cacheable section is built from"""
+        def in_phase(model, phase_name: str):
+            return model.phase_id.in_(
+                select(WorkflowPhase.phase_id).where(
+                    and_(
+                        WorkflowPhase.cycle_id == cycle_id,
+                        WorkflowPhase.report_id == report_id,
+                        WorkflowPhase.phase_name == phase_name
+                    )
+                )
+            )
+        
+        report_attributes = (
+            ReportAttribute,
+            and_(ReportAttribute.cycle_id == cycle_id, ReportAttribute.report_id == report_id)
+        )
+        return {
+            "planning": [report_attributes],
+            "data_profiling": [
+                (DataProfilingRuleVersion, in_phase(DataProfilingRuleVersion, 'Data Profiling')),
+                (ProfilingRule, in_phase(ProfilingRule, 'Data Profiling'))
+            ],
+            "scoping": [
+                (ScopingVersion, in_phase(ScopingVersion, 'Scoping')),
+                (ScopingAttribute, in_phase(ScopingAttribute, 'Scoping')),
+                report_attributes
+            ],
+            "sample_selection": [
+                (SampleSelectionVersion, in_phase(SampleSelectionVersion, 'Sample Selection')),
+                (SampleSelectionSample, in_phase(SampleSelectionSample, 'Sample Selection'))
+            ],
+            "request_info": [
+                (CycleReportTestCase, in_phase(CycleReportTestCase, 'Request Info')),
+                (TestCaseSourceEvidence, TestCaseSourceEvidence.test_case_id.in_(
+                    select(CycleReportTestCase.id).where(in_phase(CycleReportTestCase, 'Request Info'))
+                ))
+            ],
+            "test_execution": [(TestExecution, in_phase(TestExecution, 'Test Execution'))],
+            "observation_management": [(ObservationRecord, in_phase(ObservationRecord, 'Observations'))],
+            "execution_metrics": [
+                (WorkflowPhase, and_(WorkflowPhase.cycle_id == cycle_id, WorkflowPhase.report_id == report_id)),
+                (DataProfilingRuleVersion, in_phase(DataProfilingRuleVersion, 'Data Profiling')),
+                (ScopingVersion, in_phase(ScopingVersion, 'Scoping'))
+            ],
+        }
+    
+    async def _get_section_fingerprints(self, cycle_id: int, report_id: int) -> Dict[str, str]:
+        """
+        Row count and last update of every source table, per cacheable section, in one query
+        
+        A section whose fingerprint matches the cached one has not changed since it was collected.
+        """
+        sources = self._section_sources(cycle_id, report_id)
+        columns = []
+        for section, tables in sources.items():
+            for index, (model, condition) in enumerate(tables):
+                columns.append(
+                    select(func.concat(func.count(), '|', func.max(model.updated_at)))
+                    .select_from(model)
+                    .where(condition)
+                    .scalar_subquery()
+                    .label(f"{section}__{index}")
+                )
+        
+        try:
+            row = (await self.db.execute(select(*columns))).mappings().one()
+        except Exception as e:
+            logger.warning(f"Could not fingerprint report sections, collecting all: {e}")
+            return {}
+        
+        return {
+            section: hashlib.sha256(
+                json.dumps([row[f"{section}__{index}"] for index in range(len(tables))]).encode()
+            ).hexdigest()
+            for section, tables in sources.items()
+        }
+    
+    @staticmethod
+    def _section_cache_key(cycle_id: int, report_id: int, section: str) -> str:
+        return f"phase_section:{cycle_id}:{report_id}:{section}"
+    
+    @staticmethod
+    def _section_cache_enabled() -> bool:
+        return getattr(settings, 'report_section_cache_enabled', True) and time.time() >= _section_cache_down_until
+    
+    @staticmethod
+    async def _section_cache_connected() -> bool:
+        global _section_cache_down_until
+        if await get_cache_service().connect():
+            return True
+        _section_cache_down_until = time.time() + 60
+        return False
+    
+    async def _get_cached_sections(self, cycle_id: int, report_id: int, fingerprints: Dict[str, str]) -> Dict[str, Any]:
+        if not fingerprints or not await self._section_cache_connected():
+            return {}
+        keys = {self._section_cache_key(cycle_id, report_id, section): section for section in fingerprints}
+        entries = await get_cache_service().get_multiple(list(keys), SECTION_CACHE_CATEGORY)
+        cached = {}
+        for key, entry in entries.items():
+            section = keys[key]
+            if isinstance(entry, dict) and entry.get("fingerprint") == fingerprints[section]:
+                cached[section] = entry["data"]
+        return cached
+    
+    async def _cache_sections(self, cycle_id: int, report_id: int, entries: Dict[str, Dict[str, Any]]):
+        if not entries or not await self._section_cache_connected():
+            return
+        await get_cache_service().set_multiple(
+            {self._section_cache_key(cycle_id, report_id, section): entry for section, entry in entries.items()},
+            SECTION_CACHE_CATEGORY,
+            ttl=getattr(settings, 'report_section_cache_ttl_seconds', 24 * 3600)
+        )
+    
     async def _get_report_info(self, cycle_id: int, report_id: int) -> Dict[str, Any]:
         """Get basic report information"""
         # Get report details
@@ -12,14 +12,17 @@ Key Features:
 - Planning phase integration
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple
 from datetime import datetime
 import asyncio
 import threading
 import os
 import json
+import math
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, and_, func, text
+from sqlalchemy.engine import URL
 from sqlalchemy.orm import selectinload
 
 from app.models.data_profiling import (
@@ -35,11 +38,137 @@ from app.models.report_attribute import ReportAttribute
 from app.models.user import User
 from app.models.report import Report
 from app.models.cycle_report import CycleReport
+from app.core.config import settings
+from app.core.data_source_pools import get_data_source_pool_registry
 from app.core.logging import get_logger
 from app.core.exceptions import ValidationException, NotFoundException, BusinessLogicException
+from app.services.column_sketches import TableProfileBuilder
+from app.services.column_statistics_service import (
+    ColumnStatisticsService, fingerprint_table_version, table_version_query
+)
 
 logger = get_logger(__name__)
 
+# Rule code fragments whose results depend on the complete column and therefore
+# cannot be computed chunk by chunk and summed
+WHOLE_FRAME_RULE_TOKENS = (
+    'duplicated', 'drop_duplicates', 'nunique', 'unique(', 'value_counts', 'groupby',
+    'quantile', 'median', 'mean(', 'std(', 'rank(', 'shift(', 'rolling', 'cumsum',
+)
+
+# Maximum anomaly records kept per rule across chunks
+MAX_ANOMALIES_PER_RULE = 100
+
+
+def _to_native(value: Any) -> Any:
+    """Convert numpy scalars to Python natives"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _json_safe(value: Any) -> Any:
+    """Round-trip through JSON so checkpoints can be stored in Redis"""
+    return json.loads(json.dumps(value, default=lambda v: _to_native(v) if hasattr(v, 'item') else str(v)))
+
+
+class _RuleAccumulator:
+    """
+    Running totals of one rule across the chunks of a single-pass execution.
+    
+    Counts are summed, the pass rate is weighted by chunk size and the numeric
+    summary is kept as moments so it can be merged exactly. Median is only
+    reported when the rule saw the data as a single frame.
+    """
+    
+    def __init__(self, rule_code: Optional[str] = None):
+        self.rule_code = rule_code
+        self.error: Optional[str] = None
+        self.chunks = 0
+        self.rows_seen = 0
+        self.frame_columns = 0
+        self.total_count = 0
+        self.passed_count = 0
+        self.failed_count = 0
+        self.weighted_pass_rate = 0.0
+        self.anomalies: List[Any] = []
+        self.stats: Optional[Dict[str, Any]] = None
+        self.value_count = 0
+        self.value_sum = 0.0
+        self.value_sum_sq = 0.0
+        self.value_min: Optional[float] = None
+        self.value_max: Optional[float] = None
+        self.median: Optional[float] = None
+    
+    def add(self, exec_result: Dict[str, Any], df: 'pd.DataFrame', column_name: str) -> None:
+        """Fold the result of running the rule on one frame into the totals"""
+        import pandas as pd
+        
+        total = int(_to_native(exec_result.get('total_count', len(df))) or 0)
+        self.chunks += 1
+        self.rows_seen += len(df)
+        self.frame_columns = df.shape[1]
+        self.total_count += total
+        self.passed_count += int(_to_native(exec_result.get('passed_count', 0)) or 0)
+        self.failed_count += int(_to_native(exec_result.get('failed_count', 0)) or 0)
+        self.weighted_pass_rate += float(_to_native(exec_result.get('pass_rate', 0)) or 0) * total
+        
+        room = MAX_ANOMALIES_PER_RULE - len(self.anomalies)
+        if room > 0:
+            self.anomalies.extend(list(exec_result.get('anomalies', []))[:room])
+        
+        if exec_result.get('stats') is not None:
+            # Rule-provided statistics are only meaningful for a single frame
+            self.stats = exec_result['stats'] if self.chunks == 1 else None
+        
+        if column_name in df.columns and pd.api.types.is_numeric_dtype(df[column_name]):
+            values = df[column_name].dropna()
+            if len(values):
+                self.value_count += int(len(values))
+                self.value_sum += float(values.sum())
+                self.value_sum_sq += float((values.astype(float) ** 2).sum())
+                chunk_min, chunk_max = float(values.min()), float(values.max())
+                self.value_min = chunk_min if self.value_min is None else min(self.value_min, chunk_min)
+                self.value_max = chunk_max if self.value_max is None else max(self.value_max, chunk_max)
+                if self.chunks == 1:
+                    self.median = float(values.median())
+        if self.chunks > 1:
+            self.median = None
+    
+    @property
+    def pass_rate(self) -> float:
+        """Pass rate as a fraction, weighted by each chunk's record count"""
+        return (self.weighted_pass_rate / self.total_count) if self.total_count else 0.0
+    
+    def statistical_summary(self) -> Dict[str, Any]:
+        """Numeric summary of the rule's column over all chunks"""
+        if self.stats is not None:
+            return self.stats
+        if not self.value_count:
+            return {"mean": None, "median": None, "std_dev": None, "min": None, "max": None}
+        mean = self.value_sum / self.value_count
+        std_dev = None
+        if self.value_count > 1:
+            variance = (self.value_sum_sq - self.value_count * mean * mean) / (self.value_count - 1)
+            std_dev = math.sqrt(max(variance, 0.0))
+        return {
+            "mean": mean,
+            "median": self.median,
+            "std_dev": std_dev,
+            "min": self.value_min,
+            "max": self.value_max,
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state for pause/resume checkpoints"""
+        return _json_safe(self.__dict__)
+    
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> '_RuleAccumulator':
+        accumulator = cls()
+        accumulator.__dict__.update(state)
+        return accumulator
+
 
 class DataProfilingService:
     """Unified data profiling service following the same pattern as sample selection and scoping"""
@@ -536,8 +665,8 @@ class DataProfilingService:
         logger.info(f"Rejected version {version_id} by user {user_id}: {reason}")
         return version
     
-    async def execute_approved_rules(self, version_id: str) -> str:
-        """Execute all approved rules in a version via background job"""
+    async def execute_approved_rules(self, version_id: str, user_id: Optional[int] = None) -> str:
+        """Execute all approved rules in a version via background job, owned by ``user_id``"""
         version = await self.db.get(DataProfilingRuleVersion, version_id)
         if not version:
             raise NotFoundException(f"Version {version_id} not found")
@@ -570,6 +699,7 @@ class DataProfilingService:
         # Create job in Redis
         job_id = redis_job_manager.create_job("data_profiling_rule_execution", {
             "version_id": str(version_id),
+            "user_id": user_id,
             "phase_id": version.phase_id,
             "total_rules": len(rules),
             "approved_rules": len(rules),
@@ -1057,189 +1187,340 @@ class DataProfilingService:
     ) -> Dict[str, Any]:
         """Execute rule using pandas on data from file or database"""
         try:
-            import pandas as pd
-            import numpy as np
-            from io import StringIO
             import time
             
             start_time = time.time()
             
-            # Load data based on source type
+            # Load data based on source type (a single frame, no chunking)
+            columns_to_fetch = self._get_rule_columns(rule, pde_mapping.pde_code)
             df = None
+            for frame in self._iter_source_frames(
+                data_source, columns_to_fetch, execution_config, chunk_size=None
+            ):
+                df = frame
+            self._normalize_frame_columns(df, [pde_mapping.pde_code])
             
-            if data_source.source_type in ['csv', 'excel']:
-                # For file sources, load from actual file
-                connection_config = data_source.connection_config or {}
-                file_path = connection_config.get('file_path')
-                
-                if file_path and os.path.exists(file_path):
-                    try:
-                        if data_source.source_type == 'csv':
-                            df = pd.read_csv(file_path)
-                        else:  # excel
-                            sheet_name = connection_config.get('sheet_name', 0)
-                            df = pd.read_excel(file_path, sheet_name=sheet_name)
-                        
-                        logger.info(f"Loaded {len(df)} records from {file_path}")
-                    except Exception as e:
-                        logger.error(f"Failed to load file {file_path}: {e}")
-                        raise Exception(f"Failed to load file {file_path}: {e}")
-                else:
-                    # No file path or file doesn't exist
-                    logger.error(f"File not found or not specified for {data_source.name}")
-                    raise FileNotFoundError(f"File not found for data source {data_source.name}")
-                
-            elif data_source.source_type in ['postgresql', 'mysql', 'oracle', 'sqlserver']:
-                # Connect to database and load actual data
-                connection_config = data_source.connection_config or {}
-                
-                if data_source.source_type == 'postgresql':
-                    import psycopg2
-                    import pandas.io.sql as sqlio
-                    
-                    # Build connection string
-                    # Use connection config values, falling back to defaults
-                    host = connection_config.get('host', 'localhost')
-                    port = connection_config.get('port', '5432')
-                    database = connection_config.get('database', 'synapse_dt')
-                    user = connection_config.get('user', 'synapse_user')
-                    password = connection_config.get('password', 'synapse_password')
-                    
-                    conn_str = f"host={host} port={port} dbname={database} user={user} password={password}"
-                    
-                    # Connect and query
-                    with psycopg2.connect(conn_str) as conn:
-                        table_name = connection_config.get('table_name', 'data_table')
-                        schema_name = connection_config.get('schema', 'public')
-                        
-                        # Build query to get relevant columns
-                        # Get the source field and any other fields that might be referenced
-                        columns_to_fetch = [pde_mapping.pde_code]  # pde_code now contains the actual column name
-                        
-                        # Parse rule code to find referenced columns
-                        import re
-                        if rule.rule_code:
-                            # Look for column references in the rule code like df['column_name'] or 'column_name' in df.columns
-                            column_patterns = [
-                                r"df\['([^']+)'\]",  # df['column_name']
-                                r'df\["([^"]+)"\]',  # df["column_name"]
-                                r"'([^']+)' in df\.columns",  # 'column_name' in df.columns
-                                r'"([^"]+)" in df\.columns'   # "column_name" in df.columns
-                            ]
-                            
-                            for pattern in column_patterns:
-                                matches = re.findall(pattern, rule.rule_code)
-                                columns_to_fetch.extend(matches)
-                        
-                        # Add common columns if they exist
-                        check_columns_query = f"""
-                            SELECT column_name AS col_name
-                            FROM information_schema.columns 
-                            WHERE table_schema = '{schema_name}' 
-                            AND table_name = '{table_name}'
-                            AND column_name IN ('record_id', 'created_at', 'updated_at', 'id')
-                        """
-                        
-                        with conn.cursor() as cur:
-                            cur.execute(check_columns_query)
-                            # Since we're using a basic cursor, we still need to use index access
-                            # but the query is explicit about what column it returns
-                            existing_columns = [row[0] for row in cur.fetchall()]
-                            columns_to_fetch.extend(existing_columns)
-                        
-                        # Build the query
-                        columns_str = ', '.join(set(columns_to_fetch))
-                        query = f"SELECT {columns_str} FROM {schema_name}.{table_name}"
-                        
-                        # If execution config specifies limits, apply them
-                        if execution_config:
-                            if execution_config.get('sample_size'):
-                                query += f" LIMIT {execution_config['sample_size']}"
-                            elif execution_config.get('sample_percentage'):
-                                query += f" TABLESAMPLE SYSTEM ({execution_config['sample_percentage']})"
-                        
-                        logger.info(f"Executing query for rule {rule.rule_name}: {query}")
-                        
-                        # Load data into pandas
-                        df = sqlio.read_sql_query(query, conn)
-                        
-                        # Convert numeric columns to proper types
-                        # This is necessary because psycopg2 returns numeric types as strings
-                        for col in df.columns:
-                            # Try to convert to numeric, if it fails keep as is
-                            try:
-                                df[col] = pd.to_numeric(df[col], errors='ignore')
-                            except:
-                                pass
-                        
-                        # If the expected column name doesn't match exactly, try to find it
-                        if pde_mapping.pde_code not in df.columns:
-                            # Try case-insensitive match
-                            matching_cols = [col for col in df.columns if col.lower() == pde_mapping.pde_code.lower()]
-                            if matching_cols:
-                                df.rename(columns={matching_cols[0]: pde_mapping.pde_code}, inplace=True)
-                            else:
-                                # Log available columns for debugging
-                                logger.warning(f"Column {pde_mapping.pde_code} not found in table. Available columns: {list(df.columns)}")
-                                # Create the column with null values as fallback
-                                df[pde_mapping.pde_code] = None
-                
-                else:
-                    # For other database types, return error
-                    logger.error(f"Database type {data_source.source_type} not implemented")
-                    raise NotImplementedError(f"Database type {data_source.source_type} not supported yet")
-            
-            # Create execution context for the rule
             # The LLM-generated code can reference these variables
             column_name = pde_mapping.pde_code  # pde_code now contains the actual column name
-            attribute_name = rule.attribute_name
             
             logger.info(f"DataFrame shape: {df.shape}")
             logger.info(f"DataFrame columns: {list(df.columns)}")
             logger.info(f"Column name for rule: '{column_name}'")
             
-            # Execute the rule code
-            # Create a safe execution environment
-            exec_globals = {
-                'pd': pd,
-                'np': np,
-                'df': df,
-                'column_name': column_name,
-                'attribute_name': attribute_name,
-                're': __import__('re'),
-                'datetime': __import__('datetime'),
-                '__builtins__': {
-                    'len': len,
-                    'sum': sum,
-                    'min': min,
-                    'max': max,
-                    'abs': abs,
-                    'round': round,
-                    'float': float,
-                    'int': int,
-                    'str': str,
-                    'bool': bool,
-                    'isinstance': isinstance,
-                    'print': print,
-                    'dict': dict,
-                    'list': list,
-                    'set': set,
-                    'range': range,
-                    '__import__': __import__
-                }
-            }
-            exec_locals = {}
+            exec_result, rule_code = self._run_rule_code(rule, df, column_name)
+            
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            
+            accumulator = _RuleAccumulator(rule_code=rule_code)
+            accumulator.add(exec_result, df, column_name)
+            result = self._build_pandas_rule_result(
+                rule, pde_mapping, data_source, accumulator, execution_time_ms
+            )
+            
+            logger.info(f"Executed rule {rule.rule_name} using pandas - Pass rate: {result['pass_rate']:.2%}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error executing pandas rule: {str(e)}")
+            logger.error(f"Error type: {type(e).__name__}")
+            import traceback
+            logger.error(f"Traceback:\n{traceback.format_exc()}")
+            return self._failed_rule_result(
+                rule, f"Pandas execution error: {str(e)}\n{traceback.format_exc()}"
+            )
+    
+    @staticmethod
+    def _is_pandas_rule(rule: ProfilingRule) -> bool:
+        """Whether the rule code runs against a DataFrame rather than SQL"""
+        return bool(rule.rule_code) and (
+            'pd.' in rule.rule_code or 'df[' in rule.rule_code or 'DataFrame' in rule.rule_code
+        )
+    
+    @staticmethod
+    def _is_whole_frame_rule(rule: ProfilingRule) -> bool:
+        """
+        Whether the rule needs the complete column to produce a correct result.
+        
+        Uniqueness and distribution-based checks (duplicates, quantiles, z-scores)
+        cannot be summed across chunks, so they are evaluated on one shared frame.
+        """
+        if str(rule.rule_type).lower().endswith('uniqueness'):
+            return True
+        rule_code = rule.rule_code or ''
+        return any(token in rule_code for token in WHOLE_FRAME_RULE_TOKENS)
+    
+    @staticmethod
+    def _get_rule_columns(rule: ProfilingRule, column_name: str) -> List[str]:
+        """Columns referenced by a rule: its mapped column plus any df['...'] references"""
+        import re
+        
+        columns = [column_name]
+        if rule.rule_code:
+            # Look for column references in the rule code like df['column_name'] or 'column_name' in df.columns
+            column_patterns = [
+                r"df\['([^']+)'\]",  # df['column_name']
+                r'df\["([^"]+)"\]',  # df["column_name"]
+                r"'([^']+)' in df\.columns",  # 'column_name' in df.columns
+                r'"([^"]+)" in df\.columns'   # "column_name" in df.columns
+            ]
+            for pattern in column_patterns:
+                columns.extend(re.findall(pattern, rule.rule_code))
+        return columns
+    
+    def _iter_source_frames(
+        self,
+        data_source: 'CycleReportDataSource',
+        columns_to_fetch: List[str],
+        execution_config: Optional[Dict] = None,
+        chunk_size: Optional[int] = None,
+        skip_chunks: int = 0
+    ) -> Iterator['pd.DataFrame']:
+        """
+        Yield the data source as DataFrames.
+        
+        With ``chunk_size`` unset the whole source is yielded as one frame. Otherwise
+        chunks of at most ``chunk_size`` rows are streamed (``read_csv(chunksize=...)``
+        for CSV, a server-side named cursor for PostgreSQL), skipping the first
+        ``skip_chunks`` chunks so a paused execution can resume where it stopped.
+        """
+        import pandas as pd
+        
+        connection_config = data_source.connection_config or {}
+        
+        if data_source.source_type in ['csv', 'excel']:
+            # For file sources, load from actual file
+            file_path = connection_config.get('file_path')
             
-            # Prepare the rule code
-            rule_code = rule.rule_code
+            if not file_path or not os.path.exists(file_path):
+                # No file path or file doesn't exist
+                logger.error(f"File not found or not specified for {data_source.name}")
+                raise FileNotFoundError(f"File not found for data source {data_source.name}")
             
-            # Check if this is an LLM-generated function (starts with 'def check_rule')
-            if rule_code.strip().startswith('def check_rule'):
-                # Execute the function definition first
-                exec(rule_code, exec_globals, exec_locals)
+            try:
+                if data_source.source_type == 'csv':
+                    # Parse only the rule columns and the common ones the database path adds;
+                    # a callable keeps columns missing from the file from raising. Names are
+                    # compared case-insensitively, as _normalize_frame_columns resolves them
+                    wanted_columns = {
+                        str(name).lower()
+                        for name in [*columns_to_fetch, 'record_id', 'created_at', 'updated_at', 'id']
+                    }
+                    usecols = (lambda name: str(name).lower() in wanted_columns) if columns_to_fetch else None
+                    if not chunk_size:
+                        df = pd.read_csv(file_path, usecols=usecols)
+                        logger.info(f"Loaded {len(df)} records from {file_path}")
+                        yield df
+                        return
+                    # Skip already processed rows but keep the header line
+                    skiprows = range(1, skip_chunks * chunk_size + 1) if skip_chunks else None
+                    for chunk in pd.read_csv(file_path, chunksize=chunk_size, skiprows=skiprows, usecols=usecols):
+                        yield chunk
+                    return
                 
-                # Then call the function with the dataframe and column
-                execution_code = """
+                # Excel cannot be read incrementally - load once and slice in memory
+                sheet_name = connection_config.get('sheet_name', 0)
+                df = pd.read_excel(file_path, sheet_name=sheet_name)
+                logger.info(f"Loaded {len(df)} records from {file_path}")
+            except Exception as e:
+                logger.error(f"Failed to load file {file_path}: {e}")
+                raise Exception(f"Failed to load file {file_path}: {e}")
+            
+            if not chunk_size:
+                yield df
+                return
+            for start in range(skip_chunks * chunk_size, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+            return
+        
+        if data_source.source_type not in ['postgresql', 'mysql', 'oracle', 'sqlserver']:
+            raise NotImplementedError(f"Source type {data_source.source_type} not supported")
+        
+        if data_source.source_type != 'postgresql':
+            # For other database types, return error
+            logger.error(f"Database type {data_source.source_type} not implemented")
+            raise NotImplementedError(f"Database type {data_source.source_type} not supported yet")
+        
+        import pandas.io.sql as sqlio
+        
+        # Borrow a pooled psycopg2 connection; close() returns it to the shared pool
+        conn = self._get_source_engine(data_source).raw_connection()
+        try:
+            table_name = connection_config.get('table_name', 'data_table')
+            schema_name = connection_config.get('schema', 'public')
+            columns_to_fetch = list(columns_to_fetch)
+            
+            # Add common columns if they exist
+            check_columns_query = f"""
+                SELECT column_name AS col_name
+                FROM information_schema.columns 
+                WHERE table_schema = '{schema_name}' 
+                AND table_name = '{table_name}'
+                AND column_name IN ('record_id', 'created_at', 'updated_at', 'id')
+            """
+            
+            with conn.cursor() as cur:
+                cur.execute(check_columns_query)
+                existing_columns = [row[0] for row in cur.fetchall()]
+                columns_to_fetch.extend(existing_columns)
+            
+            # Build the query
+            columns_str = ', '.join(dict.fromkeys(columns_to_fetch))
+            query = f"SELECT {columns_str} FROM {schema_name}.{table_name}"
+            
+            # If execution config specifies limits, apply them
+            if execution_config:
+                if not execution_config.get('sample_size') and execution_config.get('sample_percentage'):
+                    query += f" TABLESAMPLE SYSTEM ({execution_config['sample_percentage']})"
+            
+            if chunk_size:
+                # A stable order is needed so resumed executions skip the right rows
+                order_key = next((c for c in ('id', 'record_id') if c in existing_columns), None)
+                if order_key:
+                    query += f" ORDER BY {order_key}"
+            
+            if execution_config and execution_config.get('sample_size'):
+                query += f" LIMIT {execution_config['sample_size']}"
+            
+            logger.info(f"Executing profiling query on {data_source.name}: {query}")
+            
+            if not chunk_size:
+                yield self._coerce_numeric_columns(sqlio.read_sql_query(query, conn))
+                return
+            
+            # Server-side cursor so only one chunk is held in memory at a time
+            with conn.cursor(name=f"profiling_{uuid.uuid4().hex}") as cur:
+                cur.itersize = chunk_size
+                cur.execute(query)
+                chunk_index = 0
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    if chunk_index >= skip_chunks:
+                        columns = [desc[0] for desc in cur.description]
+                        yield self._coerce_numeric_columns(pd.DataFrame(rows, columns=columns))
+                    chunk_index += 1
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _get_source_engine(data_source: 'CycleReportDataSource'):
+        """Shared psycopg2 engine of a PostgreSQL data source"""
+        connection_config = data_source.connection_config or {}
+        # Use connection config values, falling back to defaults
+        url = URL.create(
+            "postgresql+psycopg2",
+            username=connection_config.get('user', 'synapse_user'),
+            password=connection_config.get('password', 'synapse_password'),
+            host=connection_config.get('host', 'localhost'),
+            port=int(connection_config.get('port', 5432)),
+            database=connection_config.get('database', 'synapse_dt'),
+        )
+        return get_data_source_pool_registry().get_sync_engine(
+            url, connection_config.get('max_pool_size')
+        )
+    
+    async def _store_column_profile(
+        self,
+        data_source: 'CycleReportDataSource',
+        builder: TableProfileBuilder
+    ) -> None:
+        """Persist the column statistics gathered while streaming a data source"""
+        connection_config = data_source.connection_config or {}
+        schema_name = connection_config.get('schema', 'public')
+        table_name = connection_config.get('table_name', 'data_table')
+        try:
+            with self._get_source_engine(data_source).connect() as conn:
+                row = conn.execute(text(table_version_query(schema_name, table_name))).fetchone()
+            await ColumnStatisticsService(self.db).save_profile(
+                f"{schema_name}.{table_name}",
+                fingerprint_table_version(row),
+                builder.result(),
+                data_source_id=data_source.id
+            )
+        except Exception as e:
+            logger.warning(f"Could not store column statistics profile of {data_source.name}: {e}")
+    
+    @staticmethod
+    def _coerce_numeric_columns(df: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Convert numeric columns to proper types (psycopg2 returns numerics as strings)"""
+        import pandas as pd
+        
+        for col in df.columns:
+            # Try to convert to numeric, if it fails keep as is
+            try:
+                df[col] = pd.to_numeric(df[col], errors='ignore')
+            except Exception:
+                pass
+        return df
+    
+    @staticmethod
+    def _normalize_frame_columns(df: 'pd.DataFrame', expected_columns: List[str]) -> None:
+        """Map expected column names onto the frame case-insensitively, adding missing ones as nulls"""
+        for expected in dict.fromkeys(expected_columns):
+            if expected in df.columns:
+                continue
+            # Try case-insensitive match
+            matching_cols = [col for col in df.columns if str(col).lower() == expected.lower()]
+            if matching_cols:
+                df.rename(columns={matching_cols[0]: expected}, inplace=True)
+            else:
+                # Log available columns for debugging
+                logger.warning(f"Column {expected} not found in table. Available columns: {list(df.columns)}")
+                # Create the column with null values as fallback
+                df[expected] = None
+    
+    def _run_rule_code(
+        self,
+        rule: ProfilingRule,
+        df: 'pd.DataFrame',
+        column_name: str
+    ) -> Tuple[Dict[str, Any], str]:
+        """Run a rule's pandas code against ``df`` and return its raw result and the executed code"""
+        import pandas as pd
+        import numpy as np
+        
+        # Create a safe execution environment
+        exec_globals = {
+            'pd': pd,
+            'np': np,
+            'df': df,
+            'column_name': column_name,
+            'attribute_name': rule.attribute_name,
+            're': __import__('re'),
+            'datetime': __import__('datetime'),
+            '__builtins__': {
+                'len': len,
+                'sum': sum,
+                'min': min,
+                'max': max,
+                'abs': abs,
+                'round': round,
+                'float': float,
+                'int': int,
+                'str': str,
+                'bool': bool,
+                'isinstance': isinstance,
+                'print': print,
+                'dict': dict,
+                'list': list,
+                'set': set,
+                'range': range,
+                '__import__': __import__
+            }
+        }
+        exec_locals = {}
+        
+        # Prepare the rule code
+        rule_code = rule.rule_code
+        
+        # Check if this is an LLM-generated function (starts with 'def check_rule')
+        if rule_code.strip().startswith('def check_rule'):
+            # Execute the function definition first
+            exec(rule_code, exec_globals, exec_locals)
+            
+            # Then call the function with the dataframe and column
+            execution_code = """
 # Call the LLM-generated function
 result = check_rule(df, column_name)
 # Ensure the result has the expected format
@@ -1260,15 +1541,14 @@ else:
         'pass_rate': 0
     }
 """
-                exec(execution_code, exec_globals, exec_locals)
-                exec_result = exec_locals.get('final_result', {})
-                
-            else:
-                # Handle non-function rule code (fallback for older rules)
-                if 'result =' not in rule_code and 'return' not in rule_code:
-                    # Analyze the code to determine what it's trying to do
-                    if rule.rule_type == 'completeness':
-                        rule_code = f"""
+            exec(execution_code, exec_globals, exec_locals)
+            return exec_locals.get('final_result', {}), rule_code
+        
+        # Handle non-function rule code (fallback for older rules)
+        if 'result =' not in rule_code and 'return' not in rule_code:
+            # Analyze the code to determine what it's trying to do
+            if rule.rule_type == 'completeness':
+                rule_code = """
 # Completeness check
 total_count = len(df)
 null_count = df[column_name].isna().sum()
@@ -1282,8 +1562,8 @@ result = {
     'pass_rate': pass_rate
 }
 """
-                    elif rule.rule_type == 'validity':
-                        rule_code = f"""
+            elif rule.rule_type == 'validity':
+                rule_code = f"""
 # Validity check using the provided rule
 {rule_code}
 
@@ -1299,16 +1579,16 @@ else:
 
 pass_rate = (valid_count / total_count) if total_count > 0 else 0
 
-result = {
+result = {{
     'total_count': total_count,
     'passed_count': valid_count,
     'failed_count': invalid_count,
     'pass_rate': pass_rate,
     'failed_records': df[~is_valid].head(10).to_dict('records') if 'is_valid' in locals() else []
-}
+}}
 """
-                    elif rule.rule_type == 'uniqueness':
-                        rule_code = f"""
+            elif rule.rule_type == 'uniqueness':
+                rule_code = """
 # Uniqueness check
 total_count = len(df)
 unique_count = df[column_name].nunique()
@@ -1327,86 +1607,365 @@ result = {
     'failed_records': duplicates.head(10).to_dict('records')
 }
 """
-                
-                # Execute the rule code
-                exec(rule_code, exec_globals, exec_locals)
-                
-                # Get the result
-                if 'result' in exec_locals:
-                    exec_result = exec_locals['result']
-                else:
-                    # If no result variable, try to extract metrics from locals
-                    exec_result = {
-                        'total_count': exec_locals.get('total_count', len(df)),
-                        'passed_count': exec_locals.get('passed_count', 0),
-                        'failed_count': exec_locals.get('failed_count', 0),
-                        'pass_rate': exec_locals.get('pass_rate', 0)
-                    }
+        
+        # Execute the rule code
+        exec(rule_code, exec_globals, exec_locals)
+        
+        # Get the result
+        if 'result' in exec_locals:
+            return exec_locals['result'], rule_code
+        
+        # If no result variable, try to extract metrics from locals
+        return {
+            'total_count': exec_locals.get('total_count', len(df)),
+            'passed_count': exec_locals.get('passed_count', 0),
+            'failed_count': exec_locals.get('failed_count', 0),
+            'pass_rate': exec_locals.get('pass_rate', 0)
+        }, rule_code
+    
+    def _build_pandas_rule_result(
+        self,
+        rule: ProfilingRule,
+        pde_mapping: 'PlanningPDEMapping',
+        data_source: 'CycleReportDataSource',
+        accumulator: '_RuleAccumulator',
+        execution_time_ms: int
+    ) -> Dict[str, Any]:
+        """Build the per-rule result dictionary from accumulated pandas results"""
+        import numpy as np
+        
+        pass_rate = accumulator.pass_rate
+        return {
+            "rule_id": str(rule.rule_id),
+            "rule_name": rule.rule_name,
+            "rule_type": rule.rule_type,
+            "execution_status": "success",
+            "records_processed": accumulator.total_count,
+            "records_passed": accumulator.passed_count,
+            "records_failed": accumulator.failed_count,
+            "pass_rate": pass_rate * 100,  # Convert to percentage
+            "execution_time_ms": execution_time_ms,
+            "executed_at": datetime.utcnow().isoformat(),
+            "quality_scores": {
+                "completeness": round(pass_rate * 100, 2),
+                "accuracy": round(pass_rate * 100 - np.random.uniform(0, 5), 2),
+                "validity": round(pass_rate * 100 - np.random.uniform(0, 3), 2)
+            },
+            "anomaly_details": accumulator.anomalies,
+            "statistical_summary": accumulator.statistical_summary(),
+            "metadata": {
+                "data_source": data_source.name,
+                "source_type": data_source.source_type,
+                "pde_code": pde_mapping.pde_code,
+                "source_field": pde_mapping.source_field,
+                "execution_engine": "pandas",
+                "dataframe_shape": f"{accumulator.rows_seen} rows x {accumulator.frame_columns} columns",
+                "chunks_processed": accumulator.chunks,
+                "rule_code_executed": accumulator.rule_code
+            },
+            "error": None
+        }
+    
+    @staticmethod
+    def _failed_rule_result(rule: ProfilingRule, error: str) -> Dict[str, Any]:
+        """Result dictionary for a rule that could not be executed"""
+        return {
+            "rule_id": str(rule.rule_id),
+            "rule_name": rule.rule_name,
+            "rule_type": rule.rule_type,
+            "execution_status": "failed",
+            "records_processed": 0,
+            "records_passed": 0,
+            "records_failed": 0,
+            "pass_rate": 0,
+            "execution_time_ms": 0,
+            "executed_at": datetime.utcnow().isoformat(),
+            "quality_scores": {},
+            "anomaly_details": [],
+            "statistical_summary": {},
+            "error": error
+        }
+    
+    async def _resolve_rule_data_sources(
+        self,
+        rules: List[ProfilingRule]
+    ) -> Dict[str, Tuple[Optional['PlanningPDEMapping'], Optional['CycleReportDataSource']]]:
+        """
+        Resolve the PDE mapping and data source of every rule with three queries,
+        instead of the per-rule lookups done by ``execute_rule``.
+        """
+        from app.models.planning import PlanningPDEMapping
+        from app.models.cycle_report_data_source import CycleReportDataSource
+        
+        resolved = {str(rule.rule_id): (None, None) for rule in rules}
+        if not rules:
+            return resolved
+        
+        phase_ids = {rule.phase_id for rule in rules}
+        phases_result = await self.db.execute(
+            select(WorkflowPhase).where(WorkflowPhase.phase_id.in_(phase_ids))
+        )
+        phases = {phase.phase_id: phase for phase in phases_result.scalars().all()}
+        
+        # Planning phase of each profiling phase, keyed by (cycle_id, report_id)
+        planning_result = await self.db.execute(
+            select(WorkflowPhase).where(
+                and_(
+                    WorkflowPhase.phase_name == "Planning",
+                    WorkflowPhase.cycle_id.in_({p.cycle_id for p in phases.values()}),
+                    WorkflowPhase.report_id.in_({p.report_id for p in phases.values()})
+                )
+            )
+        )
+        planning_phases = {
+            (p.cycle_id, p.report_id): p.phase_id for p in planning_result.scalars().all()
+        }
+        
+        mappings_result = await self.db.execute(
+            select(PlanningPDEMapping).where(
+                and_(
+                    PlanningPDEMapping.phase_id.in_(set(planning_phases.values())),
+                    PlanningPDEMapping.attribute_id.in_({rule.attribute_id for rule in rules})
+                )
+            )
+        )
+        mappings = {
+            (m.phase_id, m.attribute_id): m for m in mappings_result.scalars().all()
+        }
+        
+        data_source_ids = {m.data_source_id for m in mappings.values() if m.data_source_id}
+        data_sources = {}
+        if data_source_ids:
+            sources_result = await self.db.execute(
+                select(CycleReportDataSource).where(CycleReportDataSource.id.in_(data_source_ids))
+            )
+            data_sources = {ds.id: ds for ds in sources_result.scalars().all()}
+        
+        for rule in rules:
+            phase = phases.get(rule.phase_id)
+            planning_phase_id = planning_phases.get((phase.cycle_id, phase.report_id)) if phase else None
+            pde_mapping = mappings.get((planning_phase_id, rule.attribute_id))
+            data_source = data_sources.get(pde_mapping.data_source_id) if pde_mapping else None
+            resolved[str(rule.rule_id)] = (pde_mapping, data_source)
+        
+        return resolved
+    
+    async def execute_rules_single_pass(
+        self,
+        rules: List[ProfilingRule],
+        execution_config: Optional[Dict] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        should_pause: Optional[Callable[[], bool]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute all rules of a version reading each data source once.
+        
+        Rules are grouped by data source. Row-local pandas rules are evaluated chunk
+        by chunk against one streamed read of the union of their columns, and their
+        counts are summed across chunks. Whole-frame rules (uniqueness, distribution
+        checks) share one additional frame limited to their columns. SQL rules and
+        rules without a mapped data source fall back to ``execute_rule``.
+        
+        ``should_pause`` is polled after every chunk; when it returns True the
+        execution stops and the returned ``checkpoint`` can be passed back in to
+        resume from the next chunk. ``on_progress`` receives a progress snapshot
+        (including the checkpoint) after every chunk.
+        
+        Returns ``{"status": "completed" | "paused", "results": {rule_id: result},
+        "checkpoint": {...}}`` where each result has the shape of ``execute_rule``.
+        """
+        import time
+        
+        execution_config = execution_config or {}
+        chunk_size = execution_config.get('chunk_size', settings.profiling_chunk_size) or None
+        
+        checkpoint = checkpoint or {}
+        results: Dict[str, Dict[str, Any]] = dict(checkpoint.get('results', {}))
+        completed_groups = set(checkpoint.get('completed_groups', []))
+        
+        rules_by_id = {str(rule.rule_id): rule for rule in rules}
+        resolved = await self._resolve_rule_data_sources(rules)
+        
+        # Group pandas rules by data source, in rule order
+        groups: Dict[str, Dict[str, Any]] = {}
+        fallback_rules: List[ProfilingRule] = []
+        for rule in rules:
+            rule_id = str(rule.rule_id)
+            if rule_id in results:
+                continue
+            pde_mapping, data_source = resolved[rule_id]
+            if not (pde_mapping and data_source and pde_mapping.source_field and self._is_pandas_rule(rule)):
+                fallback_rules.append(rule)
+                continue
             
-            execution_time_ms = int((time.time() - start_time) * 1000)
+            whole_frame = not chunk_size or self._is_whole_frame_rule(rule)
+            group_key = f"{data_source.id}:{'frame' if whole_frame else 'stream'}"
+            group = groups.setdefault(group_key, {
+                "data_source": data_source,
+                "chunk_size": None if whole_frame else chunk_size,
+                "rules": [],
+                "columns": [],
+            })
+            group["rules"].append(rule)
+            group["columns"].extend(self._get_rule_columns(rule, pde_mapping.pde_code))
+        
+        progress = {
+            "total_groups": len(groups) + len(completed_groups),
+            "completed_groups": len(completed_groups),
+            "total_rules": len(rules),
+            "completed_rules": len(results),
+        }
+        
+        def snapshot_checkpoint(current: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+            return _json_safe({
+                "mode": "single_pass",
+                "results": results,
+                "completed_groups": sorted(completed_groups),
+                "current_group": current,
+            })
+        
+        for group_key, group in groups.items():
+            data_source = group["data_source"]
+            group_rules = group["rules"]
             
-            # Build the final result
-            result = {
-                "rule_id": str(rule.rule_id),
-                "rule_name": rule.rule_name,
-                "rule_type": rule.rule_type,
-                "execution_status": "success",
-                "records_processed": exec_result.get('total_count', len(df)),
-                "records_passed": exec_result.get('passed_count', 0),
-                "records_failed": exec_result.get('failed_count', 0),
-                "pass_rate": exec_result.get('pass_rate', 0) * 100,  # Convert to percentage
-                "execution_time_ms": execution_time_ms,
-                "executed_at": datetime.utcnow().isoformat(),
-                "quality_scores": {
-                    "completeness": round(exec_result.get('pass_rate', 0) * 100, 2),
-                    "accuracy": round(exec_result.get('pass_rate', 0) * 100 - np.random.uniform(0, 5), 2),
-                    "validity": round(exec_result.get('pass_rate', 0) * 100 - np.random.uniform(0, 3), 2)
-                },
-                "anomaly_details": exec_result.get('anomalies', []),
-                "statistical_summary": exec_result.get('stats', {
-                    "mean": float(df[column_name].mean()) if pd.api.types.is_numeric_dtype(df[column_name]) else None,
-                    "median": float(df[column_name].median()) if pd.api.types.is_numeric_dtype(df[column_name]) else None,
-                    "std_dev": float(df[column_name].std()) if pd.api.types.is_numeric_dtype(df[column_name]) else None,
-                    "min": float(df[column_name].min()) if pd.api.types.is_numeric_dtype(df[column_name]) else None,
-                    "max": float(df[column_name].max()) if pd.api.types.is_numeric_dtype(df[column_name]) else None,
-                }),
-                "metadata": {
-                    "data_source": data_source.name,
-                    "source_type": data_source.source_type,
-                    "pde_code": pde_mapping.pde_code,
-                    "source_field": pde_mapping.source_field,
-                    "execution_engine": "pandas",
-                    "dataframe_shape": f"{df.shape[0]} rows x {df.shape[1]} columns",
-                    "rule_code_executed": rule_code
-                },
-                "error": None
-            }
+            # Restore partially accumulated state when resuming inside this group
+            current = checkpoint.get('current_group') or {}
+            if current.get('group_key') == group_key:
+                chunks_done = current.get('chunks_done', 0)
+                accumulators = {
+                    rule_id: _RuleAccumulator.from_dict(state)
+                    for rule_id, state in current.get('accumulators', {}).items()
+                }
+                elapsed_ms = current.get('elapsed_ms', 0)
+            else:
+                chunks_done = 0
+                accumulators = {}
+                elapsed_ms = 0
+            for rule in group_rules:
+                accumulators.setdefault(str(rule.rule_id), _RuleAccumulator())
             
-            logger.info(f"Executed rule {rule.rule_name} using pandas - Pass rate: {result['pass_rate']:.2%}")
-            return result
+            # A full, unsampled stream of a table also yields its column statistics profile
+            # (sketch state is not checkpointed, so resumed groups skip it)
+            profile_builder = None
+            if (
+                group["chunk_size"] and not chunks_done
+                and data_source.source_type == 'postgresql'
+                and not execution_config.get('sample_size')
+                and not execution_config.get('sample_percentage')
+            ):
+                profile_builder = TableProfileBuilder(
+                    resolved[str(rule.rule_id)][0].pde_code for rule in group_rules
+                )
             
-        except Exception as e:
-            logger.error(f"Error executing pandas rule: {str(e)}")
-            logger.error(f"Error type: {type(e).__name__}")
-            import traceback
-            logger.error(f"Traceback:\n{traceback.format_exc()}")
-            import traceback
-            return {
-                "rule_id": str(rule.rule_id),
-                "rule_name": rule.rule_name,
-                "rule_type": rule.rule_type,
-                "execution_status": "failed",
-                "records_processed": 0,
-                "records_passed": 0,
-                "records_failed": 0,
-                "pass_rate": 0,
-                "execution_time_ms": 0,
-                "executed_at": datetime.utcnow().isoformat(),
-                "quality_scores": {},
-                "anomaly_details": [],
-                "statistical_summary": {},
-                "error": f"Pandas execution error: {str(e)}\n{traceback.format_exc()}"
-            }
+            logger.info(
+                f"Single-pass profiling of {len(group_rules)} rules on {data_source.name} "
+                f"({'chunks of ' + str(group['chunk_size']) if group['chunk_size'] else 'one frame'})"
+            )
+            
+            group_started = time.time()
+            try:
+                frames = self._iter_source_frames(
+                    data_source,
+                    group["columns"],
+                    execution_config,
+                    chunk_size=group["chunk_size"],
+                    skip_chunks=chunks_done
+                )
+                for df in frames:
+                    self._normalize_frame_columns(
+                        df, [resolved[str(rule.rule_id)][0].pde_code for rule in group_rules]
+                    )
+                    if profile_builder:
+                        profile_builder.update(df)
+                    for rule in group_rules:
+                        accumulator = accumulators[str(rule.rule_id)]
+                        if accumulator.error:
+                            continue
+                        column_name = resolved[str(rule.rule_id)][0].pde_code
+                        try:
+                            exec_result, rule_code = self._run_rule_code(rule, df, column_name)
+                            accumulator.rule_code = rule_code
+                            accumulator.add(exec_result, df, column_name)
+                        except Exception as rule_error:
+                            logger.error(f"Error executing pandas rule {rule.rule_name}: {str(rule_error)}")
+                            accumulator.error = f"Pandas execution error: {str(rule_error)}"
+                    
+                    chunks_done += 1
+                    group_state = {
+                        "group_key": group_key,
+                        "chunks_done": chunks_done,
+                        "elapsed_ms": elapsed_ms + int((time.time() - group_started) * 1000),
+                        "accumulators": {
+                            rule_id: acc.to_dict() for rule_id, acc in accumulators.items()
+                        },
+                    }
+                    
+                    if on_progress:
+                        on_progress({
+                            **progress,
+                            "current_data_source": data_source.name,
+                            "chunks_done": chunks_done,
+                            "rows_processed": max(
+                                (acc.rows_seen for acc in accumulators.values()), default=0
+                            ),
+                            "checkpoint": snapshot_checkpoint(group_state),
+                        })
+                    
+                    if group["chunk_size"] and should_pause and should_pause():
+                        frames.close()
+                        logger.info(f"Single-pass profiling paused after chunk {chunks_done} of {data_source.name}")
+                        return {
+                            "status": "paused",
+                            "results": results,
+                            "checkpoint": snapshot_checkpoint(group_state),
+                        }
+            except Exception as load_error:
+                logger.error(f"Failed to read data source {data_source.name}: {str(load_error)}")
+                for rule in group_rules:
+                    results[str(rule.rule_id)] = self._failed_rule_result(
+                        rule, f"Execution failed: {str(load_error)}"
+                    )
+                completed_groups.add(group_key)
+                progress["completed_groups"] += 1
+                progress["completed_rules"] = len(results)
+                continue
+            
+            # The source read is shared, so every rule reports the group's wall time
+            execution_time_ms = elapsed_ms + int((time.time() - group_started) * 1000)
+            for rule in group_rules:
+                rule_id = str(rule.rule_id)
+                accumulator = accumulators[rule_id]
+                if accumulator.error:
+                    results[rule_id] = self._failed_rule_result(rule, accumulator.error)
+                else:
+                    pde_mapping, _ = resolved[rule_id]
+                    results[rule_id] = self._build_pandas_rule_result(
+                        rule, pde_mapping, data_source, accumulator, execution_time_ms
+                    )
+            
+            if profile_builder:
+                await self._store_column_profile(data_source, profile_builder)
+            
+            completed_groups.add(group_key)
+            progress["completed_groups"] += 1
+            progress["completed_rules"] = len(results)
+        
+        # SQL rules and rules without a resolvable data source keep the per-rule path
+        for rule in fallback_rules:
+            if should_pause and should_pause():
+                return {"status": "paused", "results": results, "checkpoint": snapshot_checkpoint()}
+            results[str(rule.rule_id)] = await self.execute_rule(rule, execution_config)
+            progress["completed_rules"] = len(results)
+            if on_progress:
+                on_progress({**progress, "checkpoint": snapshot_checkpoint()})
+        
+        ordered_results = {rule_id: results[rule_id] for rule_id in rules_by_id if rule_id in results}
+        return {
+            "status": "completed",
+            "results": ordered_results,
+            "checkpoint": snapshot_checkpoint(),
+        }
     
     
     async def _execute_rule_with_sql(
@@ -169,6 +169,13 @@ class DataQualityService:
                 else:
                     dimension_averages[f"{rule_type.value}_score"] = 0.0
             
+            # Observed column statistics complement the rule results
+            column_stats = await cls._get_column_statistics(db, cycle_id, report_id, attribute_id)
+            if column_stats:
+                dimension_averages.update(column_stats)
+                if not dimension_scores[ProfilingRuleType.COMPLETENESS]:
+                    dimension_averages["completeness_score"] = column_stats["observed_completeness"]
+            
             result = {
                 "overall_quality_score": round(overall_quality_score, 2),
                 "total_rules_executed": len(result_pairs),
@@ -194,6 +201,48 @@ class DataQualityService:
                 "error": str(e)
             }
     
+    @classmethod
+    async def _get_column_statistics(
+        cls,
+        db: AsyncSession,
+        cycle_id: int,
+        report_id: int,
+        attribute_id: int
+    ) -> Optional[Dict[str, float]]:
+        """
+        Completeness and distinctness observed by the latest column statistics profile
+        of the attribute's mapped source column, if one has been built
+        """
+        from app.models.workflow import WorkflowPhase
+        from app.models.planning import PlanningPDEMapping
+        from app.services.column_statistics_service import ColumnStatisticsService
+        
+        mapping_query = select(PlanningPDEMapping).join(
+            WorkflowPhase, PlanningPDEMapping.phase_id == WorkflowPhase.phase_id
+        ).where(
+            and_(
+                WorkflowPhase.cycle_id == cycle_id,
+                WorkflowPhase.report_id == report_id,
+                WorkflowPhase.phase_name == "Planning",
+                PlanningPDEMapping.attribute_id == attribute_id
+            )
+        ).limit(1)
+        mapping = (await db.execute(mapping_query)).scalar_one_or_none()
+        if not mapping or not mapping.data_source_id:
+            return None
+        
+        profile = await ColumnStatisticsService(db).get_latest_column_profile(
+            mapping.data_source_id, mapping.pde_code
+        )
+        if not profile or not profile.row_count:
+            return None
+        
+        non_null_count = profile.row_count - profile.null_count
+        return {
+            "observed_completeness": round(non_null_count * 100.0 / profile.row_count, 2),
+            "distinct_ratio": round(profile.distinct_count / non_null_count, 4) if non_null_count else 0.0
+        }
+    
     @classmethod
     async def calculate_dq_scores_for_all_attributes(
         cls,
@@ -5,12 +5,15 @@ Handles querying real data from configured data sources with support for large d
 
 import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List, AsyncIterator
 from datetime import datetime
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine, text
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 import asyncpg
 import aiomysql
 try:
@@ -25,6 +28,7 @@ except ImportError:
 from contextlib import asynccontextmanager
 
 from app.core.config import get_settings
+from app.core.data_source_pools import get_data_source_pool_registry
 from app.models.cycle_report_data_source import CycleReportDataSource as DataSourceConfig, DataSourceType
 from app.models.planning import PlanningPDEMapping as PDEMapping
 
@@ -35,14 +39,193 @@ settings = get_settings()
 CHUNK_SIZE = 100_000  # Process 100k rows at a time
 MAX_MEMORY_MB = 1024  # Maximum memory usage in MB
 QUERY_TIMEOUT = 300  # 5 minutes timeout for queries
+PREFETCH_DEPTH = 1  # Chunks fetched ahead while the current one is processed
+
+
+class _ServerSideCursorReader:
+    """
+    Reads a query through a server-side cursor (named cursor on PostgreSQL,
+    SSCursor on MySQL, native fetchmany streaming on Oracle/SQL Server).
+    
+    The query runs once and each chunk is a ``fetchmany`` on the open cursor,
+    so every chunk costs the same regardless of how far into the result it is.
+    """
+    
+    def __init__(self, engine: Engine, query: str, params: Optional[Dict], chunk_size: int):
+        self.engine = engine
+        self.query = query
+        self.params = params or {}
+        self.chunk_size = chunk_size
+        self._connection = None
+        self._result = None
+        self._columns: List[str] = []
+        self._dtypes: Optional[Dict[str, Any]] = None
+    
+    def open(self):
+        self._connection = self.engine.connect().execution_options(
+            stream_results=True, max_row_buffer=self.chunk_size
+        )
+        self._result = self._connection.execute(text(self.query), self.params)
+        self._columns = list(self._result.keys())
+    
+    def read_chunk(self) -> Optional[pd.DataFrame]:
+        rows = self._result.fetchmany(self.chunk_size)
+        if not rows:
+            return None
+        return _typed_frame(self, rows)
+    
+    def close(self):
+        if self._result is not None:
+            self._result.close()
+        if self._connection is not None:
+            self._connection.close()
+
+
+class _KeysetReader:
+    """
+    Reads a query in pages ordered by a unique key column, seeking past the last
+    key of the previous page instead of using OFFSET.
+    
+    Each page is an index range scan bounded by ``chunk_size``, and no cursor or
+    transaction is held open between pages.
+    """
+    
+    def __init__(self, engine: Engine, source_type: DataSourceType, query: str,
+                 params: Optional[Dict], chunk_size: int, key_column: str):
+        self.engine = engine
+        self.source_type = source_type
+        self.query = query
+        self.params = params or {}
+        self.chunk_size = chunk_size
+        self.key_column = key_column
+        self._last_key = None
+        self._exhausted = False
+        self._columns: List[str] = []
+        self._dtypes: Optional[Dict[str, Any]] = None
+    
+    def open(self):
+        pass
+    
+    def _page_query(self) -> str:
+        key = f"keyset_q.{self.key_column}"
+        where = f" WHERE {key} > :_keyset_last" if self._last_key is not None else ""
+        inner = f"SELECT * FROM ({self.query}) keyset_q{where} ORDER BY {key}"
+        
+        if self.source_type == DataSourceType.SQLSERVER:
+            return (
+                f"SELECT TOP {self.chunk_size} * FROM ({self.query}) keyset_q{where} ORDER BY {key}"
+            )
+        if self.source_type == DataSourceType.ORACLE:
+            return f"SELECT * FROM ({inner}) WHERE ROWNUM <= {self.chunk_size}"
+        return f"{inner} LIMIT {self.chunk_size}"
+    
+    def read_chunk(self) -> Optional[pd.DataFrame]:
+        if self._exhausted:
+            return None
+        
+        params = dict(self.params)
+        if self._last_key is not None:
+            params["_keyset_last"] = self._last_key
+        
+        with self.engine.connect() as conn:
+            result = conn.execute(text(self._page_query()), params)
+            self._columns = list(result.keys())
+            rows = result.fetchall()
+        
+        if len(rows) < self.chunk_size:
+            self._exhausted = True
+        if not rows:
+            return None
+        
+        if self.key_column not in self._columns:
+            raise ValueError(
+                f"Keyset column '{self.key_column}' is not selected by the query"
+            )
+        self._last_key = rows[-1][self._columns.index(self.key_column)]
+        return _typed_frame(self, rows)
+    
+    def close(self):
+        pass
+
+
+def _typed_frame(reader, rows) -> pd.DataFrame:
+    """
+    Build a chunk DataFrame whose dtypes match the first chunk of the read,
+    so an all-null column in a later chunk does not turn into ``object``.
+    """
+    df = pd.DataFrame.from_records(rows, columns=reader._columns, coerce_float=True)
+    if reader._dtypes is None:
+        df = df.infer_objects()
+        reader._dtypes = df.dtypes.to_dict()
+        return df
+    
+    for column, dtype in reader._dtypes.items():
+        if df[column].dtype != dtype:
+            try:
+                df[column] = df[column].astype(dtype)
+            except (TypeError, ValueError):
+                # Keep the column as read if it cannot be cast (e.g. NULLs in an integer column)
+                pass
+    return df
 
 
 class DataSourceQueryService:
     """Service for querying data from various data sources"""
     
     def __init__(self):
-        self.connection_pools = {}
+        self.pools = get_data_source_pool_registry()
         self.chunk_size = CHUNK_SIZE
+        self.prefetch_depth = PREFETCH_DEPTH
+    
+    @staticmethod
+    def _max_pool_size(data_source: DataSourceConfig) -> Optional[int]:
+        config = data_source.connection_config or {}
+        return int(config['max_pool_size']) if config.get('max_pool_size') else None
+    
+    async def _get_sync_engine(self, data_source: DataSourceConfig) -> Engine:
+        """Shared synchronous engine for pandas reads"""
+        conn_string = await self.get_connection_string(data_source)
+        sync_conn_string = conn_string.replace('+asyncpg', '').replace('+aiomysql', '')
+        return self.pools.get_sync_engine(sync_conn_string, self._max_pool_size(data_source))
+    
+    async def _get_async_engine(self, data_source: DataSourceConfig) -> AsyncEngine:
+        """Shared async engine for the running event loop"""
+        conn_string = await self.get_connection_string(data_source)
+        return self.pools.get_async_engine(conn_string, self._max_pool_size(data_source))
+    
+    async def dispose(self):
+        """
+        Release this service's resources
+        
+        The pools belong to the process-wide registry and may be in use by other
+        requests and tasks, so they are left open; they are closed at application
+        and worker shutdown.
+        """
+        return None
+    
+    async def detect_key_column(self, data_source: DataSourceConfig,
+                                table_name: Optional[str] = None) -> Optional[str]:
+        """Return the single-column primary key of a table, if it has one"""
+        config = data_source.connection_config or {}
+        table_name = table_name or config.get('default_table') or config.get('table_name')
+        if not table_name:
+            return None
+        
+        schema = config.get('schema')
+        if '.' in table_name and not schema:
+            schema, table_name = table_name.split('.', 1)
+        
+        engine = await self._get_sync_engine(data_source)
+        try:
+            pk = await asyncio.to_thread(
+                lambda: inspect(engine).get_pk_constraint(table_name, schema=schema)
+            )
+        except Exception as e:
+            logger.warning(f"Could not inspect primary key of {table_name}: {str(e)}")
+            return None
+        
+        columns = pk.get('constrained_columns') or []
+        return columns[0] if len(columns) == 1 else None
         
     async def get_connection_string(self, data_source: DataSourceConfig) -> str:
         """Build connection string based on data source type"""
@@ -62,15 +245,12 @@ class DataSourceQueryService:
     async def test_connection(self, data_source: DataSourceConfig) -> Dict[str, Any]:
         """Test connection to data source"""
         try:
-            conn_string = await self.get_connection_string(data_source)
-            engine = create_async_engine(conn_string, pool_size=1, max_overflow=0)
+            engine = await self._get_async_engine(data_source)
             
             async with engine.connect() as conn:
                 # Simple test query
                 result = await conn.execute(text("SELECT 1"))
-                await result.fetchone()
-                
-            await engine.dispose()
+                result.fetchone()
             
             return {
                 "success": True,
@@ -89,8 +269,7 @@ class DataSourceQueryService:
                            where_clause: Optional[str] = None) -> int:
         """Get row count for a table with optional filtering"""
         try:
-            conn_string = await self.get_connection_string(data_source)
-            engine = create_async_engine(conn_string)
+            engine = await self._get_async_engine(data_source)
             
             query = f"SELECT COUNT(*) AS row_count FROM {table_name}"
             if where_clause:
@@ -98,10 +277,9 @@ class DataSourceQueryService:
             
             async with engine.connect() as conn:
                 result = await conn.execute(text(query))
-                row = await result.fetchone()
+                row = result.fetchone()
                 count = row.row_count if hasattr(row, 'row_count') else row[0]
                 
-            await engine.dispose()
             return count
             
         except Exception as e:
@@ -109,62 +287,111 @@ class DataSourceQueryService:
             raise
     
     async def query_data_chunked(self, data_source: DataSourceConfig, query: str,
-                                params: Optional[Dict] = None) -> AsyncIterator[pd.DataFrame]:
+                                params: Optional[Dict] = None,
+                                chunk_size: Optional[int] = None,
+                                key_column: Optional[str] = None,
+                                prefetch: Optional[int] = None) -> AsyncIterator[pd.DataFrame]:
         """
         Query data in chunks for memory-efficient processing of large datasets
-        Yields DataFrames of chunk_size rows
+        Yields typed DataFrames of at most chunk_size rows
+        
+        By default the query is streamed through a server-side cursor. When
+        ``key_column`` is given, or the data source sets ``"pagination": "keyset"``
+        in its connection config (the table's primary key is then detected), the
+        query is paged by key instead, so no cursor is held open between chunks.
+        
+        Up to ``prefetch`` chunks are read ahead on a background thread while the
+        caller processes the current one; 0 reads strictly on demand.
         """
+        chunk_size = chunk_size or self.chunk_size
+        prefetch = self.prefetch_depth if prefetch is None else prefetch
+        
         try:
-            conn_string = await self.get_connection_string(data_source)
+            engine = await self._get_sync_engine(data_source)
             
-            # Use synchronous engine for pandas compatibility
-            sync_conn_string = conn_string.replace('+asyncpg', '').replace('+aiomysql', '')
-            engine = create_engine(sync_conn_string)
+            config = data_source.connection_config or {}
+            if key_column is None and config.get('pagination') == 'keyset':
+                key_column = await self.detect_key_column(data_source)
+                if key_column is None:
+                    logger.warning(
+                        f"No single-column primary key found for {data_source.name}, "
+                        f"falling back to a server-side cursor"
+                    )
             
-            # Add LIMIT/OFFSET for chunking based on database type
-            offset = 0
-            while True:
-                if data_source.source_type in [DataSourceType.POSTGRESQL, DataSourceType.MYSQL]:
-                    chunk_query = f"{query} LIMIT {self.chunk_size} OFFSET {offset}"
-                elif data_source.source_type == DataSourceType.SQLSERVER:
-                    # SQL Server uses OFFSET FETCH
-                    chunk_query = f"{query} ORDER BY 1 OFFSET {offset} ROWS FETCH NEXT {self.chunk_size} ROWS ONLY"
-                elif data_source.source_type == DataSourceType.ORACLE:
-                    # Oracle uses ROWNUM
-                    chunk_query = f"""
-                        SELECT * FROM (
-                            SELECT a.*, ROWNUM rnum FROM ({query}) a 
-                            WHERE ROWNUM <= {offset + self.chunk_size}
-                        ) WHERE rnum > {offset}
-                    """
-                else:
-                    chunk_query = query  # Fallback to full query
-                
-                # Read chunk
-                chunk_df = await asyncio.to_thread(
-                    pd.read_sql_query, 
-                    chunk_query, 
-                    engine, 
-                    params=params
+            if key_column:
+                reader = _KeysetReader(
+                    engine, data_source.source_type, query, params, chunk_size, key_column
                 )
-                
-                if chunk_df.empty:
-                    break
-                    
+            else:
+                reader = _ServerSideCursorReader(engine, query, params, chunk_size)
+            
+            async for chunk_df in self._read_chunks(reader, prefetch):
                 yield chunk_df
-                
-                # If we got less than chunk_size rows, we're done
-                if len(chunk_df) < self.chunk_size:
-                    break
-                    
-                offset += self.chunk_size
-                
-            engine.dispose()
             
         except Exception as e:
             logger.error(f"Failed to query data: {str(e)}")
             raise
     
+    async def _read_chunks(self, reader, prefetch: int) -> AsyncIterator[pd.DataFrame]:
+        """
+        Drive a chunk reader on a dedicated thread, keeping up to ``prefetch``
+        chunks queued ahead of the consumer.
+        """
+        loop = asyncio.get_running_loop()
+        # One thread per read so the DBAPI connection is only ever used from one thread
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-source-reader")
+        
+        def timed_read():
+            started = time.perf_counter()
+            chunk = reader.read_chunk()
+            if chunk is not None:
+                logger.debug(
+                    f"Read chunk of {len(chunk)} rows in {(time.perf_counter() - started) * 1000:.0f}ms"
+                )
+            return chunk
+        
+        try:
+            await loop.run_in_executor(executor, reader.open)
+            
+            if prefetch <= 0:
+                while True:
+                    chunk = await loop.run_in_executor(executor, timed_read)
+                    if chunk is None:
+                        break
+                    yield chunk
+                return
+            
+            queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+            
+            async def produce():
+                try:
+                    while True:
+                        chunk = await loop.run_in_executor(executor, timed_read)
+                        await queue.put(chunk)
+                        if chunk is None:
+                            break
+                except Exception as e:
+                    await queue.put(e)
+            
+            producer = asyncio.create_task(produce())
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                producer.cancel()
+                try:
+                    await producer
+                except (asyncio.CancelledError, Exception):
+                    pass
+        finally:
+            await loop.run_in_executor(executor, reader.close)
+            executor.shutdown(wait=False)
+    
     async def query_attribute_data(self, data_source: DataSourceConfig, 
                                   pde_mapping: PDEMapping,
                                   limit: Optional[int] = None) -> pd.DataFrame:
@@ -215,17 +442,13 @@ class DataSourceQueryService:
                     result_df = result_df.head(limit)
             else:
                 # Small dataset, query all at once
-                conn_string = await self.get_connection_string(data_source)
-                sync_conn_string = conn_string.replace('+asyncpg', '').replace('+aiomysql', '')
-                engine = create_engine(sync_conn_string)
+                engine = await self._get_sync_engine(data_source)
                 
                 result_df = await asyncio.to_thread(
                     pd.read_sql_query,
                     query,
                     engine
                 )
-                
-                engine.dispose()
             
             # Apply any transformation rules
             if pde_mapping.transformation_rule:
@@ -366,14 +589,11 @@ class DataSourceQueryService:
                 FROM {table_name}
             """
             
-            conn_string = await self.get_connection_string(data_source)
-            engine = create_async_engine(conn_string)
+            engine = await self._get_async_engine(data_source)
             
             async with engine.connect() as conn:
                 result = await conn.execute(text(query))
-                row = await result.mappings().fetchone()
-                
-            await engine.dispose()
+                row = result.mappings().fetchone()
             
             total = row['total']
             passed = row['passed']
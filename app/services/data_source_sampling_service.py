@@ -9,7 +9,7 @@ import logging
 import uuid
 import random
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select, and_
+from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 import pandas as pd
 
@@ -20,6 +20,7 @@ from app.core.background_jobs import job_manager
 from app.core.exceptions import BusinessLogicError
 from app.services.data_source_query_service import DataSourceQueryService
 from app.services.sample_selection_table_service import SampleSelectionTableService
+from app.services.table_sampler import TableSampler, new_sampling_seed
 
 logger = logging.getLogger(__name__)
 
@@ -255,25 +256,25 @@ class DataSourceSamplingService:
                 
                 sample_number = 1
                 
+                # One seeded TABLESAMPLE draw is split across the categories in order,
+                # so no row is picked twice
+                sampler = TableSampler(
+                    db, schema_name, table_name,
+                    data_source_config.get('sampling_seed') or new_sampling_seed()
+                )
+                sampled_rows = None
+                offset = 0
+                
                 # Generate samples for each category
                 for category, count in samples_per_category.items():
                     if count == 0:
                         continue
                     
-                    # Build sampling query
-                    # Using TABLESAMPLE for efficient random sampling
-                    query = f"""
-                        SELECT {', '.join(columns)}
-                        FROM {schema_name}.{table_name}
-                        TABLESAMPLE SYSTEM (10)
-                        ORDER BY RANDOM()
-                        LIMIT {count}
-                    """
-                    
                     try:
-                        # Execute query
-                        result = await db.execute(text(query))
-                        rows = result.fetchall()
+                        if sampled_rows is None:
+                            sampled_rows = await sampler.sample(', '.join(columns), None, target_sample_size)
+                        rows = sampled_rows[offset:offset + count]
+                        offset += count
                         
                         logger.info(f"Retrieved {len(rows)} {category} samples from database")
                         
@@ -7,7 +7,6 @@ import asyncio
 import json
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-import asyncpg
 import aiomysql
 import aiofiles
 import pandas as pd
@@ -15,6 +14,7 @@ from sqlalchemy import create_engine, text
 from contextlib import asynccontextmanager
 import logging
 
+from app.core.data_source_pools import get_data_source_pool_registry
 from app.core.exceptions import ValidationError, BusinessLogicError
 
 logger = logging.getLogger(__name__)
@@ -24,7 +24,8 @@ class DatabaseConnectionService:
     """Service for managing database connections and query execution"""
     
     def __init__(self):
-        self.connection_pools: Dict[str, Any] = {}
+        # Pools are shared process-wide so per-request instances reuse connections
+        self.pools = get_data_source_pool_registry()
         self.supported_types = ['postgresql', 'mysql', 'oracle', 'csv', 'api']
         
     async def test_connection(
@@ -82,29 +83,17 @@ class DatabaseConnectionService:
     # PostgreSQL implementation
     async def _test_postgresql(self, connection_details: Dict[str, Any], test_query: Optional[str]) -> bool:
         """Test PostgreSQL connection"""
-        conn = None
         try:
-            conn = await asyncpg.connect(
-                host=connection_details['host'],
-                port=connection_details.get('port', 5432),
-                database=connection_details['database'],
-                user=connection_details['username'],
-                password=connection_details.get('password', ''),
-                timeout=10.0
-            )
-            
-            if test_query:
-                await conn.fetch(test_query)
-            else:
-                await conn.fetch("SELECT 1")
+            async with self.pools.acquire('postgresql', connection_details, timeout=10.0) as conn:
+                if test_query:
+                    await conn.fetch(test_query)
+                else:
+                    await conn.fetch("SELECT 1")
                 
             return True
         except Exception as e:
             logger.error(f"PostgreSQL connection test failed: {str(e)}")
             raise
-        finally:
-            if conn:
-                await conn.close()
     
     async def _execute_postgresql(
         self, 
@@ -114,17 +103,7 @@ class DatabaseConnectionService:
         timeout: float
     ) -> Dict[str, Any]:
         """Execute PostgreSQL query"""
-        conn = None
-        try:
-            conn = await asyncpg.connect(
-                host=connection_details['host'],
-                port=connection_details.get('port', 5432),
-                database=connection_details['database'],
-                user=connection_details['username'],
-                password=connection_details.get('password', ''),
-                timeout=timeout
-            )
-            
+        async with self.pools.acquire('postgresql', connection_details, timeout=timeout) as conn:
             # Check if this is a query for fry14m_scheduled1_data and add column aliases
             if 'fry14m_scheduled1_data' in query.lower():
                 # Define column mappings for primary keys - matching what the UI expects
@@ -160,22 +139,23 @@ class DatabaseConnectionService:
                 if match:
                     selected_columns = match.group(1).strip()
                     
+                    # For SELECT *, include all columns with aliases
+                    all_columns = aliased_columns + [
+                        'cycle_ending_balance',
+                        'active_indicator', 
+                        'account_charge_off_date',
+                        'customer_name',
+                        'original_credit_limit',
+                        'highest_credit_limit',
+                        'account_open_date',
+                        'account_close_date',
+                        'data_source_name',
+                        'created_at',
+                        'updated_at'
+                    ]
+                    
                     # Check if it's SELECT * or specific columns
                     if selected_columns == '*':
-                        # For SELECT *, include all columns with aliases
-                        all_columns = aliased_columns + [
-                            'cycle_ending_balance',
-                            'active_indicator', 
-                            'account_charge_off_date',
-                            'customer_name',
-                            'original_credit_limit',
-                            'highest_credit_limit',
-                            'account_open_date',
-                            'account_close_date',
-                            'data_source_name',
-                            'created_at',
-                            'updated_at'
-                        ]
                         replacement = f'SELECT {", ".join(all_columns)} FROM fry14m_scheduled1_data'
                         query = select_pattern.sub(replacement, query)
                         logger.info(f"Applied column aliases for SELECT *")
@@ -197,7 +177,10 @@ class DatabaseConnectionService:
                         aliased_list = []
                         for col in columns:
                             col_lower = col.lower().strip()
-                            if col_lower in column_mapping:
+                            if col_lower == '*':
+                                # e.g. batched evidence queries append key columns after *
+                                aliased_list.extend(all_columns)
+                            elif col_lower in column_mapping:
                                 aliased_list.append(column_mapping[col_lower])
                             else:
                                 aliased_list.append(col)
@@ -251,39 +234,23 @@ class DatabaseConnectionService:
                 'total_count': total_count,
                 'row_count': len(rows)
             }
-            
-        finally:
-            if conn:
-                await conn.close()
     
     # MySQL implementation
     async def _test_mysql(self, connection_details: Dict[str, Any], test_query: Optional[str]) -> bool:
         """Test MySQL connection"""
-        conn = None
         try:
-            conn = await aiomysql.connect(
-                host=connection_details['host'],
-                port=connection_details.get('port', 3306),
-                db=connection_details['database'],
-                user=connection_details['username'],
-                password=connection_details.get('password', ''),
-                connect_timeout=10
-            )
-            
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                if test_query:
-                    await cursor.execute(test_query)
-                else:
-                    await cursor.execute("SELECT 1")
-                await cursor.fetchall()
+            async with self.pools.acquire('mysql', connection_details, timeout=10.0) as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    if test_query:
+                        await cursor.execute(test_query)
+                    else:
+                        await cursor.execute("SELECT 1")
+                    await cursor.fetchall()
                 
             return True
         except Exception as e:
             logger.error(f"MySQL connection test failed: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
     
     async def _execute_mysql(
         self, 
@@ -293,17 +260,7 @@ class DatabaseConnectionService:
         timeout: float
     ) -> Dict[str, Any]:
         """Execute MySQL query"""
-        conn = None
-        try:
-            conn = await aiomysql.connect(
-                host=connection_details['host'],
-                port=connection_details.get('port', 3306),
-                db=connection_details['database'],
-                user=connection_details['username'],
-                password=connection_details.get('password', ''),
-                connect_timeout=int(timeout)
-            )
-            
+        async with self.pools.acquire('mysql', connection_details, timeout=timeout) as conn:
             async with conn.cursor(aiomysql.DictCursor) as cursor:
                 # MySQL uses %s placeholders
                 if parameters:
@@ -337,10 +294,6 @@ class DatabaseConnectionService:
                     'total_count': total_count,
                     'row_count': len(rows)
                 }
-                
-        finally:
-            if conn:
-                conn.close()
     
     # CSV implementation
     async def _test_csv(self, connection_details: Dict[str, Any]) -> bool:
@@ -416,11 +369,10 @@ class DatabaseConnectionService:
         raise NotImplementedError("API connections not yet implemented")
     
     async def close_all_pools(self):
-        """Close all connection pools"""
-        for pool_name, pool in self.connection_pools.items():
-            try:
-                if hasattr(pool, 'close'):
-                    await pool.close()
-            except Exception as e:
-                logger.error(f"Error closing pool {pool_name}: {str(e)}")
-        self.connection_pools.clear()
\ No newline at end of file
+        """
+        Kept for callers; the shared pools are closed at application and worker shutdown
+        
+        Other requests and tasks borrow from the same process-wide pools, so one
+        service instance must not close them.
+        """
+        return None
\ No newline at end of file
@@ -0,0 +1,365 @@
+"""
+Document Text Extraction Service
+Extracts text from evidence and planning documents off the event loop, once per file content
+
+Parsing (PyPDF2 for PDF, python-docx for Word, plain reads otherwise) runs in a
+process pool so CPU-bound extraction neither blocks the event loop nor holds the
+GIL. Results are cached by the SHA-256 of the file content, computed from the
+file itself (stored hashes are not trusted), in a bounded in-memory LRU and on
+disk, so the same evidence file is parsed once no matter how many test cases,
+requests or workers read it. Concurrent requests for a document being parsed
+share the parse.
+
+PDFs are parsed in page ranges: the ranges of a large document run in parallel,
+and ``iter_pages`` yields pages as their range finishes instead of waiting for
+the whole document.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PDF_SUFFIXES = {".pdf"}
+WORD_SUFFIXES = {".doc", ".docx"}
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ExtractedDocument:
+    """Text of a document with the offset at which each page starts"""
+    sha256: str
+    text: str
+    page_offsets: Tuple[int, ...]
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_offsets)
+
+    def page(self, index: int) -> str:
+        start = self.page_offsets[index]
+        end = self.page_offsets[index + 1] if index + 1 < len(self.page_offsets) else len(self.text)
+        return self.text[start:end]
+
+    @classmethod
+    def from_pages(cls, sha256: str, pages: List[str]) -> "ExtractedDocument":
+        offsets = []
+        position = 0
+        for page in pages:
+            offsets.append(position)
+            position += len(page) + 1
+        return cls(sha256=sha256, text="".join(page + "\n" for page in pages), page_offsets=tuple(offsets))
+
+    def to_json(self) -> str:
+        return json.dumps({"sha256": self.sha256, "text": self.text, "page_offsets": self.page_offsets})
+
+    @classmethod
+    def from_json(cls, data: str) -> "ExtractedDocument":
+        values = json.loads(data)
+        return cls(sha256=values["sha256"], text=values["text"], page_offsets=tuple(values["page_offsets"]))
+
+
+# Parsing functions run in worker processes and must stay module-level
+
+def _open_source(source):
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+
+def _extract_pdf_pages(source, start: int = 0, stop: Optional[int] = None) -> Tuple[int, List[str]]:
+    """Total page count and the text of pages ``start`` to ``stop`` of a PDF path or bytes"""
+    import PyPDF2
+
+    with _open_source(source) as file:
+        reader = PyPDF2.PdfReader(file)
+        total = len(reader.pages)
+        stop = total if stop is None else min(stop, total)
+        return total, [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def _extract_word(source) -> List[str]:
+    from docx import Document
+
+    document = Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return ["\n".join(paragraph.text for paragraph in document.paragraphs)]
+
+
+def _extract_plain(source) -> List[str]:
+    if isinstance(source, bytes):
+        return [source.decode("utf-8", errors="ignore")]
+    with open(source, "r", encoding="utf-8", errors="ignore") as file:
+        return [file.read()]
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentTextService:
+    """Process-pool document parsing with a content-addressed text cache"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        cache_max_bytes: Optional[int] = None,
+        cache_dir: Optional[str] = None
+    ):
+        self.max_workers = max_workers or getattr(settings, 'document_extraction_workers', 4)
+        self.pages_per_task = pages_per_task or getattr(settings, 'document_extraction_pages_per_task', 25)
+        self.cache_max_bytes = cache_max_bytes or getattr(settings, 'document_text_cache_max_bytes', 256 * 1024 * 1024)
+        if cache_dir is None:
+            cache_dir = getattr(settings, 'document_text_cache_dir', None)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        self._pool: Optional[concurrent.futures.Executor] = None
+        self._pool_lock = threading.Lock()
+        self._entries: "OrderedDict[str, ExtractedDocument]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._path_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"parses": 0, "memory_hits": 0, "disk_hits": 0, "shared": 0}
+
+    # Worker pool
+
+    def _get_pool(self) -> concurrent.futures.Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                try:
+                    self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+                except (OSError, ValueError, NotImplementedError) as e:
+                    logger.warning(f"Process pool unavailable for document extraction ({e}); using threads")
+                    self._pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="document-text"
+                    )
+            return self._pool
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        except (AssertionError, concurrent.futures.process.BrokenProcessPool) as e:
+            # Daemonic workers (e.g. Celery prefork children) cannot start child processes
+            logger.warning(f"Document extraction process pool failed ({e!r}); using threads")
+            with self._pool_lock:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="document-text"
+                )
+            return await loop.run_in_executor(self._pool, func, *args)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    # Cache
+
+    def _cache_path(self, sha256: str) -> Optional[Path]:
+        return self.cache_dir / sha256[:2] / f"{sha256}.json" if self.cache_dir else None
+
+    def _get_local(self, sha256: str) -> Optional[ExtractedDocument]:
+        with self._lock:
+            document = self._entries.get(sha256)
+            if document is not None:
+                self._entries.move_to_end(sha256)
+                self._stats["memory_hits"] += 1
+            return document
+
+    def _get_disk(self, sha256: str) -> Optional[ExtractedDocument]:
+        path = self._cache_path(sha256)
+        if path is not None and path.exists():
+            try:
+                document = ExtractedDocument.from_json(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable document text cache entry {path}: {e}")
+                return None
+            self._store_local(document)
+            self._stats["disk_hits"] += 1
+            return document
+        return None
+
+    async def _get_cached(self, sha256: str) -> Optional[ExtractedDocument]:
+        document = self._get_local(sha256)
+        if document is None and self.cache_dir is not None:
+            document = await asyncio.to_thread(self._get_disk, sha256)
+        return document
+
+    def _store_local(self, document: ExtractedDocument):
+        size = len(document.text)
+        if size > self.cache_max_bytes:
+            return
+        with self._lock:
+            if document.sha256 in self._entries:
+                return
+            self._entries[document.sha256] = document
+            self._bytes += size
+            while self._bytes > self.cache_max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.text)
+
+    def _store(self, document: ExtractedDocument):
+        self._store_local(document)
+        path = self._cache_path(document.sha256)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so other workers never read a partial entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(document.to_json(), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write document text cache entry {path}: {e}")
+
+    # Hashing
+
+    async def hash_file(self, path: str) -> str:
+        """SHA-256 of a file, remembered per (path, size, mtime)"""
+        stat = await asyncio.to_thread(os.stat, path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        sha256 = self._path_hashes.get(key)
+        if sha256 is None:
+            sha256 = await asyncio.to_thread(_hash_file, path)
+            self._path_hashes[key] = sha256
+        return sha256
+
+    async def _content_hash(self, path: str, file_hash: Optional[str]) -> str:
+        """
+        Cache key of the file at ``path``
+
+        A stored hash is only a hint: placeholder and empty-content hashes are
+        shared by different files, so the key is always the hash of the file.
+        """
+        sha256 = await self.hash_file(path)
+        if file_hash and file_hash != sha256:
+            logger.debug(f"Stored hash of {path} does not match its content; using the content hash")
+        return sha256
+
+    # Extraction
+
+    async def extract_file(self, path: str, file_hash: Optional[str] = None) -> ExtractedDocument:
+        """
+        Text of the document at ``path``
+
+        ``file_hash`` is the stored hash, if the caller has one; it is checked against the file.
+        """
+        sha256 = await self._content_hash(path, file_hash)
+        return await self._extract(sha256, path, Path(path).suffix.lower())
+
+    async def extract_bytes(self, content: bytes, suffix: str) -> ExtractedDocument:
+        """Text of an uploaded document held in memory, parsed as a ``suffix`` (e.g. ``.pdf``) file"""
+        sha256 = await asyncio.to_thread(lambda: hashlib.sha256(content).hexdigest())
+        return await self._extract(sha256, content, suffix.lower())
+
+    async def _extract(self, sha256: str, source, suffix: str) -> ExtractedDocument:
+        document = await self._get_cached(sha256)
+        if document is not None:
+            return document
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(sha256)
+        if pending is not None and pending.get_loop() is loop:
+            self._stats["shared"] += 1
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        self._inflight[sha256] = future
+        try:
+            pages: List[str] = []
+            async for page in self._parse_pages(source, suffix):
+                pages.append(page)
+            document = ExtractedDocument.from_pages(sha256, pages)
+            self._stats["parses"] += 1
+            await asyncio.to_thread(self._store, document)
+            future.set_result(document)
+            return document
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the error; nobody else is required to retrieve it
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(sha256) is future:
+                del self._inflight[sha256]
+
+    async def iter_pages(self, path: str, file_hash: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield the pages of a document as they are extracted
+
+        Cached documents are served from the cache; otherwise pages are yielded
+        range by range and the full text is cached once the last one arrives.
+        """
+        sha256 = await self._content_hash(path, file_hash)
+        document = await self._get_cached(sha256)
+        if document is not None:
+            for index in range(document.page_count):
+                yield document.page(index)
+            return
+
+        pages: List[str] = []
+        async for page in self._parse_pages(path, Path(path).suffix.lower()):
+            pages.append(page)
+            yield page
+        self._stats["parses"] += 1
+        await asyncio.to_thread(self._store, ExtractedDocument.from_pages(sha256, pages))
+
+    async def _parse_pages(self, source, suffix: str) -> AsyncIterator[str]:
+        if suffix in PDF_SUFFIXES:
+            total, first = await self._run(_extract_pdf_pages, source, 0, self.pages_per_task)
+            for page in first:
+                yield page
+            # Remaining ranges are parsed in parallel and yielded in order
+            ranges = [
+                asyncio.ensure_future(self._run(_extract_pdf_pages, source, start, start + self.pages_per_task))
+                for start in range(self.pages_per_task, total, self.pages_per_task)
+            ]
+            try:
+                for task in ranges:
+                    _, pages = await task
+                    for page in pages:
+                        yield page
+            finally:
+                for task in ranges:
+                    task.cancel()
+        elif suffix in WORD_SUFFIXES:
+            for page in await self._run(_extract_word, source):
+                yield page
+        else:
+            for page in await self._run(_extract_plain, source):
+                yield page
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "cached_documents": len(self._entries), "cached_bytes": self._bytes}
+
+
+_document_text_service: Optional[DocumentTextService] = None
+
+
+def get_document_text_service() -> DocumentTextService:
+    """Get the process-wide document text service"""
+    global _document_text_service
+    if _document_text_service is None:
+        _document_text_service = DocumentTextService()
+    return _document_text_service
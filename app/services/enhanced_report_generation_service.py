@@ -37,7 +37,7 @@ class EnhancedReportGenerationService:
         await self.db.commit()
         
         try:
-            # Collect all phase data
+            # Collect all phase data (collectors run concurrently on their own sessions)
             all_data = await self.data_service.collect_all_phase_data(cycle_id, report_id)
             
             # Generate each section as dictionary
@@ -72,7 +72,8 @@ class EnhancedReportGenerationService:
                     "generated_at": datetime.utcnow().isoformat(),
                     "generated_by": user_id,
                     "total_sections": len(sections),
-                    "phase_id": phase_id
+                    "phase_id": phase_id,
+                    "data_collection": all_data.get("collection_metadata", {})
                 }
             }
             
@@ -473,8 +473,8 @@ class EvidenceCollectionService:
                         # If JSON parsing fails, it might be encrypted
                         logging.info("JSON parsing failed, attempting to decrypt connection_details")
                         try:
-                            from app.core.encryption import EncryptionService
-                            encryption_service = EncryptionService()
+                            from app.core.encryption import get_encryption_service
+                            encryption_service = get_encryption_service()
                             connection_details = encryption_service.decrypt_dict(connection_details)
                             logging.info(f"Successfully decrypted connection_details")
                             logging.info(f"Decrypted keys: {list(connection_details.keys())}")
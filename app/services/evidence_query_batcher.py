@@ -0,0 +1,261 @@
+"""
+Evidence Query Batching
+Runs the database evidence queries of many test cases as one set-based statement per query template
+
+Test cases of a sample set usually carry the same evidence query with only the
+sample's key literals changed, e.g. ``SELECT ... FROM loans WHERE bank_id = '1'
+AND loan_id = '42'``. ``parse_evidence_query`` splits such a query into a
+template (select list, FROM clause, the other predicates, ORDER BY) and the
+literals of its ``column = literal`` predicates. Queries sharing a data source
+and template are run together by ``build_batch_query`` as a single
+``WHERE (bank_id, loan_id) IN (...)`` statement that also returns the key
+columns, and ``split_batch_rows`` hands every test case the rows of its key.
+
+Only queries whose result per key does not depend on the other keys are
+batched: no LIMIT/OFFSET, aggregation, DISTINCT, set operations, OR, function
+calls, subqueries, bind parameters or ``SELECT *`` over several tables. A bare
+``*`` over one table is qualified with the table or its alias, as MySQL and
+Oracle do not accept it next to the key columns. Anything else returns ``None`` from
+``parse_evidence_query`` and is executed on its own as before.
+"""
+
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Column aliases of the key columns added to a batched select list
+BATCH_KEY_PREFIX = "__batch_key_"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_QUERY_SHAPE = re.compile(
+    r"^\s*SELECT\s+(?P<select>.+?)\s+FROM\s+(?P<from>.+?)\s+WHERE\s+(?P<where>.+?)"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>.+?))?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+_UNBATCHABLE = re.compile(
+    r"\b(?:LIMIT|OFFSET|FETCH|TOP|GROUP\s+BY|HAVING|DISTINCT|UNION|INTERSECT|EXCEPT|WITH|OR|BETWEEN)\b"
+    r"|[()?$]|(?<!:):(?!:)",
+    re.IGNORECASE | re.DOTALL
+)
+_CONJUNCTION = re.compile(r"\s+AND\s+", re.IGNORECASE)
+_IDENTIFIER = r'(?:"[^"]+"|`[^`]+`|[A-Za-z_]\w*)'
+_KEY_PREDICATE = re.compile(
+    rf"^\s*(?P<column>{_IDENTIFIER}(?:\.{_IDENTIFIER})?)\s*=\s*(?P<literal>'(?:[^']|'')*'|-?\d+(?:\.\d+)?)\s*$",
+    re.DOTALL
+)
+_WHITESPACE = re.compile(r"('(?:[^']|'')*')|\s+")
+_SINGLE_TABLE = re.compile(
+    rf"^(?P<table>{_IDENTIFIER}(?:\.{_IDENTIFIER}){{0,2}})(?:\s+(?:AS\s+)?(?P<alias>{_IDENTIFIER}))?$",
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class QueryTemplate:
+    """An evidence query with the literals of its key predicates taken out"""
+    select_list: str
+    from_clause: str
+    fixed_predicates: Tuple[str, ...]
+    key_columns: Tuple[str, ...]
+    order_by: Optional[str] = None
+
+
+@dataclass
+class BatchSplit:
+    """Rows of a batched statement grouped by the key literals they belong to"""
+    rows_by_key: Dict[Tuple[str, ...], List[Dict[str, Any]]] = field(default_factory=dict)
+    unresolved_keys: List[Tuple[str, ...]] = field(default_factory=list)  # Keys to run on their own
+
+
+def _mask_string_literals(sql: str) -> str:
+    """Blank out string literal contents, keeping every offset in place"""
+    return _STRING_LITERAL.sub(lambda m: "'" + " " * (len(m.group(0)) - 2) + "'", sql)
+
+
+def _normalize_whitespace(sql: str) -> str:
+    return _WHITESPACE.sub(lambda m: m.group(1) or " ", sql).strip()
+
+
+def _split_conjuncts(where: str) -> List[str]:
+    masked = _mask_string_literals(where)
+    conjuncts = []
+    start = 0
+    for match in _CONJUNCTION.finditer(masked):
+        conjuncts.append(where[start:match.start()])
+        start = match.end()
+    conjuncts.append(where[start:])
+    return conjuncts
+
+
+def _qualify_star(select_list: str, from_clause: str) -> Optional[str]:
+    """
+    Qualify a bare ``*`` in the select list with the FROM table or its alias
+
+    MySQL and Oracle reject ``SELECT *, key AS ...``. Returns None when the
+    star cannot be qualified because the FROM clause names several tables.
+    """
+    items = [item.strip() for item in select_list.split(",")]
+    if "*" not in items:
+        return select_list
+    table = _SINGLE_TABLE.match(from_clause)
+    if not table:
+        return None
+    qualifier = table.group("alias") or table.group("table")
+    return ", ".join(f"{qualifier}.*" if item == "*" else item for item in items)
+
+
+def parse_evidence_query(query_text: Optional[str]) -> Optional[Tuple[QueryTemplate, Tuple[str, ...]]]:
+    """
+    Split an evidence query into its template and key literals
+
+    Returns None when the query cannot be batched with others.
+    """
+    if not query_text:
+        return None
+
+    masked = _mask_string_literals(query_text)
+    if _UNBATCHABLE.search(masked):
+        return None
+    shape = _QUERY_SHAPE.match(masked)
+    if not shape:
+        return None
+
+    def part(name: str) -> Optional[str]:
+        start, end = shape.span(name)
+        return query_text[start:end] if start >= 0 else None
+
+    fixed_predicates = []
+    key_predicates = []
+    for conjunct in _split_conjuncts(part("where")):
+        predicate = _KEY_PREDICATE.match(conjunct)
+        if predicate:
+            key_predicates.append((predicate.group("column"), predicate.group("literal")))
+        else:
+            fixed_predicates.append(_normalize_whitespace(conjunct))
+
+    if not key_predicates:
+        return None
+    # A column compared twice cannot be expressed as one IN tuple
+    if len({column for column, _ in key_predicates}) != len(key_predicates):
+        return None
+    key_predicates.sort(key=lambda predicate: predicate[0])
+
+    from_clause = _normalize_whitespace(part("from"))
+    select_list = _qualify_star(_normalize_whitespace(part("select")), from_clause)
+    if select_list is None:
+        return None
+
+    order_by = part("order")
+    template = QueryTemplate(
+        select_list=select_list,
+        from_clause=from_clause,
+        fixed_predicates=tuple(fixed_predicates),
+        key_columns=tuple(column for column, _ in key_predicates),
+        order_by=_normalize_whitespace(order_by) if order_by else None
+    )
+    return template, tuple(literal for _, literal in key_predicates)
+
+
+def build_batch_query(template: QueryTemplate, keys: Sequence[Tuple[str, ...]]) -> str:
+    """Build one statement returning the rows of every key, tagged with the key columns"""
+    key_select = ", ".join(
+        f'{column} AS "{BATCH_KEY_PREFIX}{index}"' for index, column in enumerate(template.key_columns)
+    )
+    distinct_keys = list(dict.fromkeys(keys))
+    if len(template.key_columns) == 1:
+        key_filter = f"{template.key_columns[0]} IN ({', '.join(key[0] for key in distinct_keys)})"
+    else:
+        key_filter = "({}) IN ({})".format(
+            ", ".join(template.key_columns),
+            ", ".join(f"({', '.join(key)})" for key in distinct_keys)
+        )
+
+    where = " AND ".join([*template.fixed_predicates, key_filter])
+    query = f"SELECT {template.select_list}, {key_select} FROM {template.from_clause} WHERE {where}"
+    if template.order_by:
+        query += f" ORDER BY {template.order_by}"
+    return query
+
+
+def _literal_value(literal: str) -> str:
+    if literal.startswith("'"):
+        return literal[1:-1].replace("''", "'").strip()
+    return literal
+
+
+def _numeric_form(value: Any) -> Optional[str]:
+    try:
+        number = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return format(number.normalize(), "f") if number.is_finite() else None
+
+
+def _is_numeric(value: Any) -> bool:
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def split_batch_rows(
+    template: QueryTemplate,
+    keys: Sequence[Tuple[str, ...]],
+    rows: List[Dict[str, Any]]
+) -> BatchSplit:
+    """
+    Hand the rows of a batched statement back to the keys they were selected for
+
+    Key columns are compared as numbers when the database returned a number and
+    as trimmed text otherwise. If any row matches no key, the comparison cannot
+    be trusted for this data, so every key left without rows is reported as
+    unresolved instead of as having no rows.
+    """
+    key_count = len(template.key_columns)
+    aliases = [f"{BATCH_KEY_PREFIX}{index}" for index in range(key_count)]
+    distinct_keys = list(dict.fromkeys(keys))
+    forms = {
+        key: [(_literal_value(literal), _numeric_form(_literal_value(literal))) for literal in key]
+        for key in distinct_keys
+    }
+    indexes: Dict[Tuple[bool, ...], Dict[Tuple[Optional[str], ...], List[Tuple[str, ...]]]] = {}
+
+    split = BatchSplit(rows_by_key={key: [] for key in distinct_keys})
+    unmatched_rows = 0
+    for row in rows:
+        row = dict(row)
+        values = [row.pop(alias, None) for alias in aliases]
+        pattern = tuple(_is_numeric(value) for value in values)
+        index = indexes.get(pattern)
+        if index is None:
+            index = {}
+            for key in distinct_keys:
+                lookup = tuple(form[1] if numeric else form[0] for form, numeric in zip(forms[key], pattern))
+                index.setdefault(lookup, []).append(key)
+            indexes[pattern] = index
+
+        lookup = tuple(
+            _numeric_form(value) if numeric else (None if value is None else str(value).strip())
+            for value, numeric in zip(values, pattern)
+        )
+        matched_keys = index.get(lookup)
+        if not matched_keys:
+            unmatched_rows += 1
+            continue
+        # Literals like '7' and '07' select the same row of a numeric column
+        for key in matched_keys:
+            split.rows_by_key[key].append(row)
+
+    if unmatched_rows:
+        split.unresolved_keys = [key for key, key_rows in split.rows_by_key.items() if not key_rows]
+        for key in split.unresolved_keys:
+            del split.rows_by_key[key]
+    return split
+
+
+def query_result_for_key(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shape the rows of one key like ``DatabaseConnectionService.execute_query`` does"""
+    return {
+        'rows': rows,
+        'columns': list(rows[0].keys()) if rows else [],
+        'total_count': len(rows),
+        'row_count': len(rows)
+    }
@@ -11,6 +11,7 @@ from datetime import datetime
 from app.models.request_info import TestCaseSourceEvidence
 from app.services.llm_service import HybridLLMService
 from app.services.document_management_service import DocumentManagementService
+from app.services.document_text_service import get_document_text_service
 from app.core.config import settings
 import logging
 
@@ -54,7 +55,9 @@ class LLMDocumentExtractionRule:
                 }
             
             # Extract document content
-            document_content = await self._extract_document_content(evidence.document_path)
+            document_content = await self._extract_document_content(
+                evidence.document_path, getattr(evidence, 'file_hash', None)
+            )
             
             if not document_content:
                 return {
@@ -161,7 +164,7 @@ class LLMDocumentExtractionRule:
                 'details': {'error': str(e)}
             }
     
-    async def _extract_document_content(self, document_path: str) -> Optional[str]:
+    async def _extract_document_content(self, document_path: str, file_hash: Optional[str] = None) -> Optional[str]:
         """Extract text content from document file"""
         try:
             file_path = Path(document_path)
@@ -170,29 +173,13 @@ class LLMDocumentExtractionRule:
                 logger.error(f"Document file not found: {document_path}")
                 return None
             
-            # For now, support text-based formats
-            # In production, you'd use document parsing libraries for PDFs, DOCs, etc.
-            if file_path.suffix.lower() in ['.txt', '.csv']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            elif file_path.suffix.lower() == '.pdf':
-                # Use PDF extraction library
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    text = ""
-                    for page in pdf_reader.pages:
-                        text += page.extract_text()
-                    return text
-            elif file_path.suffix.lower() in ['.doc', '.docx']:
-                # Use python-docx for Word documents
-                from docx import Document
-                doc = Document(file_path)
-                text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-                return text
-            else:
+            if file_path.suffix.lower() not in ['.txt', '.csv', '.pdf', '.doc', '.docx']:
                 logger.warning(f"Unsupported document format: {file_path.suffix}")
                 return None
+            
+            # Parsed in the extraction pool and cached by content hash
+            document = await get_document_text_service().extract_file(str(file_path), file_hash=file_hash)
+            return document.text
                 
         except Exception as e:
             logger.error(f"Error extracting document content: {str(e)}")
@@ -10,6 +10,8 @@ from sqlalchemy import text, select, and_, func, case
 from app.models.workflow import WorkflowPhase
 from app.models.sample_selection import SampleSelectionVersion
 from app.services.sample_selection_table_service import SampleSelectionTableService
+from app.services.table_sampler import TableSampler, exclusion_clause, new_sampling_seed
+from app.services.column_statistics_service import ColumnStatisticsService, sampling_statistics
 from app.core.logging import get_logger
 from app.core.exceptions import BusinessLogicError
 from app.core.background_jobs import job_manager
@@ -37,9 +39,13 @@ class IntelligentDataSamplingService:
         distribution: Dict[str, float],
         profiling_rules: Optional[List[Any]] = None,
         job_id: Optional[str] = None,
-        current_user_id: Optional[int] = None
+        current_user_id: Optional[int] = None,
+        seed: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Generate intelligent samples focusing on a specific target attribute"""
+        """
+        Generate intelligent samples focusing on a specific target attribute
+        Passing the ``sampling_seed`` recorded on a version regenerates the same samples
+        """
         
         samples_created = []
         
@@ -84,6 +90,9 @@ class IntelligentDataSamplingService:
             # Get target attribute column name
             target_column = pde_mappings.get(target_attribute, target_attribute)
             
+            seed = seed or data_source_config.get('sampling_seed') or new_sampling_seed()
+            sampler = TableSampler(db, schema_name, table_name, seed)
+            
             # Get all column names
             columns = []
             column_to_attr = {}
@@ -112,91 +121,29 @@ class IntelligentDataSamplingService:
                     progress_percentage=30
                 )
             
-            # 1. Analyze target attribute distribution with advanced statistics
-            stats_query = f"""
-                WITH value_counts AS (
-                    SELECT 
-                        "{target_column}" as value,
-                        COUNT(*) as frequency,
-                        COUNT(*) * 100.0 / (SELECT COUNT(*) FROM {schema_name}.{table_name}) as frequency_pct
-                    FROM {schema_name}.{table_name}
-                    GROUP BY "{target_column}"
-                ),
-                numeric_stats AS (
-                    SELECT 
-                        MIN(CAST("{target_column}" AS NUMERIC)) as min_val,
-                        MAX(CAST("{target_column}" AS NUMERIC)) as max_val,
-                        AVG(CAST("{target_column}" AS NUMERIC)) as avg_val,
-                        STDDEV(CAST("{target_column}" AS NUMERIC)) as stddev_val,
-                        PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY CAST("{target_column}" AS NUMERIC)) as q1,
-                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CAST("{target_column}" AS NUMERIC)) as median,
-                        PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY CAST("{target_column}" AS NUMERIC)) as q3,
-                        COUNT(*) as total_count,
-                        COUNT(DISTINCT "{target_column}") as distinct_count,
-                        COUNT("{target_column}") as non_null_count
-                    FROM {schema_name}.{table_name}
-                    WHERE "{target_column}" IS NOT NULL
-                ),
-                frequency_stats AS (
-                    SELECT 
-                        MAX(frequency) as max_frequency,
-                        MIN(frequency) as min_frequency,
-                        AVG(frequency) as avg_frequency,
-                        STDDEV(frequency) as stddev_frequency,
-                        MAX(frequency_pct) as max_frequency_pct,
-                        MIN(frequency_pct) as min_frequency_pct
-                    FROM value_counts
-                    WHERE value IS NOT NULL
-                ),
-                high_frequency_values AS (
-                    SELECT value, frequency, frequency_pct
-                    FROM value_counts
-                    WHERE frequency > (SELECT avg_frequency + 2 * stddev_frequency FROM frequency_stats)
-                    ORDER BY frequency DESC
-                    LIMIT 5
-                ),
-                low_frequency_values AS (
-                    SELECT value, frequency, frequency_pct
-                    FROM value_counts
-                    WHERE frequency <= 2 AND value IS NOT NULL
-                    ORDER BY value
-                    LIMIT 5
-                )
-                SELECT 
-                    ns.*,
-                    fs.max_frequency,
-                    fs.min_frequency,
-                    fs.avg_frequency,
-                    fs.stddev_frequency,
-                    fs.max_frequency_pct,
-                    (SELECT COUNT(*) FROM {schema_name}.{table_name} WHERE "{target_column}" IS NULL) as null_count,
-                    (SELECT json_agg(row_to_json(hf)) FROM high_frequency_values hf) as high_freq_values,
-                    (SELECT json_agg(row_to_json(lf)) FROM low_frequency_values lf) as low_freq_values
-                FROM numeric_stats ns, frequency_stats fs
-            """
-            
-            stats_result = await db.execute(text(stats_query))
-            stats = stats_result.fetchone()
-            
-            if not stats:
-                raise BusinessLogicError("Unable to analyze data distribution")
+            # 1. Analyze target attribute distribution from the shared column statistics profile
+            profile = await ColumnStatisticsService(db).get_or_build_profile(
+                schema_name, table_name, columns + [target_column],
+                data_source_id=data_source_config.get('data_source_id')
+            )
+            stats = sampling_statistics(profile.get(target_column))
             
-            min_val = float(stats.min_val) if stats.min_val else 0
-            max_val = float(stats.max_val) if stats.max_val else 0
-            avg_val = float(stats.avg_val) if stats.avg_val else 0
-            stddev_val = float(stats.stddev_val) if stats.stddev_val else 0
-            q1 = float(stats.q1) if stats.q1 else 0
-            median = float(stats.median) if stats.median else 0
-            q3 = float(stats.q3) if stats.q3 else 0
+            min_val = float(stats['min_val']) if stats['min_val'] else 0
+            max_val = float(stats['max_val']) if stats['max_val'] else 0
+            avg_val = float(stats['avg_val']) if stats['avg_val'] else 0
+            stddev_val = float(stats['stddev_val']) if stats['stddev_val'] else 0
+            q1 = float(stats['q1']) if stats['q1'] else 0
+            median = float(stats['median']) if stats['median'] else 0
+            q3 = float(stats['q3']) if stats['q3'] else 0
             iqr = q3 - q1  # Interquartile range
-            max_frequency = int(stats.max_frequency) if stats.max_frequency else 0
-            avg_frequency = float(stats.avg_frequency) if stats.avg_frequency else 0
-            stddev_frequency = float(stats.stddev_frequency) if stats.stddev_frequency else 0
-            max_frequency_pct = float(stats.max_frequency_pct) if stats.max_frequency_pct else 0
-            null_count = int(stats.null_count) if stats.null_count else 0
-            distinct_count = int(stats.distinct_count) if stats.distinct_count else 0
-            high_freq_values = stats.high_freq_values if stats.high_freq_values else []
-            low_freq_values = stats.low_freq_values if stats.low_freq_values else []
+            max_frequency = int(stats['max_frequency']) if stats['max_frequency'] else 0
+            avg_frequency = float(stats['avg_frequency']) if stats['avg_frequency'] else 0
+            stddev_frequency = float(stats['stddev_frequency']) if stats['stddev_frequency'] else 0
+            max_frequency_pct = float(stats['max_frequency_pct']) if stats['max_frequency_pct'] else 0
+            null_count = int(stats['null_count']) if stats['null_count'] else 0
+            distinct_count = int(stats['distinct_count']) if stats['distinct_count'] else 0
+            high_freq_values = stats['high_freq_values']
+            low_freq_values = stats['low_freq_values']
             
             logger.info(f"Data stats for {target_attribute}: min={min_val}, max={max_val}, median={median}, IQR={iqr}, distinct={distinct_count}")
             logger.info(f"Frequency stats: max_freq={max_frequency} ({max_frequency_pct:.1f}%), avg_freq={avg_frequency:.1f}, stddev={stddev_frequency:.1f}")
@@ -266,11 +213,8 @@ class IntelligentDataSamplingService:
                 min_query = f"""
                     SELECT {', '.join([f'"{col}"' for col in columns])}
                     FROM {schema_name}.{table_name}
-                    WHERE "{target_column}" = (
-                        SELECT MIN(CAST("{target_column}" AS NUMERIC))
-                        FROM {schema_name}.{table_name}
-                        WHERE "{target_column}" IS NOT NULL
-                    )
+                    WHERE "{target_column}" IS NOT NULL
+                    ORDER BY CAST("{target_column}" AS NUMERIC) ASC
                     LIMIT 1
                 """
                 min_result = await db.execute(text(min_query))
@@ -283,11 +227,8 @@ class IntelligentDataSamplingService:
                 max_query = f"""
                     SELECT {', '.join([f'"{col}"' for col in columns])}
                     FROM {schema_name}.{table_name}
-                    WHERE "{target_column}" = (
-                        SELECT MAX(CAST("{target_column}" AS NUMERIC))
-                        FROM {schema_name}.{table_name}
-                        WHERE "{target_column}" IS NOT NULL
-                    )
+                    WHERE "{target_column}" IS NOT NULL
+                    ORDER BY CAST("{target_column}" AS NUMERIC) DESC
                     LIMIT 1
                 """
                 max_result = await db.execute(text(max_query))
@@ -479,25 +420,24 @@ class IntelligentDataSamplingService:
                 # 5. Statistical outliers (values beyond 2 standard deviations or IQR method)
                 if outlier_quota > 0 and stddev_val > 0:
                     # Use both standard deviation and IQR methods
-                    outlier_query = f"""
-                        SELECT {', '.join([f'"{col}"' for col in columns])}
-                        FROM {schema_name}.{table_name}
-                        WHERE "{target_column}" IS NOT NULL 
-                        AND "{target_column}"::text ~ '^[0-9.]+$'
-                        AND (
-                            -- Standard deviation method
-                            CAST("{target_column}" AS NUMERIC) < {avg_val - 2 * stddev_val}
-                            OR CAST("{target_column}" AS NUMERIC) > {avg_val + 2 * stddev_val}
-                            -- IQR method for additional outliers
-                            OR CAST("{target_column}" AS NUMERIC) < {q1 - 1.5 * iqr}
-                            OR CAST("{target_column}" AS NUMERIC) > {q3 + 1.5 * iqr}
-                        )
-                        AND "{target_column}" NOT IN ({','.join([f"'{v}'" for v in selected_values if v])})
-                        ORDER BY RANDOM()
-                        LIMIT {outlier_quota}
-                    """
-                    outlier_result = await db.execute(text(outlier_query))
-                    outlier_rows = outlier_result.fetchall()
+                    outlier_rows = await sampler.sample(
+                        ', '.join([f'"{col}"' for col in columns]),
+                        f"""
+                            "{target_column}" IS NOT NULL 
+                            AND "{target_column}"::text ~ '^[0-9.]+$'
+                            AND (
+                                -- Standard deviation method
+                                CAST("{target_column}" AS NUMERIC) < {avg_val - 2 * stddev_val}
+                                OR CAST("{target_column}" AS NUMERIC) > {avg_val + 2 * stddev_val}
+                                -- IQR method for additional outliers
+                                OR CAST("{target_column}" AS NUMERIC) < {q1 - 1.5 * iqr}
+                                OR CAST("{target_column}" AS NUMERIC) > {q3 + 1.5 * iqr}
+                            )
+                            {exclusion_clause(f'"{target_column}"', selected_values)}
+                        """,
+                        outlier_quota,
+                        selectivity=0.05
+                    )
                     
                     for row in outlier_rows:
                         val = float(row[columns.index(target_column)])
@@ -583,6 +523,8 @@ class IntelligentDataSamplingService:
                 if clean_quota > 2:
                     strategies.append({
                         'name': 'common_values',
+                        # Pick the values first, then one seeded row per value, so only
+                        # the distinct values and their rows are sorted
                         'query': f"""
                             WITH value_freqs AS (
                                 SELECT "{target_column}", COUNT(*) as freq
@@ -591,13 +533,22 @@ class IntelligentDataSamplingService:
                                 GROUP BY "{target_column}"
                                 HAVING COUNT(*) >= {avg_frequency - stddev_frequency}
                                 AND COUNT(*) <= {avg_frequency + stddev_frequency}
+                            ),
+                            picked AS (
+                                SELECT "{target_column}", freq
+                                FROM value_freqs
+                                WHERE TRUE {exclusion_clause(f'"{target_column}"', selected_values)}
+                                ORDER BY freq DESC, md5("{target_column}"::text || '{seed}')
+                                LIMIT {clean_quota - (clean_quota // 3 + 1) - (clean_quota // 3)}
                             )
-                            SELECT {', '.join([f't."{col}"' for col in columns])}
-                            FROM {schema_name}.{table_name} t
-                            JOIN value_freqs vf ON t."{target_column}" = vf."{target_column}"
-                            WHERE t."{target_column}" NOT IN ({','.join([f"'{v}'" for v in selected_values if v])})
-                            ORDER BY vf.freq DESC, RANDOM()
-                            LIMIT {clean_quota - (clean_quota // 3 + 1) - (clean_quota // 3)}
+                            SELECT {', '.join([f'"{col}"' for col in columns])}
+                            FROM (
+                                SELECT DISTINCT ON (t."{target_column}") t.*, p.freq AS picked_freq
+                                FROM {schema_name}.{table_name} t
+                                JOIN picked p ON t."{target_column}" = p."{target_column}"
+                                ORDER BY t."{target_column}", {sampler.order_sql}
+                            ) s
+                            ORDER BY picked_freq DESC
                         """,
                         'rationale_fn': lambda val: f"Common value with normal frequency: {target_attribute} ({val}) appears with typical frequency"
                     })
@@ -639,20 +590,18 @@ class IntelligentDataSamplingService:
                     # Build fallback query with DQ conditions
                     dq_where_clause = f" AND {' AND '.join(dq_conditions)}" if dq_conditions else ""
                     
-                    fallback_query = f"""
-                        SELECT {', '.join([f'"{col}"' for col in columns])}
-                        FROM {schema_name}.{table_name}
-                        WHERE "{target_column}" IS NOT NULL 
-                        AND "{target_column}"::text ~ '^[0-9.]+$'
-                        AND CAST("{target_column}" AS NUMERIC) BETWEEN {q1} AND {q3}
-                        AND "{target_column}" NOT IN ({','.join([f"'{v}'" for v in selected_values if v])})
-                        {dq_where_clause}
-                        ORDER BY RANDOM()
-                        LIMIT {clean_quota - len(clean_samples)}
-                    """
-                    
-                    fallback_result = await db.execute(text(fallback_query))
-                    fallback_rows = fallback_result.fetchall()
+                    fallback_rows = await sampler.sample(
+                        ', '.join([f'"{col}"' for col in columns]),
+                        f"""
+                            "{target_column}" IS NOT NULL 
+                            AND "{target_column}"::text ~ '^[0-9.]+$'
+                            AND CAST("{target_column}" AS NUMERIC) BETWEEN {q1} AND {q3}
+                            {exclusion_clause(f'"{target_column}"', selected_values)}
+                            {dq_where_clause}
+                        """,
+                        clean_quota - len(clean_samples),
+                        selectivity=0.5
+                    )
                     
                     for row in fallback_rows:
                         val = float(row[columns.index(target_column)])
@@ -694,6 +643,7 @@ class IntelligentDataSamplingService:
                     "low_freq_values_count": len(low_freq_values)
                 },
                 "sampling_strategy": "intelligent",
+                "sampling_seed": seed,
                 "anomaly_detection": {
                     "null_anomalies": null_count > 0,
                     "frequency_anomalies": len(high_freq_values) > 0 or len(low_freq_values) > 0,
@@ -738,6 +688,7 @@ class IntelligentDataSamplingService:
                     },
                     'data_source': 'database',
                     'generation_method': 'Intelligent Sampling',
+                    'sampling_seed': seed,
                     'timestamp': datetime.utcnow().isoformat()
                 }
             }
@@ -11,6 +11,8 @@ from sqlalchemy import text, select, and_, func, case
 from app.models.workflow import WorkflowPhase
 from app.models.sample_selection import SampleSelectionVersion
 from app.services.sample_selection_table_service import SampleSelectionTableService
+from app.services.table_sampler import TableSampler, exclusion_clause, new_sampling_seed
+from app.services.column_statistics_service import ColumnStatisticsService, sampling_statistics
 from app.core.logging import get_logger
 from app.core.exceptions import BusinessLogicError
 from app.core.background_jobs import job_manager
@@ -39,12 +41,14 @@ class IntelligentDataSamplingServiceV2:
         distribution: Dict[str, float],
         profiling_rules: Optional[List[Any]] = None,
         job_id: Optional[str] = None,
-        current_user_id: Optional[int] = None
+        current_user_id: Optional[int] = None,
+        seed: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Generate intelligent samples with proper stratified sampling
         Priority: Anomalies (50%) -> Boundaries (20%) -> Clean (30%)
         If categories have insufficient samples, fill with clean samples
+        Random picks are seeded; passing the recorded ``sampling_seed`` regenerates the same set
         """
         
         samples_created = []
@@ -61,6 +65,9 @@ class IntelligentDataSamplingServiceV2:
             # Get target attribute column name
             target_column = pde_mappings.get(target_attribute, target_attribute)
             
+            seed = seed or data_source_config.get('sampling_seed') or new_sampling_seed()
+            sampler = TableSampler(db, schema_name, table_name, seed)
+            
             # Get all column names
             columns = []
             column_to_attr = {}
@@ -69,6 +76,7 @@ class IntelligentDataSamplingServiceV2:
                 column_name = pde_mappings.get(attr_name, attr_name)
                 columns.append(column_name)
                 column_to_attr[column_name] = attr_name
+            select_columns = ', '.join([f'"{col}"' for col in columns])
             
             # Calculate target samples per category based on distribution
             # Default: 30% clean, 50% anomaly, 20% boundary
@@ -123,38 +131,20 @@ class IntelligentDataSamplingServiceV2:
                                     'rule_id': str(rule.rule_id)
                                 }
             
-            # Analyze data distribution
-            stats_query = f"""
-                WITH stats AS (
-                    SELECT 
-                        MIN(CAST("{target_column}" AS NUMERIC)) as min_val,
-                        MAX(CAST("{target_column}" AS NUMERIC)) as max_val,
-                        AVG(CAST("{target_column}" AS NUMERIC)) as avg_val,
-                        STDDEV(CAST("{target_column}" AS NUMERIC)) as stddev_val,
-                        PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY CAST("{target_column}" AS NUMERIC)) as q1,
-                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY CAST("{target_column}" AS NUMERIC)) as median,
-                        PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY CAST("{target_column}" AS NUMERIC)) as q3,
-                        COUNT(*) as total_count,
-                        COUNT(DISTINCT "{target_column}") as distinct_count
-                    FROM {schema_name}.{table_name}
-                    WHERE "{target_column}" IS NOT NULL
-                )
-                SELECT * FROM stats
-            """
-            
-            stats_result = await db.execute(text(stats_query))
-            stats = stats_result.fetchone()
-            
-            if not stats:
-                raise BusinessLogicError("Unable to analyze data distribution")
-            
-            min_val = float(stats.min_val) if stats.min_val else 0
-            max_val = float(stats.max_val) if stats.max_val else 0
-            avg_val = float(stats.avg_val) if stats.avg_val else 0
-            stddev_val = float(stats.stddev_val) if stats.stddev_val else 0
-            q1 = float(stats.q1) if stats.q1 else 0
-            median = float(stats.median) if stats.median else 0
-            q3 = float(stats.q3) if stats.q3 else 0
+            # Analyze data distribution from the shared column statistics profile
+            profile = await ColumnStatisticsService(db).get_or_build_profile(
+                schema_name, table_name, columns + [target_column],
+                data_source_id=data_source_config.get('data_source_id')
+            )
+            stats = sampling_statistics(profile.get(target_column))
+            
+            min_val = float(stats['min_val']) if stats['min_val'] else 0
+            max_val = float(stats['max_val']) if stats['max_val'] else 0
+            avg_val = float(stats['avg_val']) if stats['avg_val'] else 0
+            stddev_val = float(stats['stddev_val']) if stats['stddev_val'] else 0
+            q1 = float(stats['q1']) if stats['q1'] else 0
+            median = float(stats['median']) if stats['median'] else 0
+            q3 = float(stats['q3']) if stats['q3'] else 0
             iqr = q3 - q1
             
             logger.info(f"Data stats: min={min_val}, max={max_val}, median={median}, IQR={iqr}")
@@ -189,17 +179,17 @@ class IntelligentDataSamplingServiceV2:
                                 conditions.append(f"CAST(\"{target_column}\" AS NUMERIC) > {params['max_value']}")
                             
                             if conditions:
-                                violation_query = f"""
-                                    SELECT {', '.join([f'"{col}"' for col in columns])}
-                                    FROM {schema_name}.{table_name}
-                                    WHERE "{target_column}" IS NOT NULL
-                                    AND ({' OR '.join(conditions)})
-                                    ORDER BY RANDOM()
-                                    LIMIT 50
-                                """
                                 try:
-                                    result = await db.execute(text(violation_query))
-                                    for row in result.fetchall():
+                                    violation_rows = await sampler.sample(
+                                        select_columns,
+                                        f"""
+                                            "{target_column}" IS NOT NULL
+                                            AND ({' OR '.join(conditions)})
+                                        """,
+                                        50,
+                                        selectivity=max(1 - (rule.pass_rate or 0) / 100, 0.001)
+                                    )
+                                    for row in violation_rows:
                                         val = row[columns.index(target_column)]
                                         if val not in selected_values:
                                             anomaly_candidates.append({
@@ -214,23 +204,23 @@ class IntelligentDataSamplingServiceV2:
             
             # 1b. Statistical Outliers (medium priority anomalies)
             if stddev_val > 0:
-                outlier_query = f"""
-                    SELECT {', '.join([f'"{col}"' for col in columns])}
-                    FROM {schema_name}.{table_name}
-                    WHERE "{target_column}" IS NOT NULL 
-                    AND "{target_column}"::text ~ '^[0-9.-]+$'
-                    AND (
-                        CAST("{target_column}" AS NUMERIC) < {avg_val - 2 * stddev_val}
-                        OR CAST("{target_column}" AS NUMERIC) > {avg_val + 2 * stddev_val}
-                        OR CAST("{target_column}" AS NUMERIC) < {q1 - 1.5 * iqr}
-                        OR CAST("{target_column}" AS NUMERIC) > {q3 + 1.5 * iqr}
-                    )
-                    ORDER BY RANDOM()
-                    LIMIT 100
-                """
                 try:
-                    result = await db.execute(text(outlier_query))
-                    for row in result.fetchall():
+                    outlier_rows = await sampler.sample(
+                        select_columns,
+                        f"""
+                            "{target_column}" IS NOT NULL 
+                            AND "{target_column}"::text ~ '^[0-9.-]+$'
+                            AND (
+                                CAST("{target_column}" AS NUMERIC) < {avg_val - 2 * stddev_val}
+                                OR CAST("{target_column}" AS NUMERIC) > {avg_val + 2 * stddev_val}
+                                OR CAST("{target_column}" AS NUMERIC) < {q1 - 1.5 * iqr}
+                                OR CAST("{target_column}" AS NUMERIC) > {q3 + 1.5 * iqr}
+                            )
+                        """,
+                        100,
+                        selectivity=0.05
+                    )
+                    for row in outlier_rows:
                         val = float(row[columns.index(target_column)])
                         if val not in selected_values:
                             # Determine outlier type
@@ -253,25 +243,26 @@ class IntelligentDataSamplingServiceV2:
                 except Exception as e:
                     logger.warning(f"Error finding outliers: {e}")
             
-            # 1c. Null values (if they exist)
-            null_query = f"""
-                SELECT {', '.join([f'"{col}"' for col in columns])}
-                FROM {schema_name}.{table_name}
-                WHERE "{target_column}" IS NULL
-                LIMIT 10
-            """
-            try:
-                result = await db.execute(text(null_query))
-                for row in result.fetchall():
-                    anomaly_candidates.append({
-                        'row': row,
-                        'category': 'anomaly',
-                        'priority': 3,
-                        'rationale': f"Missing value: {target_attribute} is NULL",
-                        'value': None
-                    })
-            except Exception as e:
-                logger.warning(f"Error finding null values: {e}")
+            # 1c. Null values (if they exist - the profile's null count avoids a scan when none do)
+            if stats['null_count']:
+                null_query = f"""
+                    SELECT {', '.join([f'"{col}"' for col in columns])}
+                    FROM {schema_name}.{table_name}
+                    WHERE "{target_column}" IS NULL
+                    LIMIT 10
+                """
+                try:
+                    result = await db.execute(text(null_query))
+                    for row in result.fetchall():
+                        anomaly_candidates.append({
+                            'row': row,
+                            'category': 'anomaly',
+                            'priority': 3,
+                            'rationale': f"Missing value: {target_attribute} is NULL",
+                            'value': None
+                        })
+                except Exception as e:
+                    logger.warning(f"Error finding null values: {e}")
             
             # PHASE 2: COLLECT ALL POSSIBLE BOUNDARIES (Priority 2)
             if job_id:
@@ -463,17 +454,17 @@ class IntelligentDataSamplingServiceV2:
                 logger.warning(f"Error finding median values: {e}")
             
             # 3c. Random clean samples within normal range
-            clean_query = f"""
-                SELECT {', '.join([f'"{col}"' for col in columns])}
-                FROM {schema_name}.{table_name}
-                WHERE "{target_column}" IS NOT NULL 
-                AND CAST("{target_column}" AS NUMERIC) BETWEEN {q1} AND {q3}
-                ORDER BY RANDOM()
-                LIMIT 200
-            """
             try:
-                result = await db.execute(text(clean_query))
-                for row in result.fetchall():
+                clean_rows = await sampler.sample(
+                    select_columns,
+                    f"""
+                        "{target_column}" IS NOT NULL 
+                        AND CAST("{target_column}" AS NUMERIC) BETWEEN {q1} AND {q3}
+                    """,
+                    200,
+                    selectivity=0.5
+                )
+                for row in clean_rows:
                     val = row[columns.index(target_column)]
                     if val not in selected_values:
                         clean_candidates.append({
@@ -543,17 +534,16 @@ class IntelligentDataSamplingServiceV2:
                 logger.info(f"Need {additional_needed} additional samples")
                 
                 # Get more random samples
-                additional_query = f"""
-                    SELECT {', '.join([f'"{col}"' for col in columns])}
-                    FROM {schema_name}.{table_name}
-                    WHERE "{target_column}" IS NOT NULL
-                    AND "{target_column}" NOT IN ({','.join([f"'{v}'" for v in selected_values if v is not None])})
-                    ORDER BY RANDOM()
-                    LIMIT {additional_needed * 2}
-                """
                 try:
-                    result = await db.execute(text(additional_query))
-                    for row in result.fetchall():
+                    additional_rows = await sampler.sample(
+                        select_columns,
+                        f"""
+                            "{target_column}" IS NOT NULL
+                            {exclusion_clause(f'"{target_column}"', selected_values)}
+                        """,
+                        additional_needed * 2
+                    )
+                    for row in additional_rows:
                         if len(final_samples) < target_sample_size:
                             val = row[columns.index(target_column)]
                             if val not in selected_values:
@@ -592,6 +582,7 @@ class IntelligentDataSamplingServiceV2:
             version.selection_criteria = {
                 'target_attribute': target_attribute,
                 'distribution': distribution,
+                'sampling_seed': seed,
                 'anomalies_found': anomalies_selected,
                 'boundaries_found': boundaries_selected,
                 'clean_used': clean_selected,
@@ -691,6 +682,7 @@ class IntelligentDataSamplingServiceV2:
                     'target_attribute': target_attribute,
                     'distribution_achieved': distribution_achieved,
                     'actual_counts': actual_distribution,
+                    'sampling_seed': seed,
                     'version_id': str(version.version_id),
                     'version_number': version.version_number
                 }
@@ -0,0 +1,251 @@
+"""
+LLM Batch Executor
+Runs independent LLM batches concurrently within per-provider rate limits
+
+``LLMBatchExecutor.run`` starts up to ``concurrency`` batches at once, retries a
+batch that hit a provider rate limit after a jittered exponential backoff,
+reports job progress as batches finish and returns results in input order.
+
+Every request made through ``rate_limited_generate`` first takes a request and
+its estimated tokens from the provider's token buckets (requests and tokens per
+minute, shared by the whole process), then settles the estimate against the
+usage the provider reports.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Rough prompt size to token ratio used until the provider reports real usage
+CHARS_PER_TOKEN = 4
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate_per_minute`` up to ``capacity``"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Celery tasks run each job in a fresh event loop; a lock cannot cross loops
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until ``amount`` tokens are available and take them"""
+        # A single request larger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        async with self._get_lock():
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """Take (positive) or return (negative) tokens without waiting; the balance may go negative"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - amount)
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute limits of one provider"""
+
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    async def acquire(self, estimated_tokens: int):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Charge the difference between the reported usage and the estimate"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "requests_available": round(self.requests.available, 1),
+            "tokens_available": round(self.tokens.available),
+        }
+
+
+_rate_limiters: Dict[str, ProviderRateLimiter] = {}
+
+
+def provider_key(provider: Any) -> str:
+    """Rate limit key of a provider: ``ClaudeProvider`` -> ``claude``"""
+    name = type(provider).__name__
+    if name.endswith("Provider"):
+        name = name[:-len("Provider")]
+    return name.lower()
+
+
+def get_provider_rate_limiter(key: str) -> ProviderRateLimiter:
+    """Get the process-wide rate limiter of a provider"""
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        # Providers without configured limits (e.g. test stubs) get conservative defaults
+        limiter = ProviderRateLimiter(
+            key,
+            getattr(settings, f"{key}_requests_per_minute", 60),
+            getattr(settings, f"{key}_tokens_per_minute", 100000)
+        )
+        _rate_limiters[key] = limiter
+    return limiter
+
+
+def estimate_tokens(prompt: str, system_prompt: Optional[str] = None) -> int:
+    return (len(prompt) + len(system_prompt or "")) // CHARS_PER_TOKEN + 1
+
+
+def _reported_tokens(result: Dict[str, Any]) -> Optional[int]:
+    usage = result.get("usage") or {}
+    return usage.get("total_tokens", usage.get("estimated_tokens"))
+
+
+async def rate_limited_generate(provider: Any, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+    """``provider.generate`` within the provider's request and token limits"""
+    limiter = get_provider_rate_limiter(provider_key(provider))
+    estimated = estimate_tokens(prompt, system_prompt)
+    await limiter.acquire(estimated)
+    try:
+        result = await provider.generate(prompt, system_prompt)
+    except Exception:
+        # Failed requests still count against the request limit, not the token limit
+        limiter.settle(estimated, 0)
+        raise
+    limiter.settle(estimated, _reported_tokens(result))
+    return result
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether ``error`` means the provider asked us to slow down"""
+    status_code = getattr(error, "status_code", None)
+    if status_code in (429, 529):
+        return True
+    message = str(error).lower()
+    return "rate limit" in message or "rate_limit" in message or "overloaded" in message
+
+
+def backoff_delay(attempt: int, base: Optional[float] = None, cap: float = 60.0) -> float:
+    """Full-jitter exponential backoff, so concurrent batches do not retry in lockstep"""
+    base = base if base is not None else getattr(settings, "llm_retry_delay", 1.0)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LLMBatchExecutor:
+    """Run batches concurrently and assemble their results in input order"""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        job_id: Optional[str] = None,
+        progress_range: Tuple[int, int] = (10, 90),
+        label: str = "batches"
+    ):
+        self.concurrency = max(1, concurrency or getattr(settings, "max_concurrent_calls", 5))
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, "llm_rate_limit_retries", 5)
+        self.job_id = job_id
+        self.progress_range = progress_range
+        self.label = label
+
+    async def run(
+        self,
+        items: Sequence[T],
+        worker: Callable[[int, T], Awaitable[R]],
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Call ``worker(index, item)`` for every item, at most ``concurrency`` at a time
+
+        A worker failing with a rate limit error is retried up to ``max_retries``
+        times. Any other failure cancels the remaining batches and is raised,
+        unless ``return_exceptions`` is set, in which case it takes the failed
+        batch's place in the result list.
+        """
+        total = len(items)
+        if not total:
+            return []
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        completed = 0
+
+        async def run_one(index: int, item: T):
+            nonlocal completed
+            async with semaphore:
+                attempt = 0
+                while True:
+                    try:
+                        result = await worker(index, item)
+                        break
+                    except Exception as e:
+                        if attempt >= self.max_retries or not is_rate_limit_error(e):
+                            if not return_exceptions:
+                                raise
+                            result = e
+                            break
+                        delay = backoff_delay(attempt)
+                        logger.warning(
+                            f"Rate limited on {self.label} item {index + 1}/{total} "
+                            f"(attempt {attempt + 1}), retrying in {delay:.1f}s"
+                        )
+                        await asyncio.sleep(delay)
+                        attempt += 1
+            completed += 1
+            self._report_progress(completed, total)
+            return result
+
+        tasks = [asyncio.ensure_future(run_one(index, item)) for index, item in enumerate(items)]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def _report_progress(self, completed: int, total: int):
+        if not self.job_id:
+            return
+        from app.core.background_jobs import job_manager
+
+        low, high = self.progress_range
+        job_manager.update_job_progress(
+            self.job_id,
+            progress_percentage=low + int((high - low) * completed / total),
+            current_step=f"Completed {completed}/{total} {self.label}",
+            completed_steps=completed,
+            total_steps=total
+        )
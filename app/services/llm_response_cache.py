@@ -0,0 +1,237 @@
+"""
+LLM Response Cache
+Content-addressed cache of provider responses for repeated, deterministic prompts
+
+An entry is keyed by the SHA-256 of (provider, model, temperature, system prompt,
+prompt), so regenerating scoping recommendations, profiling rules or an evidence
+extraction for unchanged inputs is answered without a provider call. Only
+successful responses at or below ``llm_response_cache_max_temperature`` are
+stored.
+
+Entries live in Redis, shared by API and Celery workers, with a TTL. A sorted
+set of keys scored by last use bounds the number of entries, and the least
+recently used ones are evicted first. When Redis is unreachable a per-process
+LRU with the same bounds is used instead.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import Counter
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ENTRY_KEY_PREFIX = "llm_cache:entry:"
+INDEX_KEY = "llm_cache:index"
+
+llm_cache_lookups = Counter(
+    'synapse_llm_cache_lookups_total',
+    'LLM response cache lookups',
+    ['provider', 'result']
+)
+
+llm_cache_tokens_saved = Counter(
+    'synapse_llm_cache_tokens_saved_total',
+    'Provider tokens not spent because a cached response was served',
+    ['provider']
+)
+
+
+def _reported_tokens(result: Dict[str, Any]) -> int:
+    usage = result.get("usage") or {}
+    return usage.get("total_tokens", usage.get("estimated_tokens")) or 0
+
+
+class LLMResponseCache:
+    """Redis-backed LLM response cache with a per-process LRU fallback"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        max_temperature: Optional[float] = None,
+        redis_url: Optional[str] = None
+    ):
+        self.enabled = getattr(settings, 'llm_response_cache_enabled', True)
+        self.max_entries = max_entries or getattr(settings, 'llm_response_cache_max_entries', 50000)
+        self.ttl_seconds = ttl_seconds or getattr(settings, 'llm_response_cache_ttl_seconds', 7 * 24 * 3600)
+        self.max_temperature = (
+            max_temperature if max_temperature is not None
+            else getattr(settings, 'llm_response_cache_max_temperature', 0.1)
+        )
+        self.redis_url = redis_url if redis_url is not None else (
+            settings.redis_url if getattr(settings, 'llm_response_cache_redis', True) else None
+        )
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_down_until = 0.0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "tokens_saved": 0, "cost_saved": 0.0}
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, system_prompt: Optional[str], prompt: str) -> str:
+        raw = json.dumps([provider, model, temperature, system_prompt or "", prompt])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def cacheable(self, temperature: float) -> bool:
+        return self.enabled and temperature <= self.max_temperature
+
+    # Redis backend
+
+    def _redis_available(self) -> bool:
+        return bool(self.redis_url) and time.time() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception):
+        # Back off instead of paying a connection timeout on every LLM call
+        logger.warning(f"LLM response cache Redis backend unavailable: {e}")
+        self._redis_down_until = time.time() + 30
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+
+    def _redis_get(self, key: str) -> Optional[bytes]:
+        pipe = self._get_redis().pipeline(transaction=False)
+        pipe.get(ENTRY_KEY_PREFIX + key)
+        pipe.zadd(INDEX_KEY, {key: time.time()}, xx=True)
+        return pipe.execute()[0]
+
+    def _redis_set(self, key: str, data: bytes) -> int:
+        client = self._get_redis()
+        now = time.time()
+        pipe = client.pipeline(transaction=False)
+        pipe.set(ENTRY_KEY_PREFIX + key, data, ex=self.ttl_seconds)
+        pipe.zadd(INDEX_KEY, {key: now})
+        # Index entries whose value has expired
+        pipe.zremrangebyscore(INDEX_KEY, "-inf", now - self.ttl_seconds)
+        pipe.zcard(INDEX_KEY)
+        size = pipe.execute()[-1]
+
+        evicted = 0
+        if size > self.max_entries:
+            oldest = client.zpopmin(INDEX_KEY, size - self.max_entries)
+            if oldest:
+                client.delete(*[ENTRY_KEY_PREFIX + member.decode() for member, _ in oldest])
+                evicted = len(oldest)
+        return evicted
+
+    # Local backend
+
+    def _local_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.time() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def _local_set(self, key: str, result: Dict[str, Any]) -> int:
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    # Lookup and storage
+
+    async def get(self, key: str, provider: str) -> Optional[Dict[str, Any]]:
+        """Cached response for ``key`` (marked ``cached``), counting the hit or miss"""
+        result = None
+        if self._redis_available():
+            try:
+                data = await asyncio.to_thread(self._redis_get, key)
+                result = json.loads(data) if data is not None else None
+            except Exception as e:
+                self._redis_failed(e)
+                result = self._local_get(key)
+        else:
+            result = self._local_get(key)
+
+        if result is None:
+            self._stats["misses"] += 1
+            llm_cache_lookups.labels(provider=provider, result="miss").inc()
+            return None
+
+        tokens = _reported_tokens(result)
+        self._stats["hits"] += 1
+        self._stats["tokens_saved"] += tokens
+        self._stats["cost_saved"] += result.get("cost", 0.0) or 0.0
+        llm_cache_lookups.labels(provider=provider, result="hit").inc()
+        llm_cache_tokens_saved.labels(provider=provider).inc(tokens)
+        return {**result, "cached": True}
+
+    async def set(self, key: str, result: Dict[str, Any]):
+        """Store a successful response"""
+        if not result.get("success") or not result.get("content"):
+            return
+        if self._redis_available():
+            try:
+                data = json.dumps(result, default=str).encode()
+                evicted = await asyncio.to_thread(self._redis_set, key, data)
+            except Exception as e:
+                self._redis_failed(e)
+                evicted = self._local_set(key, result)
+        else:
+            evicted = self._local_set(key, result)
+        self._stats["stores"] += 1
+        self._stats["evictions"] += evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._redis_available():
+            try:
+                client = self._get_redis()
+                keys = [ENTRY_KEY_PREFIX + member.decode() for member in client.zrange(INDEX_KEY, 0, -1)]
+                if keys:
+                    client.delete(*keys)
+                client.delete(INDEX_KEY)
+            except Exception as e:
+                self._redis_failed(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "backend": "redis" if self._redis_available() else "memory",
+            "hits": self._stats["hits"],
+            "misses": self._stats["misses"],
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else None,
+            "stores": self._stats["stores"],
+            "evictions": self._stats["evictions"],
+            "tokens_saved": self._stats["tokens_saved"],
+            "cost_saved": round(self._stats["cost_saved"], 4),
+            "local_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+_llm_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Get the process-wide LLM response cache"""
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache()
+    return _llm_response_cache
@@ -23,6 +23,8 @@ except ImportError:
 
 from app.core.config import get_settings
 from app.core.prompt_manager import get_prompt_manager
+from app.services.llm_batch_executor import LLMBatchExecutor, backoff_delay, provider_key, rate_limited_generate
+from app.services.llm_response_cache import get_llm_response_cache
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -454,7 +456,30 @@ class HybridLLMService:
         
         return None
 
-    async def _generate_with_failover(self, prompt: str, system_prompt: Optional[str] = None, preferred_provider: str = None) -> Dict[str, Any]:
+    async def _generate(self, provider: LLMProvider, prompt: str, system_prompt: Optional[str] = None,
+                        use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Generate with one provider, answering identical deterministic requests from the response cache
+        
+        Pass ``use_cache=False`` to always call the provider (the fresh response still refreshes the cache).
+        """
+        cache = get_llm_response_cache()
+        name = provider_key(provider)
+        key = None
+        if cache.cacheable(provider.temperature):
+            key = cache.make_key(name, provider.model_name, provider.temperature, system_prompt, prompt)
+            if use_cache:
+                cached = await cache.get(key, name)
+                if cached is not None:
+                    return cached
+        
+        result = await rate_limited_generate(provider, prompt, system_prompt)
+        if key is not None:
+            await cache.set(key, result)
+        return result
+    
+    async def _generate_with_failover(self, prompt: str, system_prompt: Optional[str] = None, preferred_provider: str = None,
+                                      use_cache: bool = True) -> Dict[str, Any]:
         """Generate response with automatic failover"""
         logger.info(f"_generate_with_failover called with prompt length: {len(prompt) if prompt else 0}")
         if system_prompt:
@@ -484,7 +509,7 @@ class HybridLLMService:
         provider_name = next(name for name, p in self.providers.items() if p == provider)
         
         try:
-            result = await provider.generate(prompt, system_prompt)
+            result = await self._generate(provider, prompt, system_prompt, use_cache=use_cache)
             result["provider_used"] = provider.model_name
             result["actual_provider"] = provider_name
             return result
@@ -514,7 +539,7 @@ class HybridLLMService:
                 if fallback_name != provider_name and self.provider_health[fallback_name]["is_available"]:
                     try:
                         fallback_provider = self.providers[fallback_name]
-                        result = await fallback_provider.generate(prompt, system_prompt)
+                        result = await self._generate(fallback_provider, prompt, system_prompt, use_cache=use_cache)
                         result["provider_used"] = fallback_provider.model_name
                         result["actual_provider"] = fallback_name
                         result["failover_used"] = True
@@ -712,7 +737,7 @@ Consider:
             logger.info(f"🔍 DEBUG: system_prompt_to_use length: {len(system_prompt_to_use)}")
             logger.info(f"🔍 DEBUG: prompt_content length: {len(prompt_content) if prompt_content else 0}")
             
-            result = await provider.generate(prompt_content, system_prompt_to_use)
+            result = await self._generate(provider, prompt_content, system_prompt_to_use)
             
             # Log the full response for debugging
             logger.info("=" * 80)
@@ -877,7 +902,7 @@ Document Content: {document_text[:8000]}
 
 Please identify mandatory data elements, validation rules, risk areas, thresholds, and documentation requirements."""
             
-            result = await provider.generate(prompt, system_prompt)
+            result = await self._generate(provider, prompt, system_prompt)
             
             if result.get("success"):
                 try:
@@ -1022,7 +1047,7 @@ Return a complete list of attribute names needed for this regulatory requirement
             logger.info("=" * 80)
 
             # Get attribute names
-            discovery_result = await discovery_provider.generate(discovery_prompt, discovery_system_prompt)
+            discovery_result = await self._generate(discovery_provider, discovery_prompt, discovery_system_prompt)
             
             if not discovery_result.get("success"):
                 logger.error(f"{discovery_provider_name} attribute discovery failed")
@@ -1181,7 +1206,7 @@ For each attribute, provide comprehensive testing details including data type, w
                     logger.info("=" * 80)
 
                 try:
-                    details_result = await details_provider.generate(details_prompt, batch_system_prompt)
+                    details_result = await self._generate(details_provider, details_prompt, batch_system_prompt)
                     
                     if details_result.get("success"):
                         logger.info(f"Batch {batch_num} raw response length: {len(details_result['content'])} characters")
@@ -1478,7 +1503,7 @@ Important: Return a JSON array with exactly {len(attributes)} objects, one for e
             logger.info(f"System prompt preview:\n{system_prompt[:500]}...")
             logger.info(f"User prompt:\n{prompt}")
             
-            result = await provider.generate(prompt, system_prompt)
+            result = await self._generate(provider, prompt, system_prompt)
             
             if result.get("success"):
                 try:
@@ -1537,7 +1562,7 @@ Historical Issues: {historical_context}
 
 Provide comprehensive testing recommendations including data quality, business rules, compliance checks, edge cases, and sample size."""
             
-            result = await provider.generate(prompt, system_prompt)
+            result = await self._generate(provider, prompt, system_prompt)
             
             if result.get("success"):
                 try:
@@ -1587,7 +1612,7 @@ Historical Issues:
 
 Identify patterns, risk factors, recommendations, and prevention strategies."""
             
-            result = await provider.generate(prompt, system_prompt)
+            result = await self._generate(provider, prompt, system_prompt)
             
             if result.get("success"):
                 try:
@@ -1651,7 +1676,8 @@ Identify patterns, risk factors, recommendations, and prevention strategies."""
             "hybrid_service": {
                 "providers_available": len(self.providers),
                 "hybrid_enabled": self.hybrid_enabled
-            }
+            },
+            "response_cache": get_llm_response_cache().get_stats()
         }
     
     async def extract_test_value_from_document(
@@ -1757,7 +1783,7 @@ IMPORTANT: You must respond ONLY with a valid JSON object. Do not include any ex
 The JSON response must follow the exact format specified in the prompt."""
                 prompt = prompt_content + "\n\nREMEMBER: Respond ONLY with the JSON object, no other text."
 
-            result = await provider.generate(prompt, system_prompt)
+            result = await self._generate(provider, prompt, system_prompt)
             
             if result.get("success"):
                 # Parse the JSON response
@@ -2074,7 +2100,7 @@ Generate 3-5 comprehensive rules appropriate for this specific attribute, coveri
 
 RESPOND WITH ONLY THE JSON OBJECT - NO ADDITIONAL TEXT OR EXPLANATIONS."""
 
-            result = await provider.generate(prompt, system_prompt)
+            result = await self._generate(provider, prompt, system_prompt)
             
             if result.get("success"):
                 try:
@@ -2289,7 +2315,7 @@ Analyze the provided data element and return a JSON response with classification
 CRITICAL: You must respond with ONLY a valid JSON object. Do not include any explanatory text before or after the JSON. The JSON must include all required fields."""
 
             # Generate classification with the properly formatted prompt
-            result = await provider.generate(prompt_content, system_prompt)
+            result = await self._generate(provider, prompt_content, system_prompt)
             
             if not result.get("success", False):
                 raise Exception(f"LLM generation failed: {result.get('error', 'Unknown error')}")
@@ -2483,72 +2509,38 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
             except Exception as e:
                 logger.warning(f"Could not get regulatory context for batch classification: {e}")
             
-            all_suggestions = []
-            
-            # Process in batches to avoid token limits
-            batch_size = 8  # Optimal size for comprehensive analysis without truncation
-            total_batches = (len(pde_mappings) + batch_size - 1) // batch_size
-            
-            for batch_idx in range(0, len(pde_mappings), batch_size):
-                batch_mappings = pde_mappings[batch_idx:batch_idx + batch_size]
-                batch_num = (batch_idx // batch_size) + 1
-                
-                logger.info(f"Processing classification batch {batch_num}/{total_batches} ({len(batch_mappings)} mappings)")
-                
-                if job_id:
-                    progress = 10 + int((batch_num - 1) / total_batches * 80)  # 10-90% for batch processing
-                    job_manager.update_job_progress(
-                        job_id,
-                        progress_percentage=progress,
-                        current_step=f"Processing batch {batch_num}/{total_batches}",
-                        message=f"Analyzing {len(batch_mappings)} PDE mappings with regulation-specific prompts",
-                        completed_steps=(batch_num - 1) * batch_size,
-                        total_steps=len(pde_mappings)
+            # Each mapping is its own request; run them concurrently within the provider limits
+            async def classify(index: int, mapping) -> Dict[str, Any]:
+                try:
+                    return await self.generate_pde_classification_suggestion(
+                        mapping, mapping.attribute, cycle_id, report_id
                     )
-                
-                # Use the individual classification method for each mapping in the batch
-                # This ensures consistent use of regulation-specific prompts
-                batch_suggestions = []
-                for i, mapping in enumerate(batch_mappings):
-                    try:
-                        # Add delay between individual calls to avoid rate limiting
-                        if i > 0:
-                            await asyncio.sleep(1.5)  # 1.5 second delay between API calls
-                            
-                        individual_suggestion = await self.generate_pde_classification_suggestion(
-                            mapping, mapping.attribute, cycle_id, report_id
-                        )
-                        batch_suggestions.append(individual_suggestion)
-                    except Exception as e:
-                        logger.error(f"Individual classification failed for mapping {mapping.id}: {e}")
-                        # Use fallback classification
-                        fallback_suggestion = {
-                            "pde_mapping_id": mapping.id,
-                            "pde_name": mapping.pde_name,
-                            "llm_suggested_criticality": "Medium",
-                            "llm_suggested_risk_level": "Medium",
-                            "llm_suggested_information_security_classification": "Confidential",
-                            "llm_regulatory_references": [regulatory_context] if regulatory_context else ["General regulatory requirements"],
-                            "llm_classification_rationale": f"Individual classification failed - using default medium risk classification for {regulatory_context}",
-                            "regulatory_flag": True,
-                            "pii_flag": False,
-                            "evidence": {
-                                "data_sensitivity_indicators": ["Regulatory reporting data"],
-                                "regulatory_scope": [regulatory_context] if regulatory_context else ["General regulations"],
-                                "business_impact": "Medium impact on regulatory compliance"
-                            },
-                            "security_controls": {
-                                "required_controls": ["Access logging", "Data encryption"],
-                                "access_restrictions": "Restricted to authorized personnel"
-                            }
+                except Exception as e:
+                    logger.error(f"Individual classification failed for mapping {mapping.id}: {e}")
+                    # Use fallback classification
+                    return {
+                        "pde_mapping_id": mapping.id,
+                        "pde_name": mapping.pde_name,
+                        "llm_suggested_criticality": "Medium",
+                        "llm_suggested_risk_level": "Medium",
+                        "llm_suggested_information_security_classification": "Confidential",
+                        "llm_regulatory_references": [regulatory_context] if regulatory_context else ["General regulatory requirements"],
+                        "llm_classification_rationale": f"Individual classification failed - using default medium risk classification for {regulatory_context}",
+                        "regulatory_flag": True,
+                        "pii_flag": False,
+                        "evidence": {
+                            "data_sensitivity_indicators": ["Regulatory reporting data"],
+                            "regulatory_scope": [regulatory_context] if regulatory_context else ["General regulations"],
+                            "business_impact": "Medium impact on regulatory compliance"
+                        },
+                        "security_controls": {
+                            "required_controls": ["Access logging", "Data encryption"],
+                            "access_restrictions": "Restricted to authorized personnel"
                         }
-                        batch_suggestions.append(fallback_suggestion)
-                
-                all_suggestions.extend(batch_suggestions)
-                
-                # Small delay between batches to avoid rate limiting
-                if batch_idx + batch_size < len(pde_mappings):
-                    await asyncio.sleep(1)
+                    }
+            
+            executor = LLMBatchExecutor(job_id=job_id, progress_range=(10, 90), label="PDE classifications")
+            all_suggestions = await executor.run(pde_mappings, classify)
             
             if job_id:
                 job_manager.update_job_progress(
@@ -2607,9 +2599,6 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
             
             logger.info(f"Using regulatory context: {regulatory_report}/{schedule} for PDE mapping")
             
-            # Process each attribute individually for better accuracy
-            mapping_suggestions = []
-            total_attributes = len(attributes)
             
             # Import job manager for progress updates
             from app.core.background_jobs import job_manager
@@ -2617,22 +2606,9 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
             # Process attributes in batches of 6 (reduced from 8 to avoid rate limiting)
             batch_size = 6
             total_batches = (len(attributes) + batch_size - 1) // batch_size
-            results = []  # Initialize results list
             
-            for batch_idx in range(total_batches):
-                start_idx = batch_idx * batch_size
-                end_idx = min(start_idx + batch_size, len(attributes))
-                batch_attributes = attributes[start_idx:end_idx]
-                
-                # Update progress for each batch
-                if job_id:
-                    progress = int((batch_idx + 1) / total_batches * 100)
-                    job_manager.update_job_progress(
-                        job_id,
-                        progress_percentage=progress,
-                        current_step=f"Processing batch {batch_idx + 1}/{total_batches} ({len(batch_attributes)} attributes)",
-                        message=f"Mapping attributes {start_idx + 1}-{end_idx} of {len(attributes)}"
-                    )
+            async def map_batch(batch_idx: int, batch_attributes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                mapping_suggestions = []
                 
                 # Process all attributes in the batch together
                 # Format data sources for prompt with schema information
@@ -2691,12 +2667,6 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
                 batch_results = None
                 
                 if batch_prompt:
-                    # Add delay between batches to avoid rate limiting
-                    if batch_idx > 0:
-                        delay_seconds = 5  # 5 seconds between batches (increased from 2 to avoid rate limits)
-                        logger.info(f"Waiting {delay_seconds}s before batch {batch_idx + 1} to avoid rate limits")
-                        await asyncio.sleep(delay_seconds)
-                    
                     # Log the exact prompt being sent
                     logger.info(f"=== EXACT PROMPT FOR BATCH {batch_idx + 1} ===")
                     logger.info(f"Prompt length: {len(batch_prompt)} characters")
@@ -2735,8 +2705,8 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
                             # More specific error handling
                             error_msg = str(e).lower()
                             if "rate limit" in error_msg:
-                                wait_time = min(30 * (retry_count + 1), 90)  # Exponential backoff: 30s, 60s, 90s
-                                logger.info(f"⏳ Rate limit detected, waiting {wait_time} seconds before retry...")
+                                wait_time = backoff_delay(retry_count + 3)  # Jittered so concurrent batches spread out
+                                logger.info(f"⏳ Rate limit detected, waiting {wait_time:.1f} seconds before retry...")
                                 await asyncio.sleep(wait_time)
                             elif "api key" in error_msg or "authentication" in error_msg:
                                 logger.error("🔑 API key or authentication issue detected - check LLM configuration")
@@ -2915,8 +2885,7 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
                             failed_attrs = [a.get('attribute_name', f"attr_{a.get('id')}") for a in batch_attributes]
                             job_manager.update_job_progress(
                                 job_id,
-                                progress_percentage=int((batch_idx + 1) / total_batches * 100),
-                                current_step=f"Batch {batch_idx + 1} failed - continuing with next batch",
+                                current_step=f"Batch {batch_idx + 1}/{total_batches} failed - continuing with other batches",
                                 message=f"Failed to map {len(failed_attrs)} attributes: {', '.join(failed_attrs[:3])}{'...' if len(failed_attrs) > 3 else ''}"
                             )
                         
@@ -3035,7 +3004,7 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
                                 
                                 error_msg = str(e).lower()
                                 if "rate limit" in error_msg:
-                                    wait_time = 20 * (retry_count + 1)
+                                    wait_time = backoff_delay(retry_count + 3)
                                     await asyncio.sleep(wait_time)
                                 elif "api key" in error_msg or "authentication" in error_msg:
                                     # Don't retry auth errors
@@ -3127,18 +3096,17 @@ CRITICAL: You must respond with ONLY a valid JSON object. Do not include any exp
                                 'llm_classification_confidence': 0,
                                 'classification_evidence': {}
                             })
-                        
-                        # Update progress after each attribute
-                        if job_id and idx % 5 == 0:  # Update every 5 attributes to avoid too many updates
-                            progress = 5 + int((idx + 1) / total_attributes * 45)  # Progress from 5% to 50%
-                            job_manager.update_job_progress(
-                                job_id,
-                                current_step="Generating LLM mapping suggestions",
-                                progress_percentage=progress,
-                                message=f"Analyzed {idx + 1} of {total_attributes} attributes...",
-                                completed_steps=idx + 1,
-                                total_steps=total_attributes
-                            )
+                
+                return mapping_suggestions
+            
+            # Batches are independent: run them concurrently within the provider rate limits
+            batches = [attributes[i:i + batch_size] for i in range(0, len(attributes), batch_size)]
+            executor = LLMBatchExecutor(job_id=job_id, progress_range=(5, 95), label="mapping batches")
+            mapping_suggestions = [
+                suggestion
+                for batch_suggestions in await executor.run(batches, map_batch)
+                for suggestion in batch_suggestions
+            ]
             
             # Generate summary statistics
             successful_mappings = [m for m in mapping_suggestions if m.get('mapped', False) and m.get('confidence_score', 0) > 0]
@@ -0,0 +1,423 @@
+"""
+Metrics Snapshot Service
+Materialized dashboard metrics per (cycle, report, phase, LOB)
+
+Dashboards read one ``cycle_report_metrics_snapshots`` query instead of the
+dozens of sequential counts ``UniversalMetricsService`` runs per load. Statement
+triggers on the source tables (versions, decisions, test cases, executions,
+observations) stamp ``source_changed_at`` on the report's snapshot rows, so only
+reports that actually changed are recomputed:
+
+- ``refresh_stale`` (Celery beat, every minute) recomputes reports whose rows
+  changed since they were computed.
+- A read of a row that has been stale for longer than
+  ``metrics_snapshot_max_stale_seconds``, or that does not exist yet, recomputes
+  the report inline.
+- ``reconcile`` (Celery beat, nightly) recomputes every snapshot and logs rows
+  whose stored values had drifted, e.g. after changes to tables without triggers.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.metrics_snapshot import MetricsSnapshot, REPORT_WIDE_PHASE, ALL_LOBS
+from app.services.universal_metrics_service import (
+    MetricsContext, UniversalMetrics, get_universal_metrics_service
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Phases with phase-specific metrics, and the names they are also requested by
+SNAPSHOT_PHASES = ("Data Provider ID", "Sample Selection", "Data Profiling", "Scoping", "Testing", "Observations")
+PHASE_ALIASES = {"Test Execution": "Testing", "Observation Management": "Observations"}
+
+LOB_BREAKDOWN_SQL = text("""
+    WITH sample_version AS (
+        SELECT v.version_id
+        FROM cycle_report_sample_selection_versions v
+        JOIN workflow_phases p ON v.phase_id = p.phase_id
+        WHERE p.cycle_id = :cycle_id
+        AND p.report_id = :report_id
+        AND p.phase_name::text = 'Sample Selection'
+        AND v.version_status::text = 'approved'
+        ORDER BY v.version_number DESC
+        LIMIT 1
+    ),
+    samples AS (
+        SELECT
+            s.lob_id,
+            COUNT(*) AS total_samples,
+            COUNT(*) FILTER (WHERE s.report_owner_decision::text = 'approved') AS approved_samples
+        FROM cycle_report_sample_selection_samples s
+        WHERE s.version_id IN (SELECT version_id FROM sample_version)
+        AND s.lob_id IS NOT NULL
+        GROUP BY s.lob_id
+    ),
+    test_cases AS (
+        SELECT
+            tc.lob_id,
+            COUNT(*) AS test_cases_total,
+            COUNT(*) FILTER (WHERE r.test_result = 'Pass') AS test_cases_passed,
+            COUNT(*) FILTER (WHERE r.test_result = 'Fail') AS test_cases_failed,
+            COUNT(*) FILTER (WHERE r.test_result IS NULL) AS test_cases_pending
+        FROM cycle_report_test_cases tc
+        JOIN workflow_phases p ON tc.phase_id = p.phase_id
+        LEFT JOIN cycle_report_test_execution_results r
+            ON r.test_case_id = tc.id::text AND r.is_latest_execution = true
+        WHERE p.cycle_id = :cycle_id
+        AND p.report_id = :report_id
+        GROUP BY tc.lob_id
+    )
+    SELECT
+        COALESCE(s.lob_id, t.lob_id) AS lob_id,
+        COALESCE(s.total_samples, 0) AS total_samples,
+        COALESCE(s.approved_samples, 0) AS approved_samples,
+        COALESCE(t.test_cases_total, 0) AS test_cases_total,
+        COALESCE(t.test_cases_passed, 0) AS test_cases_passed,
+        COALESCE(t.test_cases_failed, 0) AS test_cases_failed,
+        COALESCE(t.test_cases_pending, 0) AS test_cases_pending
+    FROM samples s
+    FULL OUTER JOIN test_cases t ON s.lob_id = t.lob_id
+""")
+
+
+def normalize_phase_name(phase_name: Optional[str]) -> str:
+    """Snapshot key of a phase; empty for report-wide metrics"""
+    if not phase_name:
+        return REPORT_WIDE_PHASE
+    return PHASE_ALIASES.get(phase_name, phase_name)
+
+
+def universal_metrics_to_dict(metrics: UniversalMetrics) -> Dict[str, Any]:
+    """Response shape of the universal metrics endpoint"""
+    return {
+        # Core metrics
+        "total_attributes": metrics.total_attributes,
+        "all_dq_rules": metrics.all_dq_rules,
+        "approved_dq_rules": metrics.approved_dq_rules,
+        "scoped_attributes": {
+            "primary_key": metrics.scoped_attributes_pk,
+            "non_primary_key": metrics.scoped_attributes_non_pk,
+            "total": metrics.scoped_attributes_total
+        },
+        "approved_samples": metrics.approved_samples,
+        "lobs_count": metrics.lobs_count,
+        "data_providers_count": metrics.data_providers_count,
+        "test_cases": {
+            "total": metrics.test_cases_total,
+            "passed": metrics.test_cases_passed,
+            "failed": metrics.test_cases_failed,
+            "pending": metrics.test_cases_pending
+        },
+        # Computed metrics
+        "rates": {
+            "dq_rules_approval": round(metrics.dq_rules_approval_rate, 2),
+            "test_execution": round(metrics.test_execution_rate, 2),
+            "test_pass": round(metrics.test_pass_rate, 2)
+        }
+    }
+
+
+def _json_safe(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+def _stale_since(snapshot: MetricsSnapshot) -> datetime:
+    """
+    When a stale snapshot became stale
+    
+    A change committed during a refresh keeps the ``first_changed_at`` stamped
+    before the refresh started, so it is bounded by ``computed_at``.
+    """
+    return max(snapshot.first_changed_at or snapshot.source_changed_at, snapshot.computed_at)
+
+
+def snapshot_staleness(snapshot: MetricsSnapshot, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """How old a snapshot is and whether its source rows changed since"""
+    now = now or datetime.now(timezone.utc)
+    is_stale = bool(snapshot.source_changed_at and snapshot.source_changed_at > snapshot.computed_at)
+    return {
+        "computed_at": snapshot.computed_at.isoformat(),
+        "age_seconds": round((now - snapshot.computed_at).total_seconds(), 1),
+        "is_stale": is_stale,
+        "source_changed_at": snapshot.source_changed_at.isoformat() if snapshot.source_changed_at else None,
+        "stale_seconds": round((now - _stale_since(snapshot)).total_seconds(), 1) if is_stale else 0.0,
+        "compute_ms": snapshot.compute_ms
+    }
+
+
+class MetricsSnapshotService:
+    """Read and maintain materialized metrics snapshots"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.max_stale_seconds = getattr(settings, 'metrics_snapshot_max_stale_seconds', 120)
+    
+    # Reads
+    
+    async def _load(
+        self, cycle_id: int, report_id: int, phase_names: Iterable[str], lob_id: int
+    ) -> Dict[Tuple[str, int], MetricsSnapshot]:
+        result = await self.db.execute(
+            select(MetricsSnapshot).where(
+                and_(
+                    MetricsSnapshot.cycle_id == cycle_id,
+                    MetricsSnapshot.report_id == report_id,
+                    MetricsSnapshot.phase_name.in_(list(phase_names)),
+                    MetricsSnapshot.lob_id.in_(sorted({ALL_LOBS, lob_id}))
+                )
+            )
+        )
+        return {(snapshot.phase_name, snapshot.lob_id): snapshot for snapshot in result.scalars().all()}
+    
+    def _needs_refresh(self, snapshot: Optional[MetricsSnapshot], now: datetime) -> bool:
+        if snapshot is None:
+            return True
+        staleness = snapshot_staleness(snapshot, now)
+        return staleness["is_stale"] and staleness["stale_seconds"] > self.max_stale_seconds
+    
+    async def get_report_metrics(
+        self,
+        cycle_id: int,
+        report_id: int,
+        phase_name: Optional[str] = None,
+        lob_id: int = ALL_LOBS,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Universal (and optionally phase-specific) metrics of a report from its snapshots
+        
+        Recomputes the report first when asked to, when a snapshot does not exist
+        yet or when its source rows changed more than ``max_stale_seconds`` ago.
+        With a ``lob_id`` the metrics are the sample and test case counts of that
+        LOB, which are written together with the report-wide row.
+        """
+        phase_key = normalize_phase_name(phase_name)
+        keys = {REPORT_WIDE_PHASE} | ({phase_key} if phase_key in SNAPSHOT_PHASES else set())
+        
+        snapshots = await self._load(cycle_id, report_id, keys, lob_id)
+        now = datetime.now(timezone.utc)
+        refreshed = refresh or any(self._needs_refresh(snapshots.get((key, ALL_LOBS)), now) for key in keys)
+        if refreshed:
+            await self.refresh_report(cycle_id, report_id, phases=[key for key in keys if key])
+            snapshots = await self._load(cycle_id, report_id, keys, lob_id)
+        
+        report_snapshot = snapshots.get((REPORT_WIDE_PHASE, ALL_LOBS))
+        if lob_id != ALL_LOBS:
+            # LOBs without samples or test cases have no row of their own
+            lob_snapshot = snapshots.get((REPORT_WIDE_PHASE, lob_id))
+            metrics = lob_snapshot.metrics if lob_snapshot else {}
+        else:
+            metrics = report_snapshot.metrics if report_snapshot else {}
+        
+        response = {
+            "cycle_id": cycle_id,
+            "report_id": report_id,
+            "lob_id": lob_id if lob_id != ALL_LOBS else None,
+            "metrics": metrics,
+            "snapshot": {
+                **(snapshot_staleness(report_snapshot) if report_snapshot else {"computed_at": None, "is_stale": False}),
+                "refreshed": refreshed
+            }
+        }
+        if phase_name:
+            phase_snapshot = snapshots.get((phase_key, ALL_LOBS))
+            response["phase_specific_metrics"] = phase_snapshot.metrics if phase_snapshot else {}
+        return response
+    
+    async def get_cycle_metrics(self, cycle_id: int, lob_id: int = ALL_LOBS) -> List[Dict[str, Any]]:
+        """Report-wide snapshot of every report in a cycle, in one query"""
+        from app.models.report import Report
+    
+        result = await self.db.execute(
+            select(MetricsSnapshot, Report.report_name)
+            .join(Report, MetricsSnapshot.report_id == Report.report_id)
+            .where(
+                and_(
+                    MetricsSnapshot.cycle_id == cycle_id,
+                    MetricsSnapshot.phase_name == REPORT_WIDE_PHASE,
+                    MetricsSnapshot.lob_id == lob_id
+                )
+            )
+            .order_by(MetricsSnapshot.report_id)
+        )
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "report_id": snapshot.report_id,
+                "report_name": report_name,
+                "metrics": snapshot.metrics,
+                "snapshot": snapshot_staleness(snapshot, now)
+            }
+            for snapshot, report_name in result.all()
+        ]
+    
+    # Maintenance
+    
+    async def _compute_lob_breakdown(self, cycle_id: int, report_id: int) -> Dict[int, Dict[str, Any]]:
+        result = await self.db.execute(LOB_BREAKDOWN_SQL, {"cycle_id": cycle_id, "report_id": report_id})
+        breakdown = {}
+        for row in result:
+            executed = row.test_cases_passed + row.test_cases_failed
+            breakdown[row.lob_id] = {
+                "total_samples": row.total_samples,
+                "approved_samples": row.approved_samples,
+                "test_cases": {
+                    "total": row.test_cases_total,
+                    "passed": row.test_cases_passed,
+                    "failed": row.test_cases_failed,
+                    "pending": row.test_cases_pending
+                },
+                "rates": {
+                    "test_execution": round(executed / row.test_cases_total * 100, 2) if row.test_cases_total else 0.0,
+                    "test_pass": round(row.test_cases_passed / executed * 100, 2) if executed else 0.0
+                }
+            }
+        return breakdown
+    
+    async def compute_report(
+        self, cycle_id: int, report_id: int, phases: Iterable[str] = ()
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """Current metrics of a report keyed by (phase_name, lob_id)"""
+        metrics_service = get_universal_metrics_service(self.db)
+        context = MetricsContext(cycle_id=cycle_id, report_id=report_id)
+    
+        computed = {
+            (REPORT_WIDE_PHASE, ALL_LOBS): universal_metrics_to_dict(await metrics_service.get_metrics(context))
+        }
+        for phase_name in phases:
+            phase_context = MetricsContext(cycle_id=cycle_id, report_id=report_id, phase_name=phase_name)
+            phase_metrics = await metrics_service.get_phase_specific_metrics(phase_context)
+            computed[(phase_name, ALL_LOBS)] = _json_safe(phase_metrics or {})
+        
+        for lob_id, lob_metrics in (await self._compute_lob_breakdown(cycle_id, report_id)).items():
+            computed[(REPORT_WIDE_PHASE, lob_id)] = lob_metrics
+        return computed
+    
+    async def refresh_report(
+        self, cycle_id: int, report_id: int, phases: Optional[Iterable[str]] = None
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """
+        Recompute and store a report's snapshots
+    
+        ``phases`` defaults to the phases that already have a snapshot, so
+        background refreshes only maintain what dashboards have asked for.
+        ``computed_at`` is the time recomputation started: a source change
+        committed while it runs leaves the row stale for the next refresh.
+        """
+        phase_set = {phase for phase in (phases or []) if phase in SNAPSHOT_PHASES}
+        existing = await self.db.execute(
+            select(MetricsSnapshot.phase_name).distinct().where(
+                and_(MetricsSnapshot.cycle_id == cycle_id, MetricsSnapshot.report_id == report_id)
+            )
+        )
+        phase_set.update(phase for phase in existing.scalars().all() if phase in SNAPSHOT_PHASES)
+    
+        started_at = (await self.db.execute(select(func.clock_timestamp()))).scalar()
+        start = time.perf_counter()
+        computed = await self.compute_report(cycle_id, report_id, sorted(phase_set))
+        compute_ms = int((time.perf_counter() - start) * 1000)
+    
+        rows = [
+            {
+                "cycle_id": cycle_id,
+                "report_id": report_id,
+                "phase_name": phase_name,
+                "lob_id": lob_id,
+                "metrics": metrics,
+                "computed_at": started_at,
+                "compute_ms": compute_ms
+            }
+            for (phase_name, lob_id), metrics in computed.items()
+        ]
+        stmt = pg_insert(MetricsSnapshot).values(rows)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                constraint='uq_metrics_snapshot_scope',
+                set_={
+                    "metrics": stmt.excluded.metrics,
+                    "computed_at": stmt.excluded.computed_at,
+                    "compute_ms": stmt.excluded.compute_ms,
+                    "updated_at": func.now()
+                }
+            )
+        )
+        # LOBs that no longer have samples or test cases
+        conditions = [
+            MetricsSnapshot.cycle_id == cycle_id,
+            MetricsSnapshot.report_id == report_id,
+            MetricsSnapshot.lob_id != ALL_LOBS
+        ]
+        lob_ids = [lob_id for (_, lob_id) in computed if lob_id != ALL_LOBS]
+        if lob_ids:
+            conditions.append(MetricsSnapshot.lob_id.notin_(lob_ids))
+        await self.db.execute(delete(MetricsSnapshot).where(and_(*conditions)))
+        await self.db.commit()
+    
+        logger.info(
+            f"Refreshed {len(rows)} metrics snapshots for cycle {cycle_id}, report {report_id} in {compute_ms}ms"
+        )
+        return computed
+    
+    async def refresh_stale(self, limit: Optional[int] = None) -> int:
+        """Recompute reports whose snapshots changed since they were computed"""
+        limit = limit or getattr(settings, 'metrics_snapshot_refresh_batch_size', 50)
+        result = await self.db.execute(
+            select(MetricsSnapshot.cycle_id, MetricsSnapshot.report_id)
+            .where(MetricsSnapshot.source_changed_at > MetricsSnapshot.computed_at)
+            .group_by(MetricsSnapshot.cycle_id, MetricsSnapshot.report_id)
+            .order_by(func.min(func.greatest(
+                func.coalesce(MetricsSnapshot.first_changed_at, MetricsSnapshot.source_changed_at),
+                MetricsSnapshot.computed_at
+            )))
+            .limit(limit)
+        )
+        reports = result.all()
+        for cycle_id, report_id in reports:
+            try:
+                await self.refresh_report(cycle_id, report_id)
+            except Exception as e:
+                logger.error(f"Failed to refresh metrics snapshots for cycle {cycle_id}, report {report_id}: {e}")
+                await self.db.rollback()
+        return len(reports)
+    
+    async def reconcile(self) -> Dict[str, int]:
+        """Recompute every snapshot, counting rows whose stored metrics had drifted"""
+        result = await self.db.execute(
+            select(MetricsSnapshot.cycle_id, MetricsSnapshot.report_id).distinct()
+        )
+        reports = result.all()
+        drifted = 0
+        for cycle_id, report_id in reports:
+            try:
+                stored = await self.db.execute(
+                    select(MetricsSnapshot.phase_name, MetricsSnapshot.lob_id, MetricsSnapshot.metrics).where(
+                        and_(MetricsSnapshot.cycle_id == cycle_id, MetricsSnapshot.report_id == report_id)
+                    )
+                )
+                before = {(row.phase_name, row.lob_id): row.metrics for row in stored}
+                after = await self.refresh_report(cycle_id, report_id)
+                changed = [key for key, metrics in after.items() if before.get(key) != metrics]
+                if changed:
+                    drifted += len(changed)
+                    logger.warning(
+                        f"Metrics snapshots of cycle {cycle_id}, report {report_id} had drifted: {changed}"
+                    )
+            except Exception as e:
+                logger.error(f"Failed to reconcile metrics snapshots for cycle {cycle_id}, report {report_id}: {e}")
+                await self.db.rollback()
+        return {"reports": len(reports), "drifted_rows": drifted}
+    
+    
+def get_metrics_snapshot_service(db: AsyncSession) -> MetricsSnapshotService:
+    """Get metrics snapshot service instance"""
+    return MetricsSnapshotService(db)
@@ -121,6 +121,7 @@ class ObservationDetectionRunner:
                 "detection_user_id": detection_user_id,
                 "phases_processed": 0,
                 "total_processed_count": 0,
+                "total_skipped_count": 0,
                 "total_groups_created": 0,
                 "total_observations_created": 0,
                 "phase_results": [],
@@ -138,6 +139,7 @@ class ObservationDetectionRunner:
                     
                     cycle_results["phases_processed"] += 1
                     cycle_results["total_processed_count"] += phase_results.get("processed_count", 0)
+                    cycle_results["total_skipped_count"] += phase_results.get("skipped_count", 0)
                     cycle_results["total_groups_created"] += phase_results.get("groups_created", 0)
                     cycle_results["total_observations_created"] += phase_results.get("observations_created", 0)
                     cycle_results["phase_results"].append(phase_results)
@@ -197,6 +199,7 @@ class ObservationDetectionRunner:
                 "detection_user_id": detection_user_id,
                 "cycles_processed": 0,
                 "total_processed_count": 0,
+                "total_skipped_count": 0,
                 "total_groups_created": 0,
                 "total_observations_created": 0,
                 "cycle_results": [],
@@ -214,6 +217,7 @@ class ObservationDetectionRunner:
                     
                     report_results["cycles_processed"] += 1
                     report_results["total_processed_count"] += cycle_results.get("total_processed_count", 0)
+                    report_results["total_skipped_count"] += cycle_results.get("total_skipped_count", 0)
                     report_results["total_groups_created"] += cycle_results.get("total_groups_created", 0)
                     report_results["total_observations_created"] += cycle_results.get("total_observations_created", 0)
                     report_results["cycle_results"].append(cycle_results)
@@ -1,38 +1,52 @@
 """
 Observation Detection Service
 Automatically detects and creates observations from failed test executions
+
+Detection is set-based: one statement groups the failed executions of a cycle
+report that are not linked to an observation yet by attribute and LOB, one
+``INSERT ... ON CONFLICT`` upserts an auto-detected observation per group, and
+one ``INSERT ... SELECT unnest(...)`` links every execution to its group. A
+phase with thousands of failures is detected in three round trips, and running
+detection again only picks up executions that are still unlinked. Failures whose
+attribute or LOB does not resolve are counted as skipped and stay unlinked.
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from datetime import datetime
+from typing import List, Dict, Any, Set, Tuple
+
+from sqlalchemy import Boolean, Integer, String, and_, bindparam, cast, exists, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-# Observation enhanced models removed - use observation_management models
 from app.models.observation_management import (
-    ObservationRecord, Observation, ObservationRatingEnum,
-    ObservationRecordStatus, SeverityLevel, IssueType, DetectionMethod, FrequencyEstimate
+    ObservationRecord, ObservationTestExecutionLink, ObservationTypeEnum,
+    ObservationSeverityEnum, ObservationStatusEnum
 )
-from app.models.planning import PlanningAttribute
+from app.models.request_info import CycleReportTestCase
 from app.models.test_execution import TestExecution
 from app.models.report_attribute import ReportAttribute
 from app.models.lob import LOB
 from app.models.workflow import WorkflowPhase
-from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+AUTO_DETECTED = "Auto-detected"
+FAILED_RESULTS = ('fail', 'inconclusive')
+HIGH_CONFIDENCE_SCORE = 0.8
+
+# Groups per upsert statement, keeps the bind parameters of one statement well below the driver limit
+_UPSERT_CHUNK_SIZE = 1000
+
 
 class ObservationDetectionService:
     """Service for automatically detecting and creating observations from failed test executions"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     async def detect_observations_from_failures(
-        self, 
+        self,
         phase_id: int,
         cycle_id: int,
         report_id: int,
@@ -43,493 +57,319 @@ class ObservationDetectionService:
         Detect failed test executions and create observations
         
         Args:
-            phase_id: Test execution phase ID
+            phase_id: Observation phase ID the observations are created in
             cycle_id: Test cycle ID
             report_id: Report ID
             detection_user_id: User ID for detection tracking
-            batch_size: Number of test executions to process at once
-            
+            batch_size: Accepted for existing callers; every pending failure is detected in one pass
+        
         Returns:
             Detection results summary
         """
         logger.info(f"Starting observation detection for phase={phase_id}, cycle={cycle_id}, report={report_id}")
         
         try:
-            # Get failed test executions that don't have observations yet
-            failed_executions = await self._get_failed_executions_without_observations(
-                phase_id, cycle_id, report_id, batch_size
-            )
+            groups = await self._get_pending_failure_groups(cycle_id, report_id)
+            
+            skipped_count = sum(group["failure_count"] for group in groups if not self._is_resolved(group))
+            if skipped_count:
+                logger.warning(f"Skipping {skipped_count} failed test executions without a resolvable attribute or LOB")
+            groups = [group for group in groups if self._is_resolved(group)]
             
-            if not failed_executions:
+            if not groups:
                 logger.info("No failed test executions found without observations")
                 return {
                     "processed_count": 0,
+                    "skipped_count": skipped_count,
                     "groups_created": 0,
                     "observations_created": 0,
                     "errors": []
                 }
             
-            logger.info(f"Found {len(failed_executions)} failed test executions to process")
+            processed_count = sum(group["failure_count"] for group in groups)
+            logger.info(f"Found {processed_count} failed test executions in {len(groups)} attribute/LOB groups")
+            
+            observation_ids, groups_created = await self._upsert_observation_groups(
+                phase_id, groups, detection_user_id
+            )
+            observations_created = await self._link_executions(
+                groups, observation_ids, groups_created, detection_user_id
+            )
             
-            # Group failed executions by attribute and LOB
-            execution_groups = await self._group_executions_by_attribute_lob(failed_executions)
+            await self.db.commit()
             
             results = {
-                "processed_count": len(failed_executions),
-                "groups_created": 0,
-                "observations_created": 0,
+                "processed_count": processed_count,
+                "skipped_count": skipped_count,
+                "groups_created": len(groups_created),
+                "observations_created": observations_created,
                 "errors": []
             }
-            
-            # Process each group
-            for group_key, executions in execution_groups.items():
-                try:
-                    attribute_id, lob_id = group_key
-                    
-                    # Get or create observation group
-                    observation_group = await self._get_or_create_observation_group(
-                        phase_id=phase_id,
-                        cycle_id=cycle_id,
-                        report_id=report_id,
-                        attribute_id=attribute_id,
-                        lob_id=lob_id,
-                        executions=executions,
-                        detection_user_id=detection_user_id
-                    )
-                    
-                    if observation_group:
-                        if observation_group.id is None:  # New group created
-                            results["groups_created"] += 1
-                        
-                        # Create individual observations
-                        observations_created = await self._create_individual_observations(
-                            observation_group, executions, detection_user_id
-                        )
-                        results["observations_created"] += observations_created
-                    
-                except Exception as e:
-                    logger.error(f"Error processing group {group_key}: {str(e)}")
-                    results["errors"].append(f"Group {group_key}: {str(e)}")
-            
-            # Update observation counts
-            await self._update_observation_counts()
-            
-            self.db.commit()
-            
             logger.info(f"Observation detection completed: {results}")
             return results
-            
+        
         except Exception as e:
             logger.error(f"Error in observation detection: {str(e)}")
-            self.db.rollback()
+            await self.db.rollback()
             raise
     
-    async def _get_failed_executions_without_observations(
-        self, 
-        phase_id: int, 
-        cycle_id: int, 
-        report_id: int,
-        batch_size: int
-    ) -> List[TestExecution]:
-        """Get failed test executions that don't have observations yet"""
-        
-        # Find test executions that failed but don't have observations
-        query = self.db.query(TestExecution).filter(
-            and_(
-                TestExecution.phase_id == phase_id,
-                TestExecution.cycle_id == cycle_id,
-                TestExecution.report_id == report_id,
-                TestExecution.execution_status == 'completed',
-                or_(
-                    TestExecution.test_result == 'fail',
-                    TestExecution.test_result == 'inconclusive'
-                )
+    def _failed_executions_query(self, cycle_id: int, report_id: int):
+        """Latest failed executions of a cycle report, with the attribute and LOB of their test case"""
+        return (
+            select(
+                TestExecution.id.label("execution_id"),
+                func.coalesce(
+                    CycleReportTestCase.attribute_id,
+                    cast(TestExecution.analysis_results['attribute_id'].astext, Integer)
+                ).label("attribute_id"),
+                func.coalesce(
+                    CycleReportTestCase.lob_id,
+                    cast(TestExecution.analysis_results['lob_id'].astext, Integer)
+                ).label("lob_id"),
+                TestExecution.llm_confidence_score
             )
-        ).filter(
-            # Only get executions that don't have observations yet
-            ~TestExecution.id.in_(
-                self.db.query(Observation.test_execution_id).filter(
-                    Observation.test_execution_id.isnot(None)
+            .join(WorkflowPhase, WorkflowPhase.phase_id == TestExecution.phase_id)
+            .outerjoin(CycleReportTestCase, TestExecution.test_case_id == cast(CycleReportTestCase.id, String))
+            .where(
+                and_(
+                    WorkflowPhase.cycle_id == cycle_id,
+                    WorkflowPhase.report_id == report_id,
+                    TestExecution.is_latest_execution.is_(True),
+                    TestExecution.execution_status == 'completed',
+                    TestExecution.test_result.in_(FAILED_RESULTS)
                 )
             )
-        ).limit(batch_size)
-        
-        return query.all()
+        )
     
-    async def _group_executions_by_attribute_lob(
-        self, 
-        executions: List[TestExecution]
-    ) -> Dict[tuple, List[TestExecution]]:
-        """Group test executions by attribute and LOB combination"""
-        
-        groups = {}
-        
-        for execution in executions:
-            # Extract attribute and LOB from test execution
-            # This would need to be implemented based on how attributes and LOBs are stored
-            # For now, we'll use placeholder logic
-            
-            # Get attribute_id and lob_id from the execution context
-            # This might need adjustment based on actual data structure
-            attribute_id = await self._extract_attribute_id(execution)
-            lob_id = await self._extract_lob_id(execution)
-            
-            if attribute_id and lob_id:
-                group_key = (attribute_id, lob_id)
-                
-                if group_key not in groups:
-                    groups[group_key] = []
-                
-                groups[group_key].append(execution)
-        
-        return groups
-    
-    async def _extract_attribute_id(self, execution: TestExecution) -> Optional[int]:
-        """Extract attribute ID from test execution"""
-        # This would need to be implemented based on how attributes are linked to test cases
-        # For now, we'll use a placeholder approach
+    async def _get_pending_failure_groups(self, cycle_id: int, report_id: int) -> List[Dict[str, Any]]:
+        """
+        Group the failed executions without an observation by attribute and LOB, in one statement
         
-        # Look for attribute information in the execution data
-        if hasattr(execution, 'analysis_results') and execution.analysis_results:
-            if isinstance(execution.analysis_results, dict):
-                return execution.analysis_results.get('attribute_id')
+        Groups whose attribute or LOB does not resolve come back with a null name.
+        """
         
-        # Try to get from test case relationship
-        # This would need actual implementation based on data structure
-        return None
+        pending = (
+            self._failed_executions_query(cycle_id, report_id)
+            .where(
+                ~exists().where(ObservationTestExecutionLink.test_execution_id == TestExecution.id)
+            )
+            .cte("pending_failures")
+        )
+        
+        query = (
+            select(
+                pending.c.attribute_id,
+                pending.c.lob_id,
+                ReportAttribute.attribute_name,
+                LOB.lob_name,
+                func.array_agg(aggregate_order_by(pending.c.execution_id, pending.c.execution_id)).label("execution_ids"),
+                func.count().label("failure_count"),
+                func.count().filter(pending.c.llm_confidence_score > HIGH_CONFIDENCE_SCORE).label("high_confidence_count")
+            )
+            .outerjoin(ReportAttribute, ReportAttribute.id == pending.c.attribute_id)
+            .outerjoin(LOB, LOB.lob_id == pending.c.lob_id)
+            .group_by(pending.c.attribute_id, pending.c.lob_id, ReportAttribute.attribute_name, LOB.lob_name)
+            .order_by(pending.c.attribute_id, pending.c.lob_id)
+        )
+        
+        result = await self.db.execute(query)
+        return [dict(row._mapping) for row in result]
     
-    async def _extract_lob_id(self, execution: TestExecution) -> Optional[int]:
-        """Extract LOB ID from test execution"""
-        # This would need to be implemented based on how LOBs are linked to test cases
-        # For now, we'll use a placeholder approach
-        
-        # Look for LOB information in the execution data
-        if hasattr(execution, 'analysis_results') and execution.analysis_results:
-            if isinstance(execution.analysis_results, dict):
-                return execution.analysis_results.get('lob_id')
-        
-        # Try to get from test case relationship
-        # This would need actual implementation based on data structure
-        return None
+    @staticmethod
+    def _is_resolved(group: Dict[str, Any]) -> bool:
+        """Whether the group has the attribute and LOB its observation is keyed and titled by"""
+        return group["attribute_name"] is not None and group["lob_name"] is not None
     
-    async def _get_or_create_observation_group(
+    async def _upsert_observation_groups(
         self,
         phase_id: int,
-        cycle_id: int,
-        report_id: int,
-        attribute_id: int,
-        lob_id: int,
-        executions: List[TestExecution],
+        groups: List[Dict[str, Any]],
         detection_user_id: int
-    ) -> Optional[ObservationRecord]:
-        """Get existing observation group or create new one"""
-        
-        # Check if group already exists
-        existing_group = self.db.query(ObservationRecord).filter(
-            and_(
-                ObservationRecord.phase_id == phase_id,
-                ObservationRecord.attribute_id == attribute_id,
-                ObservationRecord.lob_id == lob_id
-            )
-        ).first()
-        
-        if existing_group:
-            logger.info(f"Using existing observation group {existing_group.id}")
-            return existing_group
-        
-        # Get attribute and LOB details
-        attribute = self.db.query(PlanningAttribute).filter(
-            PlanningAttribute.id == attribute_id
-        ).first()
-        
-        lob = self.db.query(LOB).filter(
-            LOB.lob_id == lob_id
-        ).first()
-        
-        if not attribute or not lob:
-            logger.error(f"Cannot find attribute {attribute_id} or LOB {lob_id}")
-            return None
-        
-        # Analyze failures to determine severity and issue type
-        severity_level, issue_type = await self._analyze_failure_severity_and_type(executions)
-        
-        # Generate group name and description
-        group_name = f"{attribute.attribute_name} - {lob.lob_name} Issues"
-        group_description = f"Automated observation group for {attribute.attribute_name} attribute in {lob.lob_name} LOB"
-        
-        # Generate issue summary
-        issue_summary = await self._generate_issue_summary(executions, attribute, lob)
+    ) -> Tuple[Dict[Tuple[int, int], int], Set[Tuple[int, int]]]:
+        """
+        Insert an auto-detected observation per group, or reuse the existing one
         
-        # Create new observation group
-        try:
-            observation_group = ObservationRecord(
-                phase_id=phase_id,
-                cycle_id=cycle_id,
-                report_id=report_id,
-                group_name=group_name,
-                group_description=group_description,
-                attribute_id=attribute_id,
-                lob_id=lob_id,
-                observation_count=0,  # Will be updated automatically
-                severity_level=severity_level.value,
-                issue_type=issue_type.value,
-                issue_summary=issue_summary,
-                impact_description=await self._generate_impact_description(executions),
-                proposed_resolution=await self._generate_proposed_resolution(executions),
-                status=ObservationRecordStatus.DRAFT.value,
-                detection_method=DetectionMethod.AUTO_DETECTED.value,
-                detected_by=detection_user_id,
-                detected_at=datetime.utcnow(),
-                created_by=detection_user_id,
-                updated_by=detection_user_id
+        Returns the observation ID of every (attribute, LOB) group and the keys
+        of the groups whose observation was created by this run.
+        """
+        detected_at = datetime.utcnow()
+        rows = [self._observation_group_values(phase_id, group, detection_user_id, detected_at) for group in groups]
+        
+        observation_ids = {}
+        groups_created = set()
+        for start in range(0, len(rows), _UPSERT_CHUNK_SIZE):
+            stmt = pg_insert(ObservationRecord).values(rows[start:start + _UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[
+                    ObservationRecord.phase_id,
+                    ObservationRecord.source_attribute_id,
+                    ObservationRecord.source_lob_id
+                ],
+                index_where=ObservationRecord.detection_method == AUTO_DETECTED,
+                # A no-op update, so RETURNING also reports the groups that already exist
+                set_={
+                    "updated_by_id": stmt.excluded.updated_by_id,
+                    "updated_at": func.now()
+                }
+            ).returning(
+                ObservationRecord.observation_id,
+                ObservationRecord.source_attribute_id,
+                ObservationRecord.source_lob_id,
+                literal_column("xmax = 0").label("inserted")
             )
             
-            self.db.add(observation_group)
-            self.db.flush()  # Get the ID
-            
-            logger.info(f"Created new observation group {observation_group.id}")
-            return observation_group
-            
-        except Exception as e:
-            logger.error(f"Error creating observation group: {str(e)}")
-            raise
+            result = await self.db.execute(stmt)
+            for row in result:
+                key = (row.source_attribute_id, row.source_lob_id)
+                observation_ids[key] = row.observation_id
+                if row.inserted:
+                    groups_created.add(key)
+        
+        return observation_ids, groups_created
     
-    async def _create_individual_observations(
+    def _observation_group_values(
         self,
-        observation_group: ObservationRecord,
-        executions: List[TestExecution],
-        detection_user_id: int
-    ) -> int:
-        """Create individual observations for each failed execution"""
-        
-        observations_created = 0
-        
-        for execution in executions:
-            try:
-                # Check if observation already exists for this execution
-                existing_observation = self.db.query(Observation).filter(
-                    Observation.test_execution_id == execution.id
-                ).first()
-                
-                if existing_observation:
-                    logger.info(f"Observation already exists for execution {execution.id}")
-                    continue
-                
-                # Extract observation details from execution
-                observation_title = await self._generate_observation_title(execution)
-                observation_description = await self._generate_observation_description(execution)
-                
-                # Create observation
-                observation = Observation(
-                    group_id=observation_group.id,
-                    test_execution_id=execution.id,
-                    test_case_id=execution.test_case_id,
-                    attribute_id=observation_group.attribute_id,
-                    sample_id=await self._extract_sample_id(execution),
-                    lob_id=observation_group.lob_id,
-                    observation_title=observation_title,
-                    observation_description=observation_description,
-                    expected_value=execution.expected_value,
-                    actual_value=execution.extracted_value,
-                    variance_details=execution.variance_details,
-                    test_result=execution.test_result,
-                    evidence_files=await self._extract_evidence_files(execution),
-                    supporting_documentation=await self._extract_supporting_documentation(execution),
-                    confidence_level=execution.llm_confidence_score,
-                    reproducible=await self._determine_reproducibility(execution),
-                    frequency_estimate=await self._estimate_frequency(execution),
-                    business_impact=await self._assess_business_impact(execution),
-                    technical_impact=await self._assess_technical_impact(execution),
-                    regulatory_impact=await self._assess_regulatory_impact(execution),
-                    created_by=detection_user_id,
-                    updated_by=detection_user_id
-                )
-                
-                self.db.add(observation)
-                observations_created += 1
-                
-                logger.info(f"Created observation for execution {execution.id}")
-                
-            except Exception as e:
-                logger.error(f"Error creating observation for execution {execution.id}: {str(e)}")
-                continue
-        
-        return observations_created
-    
-    async def _analyze_failure_severity_and_type(
-        self, 
-        executions: List[TestExecution]
-    ) -> tuple[SeverityLevel, IssueType]:
-        """Analyze failed executions to determine severity and issue type"""
-        
-        # Analyze execution results to determine severity
-        total_executions = len(executions)
-        high_confidence_failures = sum(1 for e in executions if e.llm_confidence_score and e.llm_confidence_score > 0.8)
-        
-        # Determine severity based on failure patterns
-        if high_confidence_failures / total_executions > 0.8:
-            severity_level = SeverityLevel.HIGH
-        elif high_confidence_failures / total_executions > 0.5:
-            severity_level = SeverityLevel.MEDIUM
-        else:
-            severity_level = SeverityLevel.LOW
-        
-        # Determine issue type based on failure patterns
-        # This is a simplified approach - could be enhanced with ML/patterns
-        issue_type = IssueType.DATA_QUALITY  # Default to data quality issues
-        
-        return severity_level, issue_type
-    
-    async def _generate_issue_summary(
-        self, 
-        executions: List[TestExecution], 
-        attribute: PlanningAttribute, 
-        lob: LOB
-    ) -> str:
-        """Generate issue summary for the observation group"""
-        
-        total_failures = len(executions)
-        
-        # Analyze common failure patterns
-        failure_patterns = []
-        for execution in executions:
-            if execution.error_message:
-                failure_patterns.append(execution.error_message)
-        
-        return f"Detected {total_failures} test failures for {attribute.attribute_name} in {lob.lob_name}. Common patterns include data quality issues."
-    
-    async def _generate_impact_description(self, executions: List[TestExecution]) -> str:
-        """Generate impact description based on execution failures"""
-        return f"Test execution failures detected across {len(executions)} test cases, potentially affecting data quality and compliance."
-    
-    async def _generate_proposed_resolution(self, executions: List[TestExecution]) -> str:
-        """Generate proposed resolution based on execution failures"""
-        return "Review failed test cases, validate data sources, and implement data quality controls."
-    
-    async def _generate_observation_title(self, execution: TestExecution) -> str:
-        """Generate observation title for individual execution"""
-        return f"Test failure in {execution.test_case_id}"
-    
-    async def _generate_observation_description(self, execution: TestExecution) -> str:
-        """Generate observation description for individual execution"""
-        description = f"Test case {execution.test_case_id} failed during execution."
-        
-        if execution.error_message:
-            description += f" Error: {execution.error_message}"
-        
-        if execution.llm_analysis_rationale:
-            description += f" Analysis: {execution.llm_analysis_rationale}"
+        phase_id: int,
+        group: Dict[str, Any],
+        detection_user_id: int,
+        detected_at: datetime
+    ) -> Dict[str, Any]:
+        """Column values of the auto-detected observation of one attribute/LOB group"""
+        failure_count = group["failure_count"]
+        high_confidence_ratio = group["high_confidence_count"] / failure_count
         
-        return description
-    
-    async def _extract_sample_id(self, execution: TestExecution) -> str:
-        """Extract sample ID from execution"""
-        # This would need to be implemented based on how samples are linked
-        return f"sample_{execution.id}"
-    
-    async def _extract_evidence_files(self, execution: TestExecution) -> Optional[Dict[str, Any]]:
-        """Extract evidence files from execution"""
-        if hasattr(execution, 'analysis_results') and execution.analysis_results:
-            if isinstance(execution.analysis_results, dict):
-                return execution.analysis_results.get('evidence_files')
-        return None
-    
-    async def _extract_supporting_documentation(self, execution: TestExecution) -> Optional[str]:
-        """Extract supporting documentation from execution"""
-        return execution.execution_summary
-    
-    async def _determine_reproducibility(self, execution: TestExecution) -> bool:
-        """Determine if the issue is reproducible"""
-        # Simple heuristic - issues with high confidence are more likely reproducible
-        return execution.llm_confidence_score and execution.llm_confidence_score > 0.7
-    
-    async def _estimate_frequency(self, execution: TestExecution) -> str:
-        """Estimate frequency of the issue"""
-        # This would need more sophisticated logic
-        return FrequencyEstimate.OCCASIONAL.value
-    
-    async def _assess_business_impact(self, execution: TestExecution) -> str:
-        """Assess business impact of the failure"""
-        return "Potential impact on data quality and regulatory compliance."
-    
-    async def _assess_technical_impact(self, execution: TestExecution) -> str:
-        """Assess technical impact of the failure"""
-        return "Technical validation failure requiring investigation."
+        return {
+            "phase_id": phase_id,
+            "observation_title": f"{group['attribute_name']} - {group['lob_name']} Issues",
+            "observation_description": (
+                f"Detected {failure_count} test failures for {group['attribute_name']} in {group['lob_name']}. "
+                f"Automated observation group for {group['attribute_name']} attribute in {group['lob_name']} LOB."
+            ),
+            "observation_type": ObservationTypeEnum.DATA_QUALITY,
+            "severity": self._severity_for_ratio(high_confidence_ratio),
+            "status": ObservationStatusEnum.DETECTED,
+            "source_attribute_id": group["attribute_id"],
+            "source_lob_id": group["lob_id"],
+            "detection_method": AUTO_DETECTED,
+            "detection_confidence": high_confidence_ratio,
+            "impact_description": (
+                f"Test execution failures detected across {failure_count} test cases, "
+                "potentially affecting data quality and compliance."
+            ),
+            "supporting_data": {
+                "failure_count": failure_count,
+                "high_confidence_failures": group["high_confidence_count"]
+            },
+            "auto_detection_rules": {
+                "test_results": list(FAILED_RESULTS),
+                "high_confidence_score": HIGH_CONFIDENCE_SCORE
+            },
+            "auto_detection_score": high_confidence_ratio,
+            "detected_by": detection_user_id,
+            "detected_at": detected_at,
+            "created_by_id": detection_user_id,
+            "updated_by_id": detection_user_id
+        }
     
-    async def _assess_regulatory_impact(self, execution: TestExecution) -> str:
-        """Assess regulatory impact of the failure"""
-        return "May affect regulatory reporting accuracy."
+    @staticmethod
+    def _severity_for_ratio(high_confidence_ratio: float) -> ObservationSeverityEnum:
+        """Severity from the share of high-confidence failures in a group"""
+        if high_confidence_ratio > 0.8:
+            return ObservationSeverityEnum.HIGH
+        if high_confidence_ratio > 0.5:
+            return ObservationSeverityEnum.MEDIUM
+        return ObservationSeverityEnum.LOW
     
-    async def _update_observation_counts(self):
-        """Update observation counts in all groups"""
-        # This is handled automatically by the database trigger
-        pass
+    async def _link_executions(
+        self,
+        groups: List[Dict[str, Any]],
+        observation_ids: Dict[Tuple[int, int], int],
+        groups_created: Set[Tuple[int, int]],
+        detection_user_id: int
+    ) -> int:
+        """Link every grouped execution to its observation with one multi-row insert"""
+        
+        link_observation_ids = []
+        link_execution_ids = []
+        link_primary = []
+        for group in groups:
+            key = (group["attribute_id"], group["lob_id"])
+            observation_id = observation_ids.get(key)
+            if observation_id is None:
+                continue
+            for position, execution_id in enumerate(group["execution_ids"]):
+                link_observation_ids.append(observation_id)
+                link_execution_ids.append(execution_id)
+                # The first failure of a new group is its primary execution
+                link_primary.append(position == 0 and key in groups_created)
+        
+        if not link_execution_ids:
+            return 0
+        
+        # Arrays are bound as three parameters whatever the number of links
+        source = select(
+            func.unnest(bindparam("observation_ids", link_observation_ids, type_=ARRAY(Integer))),
+            func.unnest(bindparam("execution_ids", link_execution_ids, type_=ARRAY(Integer))),
+            func.unnest(bindparam("is_primary", link_primary, type_=ARRAY(Boolean))),
+            literal(detection_user_id, Integer)
+        )
+        stmt = pg_insert(ObservationTestExecutionLink).from_select(
+            ["observation_id", "test_execution_id", "is_primary", "linked_by_id"],
+            source
+        ).on_conflict_do_nothing(
+            index_elements=[ObservationTestExecutionLink.observation_id, ObservationTestExecutionLink.test_execution_id]
+        )
+        
+        result = await self.db.execute(stmt)
+        return result.rowcount
     
     async def get_detection_statistics(
-        self, 
-        phase_id: int, 
-        cycle_id: int, 
+        self,
+        phase_id: int,
+        cycle_id: int,
         report_id: int
     ) -> Dict[str, Any]:
         """Get detection statistics for a phase"""
         
-        # Get total failed executions
-        total_failed = self.db.query(TestExecution).filter(
-            and_(
-                TestExecution.phase_id == phase_id,
-                TestExecution.cycle_id == cycle_id,
-                TestExecution.report_id == report_id,
-                TestExecution.execution_status == 'completed',
-                or_(
-                    TestExecution.test_result == 'fail',
-                    TestExecution.test_result == 'inconclusive'
-                )
+        failed = self._failed_executions_query(cycle_id, report_id).subquery()
+        linked = exists().where(ObservationTestExecutionLink.test_execution_id == failed.c.execution_id)
+        failed_counts = (
+            await self.db.execute(
+                select(
+                    func.count().label("total_failed"),
+                    func.count().filter(linked).label("failed_with_observations")
+                ).select_from(failed)
             )
-        ).count()
+        ).one()
         
-        # Get failed executions with observations
-        failed_with_observations = self.db.query(TestExecution).filter(
-            and_(
-                TestExecution.phase_id == phase_id,
-                TestExecution.cycle_id == cycle_id,
-                TestExecution.report_id == report_id,
-                TestExecution.execution_status == 'completed',
-                or_(
-                    TestExecution.test_result == 'fail',
-                    TestExecution.test_result == 'inconclusive'
+        observation_counts = (
+            await self.db.execute(
+                select(
+                    func.count(func.distinct(ObservationRecord.observation_id)).label("observation_groups"),
+                    func.count(ObservationTestExecutionLink.id).label("total_observations")
                 )
-            )
-        ).filter(
-            TestExecution.id.in_(
-                self.db.query(Observation.test_execution_id).filter(
-                    Observation.test_execution_id.isnot(None)
+                .select_from(ObservationRecord)
+                .outerjoin(
+                    ObservationTestExecutionLink,
+                    ObservationTestExecutionLink.observation_id == ObservationRecord.observation_id
                 )
+                .where(ObservationRecord.phase_id == phase_id)
             )
-        ).count()
-        
-        # Get observation groups
-        observation_groups = self.db.query(ObservationRecord).filter(
-            ObservationRecord.phase_id == phase_id
-        ).count()
-        
-        # Get total observations
-        total_observations = self.db.query(Observation).join(
-            ObservationRecord
-        ).filter(
-            ObservationRecord.phase_id == phase_id
-        ).count()
+        ).one()
         
+        total_failed = failed_counts.total_failed
+        failed_with_observations = failed_counts.failed_with_observations
         return {
             "total_failed_executions": total_failed,
             "failed_with_observations": failed_with_observations,
             "failed_without_observations": total_failed - failed_with_observations,
             "detection_coverage": failed_with_observations / total_failed if total_failed > 0 else 0,
-            "observation_groups": observation_groups,
-            "total_observations": total_observations
+            "observation_groups": observation_counts.observation_groups,
+            "total_observations": observation_counts.total_observations
         }
 
 
 # Utility function to create service instance
-def create_observation_detection_service(db: Session) -> ObservationDetectionService:
+def create_observation_detection_service(db: AsyncSession) -> ObservationDetectionService:
     """Create observation detection service instance"""
-    return ObservationDetectionService(db)
\ No newline at end of file
+    return ObservationDetectionService(db)
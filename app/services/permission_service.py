@@ -7,16 +7,16 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import selectinload
-from cachetools import TTLCache
 import asyncio
 
 from app.models.user import User
 from app.models.rbac import (
     Permission, Role, RolePermission, UserRole, 
-    UserPermission, ResourcePermission, RoleHierarchy,
+    UserPermission, RoleHierarchy,
     PermissionAuditLog
 )
 from app.core.logging import get_logger
+from app.core.permission_matrix import get_permission_matrix
 
 logger = get_logger(__name__)
 
@@ -26,9 +26,6 @@ class PermissionService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        # Cache with 5 minute TTL
-        self._permission_cache = TTLCache(maxsize=1000, ttl=300)
-        self._role_cache = TTLCache(maxsize=100, ttl=300)
     
     async def check_permission(
         self, 
@@ -45,53 +42,14 @@ class PermissionService:
         2. Direct user permission (can be grant or deny)
         3. Resource-level permission (if resource_id provided)
         4. Role permissions (including inherited)
-        """
-        # Cache key
-        cache_key = f"{user_id}:{resource}:{action}:{resource_id}"
-        
-        # Check cache
-        if cache_key in self._permission_cache:
-            return self._permission_cache[cache_key]
         
+        Answered from the process-wide permission matrix, which only queries
+        the database the first time a user is checked after an invalidation.
+        """
         try:
-            # Check if user is admin (bypass all checks)
-            user_result = await self.db.execute(select(User).where(User.user_id == user_id))
-            user = user_result.scalar_one_or_none()
-            if user and user.is_admin:
-                self._permission_cache[cache_key] = True
-                return True
-            
-            # Get permission ID
-            permission = await self._get_permission(resource, action)
-            if not permission:
-                logger.warning(f"Permission not found: {resource}:{action}")
-                self._permission_cache[cache_key] = False
-                return False
-            
-            logger.debug(f"Found permission: {permission.permission_id} for {resource}:{action}")
-            
-            # Check direct user permission (highest priority after admin)
-            user_perm = await self._check_user_permission(user_id, permission.permission_id)
-            if user_perm is not None:
-                self._permission_cache[cache_key] = user_perm
-                return user_perm
-            
-            # Check resource-level permission if resource_id provided
-            if resource_id:
-                resource_perm = await self._check_resource_permission(
-                    user_id, resource, resource_id, permission.permission_id
-                )
-                if resource_perm is not None:
-                    self._permission_cache[cache_key] = resource_perm
-                    return resource_perm
-            
-            # Check role permissions (including inherited)
-            logger.debug(f"Checking role permissions for user {user_id}")
-            role_perm = await self._check_role_permission(user_id, permission.permission_id)
-            logger.debug(f"Role permission result: {role_perm}")
-            self._permission_cache[cache_key] = role_perm
-            return role_perm
-            
+            return await get_permission_matrix().check_permission(
+                self.db, user_id, resource, action, resource_id
+            )
         except Exception as e:
             logger.error(f"Error checking permission: {e}")
             return False
@@ -173,8 +131,7 @@ class PermissionService:
             
             await self.db.commit()
             
-            # Clear cache
-            self._clear_cache()
+            # The commit invalidates compiled permissions in every process
             
             return True
             
@@ -217,8 +174,7 @@ class PermissionService:
                 
                 await self.db.commit()
                 
-                # Clear cache
-                self._clear_cache()
+                # The commit invalidates compiled permissions in every process
                 
                 return True
             
@@ -278,8 +234,7 @@ class PermissionService:
             
             await self.db.commit()
             
-            # Clear cache for this user
-            self._clear_user_cache(user_id)
+            # The commit invalidates the user's compiled permissions in every process
             
             return True
             
@@ -330,8 +285,7 @@ class PermissionService:
             
             await self.db.commit()
             
-            # Clear cache for this user
-            self._clear_user_cache(user_id)
+            # The commit invalidates the user's compiled permissions in every process
             
             return True
             
@@ -388,110 +342,6 @@ class PermissionService:
     
     # Private helper methods
     
-    async def _get_permission(self, resource: str, action: str) -> Optional[Permission]:
-        """Get permission by resource and action"""
-        # First try exact match (backward compatibility)
-        result = await self.db.execute(
-            select(Permission).where(
-                and_(
-                    Permission.resource == resource,
-                    Permission.action == action
-                )
-            )
-        )
-        permission = result.scalar_one_or_none()
-        
-        if permission:
-            return permission
-        
-        # If not found, try with normalized resource name (future compatibility)
-        # This allows "report" and "reports" to be treated the same
-        normalized_resource = resource.rstrip('s') if resource.endswith('s') else resource
-        result = await self.db.execute(
-            select(Permission).where(
-                and_(
-                    Permission.resource == normalized_resource,
-                    Permission.action == action
-                )
-            )
-        )
-        return result.scalar_one_or_none()
-    
-    async def _check_user_permission(self, user_id: int, permission_id: int) -> Optional[bool]:
-        """Check direct user permission"""
-        result = await self.db.execute(
-            select(UserPermission).where(
-                and_(
-                    UserPermission.user_id == user_id,
-                    UserPermission.permission_id == permission_id,
-                    or_(
-                        UserPermission.expires_at.is_(None),
-                        UserPermission.expires_at > datetime.utcnow()
-                    )
-                )
-            )
-        )
-        user_perm = result.scalar_one_or_none()
-        
-        if user_perm:
-            return user_perm.granted
-        
-        return None
-    
-    async def _check_resource_permission(
-        self, 
-        user_id: int, 
-        resource_type: str, 
-        resource_id: int, 
-        permission_id: int
-    ) -> Optional[bool]:
-        """Check resource-level permission"""
-        result = await self.db.execute(
-            select(ResourcePermission).where(
-                and_(
-                    ResourcePermission.user_id == user_id,
-                    ResourcePermission.resource_type == resource_type,
-                    ResourcePermission.resource_id == resource_id,
-                    ResourcePermission.permission_id == permission_id,
-                    or_(
-                        ResourcePermission.expires_at.is_(None),
-                        ResourcePermission.expires_at > datetime.utcnow()
-                    )
-                )
-            )
-        )
-        resource_perm = result.scalar_one_or_none()
-        
-        if resource_perm:
-            return resource_perm.granted
-        
-        return None
-    
-    async def _check_role_permission(self, user_id: int, permission_id: int) -> bool:
-        """Check role-based permission including inheritance"""
-        # Get all user's roles
-        user_roles = await self._get_user_roles(user_id)
-        
-        # Get all inherited roles
-        all_roles = set(user_roles)
-        for role_id in user_roles:
-            inherited = await self._get_inherited_roles(role_id)
-            all_roles.update(inherited)
-        
-        # Check if any role has the permission
-        if all_roles:
-            result = await self.db.execute(
-                select(RolePermission).where(
-                    and_(
-                        RolePermission.role_id.in_(all_roles),
-                        RolePermission.permission_id == permission_id
-                    )
-                )
-            )
-            return result.scalar_one_or_none() is not None
-        
-        return False
-    
     async def _get_user_roles(self, user_id: int) -> List[int]:
         """Get all active roles for a user"""
         result = await self.db.execute(
@@ -548,18 +398,6 @@ class PermissionService:
                 permissions.add(perm.permission_string)
         
         return permissions
-    
-    def _clear_cache(self):
-        """Clear all caches"""
-        self._permission_cache.clear()
-        self._role_cache.clear()
-    
-    def _clear_user_cache(self, user_id: int):
-        """Clear cache for specific user"""
-        # Remove all entries for this user
-        keys_to_remove = [k for k in self._permission_cache.keys() if k.startswith(f"{user_id}:")]
-        for key in keys_to_remove:
-            del self._permission_cache[key]
 
 
 async def get_permission_service(db: AsyncSession) -> PermissionService:
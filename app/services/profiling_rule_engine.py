@@ -0,0 +1,437 @@
+"""
+Profiling rule engines used by the streaming profiler
+
+RuleEngine evaluates one record at a time; CompiledRuleEngine compiles the same
+rule definitions into column-wise NumPy/pandas predicates evaluated per batch.
+"""
+import logging
+import math
+import operator
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rule type aliases shared by the per-record and compiled engines
+NULL_CHECK_RULE_TYPES = ('null_check', 'completeness')
+PATTERN_RULE_TYPES = ('pattern', 'regex')
+RANGE_RULE_TYPES = ('range',)
+ENUM_RULE_TYPES = ('enumerated', 'allowed_values')
+CROSS_FIELD_RULE_TYPES = ('cross_field',)
+
+CROSS_FIELD_OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+SEVERITY_ORDER = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+
+class RuleEngine:
+    """Engine for evaluating profiling rules"""
+    
+    async def evaluate_record(
+        self, 
+        record: Dict[str, Any], 
+        rules: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Evaluate all rules against a record"""
+        anomalies = []
+        max_severity = 'low'
+        
+        for rule in rules:
+            try:
+                result = await self._evaluate_single_rule(record, rule)
+                if not result['passed']:
+                    anomalies.append({
+                        'rule_id': rule['id'],
+                        'rule_name': rule['name'],
+                        'category': rule['category'],
+                        'failure_reason': result['reason'],
+                        'field': rule.get('field'),
+                        'value': record.get(rule.get('field'))
+                    })
+                    
+                    if self._compare_severity(result['severity'], max_severity) > 0:
+                        max_severity = result['severity']
+                        
+            except Exception as e:
+                logger.error(f"Error evaluating rule {rule['id']}: {str(e)}")
+        
+        return {
+            'anomalies': anomalies,
+            'severity': max_severity
+        }
+    
+    async def _evaluate_single_rule(
+        self, 
+        record: Dict[str, Any], 
+        rule: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Evaluate a single rule"""
+        rule_type = rule['type']
+        
+        if rule_type in NULL_CHECK_RULE_TYPES:
+            return self._check_null(record, rule)
+        elif rule_type in PATTERN_RULE_TYPES:
+            return self._check_pattern(record, rule)
+        elif rule_type in RANGE_RULE_TYPES:
+            return self._check_range(record, rule)
+        elif rule_type in ENUM_RULE_TYPES:
+            return self._check_enumerated(record, rule)
+        elif rule_type in CROSS_FIELD_RULE_TYPES:
+            return self._check_cross_field(record, rule)
+        elif rule_type == 'custom':
+            return await self._evaluate_custom_rule(record, rule)
+        else:
+            return {'passed': True, 'severity': 'low'}
+    
+    def _check_null(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Check for null values"""
+        field = rule['field']
+        value = record.get(field)
+        
+        if value is None or value == '':
+            return {
+                'passed': False,
+                'reason': f"Field '{field}' is null or empty",
+                'severity': rule.get('severity', 'medium')
+            }
+        
+        return {'passed': True, 'severity': 'low'}
+    
+    def _check_pattern(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Check pattern matching"""
+        import re
+        
+        field = rule['field']
+        value = str(record.get(field, ''))
+        pattern = rule['pattern']
+        
+        if not re.match(pattern, value):
+            return {
+                'passed': False,
+                'reason': f"Field '{field}' does not match pattern '{pattern}'",
+                'severity': rule.get('severity', 'medium')
+            }
+        
+        return {'passed': True, 'severity': 'low'}
+    
+    def _check_range(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Check value ranges"""
+        field = rule['field']
+        value = record.get(field)
+        
+        try:
+            numeric_value = float(value)
+            min_val = rule.get('min', float('-inf'))
+            max_val = rule.get('max', float('inf'))
+            
+            if numeric_value < min_val or numeric_value > max_val:
+                return {
+                    'passed': False,
+                    'reason': f"Field '{field}' value {numeric_value} outside range [{min_val}, {max_val}]",
+                    'severity': rule.get('severity', 'medium')
+                }
+        except (TypeError, ValueError):
+            return {
+                'passed': False,
+                'reason': f"Field '{field}' is not numeric",
+                'severity': 'high'
+            }
+        
+        return {'passed': True, 'severity': 'low'}
+    
+    def _check_enumerated(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Check value is one of the allowed values"""
+        field = rule['field']
+        value = record.get(field)
+        
+        if value is None:
+            if rule.get('allow_null', True):
+                return {'passed': True, 'severity': 'low'}
+        elif value in rule['values']:
+            return {'passed': True, 'severity': 'low'}
+        
+        return {
+            'passed': False,
+            'reason': f"Field '{field}' value {value} not in allowed values",
+            'severity': rule.get('severity', 'medium')
+        }
+    
+    def _check_cross_field(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Check the relationship between two fields"""
+        field = rule['field']
+        other_field = rule['other_field']
+        value = record.get(field)
+        other_value = record.get(other_field)
+        
+        if value is None or other_value is None:
+            return {'passed': True, 'severity': 'low'}
+        
+        if not CROSS_FIELD_OPERATORS[rule['operator']](value, other_value):
+            return {
+                'passed': False,
+                'reason': f"Field '{field}' is not {rule['operator']} field '{other_field}'",
+                'severity': rule.get('severity', 'medium')
+            }
+        
+        return {'passed': True, 'severity': 'low'}
+    
+    async def _evaluate_custom_rule(
+        self, 
+        record: Dict[str, Any], 
+        rule: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Evaluate custom rule logic"""
+        # Custom rule evaluation would be implemented here
+        # This is a placeholder
+        return {'passed': True, 'severity': 'low'}
+    
+    def _compare_severity(self, sev1: str, sev2: str) -> int:
+        """Compare severity levels"""
+        return SEVERITY_ORDER.get(sev1, 0) - SEVERITY_ORDER.get(sev2, 0)
+
+
+SEVERITY_NAMES = {rank: name for name, rank in SEVERITY_ORDER.items()}
+
+
+@dataclass
+class CompiledRule:
+    """
+    A profiling rule compiled into a column-wise predicate.
+    
+    ``evaluate`` returns a boolean failure mask and an int8 array of severity
+    ranks for a batch; ``signature`` identifies rules with identical predicates
+    so they are evaluated once per batch.
+    """
+    rule: Dict[str, Any]
+    evaluate: Callable[[pd.DataFrame], Tuple[np.ndarray, np.ndarray]]
+    reason: Callable[[Any], str]
+    signature: Tuple[Any, ...]
+
+
+class CompiledRuleEngine:
+    """
+    Column-wise rule engine for whole batches.
+    
+    Rules are compiled once into NumPy/pandas predicates that return a boolean
+    failure mask and a per-row severity for a DataFrame batch, so 400 rules over
+    a 1,000 record batch cost 400 vectorized operations instead of 400,000
+    coroutine calls. Anomaly records are assembled only for rows whose mask is
+    set. Custom and unknown rule types pass, as they do in ``RuleEngine``.
+    """
+    
+    def compile(self, rules: List[Dict[str, Any]]) -> List[CompiledRule]:
+        """Compile rule definitions into vectorized predicates"""
+        compiled = []
+        for rule in rules:
+            try:
+                compiled_rule = self._compile_rule(rule)
+            except Exception as e:
+                logger.error(f"Error compiling rule {rule.get('id')}: {str(e)}")
+                continue
+            if compiled_rule:
+                compiled.append(compiled_rule)
+        return compiled
+    
+    def evaluate_batch(
+        self,
+        frame: pd.DataFrame,
+        compiled_rules: List[CompiledRule]
+    ) -> List[Dict[str, Any]]:
+        """Evaluate compiled rules against a batch and return one anomaly entry per failing record"""
+        if frame.empty:
+            return []
+        
+        failures: Dict[int, List[Dict[str, Any]]] = {}
+        max_severity = np.zeros(len(frame), dtype=np.int8)
+        evaluated: Dict[Tuple[Any, ...], Tuple[np.ndarray, np.ndarray]] = {}
+        
+        for compiled_rule in compiled_rules:
+            rule = compiled_rule.rule
+            try:
+                if compiled_rule.signature not in evaluated:
+                    evaluated[compiled_rule.signature] = compiled_rule.evaluate(frame)
+                failed_mask, severity = evaluated[compiled_rule.signature]
+            except Exception as e:
+                logger.error(f"Error evaluating rule {rule['id']}: {str(e)}")
+                continue
+            
+            failed_rows = np.flatnonzero(failed_mask)
+            if not len(failed_rows):
+                continue
+            np.maximum.at(max_severity, failed_rows, severity[failed_rows])
+            
+            field = rule.get('field')
+            if field in frame.columns:
+                values = _to_python_list(frame[field].to_numpy()[failed_rows])
+            else:
+                values = [None] * len(failed_rows)
+            for row, value in zip(failed_rows.tolist(), values):
+                failures.setdefault(row, []).append({
+                    'rule_id': rule['id'],
+                    'rule_name': rule['name'],
+                    'category': rule['category'],
+                    'failure_reason': compiled_rule.reason(value),
+                    'field': field,
+                    'value': value
+                })
+        
+        if not failures:
+            return []
+        
+        rows = sorted(failures)
+        if 'id' in frame.columns:
+            record_ids = _to_python_list(frame['id'].to_numpy()[rows])
+        else:
+            record_ids = ['unknown'] * len(rows)
+        severity_ranks = max_severity[rows].tolist()
+        return [
+            {
+                'record_id': record_id,
+                'anomalies': failures[row],
+                'severity': SEVERITY_NAMES[rank]
+            }
+            for row, record_id, rank in zip(rows, record_ids, severity_ranks)
+        ]
+    
+    def _compile_rule(self, rule: Dict[str, Any]) -> Optional[CompiledRule]:
+        """Build the predicate for a single rule, or None if it always passes"""
+        rule_type = rule['type']
+        field = rule.get('field')
+        severity = SEVERITY_ORDER.get(rule.get('severity', 'medium'), 0)
+        
+        def column(frame: pd.DataFrame, name: str) -> pd.Series:
+            if name in frame.columns:
+                return frame[name]
+            return pd.Series([None] * len(frame), index=frame.index, dtype=object)
+        
+        def uniform(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            return mask, np.full(len(mask), severity, dtype=np.int8)
+        
+        if rule_type in NULL_CHECK_RULE_TYPES:
+            def evaluate(frame):
+                values = column(frame, field)
+                mask = values.isna().to_numpy()
+                if values.dtype == object:
+                    mask |= (values == '').to_numpy()
+                return uniform(mask)
+            
+            null_reason = f"Field '{field}' is null or empty"
+            return CompiledRule(
+                rule, evaluate, lambda value: null_reason, (rule_type, field, severity)
+            )
+        
+        if rule_type in PATTERN_RULE_TYPES:
+            pattern = rule['pattern']
+            
+            regex = re.compile(pattern)
+            
+            def evaluate(frame):
+                # Match the per-record engine, which applies re.match to str(value);
+                # the regex only runs once per distinct value
+                values = column(frame, field)
+                codes, uniques = pd.factorize(values, use_na_sentinel=False)
+                matched = np.fromiter(
+                    (regex.match(str(_to_python(value))) is not None for value in uniques),
+                    dtype=bool,
+                    count=len(uniques)
+                )
+                return uniform(~matched[codes])
+            
+            mismatch_reason = f"Field '{field}' does not match pattern '{pattern}'"
+            return CompiledRule(
+                rule, evaluate, lambda value: mismatch_reason, (rule_type, field, severity, pattern)
+            )
+        
+        if rule_type in RANGE_RULE_TYPES:
+            min_val = rule.get('min', float('-inf'))
+            max_val = rule.get('max', float('inf'))
+            
+            def evaluate(frame):
+                numeric = pd.to_numeric(column(frame, field), errors='coerce').to_numpy(dtype=float)
+                not_numeric = np.isnan(numeric)
+                with np.errstate(invalid='ignore'):
+                    out_of_range = (numeric < min_val) | (numeric > max_val)
+                row_severity = np.where(not_numeric, SEVERITY_ORDER['high'], severity).astype(np.int8)
+                return not_numeric | out_of_range, row_severity
+            
+            def reason(value):
+                try:
+                    numeric_value = float(value)
+                except (TypeError, ValueError):
+                    return f"Field '{field}' is not numeric"
+                if math.isnan(numeric_value):
+                    return f"Field '{field}' is not numeric"
+                return f"Field '{field}' value {numeric_value} outside range [{min_val}, {max_val}]"
+            
+            return CompiledRule(rule, evaluate, reason, (rule_type, field, severity, min_val, max_val))
+        
+        if rule_type in ENUM_RULE_TYPES:
+            allowed_values = list(rule['values'])
+            allow_null = rule.get('allow_null', True)
+            
+            def evaluate(frame):
+                values = column(frame, field)
+                is_null = values.isna().to_numpy()
+                mask = ~values.isin(allowed_values).to_numpy() & ~is_null
+                if not allow_null:
+                    mask |= is_null
+                return uniform(mask)
+            
+            return CompiledRule(
+                rule, evaluate,
+                lambda value: f"Field '{field}' value {value} not in allowed values",
+                (rule_type, field, severity, tuple(allowed_values), allow_null)
+            )
+        
+        if rule_type in CROSS_FIELD_RULE_TYPES:
+            op_symbol = rule['operator']
+            compare = CROSS_FIELD_OPERATORS[op_symbol]
+            other_field = rule['other_field']
+            
+            def evaluate(frame):
+                left = column(frame, field)
+                right = column(frame, other_field)
+                comparable = (left.notna() & right.notna()).to_numpy()
+                mask = np.zeros(len(frame), dtype=bool)
+                if comparable.any():
+                    mask[comparable] = ~compare(
+                        left[comparable].to_numpy(), right[comparable].to_numpy()
+                    ).astype(bool)
+                return uniform(mask)
+            
+            reason = f"Field '{field}' is not {op_symbol} field '{other_field}'"
+            return CompiledRule(
+                rule, evaluate, lambda value: reason, (rule_type, field, severity, op_symbol, other_field)
+            )
+        
+        # Custom and unknown rule types pass, matching RuleEngine
+        return None
+
+
+def _to_python_list(values: np.ndarray) -> List[Any]:
+    """Convert an array slice to Python values, with NaN mapped to None"""
+    return [_to_python(value) for value in values.tolist()]
+
+
+def _to_python(value: Any) -> Any:
+    """Convert NumPy scalars (and NaN) to JSON-friendly Python values"""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+    return value
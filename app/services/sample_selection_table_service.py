@@ -3,12 +3,15 @@ Sample Selection Service - Uses Version Tables
 This consolidates all sample selection logic and uses proper database tables
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, update
+from sqlalchemy import select, and_, or_, func, update, cast, literal, tuple_, String, Text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import selectinload
+import base64
+import binascii
 import uuid
 import json
 
@@ -19,9 +22,30 @@ from app.models.sample_selection import (
 from app.models.workflow import WorkflowPhase
 from app.models.lob import LOB
 from app.models.user import User
+from app.core.config import get_settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
+settings = get_settings()
+
+# Phases whose phase_data is known to be in the version tables (per process)
+_migrated_phase_ids: Set[int] = set()
+
+# Grid sort keys: (expression, type of its cursor value); NULLs are coalesced so keyset comparisons hold
+_S = SampleSelectionSample
+GRID_SORT_FIELDS = {
+    "created_at": (_S.created_at, "datetime"),
+    "sample_identifier": (_S.sample_identifier, "str"),
+    "risk_score": (func.coalesce(_S.risk_score, -1.0), "float"),
+    "confidence_score": (func.coalesce(_S.confidence_score, -1.0), "float"),
+    "sample_category": (cast(_S.sample_category, String), "str"),
+    "tester_decision": (cast(_S.tester_decision, String), "str"),
+    "report_owner_decision": (cast(_S.report_owner_decision, String), "str"),
+    "lob": (func.coalesce(LOB.lob_name, ""), "str"),
+}
+GRID_DATA_SORT_PREFIX = "sample_data."
+# jsonb_build_object takes at most 100 arguments
+GRID_MAX_COLUMNS = 50
 
 
 def _serialize_for_json(obj):
@@ -179,31 +203,9 @@ class SampleSelectionTableService:
             }
             
             # Add attribute focus - get from version's selection criteria or intelligent sampling config
-            attribute_focus = None
-            if version.intelligent_sampling_config:
-                attribute_focus = version.intelligent_sampling_config.get("target_attribute")
-            if not attribute_focus and version.selection_criteria:
-                attribute_focus = version.selection_criteria.get("target_attribute")
-            if not attribute_focus and sample.generation_metadata:
-                attribute_focus = sample.generation_metadata.get("target_attribute")
-            
-            # If still not found, look for a non-PK attribute in scoped attributes
-            if not attribute_focus and version.selection_criteria:
-                scoped_attrs = version.selection_criteria.get("scoped_attributes", [])
-                # Find first non-PK attribute, preferring numeric types
-                non_pk_attrs = [attr for attr in scoped_attrs if not attr.get("is_primary_key")]
-                
-                if non_pk_attrs:
-                    # Prefer numeric attributes for intelligent sampling
-                    numeric_attrs = [attr for attr in non_pk_attrs 
-                                   if attr.get('data_type', '').lower() in ['numeric', 'integer', 'decimal', 'float', 'double', 'bigint', 'int']]
-                    
-                    if numeric_attrs:
-                        attribute_focus = numeric_attrs[0].get("attribute_name")
-                    else:
-                        attribute_focus = non_pk_attrs[0].get("attribute_name")
-            
-            formatted_sample["attribute_focus"] = attribute_focus or "Unknown"
+            formatted_sample["attribute_focus"] = SampleSelectionTableService._attribute_focus(
+                version, (sample.generation_metadata or {}).get("target_attribute")
+            )
             
             # Add rationale from generation metadata
             if sample.generation_metadata:
@@ -226,6 +228,278 @@ class SampleSelectionTableService:
             
         return formatted_samples, version
     
+    @staticmethod
+    def _attribute_focus(version: SampleSelectionVersion, sample_target: Optional[str]) -> str:
+        """Attribute a sample was selected for, from the version's config or the sample's metadata"""
+        attribute_focus = None
+        if version.intelligent_sampling_config:
+            attribute_focus = version.intelligent_sampling_config.get("target_attribute")
+        if not attribute_focus and version.selection_criteria:
+            attribute_focus = version.selection_criteria.get("target_attribute")
+        if not attribute_focus:
+            attribute_focus = sample_target
+        
+        # If still not found, look for a non-PK attribute in scoped attributes
+        if not attribute_focus and version.selection_criteria:
+            scoped_attrs = version.selection_criteria.get("scoped_attributes", [])
+            # Find first non-PK attribute, preferring numeric types
+            non_pk_attrs = [attr for attr in scoped_attrs if not attr.get("is_primary_key")]
+            
+            if non_pk_attrs:
+                # Prefer numeric attributes for intelligent sampling
+                numeric_attrs = [attr for attr in non_pk_attrs 
+                               if attr.get('data_type', '').lower() in ['numeric', 'integer', 'decimal', 'float', 'double', 'bigint', 'int']]
+                
+                if numeric_attrs:
+                    attribute_focus = numeric_attrs[0].get("attribute_name")
+                else:
+                    attribute_focus = non_pk_attrs[0].get("attribute_name")
+        
+        return attribute_focus or "Unknown"
+    
+    @staticmethod
+    def encode_grid_cursor(sort_by: str, sort_value: Any, sample_id: Any) -> str:
+        if isinstance(sort_value, datetime):
+            sort_value = sort_value.isoformat()
+        raw = json.dumps([sort_by, sort_value, str(sample_id)])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode_grid_cursor(cursor: str, sort_by: str, value_type: str) -> Tuple[Any, uuid.UUID]:
+        """Sort value and sample ID of the last row of the previous page"""
+        try:
+            cursor_sort, sort_value, sample_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if cursor_sort != sort_by:
+                raise ValueError("cursor belongs to a different sort order")
+            if value_type == "datetime":
+                sort_value = datetime.fromisoformat(sort_value)
+            elif value_type == "float":
+                sort_value = float(sort_value)
+            else:
+                sort_value = str(sort_value)
+            return sort_value, uuid.UUID(sample_id)
+        except (ValueError, TypeError, binascii.Error) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+    
+    @staticmethod
+    async def _count_grid_samples(db: AsyncSession, count_query) -> Tuple[int, bool]:
+        """
+        Exact count up to ``sample_grid_exact_count_limit`` rows, else the planner's estimate
+        
+        Returns (count, is_estimate). The exact part reads at most limit + 1 index
+        entries, so counting costs the same for a 100 and a 100,000 sample version.
+        """
+        limit = getattr(settings, 'sample_grid_exact_count_limit', 1000)
+        capped = count_query.limit(limit + 1).subquery()
+        count = (await db.execute(select(func.count()).select_from(capped))).scalar() or 0
+        if count <= limit:
+            return count, False
+        
+        try:
+            sql = str(count_query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            connection = await db.connection()
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return max(count, int(plan[0]["Plan"]["Plan Rows"])), True
+        except Exception as e:
+            logger.warning(f"Could not estimate sample count: {e}")
+            return count, True
+    
+    @staticmethod
+    async def get_samples_page(
+        db: AsyncSession,
+        phase_id: int,
+        version_number: Optional[int] = None,
+        approved_only: bool = False,
+        lob_ids: Optional[List[int]] = None,
+        unassigned_lob: bool = False,
+        tester_decisions: Optional[List[str]] = None,
+        report_owner_decisions: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        sort_by: str = "created_at",
+        sort_desc: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        include_total: bool = True
+    ) -> Dict[str, Any]:
+        """
+        One page of samples for the review grid, filtered and sorted in the database
+        
+        Pages are keyset-paginated on (sort value, sample_id); pass the returned
+        ``next_cursor`` to get the following page. ``columns`` limits
+        ``sample_data`` to the given keys. Raises ValueError for unknown filter
+        values, sort keys or cursors.
+        """
+        S = SampleSelectionSample
+        max_limit = getattr(settings, 'sample_grid_max_page_size', 1000)
+        limit = max(1, min(limit or getattr(settings, 'sample_grid_page_size', 100), max_limit))
+        
+        # Version scope
+        versions_by_id: Dict[Any, SampleSelectionVersion] = {}
+        if approved_only:
+            result = await db.execute(
+                select(SampleSelectionVersion).where(
+                    and_(
+                        SampleSelectionVersion.phase_id == phase_id,
+                        SampleSelectionVersion.version_status == VersionStatus.APPROVED
+                    )
+                )
+            )
+            versions_by_id = {v.version_id: v for v in result.scalars().all()}
+        else:
+            if version_number:
+                result = await db.execute(
+                    select(SampleSelectionVersion).where(
+                        and_(
+                            SampleSelectionVersion.phase_id == phase_id,
+                            SampleSelectionVersion.version_number == version_number
+                        )
+                    )
+                )
+                version = result.scalar_one_or_none()
+            else:
+                version = await SampleSelectionTableService.get_current_version(db, phase_id)
+            if version:
+                versions_by_id = {version.version_id: version}
+        
+        single_version = next(iter(versions_by_id.values())) if len(versions_by_id) == 1 else None
+        page = {
+            "samples": [],
+            "version_number": single_version.version_number if single_version else None,
+            "version_id": str(single_version.version_id) if single_version else None,
+            "next_cursor": None,
+            "has_more": False,
+            "total": 0 if include_total else None,
+            "total_is_estimate": False,
+            "sort_by": sort_by,
+            "sort_dir": "desc" if sort_desc else "asc",
+            "limit": limit
+        }
+        if not versions_by_id:
+            return page
+        
+        # Filters
+        filters = [S.version_id.in_(list(versions_by_id))]
+        if lob_ids or unassigned_lob:
+            lob_filters = []
+            if lob_ids:
+                lob_filters.append(S.lob_id.in_(lob_ids))
+            if unassigned_lob:
+                lob_filters.append(S.lob_id.is_(None))
+            filters.append(or_(*lob_filters))
+        for column, values, allowed, label in (
+            (S.tester_decision, tester_decisions, SampleDecision, "tester decision"),
+            (S.report_owner_decision, report_owner_decisions, SampleDecision, "report owner decision"),
+            (S.sample_category, categories, SampleCategory, "sample category"),
+        ):
+            if not values:
+                continue
+            normalized = [str(value).lower() for value in values]
+            invalid = [value for value in normalized if value not in {member.value for member in allowed}]
+            if invalid:
+                raise ValueError(f"Unknown {label}: {', '.join(invalid)}")
+            filters.append(column.in_(normalized))
+        
+        # Sort key
+        if sort_by.startswith(GRID_DATA_SORT_PREFIX) and len(sort_by) > len(GRID_DATA_SORT_PREFIX):
+            sort_expr = func.coalesce(S.sample_data[sort_by[len(GRID_DATA_SORT_PREFIX):]].astext, "")
+            value_type = "str"
+        elif sort_by in GRID_SORT_FIELDS:
+            sort_expr, value_type = GRID_SORT_FIELDS[sort_by]
+        else:
+            raise ValueError(f"Cannot sort samples by '{sort_by}'")
+        
+        # Projection of sample_data
+        if columns is None:
+            data_expr = S.sample_data
+        else:
+            if len(columns) > GRID_MAX_COLUMNS:
+                raise ValueError(f"At most {GRID_MAX_COLUMNS} sample_data columns can be requested")
+            data_args = []
+            for key in columns:
+                data_args.extend([cast(literal(key), Text), S.sample_data[key]])
+            data_expr = func.jsonb_build_object(*data_args)
+        
+        metadata = S.generation_metadata
+        query = (
+            select(
+                S.sample_id, S.version_id, S.lob_id, LOB.lob_name, S.sample_identifier,
+                data_expr.label("sample_data"),
+                S.sample_category, S.sample_source, S.risk_score, S.confidence_score,
+                S.tester_decision, S.tester_decision_notes, S.tester_decision_at,
+                S.report_owner_decision, S.report_owner_decision_notes, S.report_owner_decision_at,
+                S.created_at, S.created_by_id, S.updated_at, S.updated_by_id,
+                func.coalesce(metadata["rationale"].astext, metadata["reason"].astext).label("rationale"),
+                metadata["target_attribute"].astext.label("target_attribute"),
+                metadata["generation_method"].astext.label("generation_method"),
+                metadata["generated_at"].astext.label("generated_at"),
+                metadata["generated_by"].astext.label("generated_by"),
+                sort_expr.label("sort_value")
+            )
+            .outerjoin(LOB, S.lob_id == LOB.lob_id)
+            .where(*filters)
+        )
+        if cursor:
+            after_value, after_id = SampleSelectionTableService.decode_grid_cursor(cursor, sort_by, value_type)
+            key, after = tuple_(sort_expr, S.sample_id), tuple_(literal(after_value, sort_expr.type), literal(after_id, S.sample_id.type))
+            query = query.where(key < after if sort_desc else key > after)
+        if sort_desc:
+            query = query.order_by(sort_expr.desc(), S.sample_id.desc())
+        else:
+            query = query.order_by(sort_expr, S.sample_id)
+        
+        # One extra row tells whether another page follows
+        rows = (await db.execute(query.limit(limit + 1))).all()
+        page["has_more"] = len(rows) > limit
+        rows = rows[:limit]
+        if page["has_more"]:
+            last = rows[-1]
+            page["next_cursor"] = SampleSelectionTableService.encode_grid_cursor(sort_by, last.sort_value, last.sample_id)
+        
+        for row in rows:
+            version = versions_by_id[row.version_id]
+            category_value = str(row.sample_category).upper() if row.sample_category else row.sample_category
+            page["samples"].append({
+                "sample_id": str(row.sample_id),
+                "version_number": version.version_number,
+                "line_of_business": row.lob_name,
+                "lob_id": row.lob_id if row.lob_name else None,
+                "lob_assignment": row.lob_name,
+                "primary_attribute_value": row.sample_identifier,
+                "sample_data": row.sample_data,
+                "sample_category": category_value,
+                "sample_source": row.sample_source,
+                "risk_score": row.risk_score,
+                "confidence_score": row.confidence_score,
+                # Tester fields
+                "tester_decision": row.tester_decision,
+                "tester_feedback": row.tester_decision_notes,
+                "tester_decision_date": row.tester_decision_at.isoformat() if row.tester_decision_at else None,
+                # Report Owner fields
+                "report_owner_decision": row.report_owner_decision,
+                "report_owner_feedback": row.report_owner_decision_notes,
+                "report_owner_decision_date": row.report_owner_decision_at.isoformat() if row.report_owner_decision_at else None,
+                # Metadata
+                "created_at": row.created_at.isoformat(),
+                "created_by_id": row.created_by_id,
+                "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+                "updated_by_id": row.updated_by_id,
+                "attribute_focus": SampleSelectionTableService._attribute_focus(version, row.target_attribute),
+                "rationale": row.rationale or f"Sample selected as {category_value} case",
+                "generation_method": row.generation_method or "Data Source",
+                "generated_at": row.generated_at or row.created_at.isoformat(),
+                "generated_by": row.generated_by or "System"
+            })
+        
+        if include_total:
+            count_query = select(S.sample_id).where(*filters)
+            page["total"], page["total_is_estimate"] = await SampleSelectionTableService._count_grid_samples(db, count_query)
+        
+        return page
+    
     @staticmethod
     async def create_samples_from_generation(
         db: AsyncSession,
@@ -692,6 +966,31 @@ class SampleSelectionTableService:
         logger.info(f"Created version {new_version.version_number} from feedback version {feedback_version.version_number} with {len(feedback_samples)} samples")
         return new_version
     
+    @staticmethod
+    async def ensure_phase_migrated(
+        db: AsyncSession,
+        phase: WorkflowPhase,
+        user_id: int
+    ) -> int:
+        """
+        Migrate a phase's legacy phase_data once per process instead of on every request
+        
+        Phases without legacy versions or samples need no database round trip. A
+        phase is only remembered once migration found nothing left to do, so a
+        migration rolled back with its request is retried on the next one.
+        """
+        if phase.phase_id in _migrated_phase_ids:
+            return 0
+        phase_data = phase.phase_data or {}
+        if not phase_data.get('versions') and not phase_data.get('cycle_report_sample_selection_samples'):
+            _migrated_phase_ids.add(phase.phase_id)
+            return 0
+        
+        migrated = await SampleSelectionTableService.migrate_from_phase_data(db, phase, user_id)
+        if not migrated:
+            _migrated_phase_ids.add(phase.phase_id)
+        return migrated
+    
     @staticmethod
     async def migrate_from_phase_data(
         db: AsyncSession,
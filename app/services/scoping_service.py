@@ -7,15 +7,16 @@ replacing the legacy scoping system with a unified approach.
 
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import select, and_, or_, func, desc, asc, text, case
+from sqlalchemy import select, update, insert, and_, or_, func, desc, asc, text, case, cast, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, selectinload, aliased
 from sqlalchemy.exc import IntegrityError
 from uuid import UUID
 import logging
 
 from app.models.scoping import (
-    ScopingVersion, ScopingAttribute,
+    ScopingVersion, ScopingAttribute, ScopingAuditLog,
     VersionStatus, TesterDecision, ReportOwnerDecision, AttributeStatus
 )
 from app.models.workflow import WorkflowPhase
@@ -1172,8 +1173,8 @@ class ScopingService:
             
             updated_attributes = []
             
-            for update in updates:
-                attribute_id = update.get('attribute_id')
+            for attribute_update in updates:
+                attribute_id = attribute_update.get('attribute_id')
                 if not attribute_id:
                     continue
                 
@@ -1184,7 +1185,7 @@ class ScopingService:
                     continue
                 
                 # Apply updates
-                for field, value in update.items():
+                for field, value in attribute_update.items():
                     if field == 'attribute_id':
                         continue
                     if hasattr(attribute, field):
@@ -1424,97 +1425,61 @@ class ScopingService:
     
     async def bulk_approve_attributes(
         self,
-        attribute_ids: List[UUID],
+        attribute_ids: List[int],
         user_id: int,
         user_role: str,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        version_id: Optional[UUID] = None
     ) -> Dict[str, Any]:
         """
         Bulk approve multiple scoping attributes.
         Automatically determines whether to apply tester or report owner decision based on user role.
         
         Args:
-            attribute_ids: List of attribute IDs to approve
+            attribute_ids: List of planning attribute IDs to approve
             user_id: User performing the approval
             user_role: Role of the user performing the approval
             notes: Optional notes for the approval
+            version_id: Version to decide in (defaults to the draft or pending version)
             
         Returns:
             Dictionary with results including count and any errors
         """
         try:
-            approved_count = 0
-            errors = []
-            processed_versions = set()
-            
-            for attribute_id in attribute_ids:
-                try:
-                    # Get the attribute
-                    attribute = await self.db.get(ScopingAttribute, attribute_id)
-                    if not attribute:
-                        errors.append({
-                            "attribute_id": str(attribute_id),
-                            "error": "Attribute not found"
-                        })
-                        continue
-                    
-                    # Track which versions we're updating
-                    processed_versions.add(attribute.version_id)
-                    
-                    # Update based on user role
-                    if user_role in ["Tester", "Test Executive"]:
-                        # Set tester approval
-                        attribute.tester_decision = TesterDecision.ACCEPT
-                        attribute.tester_rationale = notes or "Bulk approved"
-                        attribute.tester_decided_by_id = user_id
-                        attribute.tester_decided_at = utc_now()
-                        
-                        # Update status - if tester approves, mark as submitted for report owner review
-                        if attribute.report_owner_decision == ReportOwnerDecision.APPROVED:
-                            attribute.status = AttributeStatus.APPROVED
-                        else:
-                            attribute.status = AttributeStatus.SUBMITTED
-                            
-                    elif user_role in ["Report Owner", "Report Owner Executive"]:
-                        # Set report owner approval
-                        attribute.report_owner_decision = ReportOwnerDecision.APPROVED
-                        attribute.report_owner_notes = notes or "Bulk approved"
-                        attribute.report_owner_decided_by_id = user_id
-                        attribute.report_owner_decided_at = utc_now()
-                        
-                        # Update status - only fully approved when both approve
-                        if attribute.tester_decision == TesterDecision.ACCEPT:
-                            attribute.status = AttributeStatus.APPROVED
-                        # Otherwise keep current status
-                            
-                    else:
-                        # Admin or other roles default to tester behavior
-                        attribute.tester_decision = TesterDecision.ACCEPT
-                        attribute.tester_rationale = notes or "Bulk approved"
-                        attribute.tester_decided_by_id = user_id
-                        attribute.tester_decided_at = utc_now()
-                        
-                        if attribute.report_owner_decision == ReportOwnerDecision.APPROVED:
-                            attribute.status = AttributeStatus.APPROVED
-                        else:
-                            attribute.status = AttributeStatus.SUBMITTED
-                    
-                    attribute.updated_by_id = user_id
-                    attribute.updated_at = utc_now()
-                    
-                    approved_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error approving attribute {attribute_id}: {str(e)}")
-                    errors.append({
-                        "attribute_id": str(attribute_id),
-                        "error": str(e)
-                    })
-            
-            # Update version statistics for all affected versions
-            for version_id in processed_versions:
-                await self._update_version_statistics(version_id)
+            now = utc_now()
+            if user_role in ["Report Owner", "Report Owner Executive"]:
+                action = "bulk_report_owner_approve"
+                values = {
+                    "report_owner_decision": ReportOwnerDecision.APPROVED.value,
+                    "report_owner_notes": notes or "Bulk approved",
+                    "report_owner_decided_by_id": user_id,
+                    "report_owner_decided_at": now,
+                    # Only fully approved when both approve; otherwise keep current status
+                    "status": self._status_expression(
+                        ScopingAttribute.tester_decision == TesterDecision.ACCEPT.value,
+                        AttributeStatus.APPROVED,
+                        ScopingAttribute.status
+                    )
+                }
+            else:
+                # Testers, and admin or other roles, make the tester decision
+                action = "bulk_tester_approve"
+                values = {
+                    "tester_decision": TesterDecision.ACCEPT.value,
+                    "tester_rationale": notes or "Bulk approved",
+                    "tester_decided_by_id": user_id,
+                    "tester_decided_at": now,
+                    # Submitted for report owner review unless the report owner already approved
+                    "status": self._status_expression(
+                        ScopingAttribute.report_owner_decision == ReportOwnerDecision.APPROVED.value,
+                        AttributeStatus.APPROVED,
+                        AttributeStatus.SUBMITTED
+                    )
+                }
             
+            approved_count, errors = await self._apply_bulk_decision(
+                attribute_ids, user_id, values, action, notes, version_id
+            )
             await self.db.commit()
             
             logger.info(f"Bulk approved {approved_count} attributes by {user_role}")
@@ -1534,92 +1499,55 @@ class ScopingService:
     
     async def bulk_reject_attributes(
         self,
-        attribute_ids: List[UUID],
+        attribute_ids: List[int],
         user_id: int,
         user_role: str,
         reason: str,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        version_id: Optional[UUID] = None
     ) -> Dict[str, Any]:
         """
         Bulk reject multiple scoping attributes.
         Automatically determines whether to apply tester or report owner decision based on user role.
         
         Args:
-            attribute_ids: List of attribute IDs to reject
+            attribute_ids: List of planning attribute IDs to reject
             user_id: User performing the rejection
             user_role: Role of the user performing the rejection
             reason: Reason for rejection
             notes: Optional additional notes
+            version_id: Version to decide in (defaults to the draft or pending version)
             
         Returns:
             Dictionary with results including count and any errors
         """
         try:
-            rejected_count = 0
-            errors = []
-            processed_versions = set()
-            
-            for attribute_id in attribute_ids:
-                try:
-                    # Get the attribute
-                    attribute = await self.db.get(ScopingAttribute, attribute_id)
-                    if not attribute:
-                        errors.append({
-                            "attribute_id": str(attribute_id),
-                            "error": "Attribute not found"
-                        })
-                        continue
-                    
-                    # Track which versions we're updating
-                    processed_versions.add(attribute.version_id)
-                    
-                    rejection_text = f"{reason}. {notes or ''}".strip()
-                    
-                    # Update based on user role
-                    if user_role in ["Tester", "Test Executive"]:
-                        # Set tester rejection
-                        attribute.tester_decision = TesterDecision.DECLINE
-                        attribute.tester_rationale = rejection_text
-                        attribute.tester_decided_by_id = user_id
-                        attribute.tester_decided_at = utc_now()
-                        
-                        # Mark as rejected if tester rejects
-                        attribute.status = AttributeStatus.REJECTED
-                        
-                    elif user_role in ["Report Owner", "Report Owner Executive"]:
-                        # Set report owner rejection
-                        attribute.report_owner_decision = ReportOwnerDecision.REJECTEDED
-                        attribute.report_owner_notes = rejection_text
-                        attribute.report_owner_decided_by_id = user_id
-                        attribute.report_owner_decided_at = utc_now()
-                        
-                        # Mark as rejected if report owner rejects
-                        attribute.status = AttributeStatus.REJECTED
-                        
-                    else:
-                        # Admin or other roles default to tester behavior
-                        attribute.tester_decision = TesterDecision.DECLINE
-                        attribute.tester_rationale = rejection_text
-                        attribute.tester_decided_by_id = user_id
-                        attribute.tester_decided_at = utc_now()
-                        attribute.status = AttributeStatus.REJECTED
-                    
-                    attribute.updated_by_id = user_id
-                    attribute.updated_at = utc_now()
-                    
-                    rejected_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error rejecting attribute {attribute_id}: {str(e)}")
-                    errors.append({
-                        "attribute_id": str(attribute_id),
-                        "error": str(e)
-                    })
-            
-            # Update version statistics for all affected versions
-            for version_id in processed_versions:
-                await self._update_version_statistics(version_id)
+            now = utc_now()
+            rejection_text = f"{reason}. {notes or ''}".strip()
+            
+            if user_role in ["Report Owner", "Report Owner Executive"]:
+                action = "bulk_report_owner_reject"
+                values = {
+                    "report_owner_decision": ReportOwnerDecision.REJECTED.value,
+                    "report_owner_notes": rejection_text,
+                    "report_owner_decided_by_id": user_id,
+                    "report_owner_decided_at": now,
+                    "status": AttributeStatus.REJECTED.value
+                }
+            else:
+                # Testers, and admin or other roles, make the tester decision
+                action = "bulk_tester_reject"
+                values = {
+                    "tester_decision": TesterDecision.DECLINE.value,
+                    "tester_rationale": rejection_text,
+                    "tester_decided_by_id": user_id,
+                    "tester_decided_at": now,
+                    "status": AttributeStatus.REJECTED.value
+                }
             
+            rejected_count, errors = await self._apply_bulk_decision(
+                attribute_ids, user_id, values, action, rejection_text, version_id
+            )
             await self.db.commit()
             
             logger.info(f"Bulk rejected {rejected_count} attributes by {user_role}")
@@ -1639,70 +1567,35 @@ class ScopingService:
     
     async def bulk_approve_report_owner(
         self,
-        attribute_ids: List[UUID],
+        attribute_ids: List[int],
         user_id: int,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        version_id: Optional[UUID] = None
     ) -> Dict[str, Any]:
         """
         Bulk approve multiple scoping attributes as report owner.
         
         Args:
-            attribute_ids: List of attribute IDs to approve
+            attribute_ids: List of planning attribute IDs to approve
             user_id: User performing the approval (must be report owner)
             notes: Optional notes for the approval
+            version_id: Version to decide in (defaults to the draft or pending version)
             
         Returns:
             Dictionary with results including count and any errors
         """
         try:
-            approved_count = 0
-            errors = []
-            processed_versions = set()
-            
-            for attribute_id in attribute_ids:
-                try:
-                    # Get the attribute
-                    attribute = await self.db.get(ScopingAttribute, attribute_id)
-                    if not attribute:
-                        errors.append({
-                            "attribute_id": str(attribute_id),
-                            "error": "Attribute not found"
-                        })
-                        continue
-                    
-                    # Verify tester has made a decision
-                    if not attribute.tester_decision:
-                        errors.append({
-                            "attribute_id": str(attribute_id),
-                            "error": "Tester decision required before report owner approval"
-                        })
-                        continue
-                    
-                    # Track which versions we're updating
-                    processed_versions.add(attribute.version_id)
-                    
-                    # Update report owner decision
-                    attribute.report_owner_decision = ReportOwnerDecision.APPROVED
-                    attribute.report_owner_notes = notes or "Bulk approved by report owner"
-                    attribute.report_owner_decided_by_id = user_id
-                    attribute.report_owner_decided_at = utc_now()
-                    attribute.status = AttributeStatus.APPROVED
-                    attribute.updated_by_id = user_id
-                    attribute.updated_at = utc_now()
-                    
-                    approved_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error approving attribute {attribute_id} as report owner: {str(e)}")
-                    errors.append({
-                        "attribute_id": str(attribute_id),
-                        "error": str(e)
-                    })
-            
-            # Update version statistics for all affected versions
-            for version_id in processed_versions:
-                await self._update_version_statistics(version_id)
-            
+            values = {
+                "report_owner_decision": ReportOwnerDecision.APPROVED.value,
+                "report_owner_notes": notes or "Bulk approved by report owner",
+                "report_owner_decided_by_id": user_id,
+                "report_owner_decided_at": utc_now(),
+                "status": AttributeStatus.APPROVED.value
+            }
+            approved_count, errors = await self._apply_bulk_decision(
+                attribute_ids, user_id, values, "bulk_report_owner_approve", notes, version_id,
+                require_tester_decision=True
+            )
             await self.db.commit()
             
             logger.info(f"Report owner bulk approved {approved_count} attributes")
@@ -1719,6 +1612,149 @@ class ScopingService:
             logger.error(f"Error in report owner bulk approve: {str(e)}")
             raise BusinessLogicError(f"Failed to bulk approve attributes as report owner: {str(e)}")
     
+    @staticmethod
+    def _status_expression(condition, status_if: AttributeStatus, otherwise):
+        """Attribute status computed in SQL from the row's current decisions"""
+        otherwise = otherwise.value if isinstance(otherwise, AttributeStatus) else otherwise
+        return cast(
+            case((condition, status_if.value), else_=otherwise),
+            ScopingAttribute.status.type
+        )
+    
+    async def _apply_bulk_decision(
+        self,
+        attribute_ids: List[int],
+        user_id: int,
+        values: Dict[str, Any],
+        action: str,
+        notes: Optional[str],
+        version_id: Optional[UUID] = None,
+        require_tester_decision: bool = False
+    ) -> Tuple[int, List[Dict[str, str]]]:
+        """
+        Apply one decision to many attributes with a single UPDATE ... RETURNING
+        
+        Writes one decision history row per updated attribute in a multi-row
+        insert and recomputes the statistics of the affected versions once.
+        
+        Returns:
+            Number of attributes decided and per-attribute errors for the rest
+        """
+        requested = list(dict.fromkeys(attribute_ids))
+        if not requested:
+            return 0, []
+        
+        if version_id is not None:
+            version_filter = ScopingAttribute.version_id == version_id
+        else:
+            # Decisions are made on the working version, never on approved or superseded history
+            version_filter = ScopingAttribute.version_id.in_(
+                select(ScopingVersion.version_id).where(
+                    ScopingVersion.version_status.in_([
+                        VersionStatus.DRAFT.value, VersionStatus.PENDING_APPROVAL.value
+                    ])
+                )
+            )
+        conditions = [ScopingAttribute.attribute_id == any_(bindparam("attribute_ids", requested, type_=ARRAY(Integer))), version_filter]
+        if require_tester_decision:
+            conditions.append(ScopingAttribute.tester_decision.isnot(None))
+        
+        # Self-join so RETURNING can report the values the update replaced
+        previous = aliased(ScopingAttribute)
+        decided_columns = [column for column in values if column.endswith("_decision")]
+        stmt = (
+            update(ScopingAttribute)
+            .where(
+                *conditions,
+                ScopingAttribute.version_id == previous.version_id,
+                ScopingAttribute.attribute_id == previous.attribute_id
+            )
+            .values(**values, updated_by_id=user_id, updated_at=utc_now())
+            .returning(
+                ScopingAttribute.version_id,
+                ScopingAttribute.attribute_id,
+                ScopingAttribute.phase_id,
+                ScopingAttribute.status,
+                previous.status.label("previous_status"),
+                *[getattr(previous, column).label(f"previous_{column}") for column in decided_columns]
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await self.db.execute(stmt)).mappings().all()
+        
+        decided_ids = {row["attribute_id"] for row in rows}
+        missing = [attribute_id for attribute_id in requested if attribute_id not in decided_ids]
+        errors = []
+        if missing:
+            undecided = set()
+            if require_tester_decision:
+                result = await self.db.execute(
+                    select(ScopingAttribute.attribute_id).where(
+                        ScopingAttribute.attribute_id == any_(bindparam("attribute_ids", missing, type_=ARRAY(Integer))), version_filter
+                    )
+                )
+                undecided = set(result.scalars().all())
+            for attribute_id in missing:
+                errors.append({
+                    "attribute_id": str(attribute_id),
+                    "error": "Tester decision required before report owner approval"
+                    if attribute_id in undecided else "Attribute not found"
+                })
+        
+        if rows:
+            await self._write_decision_history(rows, user_id, action, values, decided_columns, notes)
+            await self._update_versions_statistics({row["version_id"] for row in rows})
+        
+        return len(decided_ids), errors
+    
+    async def _write_decision_history(
+        self,
+        rows: List[Any],
+        user_id: int,
+        action: str,
+        values: Dict[str, Any],
+        decided_columns: List[str],
+        notes: Optional[str]
+    ) -> None:
+        """Record the decisions of a bulk action in the scoping audit log with one multi-row insert"""
+        phases = await self.db.execute(
+            select(WorkflowPhase.phase_id, WorkflowPhase.cycle_id, WorkflowPhase.report_id).where(
+                WorkflowPhase.phase_id.in_(list({row["phase_id"] for row in rows}))
+            )
+        )
+        phase_context = {phase.phase_id: phase for phase in phases}
+        
+        history = []
+        for row in rows:
+            phase = phase_context.get(row["phase_id"])
+            if phase is None:
+                continue
+            history.append({
+                "cycle_id": phase.cycle_id,
+                "report_id": phase.report_id,
+                "phase_id": row["phase_id"],
+                "action": action,
+                "performed_by": user_id,
+                "details": {
+                    "attribute_id": row["attribute_id"],
+                    "version_id": str(row["version_id"]),
+                    "notes": notes
+                },
+                "previous_values": {
+                    "status": row["previous_status"],
+                    **{column: row[f"previous_{column}"] for column in decided_columns}
+                },
+                "new_values": {
+                    "status": row["status"],
+                    **{column: values[column] for column in decided_columns}
+                },
+                "created_by_id": user_id,
+                "updated_by_id": user_id
+            })
+        
+        if history:
+            await self.db.execute(insert(ScopingAuditLog), history)
+    
     async def get_attribute_by_id(
         self,
         version_id: UUID,
@@ -1849,38 +1885,67 @@ class ScopingService:
         Args:
             version_id: Version ID to update statistics for
         """
+        await self._update_versions_statistics({version_id})
+    
+    async def _update_versions_statistics(self, version_ids: set) -> None:
+        """
+        Recompute the statistics of several versions with one UPDATE ... FROM aggregate.
+        
+        Args:
+            version_ids: Version IDs to update statistics for
+        """
+        if not version_ids:
+            return
         try:
-            # Get counts
-            stats_query = select(
-                func.count(ScopingAttribute.attribute_id).label('total'),
-                func.count(
-                    case(
-                        (ScopingAttribute.tester_decision == TesterDecision.ACCEPT, 1)
-                    )
-                ).label('scoped'),
-                func.count(
-                    case(
-                        (ScopingAttribute.tester_decision == TesterDecision.DECLINE, 1)
-                    )
-                ).label('declined'),
-                func.count(
-                    case(
-                        (ScopingAttribute.tester_decision == TesterDecision.OVERRIDE, 1)
-                    )
-                ).label('overrides')
-            ).where(ScopingAttribute.version_id == version_id)
-            
-            result = await self.db.execute(stats_query)
-            stats = result.one()
-            
-            # Update version
-            version = await self.db.get(ScopingVersion, version_id)
-            if version:
-                version.total_attributes = stats.total
-                version.scoped_attributes = stats.scoped
-                version.declined_attributes = stats.declined
-                version.override_count = stats.overrides
-                version.updated_at = utc_now()
+            stats = (
+                select(
+                    ScopingAttribute.version_id,
+                    func.count(ScopingAttribute.attribute_id).label('total'),
+                    func.count(
+                        case(
+                            (ScopingAttribute.tester_decision == TesterDecision.ACCEPT.value, 1)
+                        )
+                    ).label('scoped'),
+                    func.count(
+                        case(
+                            (ScopingAttribute.tester_decision == TesterDecision.DECLINE.value, 1)
+                        )
+                    ).label('declined'),
+                    func.count(
+                        case(
+                            (ScopingAttribute.tester_decision == TesterDecision.OVERRIDE.value, 1)
+                        )
+                    ).label('overrides')
+                )
+                .where(ScopingAttribute.version_id.in_(list(version_ids)))
+                .group_by(ScopingAttribute.version_id)
+                .subquery()
+            )
+            
+            await self.db.execute(
+                update(ScopingVersion)
+                .where(ScopingVersion.version_id == stats.c.version_id)
+                .values(
+                    total_attributes=stats.c.total,
+                    scoped_attributes=stats.c.scoped,
+                    declined_attributes=stats.c.declined,
+                    override_count=stats.c.overrides,
+                    updated_at=utc_now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            
+            # The UPDATE ... FROM bypasses the session; reload the statistics of versions already loaded
+            loaded_ids = [
+                obj.version_id for obj in self.db.identity_map.values()
+                if isinstance(obj, ScopingVersion) and obj.version_id in version_ids
+            ]
+            if loaded_ids:
+                await self.db.execute(
+                    select(ScopingVersion)
+                    .where(ScopingVersion.version_id.in_(loaded_ids))
+                    .execution_options(populate_existing=True)
+                )
                 
         except Exception as e:
             logger.error(f"Error updating version statistics: {str(e)}")
@@ -13,6 +13,7 @@ import aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 import numpy as np
+import pandas as pd
 from collections import defaultdict
 import psutil
 import gc
@@ -24,6 +25,7 @@ from app.models.profiling_enhanced import (
 )
 from app.models.data_source import DataSource
 from app.core.database import AsyncSessionLocal
+from app.services.profiling_rule_engine import CompiledRule, CompiledRuleEngine, RuleEngine
 
 logger = logging.getLogger(__name__)
 
@@ -43,10 +45,16 @@ class ProfilingContext:
 class StreamingProfiler:
     """Core streaming profiler engine"""
     
-    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
+    def __init__(
+        self,
+        redis_client: Optional[aioredis.Redis] = None,
+        use_compiled_engine: bool = True
+    ):
         self.redis = redis_client
         self.memory_tracker = MemoryTracker()
         self.rule_engine = RuleEngine()
+        self.compiled_engine = CompiledRuleEngine()
+        self.use_compiled_engine = use_compiled_engine
         self.stats_collector = StatisticsCollector()
     
     async def profile_partition(
@@ -62,6 +70,11 @@ class StreamingProfiler:
             checkpoint_counter = 0
             start_time = datetime.utcnow()
             
+            # Compile rules once for the whole partition
+            compiled_rules = (
+                self.compiled_engine.compile(context.rules) if self.use_compiled_engine else None
+            )
+            
             # Process data in batches
             batch = []
             async for record in data_stream:
@@ -69,11 +82,11 @@ class StreamingProfiler:
                 
                 if len(batch) >= context.batch_size:
                     # Process batch
-                    batch_results = await self._process_batch(batch, context)
+                    batch_results = await self._process_batch(batch, context, compiled_rules)
                     anomalies.extend(batch_results['anomalies'])
                     
                     # Update statistics
-                    self.stats_collector.update(batch_results['statistics'])
+                    self._update_statistics(batch_results['statistics'])
                     
                     records_processed += len(batch)
                     checkpoint_counter += len(batch)
@@ -93,8 +106,9 @@ class StreamingProfiler:
             
             # Process remaining records
             if batch:
-                batch_results = await self._process_batch(batch, context)
+                batch_results = await self._process_batch(batch, context, compiled_rules)
                 anomalies.extend(batch_results['anomalies'])
+                self._update_statistics(batch_results['statistics'])
                 records_processed += len(batch)
             
             # Create result
@@ -121,9 +135,18 @@ class StreamingProfiler:
     async def _process_batch(
         self, 
         batch: List[Dict[str, Any]], 
-        context: ProfilingContext
+        context: ProfilingContext,
+        compiled_rules: Optional[List['CompiledRule']] = None
     ) -> Dict[str, Any]:
         """Process a batch of records"""
+        if compiled_rules is not None:
+            # Column-wise evaluation of the whole batch
+            frame = pd.DataFrame.from_records(batch)
+            return {
+                'anomalies': self.compiled_engine.evaluate_batch(frame, compiled_rules),
+                'statistics': frame
+            }
+        
         anomalies = []
         batch_stats = defaultdict(list)
         
@@ -149,6 +172,13 @@ class StreamingProfiler:
             'statistics': batch_stats
         }
     
+    def _update_statistics(self, statistics: Any):
+        """Fold batch statistics (a frame or per-field value lists) into the collector"""
+        if isinstance(statistics, pd.DataFrame):
+            self.stats_collector.update_frame(statistics)
+        else:
+            self.stats_collector.update(statistics)
+    
     async def _save_checkpoint(self, context: ProfilingContext, records_processed: int):
         """Save processing checkpoint"""
         if self.redis:
@@ -168,133 +198,6 @@ class StreamingProfiler:
         logger.info(f"Flushing {len(anomalies)} anomalies to storage")
 
 
-class RuleEngine:
-    """Engine for evaluating profiling rules"""
-    
-    async def evaluate_record(
-        self, 
-        record: Dict[str, Any], 
-        rules: List[Dict[str, Any]]
-    ) -> Dict[str, Any]:
-        """Evaluate all rules against a record"""
-        anomalies = []
-        max_severity = 'low'
-        
-        for rule in rules:
-            try:
-                result = await self._evaluate_single_rule(record, rule)
-                if not result['passed']:
-                    anomalies.append({
-                        'rule_id': rule['id'],
-                        'rule_name': rule['name'],
-                        'category': rule['category'],
-                        'failure_reason': result['reason'],
-                        'field': rule.get('field'),
-                        'value': record.get(rule.get('field'))
-                    })
-                    
-                    if self._compare_severity(result['severity'], max_severity) > 0:
-                        max_severity = result['severity']
-                        
-            except Exception as e:
-                logger.error(f"Error evaluating rule {rule['id']}: {str(e)}")
-        
-        return {
-            'anomalies': anomalies,
-            'severity': max_severity
-        }
-    
-    async def _evaluate_single_rule(
-        self, 
-        record: Dict[str, Any], 
-        rule: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Evaluate a single rule"""
-        rule_type = rule['type']
-        
-        if rule_type == 'null_check':
-            return self._check_null(record, rule)
-        elif rule_type == 'pattern':
-            return self._check_pattern(record, rule)
-        elif rule_type == 'range':
-            return self._check_range(record, rule)
-        elif rule_type == 'custom':
-            return await self._evaluate_custom_rule(record, rule)
-        else:
-            return {'passed': True, 'severity': 'low'}
-    
-    def _check_null(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
-        """Check for null values"""
-        field = rule['field']
-        value = record.get(field)
-        
-        if value is None or value == '':
-            return {
-                'passed': False,
-                'reason': f"Field '{field}' is null or empty",
-                'severity': rule.get('severity', 'medium')
-            }
-        
-        return {'passed': True, 'severity': 'low'}
-    
-    def _check_pattern(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
-        """Check pattern matching"""
-        import re
-        
-        field = rule['field']
-        value = str(record.get(field, ''))
-        pattern = rule['pattern']
-        
-        if not re.match(pattern, value):
-            return {
-                'passed': False,
-                'reason': f"Field '{field}' does not match pattern '{pattern}'",
-                'severity': rule.get('severity', 'medium')
-            }
-        
-        return {'passed': True, 'severity': 'low'}
-    
-    def _check_range(self, record: Dict[str, Any], rule: Dict[str, Any]) -> Dict[str, Any]:
-        """Check value ranges"""
-        field = rule['field']
-        value = record.get(field)
-        
-        try:
-            numeric_value = float(value)
-            min_val = rule.get('min', float('-inf'))
-            max_val = rule.get('max', float('inf'))
-            
-            if numeric_value < min_val or numeric_value > max_val:
-                return {
-                    'passed': False,
-                    'reason': f"Field '{field}' value {numeric_value} outside range [{min_val}, {max_val}]",
-                    'severity': rule.get('severity', 'medium')
-                }
-        except (TypeError, ValueError):
-            return {
-                'passed': False,
-                'reason': f"Field '{field}' is not numeric",
-                'severity': 'high'
-            }
-        
-        return {'passed': True, 'severity': 'low'}
-    
-    async def _evaluate_custom_rule(
-        self, 
-        record: Dict[str, Any], 
-        rule: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Evaluate custom rule logic"""
-        # Custom rule evaluation would be implemented here
-        # This is a placeholder
-        return {'passed': True, 'severity': 'low'}
-    
-    def _compare_severity(self, sev1: str, sev2: str) -> int:
-        """Compare severity levels"""
-        severity_order = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
-        return severity_order.get(sev1, 0) - severity_order.get(sev2, 0)
-
-
 class StatisticsCollector:
     """Collects statistics during profiling"""
     
@@ -337,6 +240,36 @@ class StatisticsCollector:
                     field_stats['min_length'] = min(field_stats['min_length'], len(str_val))
                     field_stats['max_length'] = max(field_stats['max_length'], len(str_val))
     
+    def update_frame(self, frame: pd.DataFrame):
+        """Update statistics with a batch frame using column-wise operations"""
+        for field in frame.columns:
+            field_stats = self.stats[field]
+            values = frame[field]
+            non_null = values.dropna()
+            
+            field_stats['count'] += len(values)
+            field_stats['null_count'] += len(values) - len(non_null)
+            if non_null.empty:
+                continue
+            
+            text = non_null.astype(str)
+            
+            # Track distinct values (limit to prevent memory issues)
+            room = 1000 - len(field_stats['distinct_values'])
+            if room > 0:
+                field_stats['distinct_values'].update(text.unique()[:room])
+            
+            # Numeric statistics
+            numeric = pd.to_numeric(non_null, errors='coerce').dropna()
+            if not numeric.empty:
+                field_stats['numeric_sum'] += float(numeric.sum())
+                field_stats['numeric_count'] += len(numeric)
+            
+            # String length statistics
+            lengths = text.str.len()
+            field_stats['min_length'] = min(field_stats['min_length'], int(lengths.min()))
+            field_stats['max_length'] = max(field_stats['max_length'], int(lengths.max()))
+    
     def get_summary(self) -> Dict[str, Any]:
         """Get statistics summary"""
         summary = {}
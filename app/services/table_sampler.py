@@ -0,0 +1,164 @@
+"""
+Table Sampler
+Random row sampling for sample selection without sorting the whole table
+
+``ORDER BY RANDOM() LIMIT n`` reads and sorts every qualifying row, so its cost
+grows with the table. ``TableSampler`` instead reads a ``TABLESAMPLE`` slice
+sized from the planner's row estimate (oversampled for the stratum's expected
+selectivity), filters it, and orders only that slice. If a stratum turns out
+rarer than expected, the sample percentage grows adaptively until enough rows
+are found or the whole table has been considered.
+
+The default ``SYSTEM`` method reads only the sampled pages, so latency does not
+grow with the table, at the price of sampling the rows of a page together.
+``BERNOULLI`` picks individual rows but still reads every page; it is an opt-in
+for tables that are small or strongly clustered on the stratum columns.
+
+Both the slice (``REPEATABLE``) and the ordering within it (an md5 of the row
+and the seed) are derived from the seed, so the same seed regenerates the same
+sample set as long as the table has not changed.
+"""
+import secrets
+from typing import Any, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Growth of the sample percentage between attempts when a stratum is rarer than estimated
+MAX_SAMPLE_ROUNDS = 5
+MIN_GROWTH_FACTOR = 4.0
+
+
+def new_sampling_seed() -> int:
+    """Random seed to record with a sample set so it can be regenerated"""
+    return secrets.randbelow(2 ** 31 - 1) + 1
+
+
+def exclusion_clause(column_sql: str, values) -> str:
+    """``AND col NOT IN (...)`` for already selected values, or nothing if there are none"""
+    literals = ["'" + str(v).replace("'", "''") + "'" for v in values if v is not None]
+    if not literals:
+        return ""
+    return f"AND {column_sql} NOT IN ({','.join(literals)})"
+
+
+class TableSampler:
+    """Seeded, size-independent row sampler for one PostgreSQL table"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        schema_name: str,
+        table_name: str,
+        seed: int,
+        method: Optional[str] = None,
+        oversample_factor: Optional[float] = None,
+        exact_threshold: Optional[int] = None
+    ):
+        self.db = db
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.seed = int(seed)
+        self.method = (method or settings.sampling_tablesample_method).upper()
+        if self.method not in ('SYSTEM', 'BERNOULLI'):
+            raise ValueError(f"Unsupported TABLESAMPLE method: {self.method}")
+        self.oversample_factor = oversample_factor or settings.sampling_oversample_factor
+        self.exact_threshold = exact_threshold if exact_threshold is not None else settings.sampling_exact_threshold
+        self._estimated_rows: Optional[int] = None
+
+    @property
+    def qualified_table(self) -> str:
+        return f"{self.schema_name}.{self.table_name}"
+
+    @property
+    def order_sql(self) -> str:
+        """Deterministic pseudo-random order of the rows of alias ``t``"""
+        return f"md5(t::text || '{self.seed}')"
+
+    async def estimated_row_count(self) -> int:
+        """Planner row estimate, falling back to an exact count for never-analyzed tables"""
+        if self._estimated_rows is None:
+            result = await self.db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": self.qualified_table}
+            )
+            estimate = result.scalar()
+            if estimate is None or estimate <= 0:
+                result = await self.db.execute(text(f"SELECT COUNT(*) FROM {self.qualified_table}"))
+                estimate = result.scalar() or 0
+            self._estimated_rows = int(estimate)
+        return self._estimated_rows
+
+    async def sample(
+        self,
+        select_sql: str,
+        where_sql: str,
+        limit: int,
+        selectivity: float = 1.0
+    ) -> List[Any]:
+        """
+        Return up to ``limit`` rows of ``SELECT <select_sql> FROM table t WHERE <where_sql>``
+        in seeded random order
+
+        ``selectivity`` is the expected fraction of rows matching ``where_sql``; it only
+        sizes the first attempt, which is retried with a larger sample if too few rows match.
+        """
+        if limit <= 0:
+            return []
+
+        total_rows = await self.estimated_row_count()
+        if total_rows <= self.exact_threshold:
+            # Small table: sorting every qualifying row is cheap and exact
+            return await self._fetch(select_sql, where_sql, limit, None)
+
+        expected_matches = max(total_rows * max(selectivity, 1e-6), 1)
+        percentage = min(100.0, 100.0 * limit * self.oversample_factor / expected_matches)
+
+        rows: List[Any] = []
+        for attempt in range(MAX_SAMPLE_ROUNDS):
+            if attempt == MAX_SAMPLE_ROUNDS - 1:
+                # Last resort: scan everything so a rare stratum still fills its quota
+                percentage = 100.0
+            rows = await self._fetch(select_sql, where_sql, limit, percentage)
+            if len(rows) >= limit or percentage >= 100.0:
+                break
+
+            # Too rare for this slice: scale the next attempt by the observed shortfall
+            growth = limit * self.oversample_factor / len(rows) if rows else MIN_GROWTH_FACTOR ** 2
+            percentage = min(100.0, percentage * max(growth, MIN_GROWTH_FACTOR))
+            logger.info(
+                f"Sampled {len(rows)}/{limit} rows from {self.qualified_table}, "
+                f"retrying with TABLESAMPLE {self.method} ({percentage:.4f})"
+            )
+
+        return rows
+
+    async def _fetch(
+        self,
+        select_sql: str,
+        where_sql: str,
+        limit: int,
+        percentage: Optional[float]
+    ) -> List[Any]:
+        if percentage is None or percentage >= 100.0:
+            source = f"{self.qualified_table} t"
+        else:
+            source = (
+                f"{self.qualified_table} t TABLESAMPLE {self.method} ({percentage:.6f}) "
+                f"REPEATABLE ({self.seed})"
+            )
+
+        query = f"""
+            SELECT {select_sql}
+            FROM {source}
+            WHERE {where_sql or 'TRUE'}
+            ORDER BY {self.order_sql}
+            LIMIT {int(limit)}
+        """
+        result = await self.db.execute(text(query))
+        return result.fetchall()
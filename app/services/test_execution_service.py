@@ -21,14 +21,20 @@ from app.schemas.test_execution_unified import (
     TestExecutionSummaryResponse, TestExecutionDashboardResponse, BulkTestExecutionResponse,
     BulkReviewResponse, TestExecutionCompletionStatusResponse
 )
+from app.core.config import get_settings
 from app.core.exceptions import ValidationError, ResourceNotFoundError, BusinessLogicError
 from app.services.llm_service import HybridLLMService
 from app.services.database_connection_service import DatabaseConnectionService
 from app.services.value_extraction_service import ValueExtractionService
+from app.services.document_text_service import get_document_text_service
+from app.services.evidence_query_batcher import (
+    parse_evidence_query, build_batch_query, split_batch_rows, query_result_for_key
+)
 from app.core.logging import get_logger
 from app.utils.phase_helpers import get_cycle_report_from_phase
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 
 class TestExecutionService:
@@ -155,9 +161,10 @@ class TestExecutionService:
                 
                 # Create job record in Redis
                 redis_job_manager.create_job(
-                    job_id,
-                    job_type="test_execution",
+                    "test_execution",
+                    job_id=job_id,
                     metadata={
+                        "user_id": executed_by,
                         "execution_id": execution.id,
                         "test_case_id": request.test_case_id,
                         "evidence_id": request.evidence_id,
@@ -307,6 +314,217 @@ class TestExecutionService:
             await self._handle_execution_error(execution_id, str(e))
             raise BusinessLogicError(f"Failed to execute test case: {str(e)}")
     
+    async def execute_test_cases_batch(
+        self,
+        test_case_ids: List[str],
+        phase_id: int,
+        execution_reason: Any,
+        execution_method: Any,
+        executed_by: int
+    ) -> Dict[str, Any]:
+        """
+        Execute the database evidence of many test cases with one query per data source and query template
+        
+        Evidence queries that share a data source and differ only in their key literals
+        (see ``evidence_query_batcher``) are answered by one set-based statement per
+        ``test_execution_batch_size`` keys; executions, previous-execution flags and audit
+        entries are then written in bulk. Returns the created execution IDs by test case,
+        and as ``unbatched`` the test cases to run through ``create_test_execution``:
+        document evidence, queries that cannot be batched and groups whose statement failed.
+        """
+        started_at = datetime.utcnow()
+        test_case_ids = list(dict.fromkeys(test_case_ids))
+        evidence_by_test_case = await self._get_approved_evidence_bulk(test_case_ids)
+        sample_data_by_test_case = await self._get_sample_data_bulk(list(evidence_by_test_case))
+        
+        unbatched = []
+        connections: Dict[str, Optional[Dict[str, Any]]] = {}
+        groups: Dict[Tuple[str, Any], Dict[Tuple[str, ...], List[str]]] = {}
+        for test_case_id in test_case_ids:
+            evidence = evidence_by_test_case.get(test_case_id)
+            if (
+                not evidence
+                or evidence.get("evidence_type") != "data_source"
+                or not evidence.get("data_source_id")
+                or test_case_id not in sample_data_by_test_case
+            ):
+                unbatched.append(test_case_id)
+                continue
+            parsed = parse_evidence_query(evidence.get("query_text"))
+            data_source_id = str(evidence["data_source_id"])
+            if parsed and data_source_id not in connections:
+                connections[data_source_id] = await self._get_data_source_connection_details(data_source_id)
+            connection = connections.get(data_source_id)
+            if not parsed or not connection or connection["connection_type"] not in ("postgresql", "mysql"):
+                unbatched.append(test_case_id)
+                continue
+            template, key = parsed
+            groups.setdefault((data_source_id, template), {}).setdefault(key, []).append(test_case_id)
+        
+        extraction_service = ValueExtractionService()
+        batch_size = max(1, getattr(settings, 'test_execution_batch_size', 500))
+        completed = []
+        for (data_source_id, template), test_cases_by_key in groups.items():
+            connection = connections[data_source_id]
+            keys = list(test_cases_by_key)
+            for start in range(0, len(keys), batch_size):
+                chunk = keys[start:start + batch_size]
+                chunk_test_cases = [test_case_id for key in chunk for test_case_id in test_cases_by_key[key]]
+                query_started = datetime.utcnow()
+                try:
+                    query_result = await self.db_service.execute_query(
+                        connection_type=connection["connection_type"],
+                        connection_details=connection["connection_details"],
+                        query=build_batch_query(template, chunk),
+                        timeout=getattr(settings, 'test_execution_batch_timeout_seconds', 120.0)
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Batched evidence query on data source {data_source_id} failed, "
+                        f"executing its {len(chunk_test_cases)} test cases one by one: {str(e)}"
+                    )
+                    unbatched.extend(chunk_test_cases)
+                    continue
+                query_time_ms = int((datetime.utcnow() - query_started).total_seconds() * 1000)
+                
+                split = split_batch_rows(template, chunk, query_result.get("rows", []))
+                for key in chunk:
+                    if key not in split.rows_by_key:
+                        unbatched.extend(test_cases_by_key[key])
+                        continue
+                    key_result = query_result_for_key(split.rows_by_key[key])
+                    for test_case_id in test_cases_by_key[key]:
+                        extracted_values = extraction_service.extract_values_from_query_result(
+                            key_result,
+                            sample_data_by_test_case[test_case_id],
+                            evidence_by_test_case[test_case_id]["query_text"]
+                        )
+                        extracted_values["batch"] = {"keys": len(chunk), "query_time_ms": query_time_ms}
+                        completed.append((test_case_id, extracted_values, query_time_ms))
+        
+        execution_ids = {}
+        if completed:
+            try:
+                execution_ids = await self._create_batch_executions(
+                    completed,
+                    evidence_by_test_case,
+                    sample_data_by_test_case,
+                    phase_id,
+                    execution_reason,
+                    execution_method,
+                    executed_by,
+                    started_at
+                )
+            except Exception as e:
+                await self.db.rollback()
+                logger.error(f"Error saving batched test executions, executing them one by one: {str(e)}")
+                unbatched.extend(test_case_id for test_case_id, _, _ in completed)
+        
+        logger.info(
+            f"Batch execution: {len(execution_ids)} test cases from {len(groups)} query templates, "
+            f"{len(unbatched)} left for individual execution"
+        )
+        return {"execution_ids": execution_ids, "unbatched": unbatched}
+    
+    async def _create_batch_executions(
+        self,
+        completed: List[Tuple[str, Dict[str, Any], int]],
+        evidence_by_test_case: Dict[str, Dict[str, Any]],
+        sample_data_by_test_case: Dict[str, Dict[str, Any]],
+        phase_id: int,
+        execution_reason: Any,
+        execution_method: Any,
+        executed_by: int,
+        started_at: datetime
+    ) -> Dict[str, int]:
+        """Insert completed executions of a batch, superseding earlier executions, in one transaction"""
+        test_case_ids = [test_case_id for test_case_id, _, _ in completed]
+        
+        numbers_result = await self.db.execute(
+            select(TestExecution.test_case_id, func.max(TestExecution.execution_number))
+            .where(TestExecution.test_case_id.in_(test_case_ids))
+            .group_by(TestExecution.test_case_id)
+        )
+        last_numbers = {test_case_id: number or 0 for test_case_id, number in numbers_result.all()}
+        await self.db.execute(
+            update(TestExecution)
+            .where(TestExecution.test_case_id.in_(test_case_ids))
+            .values(is_latest_execution=False)
+        )
+        
+        completed_at = datetime.utcnow()
+        processing_time_ms = int((completed_at - started_at).total_seconds() * 1000)
+        executions = []
+        for test_case_id, extracted_values, query_time_ms in completed:
+            evidence = evidence_by_test_case[test_case_id]
+            sample_data = sample_data_by_test_case[test_case_id]
+            sample_value = await self._extract_sample_value(sample_data, test_case_id)
+            extracted_value = extracted_values.get("extracted_value")
+            analysis_results = self._build_analysis_results(
+                sample_value, extracted_values, sample_data, "batch_execution"
+            )
+            
+            execution = TestExecution(
+                phase_id=phase_id,
+                test_case_id=test_case_id,
+                evidence_id=evidence["id"],
+                execution_number=last_numbers.get(test_case_id, 0) + 1,
+                is_latest_execution=True,
+                execution_reason=execution_reason.value if hasattr(execution_reason, 'value') else execution_reason,
+                test_type="database_test",
+                analysis_method="database_query",
+                sample_value=str(sample_value) if sample_value is not None else None,
+                extracted_value=str(extracted_value) if extracted_value is not None else None,
+                expected_value=str(sample_value) if sample_value is not None else None,
+                # Don't auto-decide - just present the data
+                test_result="pending_review",
+                comparison_result=None,
+                variance_details={},
+                database_query_executed=extracted_values.get("query_executed"),
+                database_result_count=extracted_values.get("row_count", 0),
+                database_execution_time_ms=query_time_ms,
+                database_result_sample=self._convert_decimals_to_str(extracted_values["all_rows"][:5]) if extracted_values.get("all_rows") else None,
+                execution_status="completed",
+                started_at=started_at,
+                completed_at=completed_at,
+                processing_time_ms=processing_time_ms,
+                execution_method=execution_method.value if hasattr(execution_method, 'value') else execution_method,
+                executed_by=executed_by,
+                created_by=executed_by,
+                updated_by=executed_by,
+                evidence_validation_status="valid",
+                evidence_version_number=evidence.get("version_number", 1),
+                analysis_results=self._convert_decimals_to_str(analysis_results)
+            )
+            execution.execution_summary = await self._generate_execution_summary(execution)
+            executions.append(execution)
+        
+        self.db.add_all(executions)
+        await self.db.flush()
+        
+        audits = []
+        for execution in executions:
+            audits.append(TestExecutionAudit(
+                execution_id=execution.id,
+                action="created",
+                action_details={"execution_reason": execution.execution_reason, "execution_source": "batch_execution"},
+                performed_by=executed_by
+            ))
+            audits.append(TestExecutionAudit(
+                execution_id=execution.id,
+                action="completed",
+                action_details={
+                    "test_result": execution.test_result,
+                    "comparison_result": None,
+                    "processing_time_ms": execution.processing_time_ms
+                },
+                performed_by=executed_by
+            ))
+        self.db.add_all(audits)
+        await self.db.commit()
+        
+        return {execution.test_case_id: execution.id for execution in executions}
+    
     async def _execute_test_case(self, execution_id: int, sample_data: Dict[str, Any], evidence: Dict[str, Any]):
         """
         Internal method to execute test case with evidence analysis
@@ -344,17 +562,11 @@ class TestExecutionService:
                     import os
                     logger.info(f"Reading document from path: {file_path}")
                     if os.path.exists(file_path):
-                        if file_path.endswith('.pdf'):
-                            import PyPDF2
-                            with open(file_path, 'rb') as file:
-                                pdf_reader = PyPDF2.PdfReader(file)
-                                for page in pdf_reader.pages:
-                                    document_content += page.extract_text() + "\n"
-                            logger.info(f"Extracted PDF content, length: {len(document_content)}")
-                        else:
-                            with open(file_path, 'r') as file:
-                                document_content = file.read()
-                            logger.info(f"Read text file content, length: {len(document_content)}")
+                        document = await get_document_text_service().extract_file(
+                            file_path, file_hash=evidence.get("file_hash")
+                        )
+                        document_content = document.text
+                        logger.info(f"Extracted document content, length: {len(document_content)}")
                     else:
                         logger.warning(f"Document file not found: {file_path}")
                 
@@ -379,27 +591,9 @@ class TestExecutionService:
             extracted_value = extracted_values.get("extracted_value", "")
             
             # Build analysis results without auto-deciding pass/fail
-            analysis_results = {
-                "expected_value": sample_value,
-                "actual_value": extracted_value,
-                "primary_key_values": extracted_values.get("primary_key_values", {}),
-                # Add sample/expected primary key values
-                "sample_primary_key_values": sample_data.get("primary_key_attributes", {}),
-                "attribute_name": sample_data.get("attribute_name"),
-                "sample_identifier": sample_data.get("sample_identifier"),
-                "confidence_score": extracted_values.get("confidence_score", 1.0),
-                "extraction_details": extracted_values,
-                "analysis_timestamp": datetime.utcnow().isoformat(),
-                "requires_review": True,  # Always require human review
-                "execution_source": "sync_execution",  # Track execution source
-                # Include all query data for UI display (like RFI does)
-                "all_rows": extracted_values.get("all_rows", []),
-                "columns": extracted_values.get("columns", []),
-                "row_count": extracted_values.get("row_count", 0),
-                "extraction_method": extracted_values.get("extraction_method"),
-                # Include the full sample data for reference
-                "sample_data": sample_data.get("sample_data", {})
-            }
+            analysis_results = self._build_analysis_results(
+                sample_value, extracted_values, sample_data, "sync_execution"
+            )
             
             logger.info(f"[DEBUG] Synchronous execution - sample_value: {sample_value}")
             logger.info(f"[DEBUG] Synchronous execution - extracted_value: {extracted_value}")
@@ -469,6 +663,36 @@ class TestExecutionService:
             await self._handle_execution_error(execution_id, str(e))
             raise
     
+    def _build_analysis_results(
+        self,
+        sample_value: Any,
+        extracted_values: Dict[str, Any],
+        sample_data: Dict[str, Any],
+        execution_source: str
+    ) -> Dict[str, Any]:
+        """Build the analysis results presented for tester review"""
+        return {
+            "expected_value": sample_value,
+            "actual_value": extracted_values.get("extracted_value", ""),
+            "primary_key_values": extracted_values.get("primary_key_values", {}),
+            # Add sample/expected primary key values
+            "sample_primary_key_values": sample_data.get("primary_key_attributes", {}),
+            "attribute_name": sample_data.get("attribute_name"),
+            "sample_identifier": sample_data.get("sample_identifier"),
+            "confidence_score": extracted_values.get("confidence_score", 1.0),
+            "extraction_details": extracted_values,
+            "analysis_timestamp": datetime.utcnow().isoformat(),
+            "requires_review": True,  # Always require human review
+            "execution_source": execution_source,  # Track execution source
+            # Include all query data for UI display (like RFI does)
+            "all_rows": extracted_values.get("all_rows", []),
+            "columns": extracted_values.get("columns", []),
+            "row_count": extracted_values.get("row_count", 0),
+            "extraction_method": extracted_values.get("extraction_method"),
+            # Include the full sample data for reference
+            "sample_data": sample_data.get("sample_data", {})
+        }
+    
     async def _extract_value_from_evidence(self, evidence: Dict[str, Any], execution: TestExecution) -> Tuple[str, Dict[str, Any]]:
         """
         Extract value from evidence using appropriate method
@@ -526,24 +750,12 @@ class TestExecutionService:
                 import os
                 logger.info(f"Checking if file exists: {file_path}")
                 if file_path and os.path.exists(file_path):
-                    # For PDFs, we need to extract text first
-                    if file_path.endswith('.pdf'):
-                        # Import PDF extraction utility
-                        import PyPDF2
-                        logger.info(f"Reading PDF file: {file_path}")
-                        with open(file_path, 'rb') as file:
-                            pdf_reader = PyPDF2.PdfReader(file)
-                            document_content = ""
-                            logger.info(f"PDF has {len(pdf_reader.pages)} pages")
-                            for page in pdf_reader.pages:
-                                page_text = page.extract_text()
-                                document_content += page_text + "\n"
-                        logger.info(f"Extracted PDF content length: {len(document_content)}")
-                    else:
-                        logger.info(f"Reading text file: {file_path}")
-                        with open(file_path, 'r') as file:
-                            document_content = file.read()
-                        logger.info(f"Read text content length: {len(document_content)}")
+                    # Parsed off the event loop; repeat reads of the same file hit the cache
+                    document = await get_document_text_service().extract_file(
+                        file_path, file_hash=evidence.get("file_hash")
+                    )
+                    document_content = document.text
+                    logger.info(f"Extracted document content length: {len(document_content)} ({document.page_count} pages)")
                 else:
                     logger.warning(f"File does not exist: {file_path}")
             
@@ -618,8 +830,8 @@ class TestExecutionService:
                     connection_details = json.loads(connection_details)
                 except json.JSONDecodeError:
                     # Handle encrypted connection details if needed
-                    from app.core.encryption import EncryptionService
-                    encryption_service = EncryptionService()
+                    from app.core.encryption import get_encryption_service
+                    encryption_service = get_encryption_service()
                     connection_details = encryption_service.decrypt_dict(connection_details)
             
             # Use database service to execute query with correct parameters
@@ -952,6 +1164,7 @@ class TestExecutionService:
                     TestCaseEvidence.validation_status,
                     TestCaseEvidence.version_number,
                     TestCaseEvidence.file_path,
+                    TestCaseEvidence.file_hash,
                     TestCaseEvidence.original_filename,
                     TestCaseEvidence.planning_data_source_id,
                     TestCaseEvidence.rfi_data_source_id,
@@ -983,6 +1196,7 @@ class TestExecutionService:
                 "validation_status": evidence_row["validation_status"],
                 "version_number": evidence_row["version_number"],
                 "document_path": evidence_row["file_path"],
+                "file_hash": evidence_row["file_hash"],
                 "document_name": evidence_row["original_filename"],
                 "data_source_id": evidence_row["planning_data_source_id"] or evidence_row["rfi_data_source_id"],
                 "query_text": evidence_row["query_text"],
@@ -1282,6 +1496,95 @@ class TestExecutionService:
                 }
             }
     
+    async def _get_sample_data_bulk(self, test_case_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get sample data of many test cases, keyed by test case ID
+        
+        Reads the test cases and their samples with one query each and primary keys once
+        per report. Test cases without sample data are left out; ``_get_sample_data``
+        falls back to the evidence query for those.
+        """
+        import uuid
+        from app.models.request_info import CycleReportTestCase
+        from app.models.sample_selection import SampleSelectionSample
+        from app.models.workflow import WorkflowPhase
+        
+        ids_by_int = {}
+        for test_case_id in test_case_ids:
+            try:
+                ids_by_int[int(test_case_id)] = test_case_id
+            except (ValueError, TypeError):
+                continue
+        if not ids_by_int:
+            return {}
+        
+        result = await self.db.execute(
+            select(
+                CycleReportTestCase.id,
+                CycleReportTestCase.test_case_name,
+                CycleReportTestCase.attribute_name,
+                CycleReportTestCase.sample_id,
+                CycleReportTestCase.data_owner_id,
+                WorkflowPhase.cycle_id,
+                WorkflowPhase.report_id
+            )
+            .outerjoin(WorkflowPhase, WorkflowPhase.phase_id == CycleReportTestCase.phase_id)
+            .where(CycleReportTestCase.id.in_(sorted(ids_by_int)))
+        )
+        test_case_rows = result.mappings().fetchall()
+        
+        sample_ids = {}
+        for row in test_case_rows:
+            try:
+                sample_ids[row["sample_id"]] = uuid.UUID(str(row["sample_id"]))
+            except (ValueError, TypeError):
+                continue
+        samples = {}
+        if sample_ids:
+            sample_result = await self.db.execute(
+                select(
+                    SampleSelectionSample.sample_id,
+                    SampleSelectionSample.sample_data,
+                    SampleSelectionSample.sample_identifier
+                )
+                .where(SampleSelectionSample.sample_id.in_(sorted(set(sample_ids.values()), key=str)))
+            )
+            samples = {row["sample_id"]: row for row in sample_result.mappings()}
+        
+        primary_keys_by_report: Dict[Tuple[Any, Any], List[str]] = {}
+        sample_data_by_test_case = {}
+        for row in test_case_rows:
+            sample = samples.get(sample_ids.get(row["sample_id"]))
+            if not sample or not sample["sample_data"]:
+                continue
+            
+            report_scope = (row["cycle_id"], row["report_id"])
+            if report_scope not in primary_keys_by_report:
+                primary_keys_by_report[report_scope] = await self._get_primary_key_list(*report_scope)
+            primary_key_list = primary_keys_by_report[report_scope]
+            
+            test_case_id = ids_by_int[row["id"]]
+            attribute_value = sample["sample_data"].get(row["attribute_name"], "")
+            sample_data_by_test_case[test_case_id] = {
+                "test_case_id": test_case_id,
+                "sample_id": row["sample_id"],
+                "sample_value": attribute_value,
+                "expected_value": attribute_value,
+                "sample_data": sample["sample_data"],
+                "primary_key_attributes": {
+                    key: sample["sample_data"][key] for key in primary_key_list if key in sample["sample_data"]
+                },
+                "primary_key_list": primary_key_list,
+                "attribute_name": row["attribute_name"],
+                "sample_identifier": sample["sample_identifier"],
+                "context": {
+                    "test_case_name": row["test_case_name"],
+                    "data_owner_id": row["data_owner_id"]
+                }
+            }
+        
+        return sample_data_by_test_case
+    
     async def _extract_sample_value(self, sample_data: Dict[str, Any], test_case_id: str) -> str:
         """Extract expected value from sample data"""
         return sample_data.get("sample_value", "")
@@ -1511,6 +1814,29 @@ class TestExecutionService:
         
         return execution
     
+    def _approved_evidence_columns(self):
+        """Evidence columns read when picking the evidence a test case is executed against"""
+        from app.models.request_info import TestCaseEvidence
+        
+        return (
+            TestCaseEvidence.id,
+            TestCaseEvidence.evidence_type,
+            TestCaseEvidence.validation_status,
+            TestCaseEvidence.tester_decision,
+            TestCaseEvidence.version_number,
+            TestCaseEvidence.file_path,
+            TestCaseEvidence.file_hash,
+            TestCaseEvidence.original_filename,
+            TestCaseEvidence.planning_data_source_id,
+            TestCaseEvidence.rfi_data_source_id,
+            TestCaseEvidence.query_text,
+            TestCaseEvidence.test_case_id,
+            TestCaseEvidence.query_parameters,
+            TestCaseEvidence.sample_id,
+            TestCaseEvidence.data_owner_id,
+            TestCaseEvidence.submitted_at
+        )
+    
     async def _get_approved_evidence_for_test_case(self, test_case_id: str) -> Optional[Dict[str, Any]]:
         """Get approved evidence for test case"""
         from app.models.request_info import TestCaseEvidence
@@ -1525,23 +1851,7 @@ class TestExecutionService:
         # First check if there's any evidence at all
         # Use explicit columns to avoid lazy loading issues
         all_evidence_result = await self.db.execute(
-            select(
-                TestCaseEvidence.id,
-                TestCaseEvidence.evidence_type,
-                TestCaseEvidence.validation_status,
-                TestCaseEvidence.tester_decision,
-                TestCaseEvidence.version_number,
-                TestCaseEvidence.file_path,
-                TestCaseEvidence.original_filename,
-                TestCaseEvidence.planning_data_source_id,
-                TestCaseEvidence.rfi_data_source_id,
-                TestCaseEvidence.query_text,
-                TestCaseEvidence.test_case_id,
-                TestCaseEvidence.query_parameters,
-                TestCaseEvidence.sample_id,
-                TestCaseEvidence.data_owner_id,
-                TestCaseEvidence.submitted_at
-            )
+            select(*self._approved_evidence_columns())
             .where(
                 and_(
                     TestCaseEvidence.test_case_id == test_case_id_int,
@@ -1552,6 +1862,44 @@ class TestExecutionService:
         )
         all_evidence = all_evidence_result.mappings().fetchall()
         
+        return self._select_approved_evidence(test_case_id, all_evidence)
+    
+    async def _get_approved_evidence_bulk(self, test_case_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get approved evidence of many test cases with one query, keyed by test case ID"""
+        from app.models.request_info import TestCaseEvidence
+        
+        ids_by_int = {}
+        for test_case_id in test_case_ids:
+            try:
+                ids_by_int[int(test_case_id)] = test_case_id
+            except (ValueError, TypeError):
+                continue
+        if not ids_by_int:
+            return {}
+        
+        result = await self.db.execute(
+            select(*self._approved_evidence_columns())
+            .where(
+                and_(
+                    TestCaseEvidence.test_case_id.in_(sorted(ids_by_int)),
+                    TestCaseEvidence.is_current.is_(True)
+                )
+            )
+            .order_by(TestCaseEvidence.test_case_id, TestCaseEvidence.version_number.desc())
+        )
+        rows_by_test_case: Dict[int, List[Any]] = {}
+        for row in result.mappings().fetchall():
+            rows_by_test_case.setdefault(row["test_case_id"], []).append(row)
+        
+        evidence_by_test_case = {}
+        for test_case_id_int, rows in rows_by_test_case.items():
+            evidence = self._select_approved_evidence(ids_by_int[test_case_id_int], rows)
+            if evidence:
+                evidence_by_test_case[ids_by_int[test_case_id_int]] = evidence
+        return evidence_by_test_case
+    
+    def _select_approved_evidence(self, test_case_id: str, all_evidence: List[Any]) -> Optional[Dict[str, Any]]:
+        """Pick the evidence to execute from a test case's current evidence, newest version first"""
         if not all_evidence:
             logger.warning(f"No evidence found for test case {test_case_id}")
             return None
@@ -1599,6 +1947,7 @@ class TestExecutionService:
             "validation_status": evidence_row["validation_status"],
             "version_number": evidence_row["version_number"],
             "document_path": evidence_row["file_path"],
+            "file_hash": evidence_row["file_hash"],
             "document_name": evidence_row["original_filename"],
             "data_source_id": evidence_row["planning_data_source_id"] or evidence_row["rfi_data_source_id"],
             "query_text": evidence_row["query_text"],
@@ -1608,4 +1957,4 @@ class TestExecutionService:
                 "submitted_by": evidence_row["data_owner_id"],
                 "submitted_at": evidence_row["submitted_at"].isoformat() if evidence_row["submitted_at"] else None
             }
-        }
\ No newline at end of file
+        }
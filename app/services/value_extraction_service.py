@@ -131,6 +131,20 @@ class ValueExtractionService:
             parameters=sample_data
         )
         
+        return self.extract_values_from_query_result(query_result, sample_data, query_text)
+    
+    def extract_values_from_query_result(
+        self,
+        query_result: Dict[str, Any],
+        sample_data: Dict[str, Any],
+        query_text: str
+    ) -> Dict[str, Any]:
+        """
+        Extract the tested attribute and primary key values from the rows a query returned
+        
+        Shared by single query execution and batched execution, which runs the
+        queries of many test cases as one statement and hands each test case its rows.
+        """
         # Extract values from query result
         rows = query_result.get("rows", [])
         columns = query_result.get("columns", [])
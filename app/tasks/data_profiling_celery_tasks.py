@@ -11,6 +11,7 @@ from celery import Task, states
 from celery.result import AsyncResult
 
 from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal, SyncSessionLocal
 from app.services.llm_service import get_llm_service
 from app.services.data_profiling_service import DataProfilingService
@@ -412,7 +413,8 @@ def execute_profiling_rules_celery_task(
                 initial_failed=failed_rules,
                 initial_records=total_records_processed,
                 initial_anomalies=total_anomalies_found,
-                redis_job_manager=redis_job_manager
+                redis_job_manager=redis_job_manager,
+                checkpoint=checkpoint
             )
         )
         
@@ -453,7 +455,8 @@ async def _execute_profiling_rules_with_pause_support(
     initial_failed: int = 0,
     initial_records: int = 0,
     initial_anomalies: int = 0,
-    redis_job_manager = None
+    redis_job_manager = None,
+    checkpoint: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """Async helper for profiling rule execution with pause support"""
     
@@ -505,6 +508,23 @@ async def _execute_profiling_rules_with_pause_support(
             version.execution_job_id = task_id
             await db.commit()
             
+            execution_mode = (execution_config or {}).get(
+                'execution_mode', settings.profiling_execution_mode
+            )
+            if execution_mode == 'single_pass' and (not checkpoint or checkpoint.get('mode') == 'single_pass'):
+                return await _execute_rules_single_pass(
+                    task=task,
+                    task_id=task_id,
+                    db=db,
+                    version=version,
+                    version_id=version_id,
+                    rules=rules,
+                    profiling_service=profiling_service,
+                    execution_config=execution_config,
+                    checkpoint=checkpoint,
+                    redis_job_manager=redis_job_manager
+                )
+            
             # Initialize counters
             successful_rules = initial_successful
             failed_rules = initial_failed
@@ -699,6 +719,194 @@ async def _execute_profiling_rules_with_pause_support(
             raise
 
 
+async def _execute_rules_single_pass(
+    task: PausableTask,
+    task_id: str,
+    db: AsyncSession,
+    version: DataProfilingRuleVersion,
+    version_id: str,
+    rules: List[ProfilingRule],
+    profiling_service: DataProfilingService,
+    execution_config: Optional[Dict],
+    checkpoint: Optional[Dict[str, Any]] = None,
+    redis_job_manager = None
+) -> Dict[str, Any]:
+    """
+    Execute all approved rules of a version reading each data source once.
+    
+    Checkpoints are saved per chunk (not per rule) so a paused task resumes at
+    the next unread chunk of the data source it stopped in.
+    """
+    total_rules = len(rules)
+    
+    def on_progress(snapshot: Dict[str, Any]) -> None:
+        completed_rules = snapshot["completed_rules"]
+        progress_percentage = int((completed_rules / total_rules) * 100) if total_rules else 0
+        source_name = snapshot.get("current_data_source")
+        current_step = (
+            f"Profiling {source_name}: chunk {snapshot['chunks_done']} "
+            f"({snapshot['rows_processed']} rows)"
+            if source_name else f"Executed {completed_rules} of {total_rules} rules"
+        )
+        
+        task.save_checkpoint(task_id, {
+            **snapshot["checkpoint"],
+            'last_processed_index': completed_rules
+        })
+        
+        if redis_job_manager:
+            redis_job_manager.update_job_progress(
+                task_id,
+                progress_percentage=progress_percentage,
+                current_step=current_step,
+                total_steps=total_rules,
+                completed_steps=completed_rules,
+                message=f"Processed {snapshot['completed_groups']} of {snapshot['total_groups']} data source passes"
+            )
+        
+        task.update_state(
+            state='PROGRESS',
+            meta={
+                'current': completed_rules,
+                'total': total_rules,
+                'status': current_step,
+                'progress_percentage': progress_percentage
+            }
+        )
+    
+    logger.info(f"🔄 Executing {total_rules} rules in single-pass mode for version {version_id}")
+    
+    outcome = await profiling_service.execute_rules_single_pass(
+        rules,
+        execution_config or {},
+        checkpoint=checkpoint if checkpoint and checkpoint.get('mode') == 'single_pass' else None,
+        should_pause=lambda: task.is_paused(task_id),
+        on_progress=on_progress
+    )
+    
+    # Build per-rule results in the same shape as the per-rule execution loop
+    execution_results = {}
+    successful_rules = 0
+    failed_rules = 0
+    total_records_processed = 0
+    total_anomalies_found = 0
+    for rule_id, result in outcome["results"].items():
+        if result.get("execution_status") == "failed":
+            execution_results[rule_id] = {
+                "rule_name": result.get("rule_name"),
+                "rule_type": result.get("rule_type"),
+                "status": "failed",
+                "error": result.get("error"),
+                "execution_time_ms": 0
+            }
+            failed_rules += 1
+            continue
+        
+        execution_results[rule_id] = {
+            "rule_name": result.get("rule_name"),
+            "rule_type": result.get("rule_type"),
+            "status": "success",
+            "records_processed": result.get("records_processed", 0),
+            "records_passed": result.get("records_passed", 0),
+            "records_failed": result.get("records_failed", 0),
+            "pass_rate": result.get("pass_rate", 0.0),
+            "execution_time_ms": result.get("execution_time_ms", 0),
+            "quality_scores": result.get("quality_scores", {}),
+            "anomaly_details": result.get("anomaly_details", []),
+            "statistical_summary": result.get("statistical_summary", {})
+        }
+        successful_rules += 1
+        total_records_processed += result.get("records_processed", 0)
+        total_anomalies_found += len(result.get("anomaly_details", []))
+    
+    if outcome["status"] == "paused":
+        completed_rules = len(outcome["results"])
+        logger.info(f"⏸️ Task {task_id} is paused after {completed_rules} of {total_rules} rules")
+        task.save_checkpoint(task_id, {
+            **outcome["checkpoint"],
+            'last_processed_index': completed_rules,
+            'successful_rules': successful_rules,
+            'failed_rules': failed_rules,
+            'total_records_processed': total_records_processed,
+            'total_anomalies_found': total_anomalies_found
+        })
+        
+        if redis_job_manager:
+            redis_job_manager.update_job_progress(
+                task_id,
+                status="paused",
+                current_step=f"Paused after {completed_rules} of {total_rules} rules",
+                message=f"Task paused. Successful: {successful_rules}, Failed: {failed_rules}"
+            )
+        
+        task.update_state(
+            state='PAUSED',
+            meta={
+                'current': completed_rules,
+                'total': total_rules,
+                'status': f'Paused after {completed_rules} of {total_rules} rules',
+                'successful_rules': successful_rules,
+                'failed_rules': failed_rules
+            }
+        )
+        return {
+            'status': 'paused',
+            'last_processed_index': completed_rules,
+            'successful_rules': successful_rules,
+            'failed_rules': failed_rules,
+            'total_records_processed': total_records_processed,
+            'total_anomalies_found': total_anomalies_found
+        }
+    
+    # Update version with results
+    version.execution_completed_at = datetime.utcnow()
+    version.total_records_processed = total_records_processed
+    
+    # Calculate overall quality score as average pass rate
+    if successful_rules > 0:
+        total_pass_rate = sum(
+            result.get("pass_rate", 0)
+            for result in execution_results.values()
+            if result.get("status") == "success"
+        )
+        version.overall_quality_score = (total_pass_rate / successful_rules)
+    else:
+        version.overall_quality_score = 0
+    
+    await db.commit()
+    
+    summary = {
+        "total_rules": total_rules,
+        "successful_rules": successful_rules,
+        "failed_rules": failed_rules,
+        "total_records_processed": total_records_processed,
+        "total_anomalies_found": total_anomalies_found
+    }
+    execution_time_seconds = (
+        version.execution_completed_at - version.execution_started_at
+    ).total_seconds()
+    
+    if redis_job_manager:
+        redis_job_manager.complete_job(
+            task_id,
+            result={
+                "status": "success",
+                "version_id": version_id,
+                "summary": summary,
+                "execution_mode": "single_pass",
+                "execution_time_seconds": execution_time_seconds
+            }
+        )
+    
+    return {
+        "status": "completed",
+        "version_id": version_id,
+        "summary": summary,
+        "execution_results": execution_results,
+        "execution_time_seconds": execution_time_seconds
+    }
+
+
 @celery_app.task(name='app.tasks.data_profiling_celery_tasks.pause_profiling_generation')
 def pause_profiling_generation_task(task_id: str) -> Dict[str, Any]:
     """Pause a running profiling rule generation task"""
@@ -1193,10 +1401,20 @@ def execute_single_rule_sync(rule: ProfilingRule, execution_config: Dict, db) ->
         connection_config = data_source_row.connection_config
         
         # Connect to the data source and load data
-        import psycopg2
-        conn_str = f"host={connection_config.get('host', 'localhost')} port={connection_config.get('port', '5432')} dbname={connection_config.get('database', 'synapse_dt')} user=synapse_user password=synapse_password"
+        from contextlib import closing
+        from sqlalchemy.engine import URL
+        from app.core.data_source_pools import get_data_source_pool_registry
+        url = URL.create(
+            "postgresql+psycopg2",
+            username="synapse_user",
+            password="synapse_password",
+            host=connection_config.get('host', 'localhost'),
+            port=int(connection_config.get('port', 5432)),
+            database=connection_config.get('database', 'synapse_dt'),
+        )
+        engine = get_data_source_pool_registry().get_sync_engine(url, connection_config.get('max_pool_size'))
         
-        with psycopg2.connect(conn_str) as conn:
+        with closing(engine.raw_connection()) as conn:
             table_name = connection_config.get('table_name', 'data_table')
             schema_name = connection_config.get('schema', 'public')
             column_name = pde_mapping.pde_code  # This is the actual column name
@@ -348,14 +348,8 @@ def generate_scoping_recommendations(
         
         # Update job status to failed if job_id provided
         if job_id:
-            from app.core.background_jobs import BackgroundJobManager
-            job_manager = BackgroundJobManager()
-            job = job_manager.get_job(job_id)
-            if job:
-                job.status = job_manager.JobStatus.FAILED
-                job.error = str(exc)
-                job.completed_at = datetime.utcnow()
-                job_manager._save_jobs_to_file()
+            from app.core.background_jobs import job_manager
+            job_manager.complete_job(job_id, error=str(exc))
         
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
@@ -374,13 +368,10 @@ async def _generate_scoping_recommendations_async(
     job_manager = None
     job = None
     if job_id:
-        from app.core.background_jobs import BackgroundJobManager, JobStatus
-        job_manager = BackgroundJobManager()
+        from app.core.background_jobs import job_manager
         job = job_manager.get_job(job_id)
         if job:
-            job.status = JobStatus.RUNNING
-            job.started_at = datetime.utcnow()
-            job_manager._save_jobs_to_file()
+            job_manager.update_job_progress(job_id, status="running")
     
     async with AsyncSessionLocal() as db:
         try:
@@ -396,11 +387,13 @@ async def _generate_scoping_recommendations_async(
                 
                 # Update job progress
                 if job:
-                    job.progress_percentage = int((batch_num / total_batches) * 100)
-                    job.current_step = f"Processing batch {batch_num + 1} of {total_batches}"
-                    job.message = f"Generating LLM recommendations for {len(batch)} attributes..."
-                    job.completed_steps = batch_num
-                    job_manager._save_jobs_to_file()
+                    job_manager.update_job_progress(
+                        job_id,
+                        progress_percentage=int((batch_num / total_batches) * 100),
+                        current_step=f"Processing batch {batch_num + 1} of {total_batches}",
+                        message=f"Generating LLM recommendations for {len(batch)} attributes...",
+                        completed_steps=batch_num
+                    )
                 
                 # Generate recommendations for this batch
                 result = await llm_service.generate_scoping_recommendations(
@@ -412,10 +405,12 @@ async def _generate_scoping_recommendations_async(
             
             # Update job to save recommendations phase
             if job:
-                job.current_step = "Saving recommendations to database"
-                job.message = f"Saving {len(all_recommendations)} recommendations..."
-                job.progress_percentage = 90
-                job_manager._save_jobs_to_file()
+                job_manager.update_job_progress(
+                    job_id,
+                    current_step="Saving recommendations to database",
+                    message=f"Saving {len(all_recommendations)} recommendations...",
+                    progress_percentage=90
+                )
             
             # Save recommendations to database
             # Get the scoping version and add attributes with recommendations
@@ -478,16 +473,14 @@ async def _generate_scoping_recommendations_async(
             
             # Mark job as completed
             if job:
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.utcnow()
-                job.progress_percentage = 100
-                job.current_step = "Completed"
-                job.message = f"Successfully generated recommendations for {len(all_recommendations)} attributes"
-                job.result = {
+                job_manager.update_job_progress(
+                    job_id,
+                    message=f"Successfully generated recommendations for {len(all_recommendations)} attributes"
+                )
+                job_manager.complete_job(job_id, result={
                     "recommendations_count": len(all_recommendations),
                     "attributes_processed": len(attributes)
-                }
-                job_manager._save_jobs_to_file()
+                })
             
             return {
                 "status": "success",
@@ -501,9 +494,6 @@ async def _generate_scoping_recommendations_async(
             
             # Update job status to failed
             if job:
-                job.status = JobStatus.FAILED
-                job.error = str(e)
-                job.completed_at = datetime.utcnow()
-                job_manager._save_jobs_to_file()
+                job_manager.complete_job(job_id, error=str(e))
             
             raise
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Background tasks maintaining the dashboard metrics snapshots
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict
+
+from app.core.database import AsyncSessionLocal
+from app.core.celery_app import celery_app
+from app.services.metrics_snapshot_service import get_metrics_snapshot_service
+
+logger = logging.getLogger(__name__)
+
+
+async def _refresh_stale() -> int:
+    async with AsyncSessionLocal() as db:
+        return await get_metrics_snapshot_service(db).refresh_stale()
+
+
+async def _reconcile() -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        return await get_metrics_snapshot_service(db).reconcile()
+
+
+@celery_app.task(name='app.tasks.metrics_snapshot_tasks.refresh_stale_metrics_snapshots', ignore_result=True)
+def refresh_stale_metrics_snapshots() -> int:
+    """Recompute the snapshots of reports changed since their last computation"""
+    refreshed = asyncio.run(_refresh_stale())
+    if refreshed:
+        logger.info(f"Refreshed metrics snapshots of {refreshed} reports")
+    return refreshed
+
+
+@celery_app.task(name='app.tasks.metrics_snapshot_tasks.reconcile_metrics_snapshots')
+def reconcile_metrics_snapshots() -> Dict[str, Any]:
+    """Recompute every metrics snapshot and report drifted rows"""
+    result = asyncio.run(_reconcile())
+    logger.info(f"Reconciled metrics snapshots: {result}")
+    return result
@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy import select, and_
 
 from app.core.config import settings
-from app.core.job_manager import job_manager
+from app.core.background_jobs import job_manager
 from app.models.workflow import WorkflowPhase
 from app.models.observation_management import ObservationRecord
 from app.services.observation_detection_service import ObservationDetectionService
@@ -114,6 +114,7 @@ async def run_observation_detection_job(
                     progress_percentage=90,
                     metadata={
                         "processed_count": detection_results.get("processed_count", 0),
+                        "skipped_count": detection_results.get("skipped_count", 0),
                         "groups_created": detection_results.get("groups_created", 0),
                         "observations_created": detection_results.get("observations_created", 0)
                     }
@@ -201,9 +202,9 @@ async def check_and_create_observations_batch(
     # Create job
     job_id = job_manager.create_job(
         job_type="observation_detection",
-        description=f"Detect observations for phase {phase_id}",
-        created_by=user_id,
         metadata={
+            "description": f"Detect observations for phase {phase_id}",
+            "user_id": user_id,
             "phase_id": phase_id,
             "cycle_id": cycle_id,
             "report_id": report_id,
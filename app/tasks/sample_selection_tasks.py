@@ -4,7 +4,6 @@ Implements intelligent sampling with proper async patterns
 """
 
 import asyncio
-import json
 import logging
 import uuid
 from datetime import datetime
@@ -17,7 +16,7 @@ from sqlalchemy.orm.attributes import flag_modified
 from app.core.database import AsyncSessionLocal
 from app.core.config import settings
 from app.core.background_jobs import job_manager, BackgroundJobManager
-from app.core.redis_job_manager import get_redis_job_manager, RedisJobManager
+from app.core.redis_job_manager import get_redis_job_manager
 from app.core.exceptions import BusinessLogicError
 from app.models.workflow import WorkflowPhase
 from app.models.report_attribute import ReportAttribute
@@ -113,6 +112,8 @@ async def execute_intelligent_sampling_task(
                     conn_config = data_source.connection_config or {}
                     data_source_config = {
                         'type': 'database',
+                        # Keys the column statistics profiles shared with profiling and DQ scoring
+                        'data_source_id': data_source.id,
                         'criteria': {
                             'database_name': conn_config.get('database', conn_config.get('database_name')),
                             'schema_name': conn_config.get('schema', conn_config.get('schema_name', 'public')),
@@ -460,64 +461,24 @@ def execute_intelligent_sampling_celery_task(
     job_status = redis_job_manager.get_job_status(job_id)
     if not job_status:
         logger.warning(f"Job {job_id} not found in Redis, creating it manually")
-        # Create job data manually with specific ID
-        job_data = {
-            "job_id": job_id,
-            "job_type": "intelligent_sampling",
-            "status": "pending",
-            "progress_percentage": 0,
-            "current_step": "Created",
-            "total_steps": 0,
-            "completed_steps": 0,
-            "message": "Job created",
-            "result": None,
-            "error": None,
-            "created_at": datetime.utcnow().isoformat(),
-            "started_at": None,
-            "completed_at": None,
-            "metadata": {
-                "cycle_id": cycle_id,
-                "report_id": report_id,
-                "target_sample_size": target_sample_size,
-                "use_data_source": use_data_source,
-                "distribution": distribution,
-                "initiated_by": current_user_name,
-                "initiated_by_id": current_user_id
-            }
-        }
-        
         try:
-            # Store job data directly
-            redis_job_manager.redis_client.setex(
-                f"{redis_job_manager.job_prefix}{job_id}",
-                redis_job_manager.job_ttl,
-                json.dumps(job_data)
+            redis_job_manager.create_job(
+                "intelligent_sampling",
+                job_id=job_id,
+                metadata={
+                    "cycle_id": cycle_id,
+                    "report_id": report_id,
+                    "target_sample_size": target_sample_size,
+                    "use_data_source": use_data_source,
+                    "distribution": distribution,
+                    "initiated_by": current_user_name,
+                    "initiated_by_id": current_user_id
+                }
             )
-            # Add to active jobs set
-            redis_job_manager.redis_client.sadd(redis_job_manager.active_jobs_key, job_id)
             logger.info(f"✅ Created job {job_id} in Redis")
         except Exception as e:
             logger.error(f"Failed to create job in Redis: {e}")
     
-    # Create a custom job manager that uses Redis
-    class CeleryRedisJobManager:
-        def __init__(self, redis_manager):
-            self.redis_manager = redis_manager
-            
-        def update_job_progress(self, job_id, **kwargs):
-            return self.redis_manager.update_job_progress(job_id, **kwargs)
-            
-        def complete_job(self, job_id, result=None, error=None):
-            return self.redis_manager.complete_job(job_id, result=result, error=error)
-            
-        def get_job_status(self, job_id):
-            return self.redis_manager.get_job_status(job_id)
-    
-    # Replace global job_manager with Redis-based one for this execution
-    global job_manager
-    original_job_manager = job_manager
-    job_manager = CeleryRedisJobManager(redis_job_manager)
-    
     try:
         # Close any existing event loop to avoid conflicts
         try:
@@ -586,7 +547,4 @@ def execute_intelligent_sampling_celery_task(
     except Exception as e:
         logger.error(f"Error in Celery task: {str(e)}", exc_info=True)
         job_manager.complete_job(job_id, error=str(e))
-        raise
-    finally:
-        # Restore original job manager
-        job_manager = original_job_manager
\ No newline at end of file
+        raise
\ No newline at end of file
@@ -12,6 +12,7 @@ from datetime import datetime
 from app.core.database import AsyncSessionLocal
 from app.core.background_jobs import job_manager
 from app.services.llm_service import get_llm_service
+from app.services.llm_batch_executor import LLMBatchExecutor
 from app.services.scoping_service import ScopingService
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -56,40 +57,35 @@ async def _generate_scoping_recommendations_async(
             
             logger.info(f"📊 Processing {len(attributes_to_process)} attributes in {total_batches} batches of {batch_size}")
             
-            for batch_idx in range(0, len(attributes_to_process), batch_size):
-                batch_attrs = attributes_to_process[batch_idx:batch_idx + batch_size]
-                batch_num = (batch_idx // batch_size) + 1
+            async def run_batch(batch_idx: int, batch_attrs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                batch_num = batch_idx + 1
+                logger.info(f"Processing batch {batch_num}/{total_batches} with {len(batch_attrs)} attributes")
                 
-                # Update progress for this batch
-                base_progress = 10
-                batch_progress = int(base_progress + (60 * batch_num / total_batches))
-                job_manager.update_job_progress(
-                    job_id,
-                    progress_percentage=batch_progress,
-                    current_step=f"Processing batch {batch_num} of {total_batches}",
-                    message=f"Generating recommendations for {len(batch_attrs)} attributes"
+                batch_result = await llm_service.generate_scoping_recommendations(
+                    attributes=batch_attrs,
+                    report_type=report_context.get("report_name")
                 )
                 
-                logger.info(f"Processing batch {batch_num}/{total_batches} with {len(batch_attrs)} attributes")
+                logger.info(f"🔍 DEBUG: batch_result keys: {list(batch_result.keys())}")
+                logger.info(f"🔍 DEBUG: batch_result: {json.dumps(batch_result, default=str)[:500]}")
                 
-                try:
-                    batch_result = await llm_service.generate_scoping_recommendations(
-                        attributes=batch_attrs,
-                        report_type=report_context.get("report_name")
-                    )
-                    
-                    logger.info(f"🔍 DEBUG: batch_result keys: {list(batch_result.keys())}")
-                    logger.info(f"🔍 DEBUG: batch_result: {json.dumps(batch_result, default=str)[:500]}")
-                    
-                    batch_recommendations = batch_result.get("recommendations", [])
-                    all_recommendations.extend(batch_recommendations)
-                    
-                    logger.info(f"Batch {batch_num}/{total_batches} completed: {len(batch_recommendations)} recommendations received")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing batch {batch_num}: {str(e)}")
-                    # Continue with next batch instead of failing entirely
+                batch_recommendations = batch_result.get("recommendations", [])
+                logger.info(f"Batch {batch_num}/{total_batches} completed: {len(batch_recommendations)} recommendations received")
+                return batch_recommendations
+            
+            # Batches run concurrently within the provider rate limits; results keep input order
+            batches = [
+                attributes_to_process[i:i + batch_size]
+                for i in range(0, len(attributes_to_process), batch_size)
+            ]
+            executor = LLMBatchExecutor(job_id=job_id, progress_range=(10, 70), label="recommendation batches")
+            batch_results = await executor.run(batches, run_batch, return_exceptions=True)
+            for batch_idx, batch_recommendations in enumerate(batch_results):
+                if isinstance(batch_recommendations, Exception):
+                    logger.error(f"Error processing batch {batch_idx + 1}: {str(batch_recommendations)}")
+                    # Continue with the other batches instead of failing entirely
                     continue
+                all_recommendations.extend(batch_recommendations)
             
             logger.info(f"Completed all batches. Total recommendations received: {len(all_recommendations)}")
             
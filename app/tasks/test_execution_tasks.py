@@ -161,8 +161,8 @@ async def execute_test_case_task(
                             connection_details = json.loads(connection_details)
                         except json.JSONDecodeError:
                             # Handle encrypted connection details if needed
-                            from app.core.encryption import EncryptionService
-                            encryption_service = EncryptionService()
+                            from app.core.encryption import get_encryption_service
+                            encryption_service = get_encryption_service()
                             connection_details = encryption_service.decrypt_dict(connection_details)
                     
                     # Prepare evidence with connection details
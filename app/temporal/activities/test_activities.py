@@ -1,15 +1,20 @@
 """Temporal activities for test execution"""
 
 from temporalio import activity
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
+import asyncio
 import logging
 
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.models.test_execution import TestExecution
 from app.models.request_info import CycleReportTestCase
 from app.models.report_attribute import ReportAttribute
-from app.temporal.shared.types import ActivityResult, TestExecutionData
+from app.models.sample_selection import SampleSelectionSample, SampleSelectionVersion, SampleDecision, VersionStatus
+from app.models.workflow import WorkflowPhase
+from app.temporal.shared.constants import TEST_EXECUTION_SHARD_SIZE
+from app.temporal.shared.types import ActivityResult, TestExecutionData, TestExecutionShard, build_test_shards
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +49,9 @@ async def create_test_cases_activity(
                         created_by=created_by
                     )
                     db.add(test_case)
+                    await db.flush()
                     created_cases.append({
+                        "id": test_case.id,
                         "attribute_id": attr_id,
                         "attribute_name": attribute.attribute_name
                     })
@@ -68,6 +75,43 @@ async def create_test_cases_activity(
         )
 
 
+@activity.defn
+async def load_test_sample_ids_activity(cycle_id: int, report_id: int) -> ActivityResult:
+    """Load the IDs of the samples approved in the report's approved sample selection version"""
+    try:
+        async with get_db() as db:
+            from sqlalchemy import select
+            
+            stmt = select(SampleSelectionSample.sample_id).join(
+                SampleSelectionVersion,
+                SampleSelectionVersion.version_id == SampleSelectionSample.version_id
+            ).join(
+                WorkflowPhase,
+                WorkflowPhase.phase_id == SampleSelectionSample.phase_id
+            ).where(
+                WorkflowPhase.cycle_id == cycle_id,
+                WorkflowPhase.report_id == report_id,
+                SampleSelectionVersion.version_status == VersionStatus.APPROVED.value,
+                SampleSelectionSample.tester_decision == SampleDecision.APPROVED.value
+            ).order_by(SampleSelectionSample.sample_identifier)
+            
+            result = await db.execute(stmt)
+            sample_ids = [str(sample_id) for sample_id in result.scalars().all()]
+            
+            return ActivityResult(
+                success=True,
+                data={"sample_ids": sample_ids}
+            )
+            
+    except Exception as e:
+        logger.error(f"Error loading test sample IDs: {str(e)}")
+        return ActivityResult(
+            success=False,
+            data={},
+            error_message=str(e)
+        )
+
+
 @activity.defn
 async def execute_test_activity(test_data: TestExecutionData) -> ActivityResult:
     """Execute a single test"""
@@ -122,46 +166,158 @@ async def execute_test_activity(test_data: TestExecutionData) -> ActivityResult:
         )
 
 
+async def _run_test_shard(
+    shard: TestExecutionShard,
+    start_offset: int = 0,
+    progress: Optional[Dict[str, Any]] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Execute the work items of a shard in order, starting at ``start_offset``
+    
+    ``progress`` carries the counts of items completed by an earlier attempt.
+    A failing item is counted and the shard moves on, so one bad evidence query
+    does not fail the shard.
+    """
+    progress = dict(progress or {"completed": 0, "passed": 0, "failed": 0, "errors": 0, "results": []})
+    
+    for offset in range(start_offset, len(shard.work_items)):
+        test_case_id, sample_id = shard.work_items[offset]
+        test_data = TestExecutionData(
+            test_case_id=test_case_id,
+            sample_id=sample_id,
+            attribute_id=1,  # Would be fetched from test case
+            test_type="database",
+            expected_value="Expected",
+            actual_value="Expected"  # Simulated
+        )
+        
+        result = await execute_test_activity(test_data)
+        
+        if result.success:
+            if result.data.get("test_passed"):
+                progress["passed"] += 1
+            else:
+                progress["failed"] += 1
+            progress["results"].append(result.data)
+        else:
+            progress["errors"] += 1
+        progress["completed"] = offset + 1
+        
+        if on_progress:
+            on_progress(progress)
+    
+    return progress
+
+
+@activity.defn
+async def execute_test_shard_activity(shard: TestExecutionShard) -> ActivityResult:
+    """
+    Execute one shard of a batch test execution
+    
+    Heartbeats after every item; a retried attempt resumes after the last item
+    recorded in the heartbeat instead of re-running the shard.
+    """
+    try:
+        start_offset = 0
+        progress = None
+        heartbeat_details = activity.info().heartbeat_details
+        if heartbeat_details:
+            progress = heartbeat_details[0]
+            start_offset = progress.get("completed", 0)
+            logger.info(f"Resuming test shard {shard.shard_index} at item {start_offset}/{len(shard.work_items)}")
+        
+        progress = await _run_test_shard(
+            shard,
+            start_offset=start_offset,
+            progress=progress,
+            on_progress=lambda current: activity.heartbeat(current)
+        )
+        
+        return ActivityResult(
+            success=True,
+            data={
+                "shard_index": shard.shard_index,
+                "total_tests": progress["passed"] + progress["failed"],
+                "passed": progress["passed"],
+                "failed": progress["failed"],
+                "errors": progress["errors"],
+                "results": progress["results"]
+            }
+        )
+        
+    except Exception as e:
+        # Raised so Temporal retries the shard, resuming from the last heartbeat
+        logger.error(f"Error in test shard {shard.shard_index}: {str(e)}")
+        raise
+
+
 @activity.defn
 async def batch_execute_tests_activity(
     cycle_report_id: int,
     test_case_ids: List[int],
     sample_ids: List[int]
 ) -> ActivityResult:
-    """Execute multiple tests in batch"""
+    """
+    Execute multiple tests in batch
+    
+    The test case x sample pairs are split into shards that run concurrently, at most
+    ``temporal_test_shard_parallelism`` at a time. Heartbeats carry the counts of
+    finished shards, so a retried batch only runs the shards that had not finished.
+    Per-test results are recorded by each execution and are not returned, which keeps
+    the heartbeat and result payloads independent of the batch size.
+    Workflows that can schedule activities themselves should fan out
+    ``execute_test_shard_activity`` instead, which makes every shard its own retry unit.
+    """
     try:
-        results = []
-        failed_count = 0
-        passed_count = 0
+        settings = get_settings()
+        shards = build_test_shards(
+            cycle_report_id,
+            test_case_ids,
+            sample_ids,
+            getattr(settings, 'temporal_test_shard_size', TEST_EXECUTION_SHARD_SIZE)
+        )
         
-        for test_case_id in test_case_ids:
-            for sample_id in sample_ids:
-                # Execute individual test
-                test_data = TestExecutionData(
-                    test_case_id=test_case_id,
-                    sample_id=sample_id,
-                    attribute_id=1,  # Would be fetched from test case
-                    test_type="database",
-                    expected_value="Expected",
-                    actual_value="Expected"  # Simulated
-                )
-                
-                result = await execute_test_activity(test_data)
-                
-                if result.success:
-                    if result.data.get("test_passed"):
-                        passed_count += 1
-                    else:
-                        failed_count += 1
-                    results.append(result.data)
+        completed_shards: Dict[str, Dict[str, Any]] = {}
+        heartbeat_details = activity.info().heartbeat_details
+        if heartbeat_details:
+            completed_shards = dict(heartbeat_details[0].get("completed_shards", {}))
+            logger.info(f"Resuming batch test execution with {len(completed_shards)}/{len(shards)} shards done")
+        
+        semaphore = asyncio.Semaphore(max(1, getattr(settings, 'temporal_test_shard_parallelism', 4)))
+        
+        def heartbeat():
+            activity.heartbeat({
+                "completed_shards": completed_shards,
+                "total_shards": len(shards)
+            })
+        
+        async def run_shard(shard: TestExecutionShard):
+            async with semaphore:
+                progress = await _run_test_shard(shard, on_progress=lambda _: heartbeat())
+                # Keys are strings so the details survive the JSON round trip unchanged
+                completed_shards[str(shard.shard_index)] = {
+                    "passed": progress["passed"],
+                    "failed": progress["failed"],
+                    "errors": progress["errors"]
+                }
+                heartbeat()
+        
+        pending = [shard for shard in shards if str(shard.shard_index) not in completed_shards]
+        await asyncio.gather(*[run_shard(shard) for shard in pending])
+        
+        summaries = [completed_shards[str(shard.shard_index)] for shard in shards]
+        passed_count = sum(summary["passed"] for summary in summaries)
+        failed_count = sum(summary["failed"] for summary in summaries)
         
         return ActivityResult(
             success=True,
             data={
-                "total_tests": len(results),
+                "total_tests": passed_count + failed_count,
                 "passed": passed_count,
                 "failed": failed_count,
-                "results": results
+                "errors": sum(summary["errors"] for summary in summaries),
+                "shards": len(shards)
             }
         )
         
@@ -17,6 +17,11 @@ DEFAULT_ACTIVITY_TIMEOUT = 300  # 5 minutes
 LLM_ACTIVITY_TIMEOUT = 600  # 10 minutes
 REPORT_GENERATION_TIMEOUT = 1800  # 30 minutes
 
+# Sharded test execution
+TEST_EXECUTION_SHARD_SIZE = 25  # Test case x sample pairs per shard activity
+TEST_EXECUTION_MAX_PARALLEL_SHARDS = 8  # Shard activities a workflow keeps in flight
+TEST_SHARD_HEARTBEAT_TIMEOUT = 60  # Seconds without a heartbeat before a shard is retried
+
 # Retry policies
 DEFAULT_RETRY_ATTEMPTS = 3
 LLM_RETRY_ATTEMPTS = 2
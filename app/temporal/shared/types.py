@@ -135,6 +135,33 @@ class TestExecutionData:
     test_passed: Optional[bool] = None
 
 
+@dataclass
+class TestExecutionShard:
+    """A slice of a batch test execution, run and retried as one unit"""
+    cycle_report_id: int
+    shard_index: int
+    work_items: List[List[Any]]  # [test_case_id, sample_id] pairs
+
+
+def build_test_shards(
+    cycle_report_id: int,
+    test_case_ids: List[int],
+    sample_ids: List[Any],
+    shard_size: int
+) -> List[TestExecutionShard]:
+    """Split the test case x sample cross product into shards, in a stable order"""
+    work_items = [[test_case_id, sample_id] for test_case_id in test_case_ids for sample_id in sample_ids]
+    shard_size = max(1, shard_size)
+    return [
+        TestExecutionShard(
+            cycle_report_id=cycle_report_id,
+            shard_index=index,
+            work_items=work_items[start:start + shard_size]
+        )
+        for index, start in enumerate(range(0, len(work_items), shard_size))
+    ]
+
+
 @dataclass
 class ObservationData:
     """Data for observation management"""
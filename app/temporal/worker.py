@@ -22,8 +22,8 @@ from app.temporal.activities import (
     start_phase_activity, complete_phase_activity,
     check_phase_dependencies_activity,
     # Test activities
-    create_test_cases_activity, execute_test_activity,
-    batch_execute_tests_activity, validate_test_results_activity,
+    create_test_cases_activity, load_test_sample_ids_activity, execute_test_activity,
+    batch_execute_tests_activity, execute_test_shard_activity, validate_test_results_activity,
     # Notification activities
     send_email_notification_activity, create_in_app_notification_activity,
     send_phase_completion_notification_activity,
@@ -75,6 +75,11 @@ class EnhancedTemporalWorker:
         self.workers = []
         self.settings = get_settings()
     
+    def _max_concurrent_activities(self, task_queue: str) -> int:
+        """Parallelism cap of a task queue's activities on this worker"""
+        caps = getattr(self.settings, 'temporal_max_concurrent_activities', {}) or {}
+        return max(1, int(caps.get(task_queue, 100)))
+    
     async def start(self):
         """Start all workers"""
         try:
@@ -88,6 +93,7 @@ class EnhancedTemporalWorker:
             workflow_worker = Worker(
                 self.client,
                 task_queue=TASK_QUEUE_WORKFLOW,
+                max_concurrent_activities=self._max_concurrent_activities(TASK_QUEUE_WORKFLOW),
                 workflows=[
                     # Workflows that comply with Temporal sandbox
                     TestCycleWorkflow,
@@ -101,8 +107,10 @@ class EnhancedTemporalWorker:
                     complete_phase_activity,
                     check_phase_dependencies_activity,
                     create_test_cases_activity,
+                    load_test_sample_ids_activity,
                     execute_test_activity,
                     batch_execute_tests_activity,
+                    execute_test_shard_activity,
                     validate_test_results_activity,
                     send_phase_completion_notification_activity,
                     create_in_app_notification_activity,
@@ -128,6 +136,7 @@ class EnhancedTemporalWorker:
             llm_worker = Worker(
                 self.client,
                 task_queue=TASK_QUEUE_LLM,
+                max_concurrent_activities=self._max_concurrent_activities(TASK_QUEUE_LLM),
                 workflows=[LLMAnalysisWorkflow],
                 activities=[
                     generate_test_attributes_activity,
@@ -144,6 +153,7 @@ class EnhancedTemporalWorker:
             notification_worker = Worker(
                 self.client,
                 task_queue=TASK_QUEUE_NOTIFICATION,
+                max_concurrent_activities=self._max_concurrent_activities(TASK_QUEUE_NOTIFICATION),
                 activities=[
                     send_email_notification_activity,
                     create_in_app_notification_activity,
@@ -156,6 +166,7 @@ class EnhancedTemporalWorker:
             report_worker = Worker(
                 self.client,
                 task_queue=TASK_QUEUE_REPORT,
+                max_concurrent_activities=self._max_concurrent_activities(TASK_QUEUE_REPORT),
                 activities=[
                     # Report generation activities would go here
                     execute_workflow_activity  # Can handle report activities dynamically
@@ -180,7 +191,9 @@ class EnhancedTemporalWorker:
             await worker.shutdown()
         
         # Client doesn't need explicit close in newer versions
-        pass
+        # Activities share the process-wide data source pools; close them once the workers are done
+        from app.core.data_source_pools import get_data_source_pool_registry
+        await get_data_source_pool_registry().close_all()
         
         logger.info("Workers shut down successfully")
 
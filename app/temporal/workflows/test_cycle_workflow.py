@@ -4,13 +4,16 @@ from temporalio import workflow
 from temporalio.common import RetryPolicy
 from datetime import timedelta
 from typing import List, Dict, Any
+import asyncio
 import logging
 
 # Import only data classes and enums - no activities
 from app.temporal.shared import (
     TestCycleWorkflowInput, WorkflowContext, PhaseResult,
     WorkflowStatus, PhaseStatus, WORKFLOW_PHASES,
-    DEFAULT_ACTIVITY_TIMEOUT, DEFAULT_RETRY_ATTEMPTS
+    DEFAULT_ACTIVITY_TIMEOUT, DEFAULT_RETRY_ATTEMPTS,
+    TestExecutionShard, build_test_shards,
+    TEST_EXECUTION_SHARD_SIZE, TEST_EXECUTION_MAX_PARALLEL_SHARDS, TEST_SHARD_HEARTBEAT_TIMEOUT
 )
 
 # DO NOT import activities directly - this violates Temporal's sandbox
@@ -213,8 +216,29 @@ class TestCycleWorkflow:
                     retry_policy=retry_policy
                 )
                 
-                # Execute tests in batches
-                if test_cases.get("test_cases"):
+                if workflow.patched("sharded-test-execution"):
+                    # Execute tests in shards, each its own activity with its own retries
+                    created_test_cases = (test_cases.get("data") or {}).get("test_cases", [])
+                    if created_test_cases:
+                        samples = await workflow.execute_activity(
+                            "load_test_sample_ids_activity",
+                            args=[context.cycle_id, context.report_id],
+                            start_to_close_timeout=DEFAULT_ACTIVITY_TIMEOUT,
+                            retry_policy=retry_policy
+                        )
+                        shard_results = await self._execute_test_shards(
+                            context,
+                            [tc["id"] for tc in created_test_cases],
+                            (samples.get("data") or {}).get("sample_ids", []),
+                            retry_policy
+                        )
+                        phase_result.data["tests_executed"] = sum(r.get("total_tests", 0) for r in shard_results)
+                        phase_result.data["tests_passed"] = sum(r.get("passed", 0) for r in shard_results)
+                        phase_result.data["tests_failed"] = sum(r.get("failed", 0) for r in shard_results)
+                        phase_result.data["shards"] = len(shard_results)
+                
+                # Histories started before sharding replay the single batch activity
+                elif test_cases.get("test_cases"):
                     batch_result = await workflow.execute_activity(
                         "batch_execute_tests_activity",
                         {
@@ -237,4 +261,39 @@ class TestCycleWorkflow:
             workflow.logger.error(f"Phase {phase_name} failed: {str(e)}")
             raise
         
-        return phase_result
\ No newline at end of file
+        return phase_result
+    
+    async def _execute_test_shards(
+        self,
+        context: WorkflowContext,
+        test_case_ids: List[int],
+        sample_ids: List[int],
+        retry_policy: RetryPolicy
+    ) -> List[Dict[str, Any]]:
+        """
+        Fan the test case x sample pairs out to shard activities, a bounded number at a time
+        
+        Completed shards are recorded in the workflow history, so a retried or replayed
+        workflow only runs the shards that have not finished; a shard that is retried
+        resumes after the last item it heartbeated.
+        """
+        shards = build_test_shards(
+            context.cycle_report_id, test_case_ids, sample_ids, TEST_EXECUTION_SHARD_SIZE
+        )
+        semaphore = asyncio.Semaphore(TEST_EXECUTION_MAX_PARALLEL_SHARDS)
+        
+        async def run_shard(shard: TestExecutionShard) -> Dict[str, Any]:
+            async with semaphore:
+                result = await workflow.execute_activity(
+                    "execute_test_shard_activity",
+                    shard,
+                    start_to_close_timeout=timedelta(minutes=10),
+                    heartbeat_timeout=timedelta(seconds=TEST_SHARD_HEARTBEAT_TIMEOUT),
+                    retry_policy=retry_policy
+                )
+            return result.get("data", {})
+        
+        workflow.logger.info(
+            f"Executing {len(test_case_ids) * len(sample_ids)} tests in {len(shards)} shards"
+        )
+        return list(await asyncio.gather(*[run_shard(shard) for shard in shards]))
\ No newline at end of file